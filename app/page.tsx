@@ -11,9 +11,10 @@ import ContentHighlightsSection, {
 } from '@/components/home/ContentHighlightsSection'
 import CTASection from '@/components/home/CTASection'
 import type { EventCardProps } from '@/components/events/EventCard'
-import { getBlogPosts, type BlogPost } from '@/lib/api/blog-service'
+import { type BlogPost } from '@/lib/api/blog-service'
 import { getJoinedEvents } from '@/lib/api/auth-service'
-import { getEvents, type Event } from '@/lib/api/events'
+import { type Event } from '@/lib/api/events'
+import { getHome } from '@/lib/api/home'
 
 const formatDate = (date: Date): string => {
   const day = date.getDate().toString().padStart(2, '0')
@@ -221,25 +222,6 @@ export default function HomePage() {
   const [isLoadingRegistered, setIsLoadingRegistered] = useState(true)
   const [isLoadingUpcoming, setIsLoadingUpcoming] = useState(true)
 
-  useEffect(() => {
-    const fetchApprovedBlogs = async () => {
-      try {
-        setIsFetchingPosts(true)
-        const response = await getBlogPosts(1, 4, undefined, 'approved')
-        if (response.posts.length > 0) {
-          setPosts(response.posts.map(mapBlogPostToHighlight))
-        }
-      } catch (error) {
-        console.error('Failed to load blog posts for home:', error)
-        // Keep static content on error
-      } finally {
-        setIsFetchingPosts(false)
-      }
-    }
-
-    fetchApprovedBlogs()
-  }, [])
-
   useEffect(() => {
     const fetchRegisteredEvents = async () => {
       try {
@@ -259,28 +241,27 @@ export default function HomePage() {
   }, [])
 
   useEffect(() => {
-    const fetchUpcomingEvents = async () => {
+    const fetchHome = async () => {
       try {
+        setIsFetchingPosts(true)
         setIsLoadingUpcoming(true)
-        const response = await getEvents(1, 12)
-        // Filter for upcoming events (date >= today)
-        const today = new Date()
-        today.setHours(0, 0, 0, 0)
-        const upcoming = response.events.filter(event => {
-          const eventDate = new Date(event.date)
-          eventDate.setHours(0, 0, 0, 0)
-          return eventDate >= today
-        }).slice(0, 12)
-        setUpcomingEvents(upcoming.map(mapEventToCardProps))
+        // Upcoming approved events and the latest approved posts in one request
+        const home = await getHome(12, 4)
+        setUpcomingEvents(home.upcoming_events.map(mapEventToCardProps))
+        if (home.blog_posts.length > 0) {
+          setPosts(home.blog_posts.map(mapBlogPostToHighlight))
+        }
       } catch (error) {
-        console.error('Failed to load upcoming events:', error)
+        console.error('Failed to load home page data:', error)
+        // Keep static content on error
         setUpcomingEvents([])
       } finally {
+        setIsFetchingPosts(false)
         setIsLoadingUpcoming(false)
       }
     }
 
-    fetchUpcomingEvents()
+    fetchHome()
   }, [])
 
   return (
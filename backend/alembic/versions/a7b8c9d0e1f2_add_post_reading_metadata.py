@@ -0,0 +1,30 @@
+"""add_post_reading_metadata
+
+Revision ID: a7b8c9d0e1f2
+Revises: f6a7b8c9d0e1
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "a7b8c9d0e1f2"
+down_revision = "f6a7b8c9d0e1"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add reading metadata columns to blog_posts (filled by backfill_post_metadata.py)."""
+    op.add_column("blog_posts", sa.Column("word_count", sa.Integer(), nullable=True))
+    op.add_column("blog_posts", sa.Column("reading_minutes", sa.Integer(), nullable=True))
+    op.add_column("blog_posts", sa.Column("first_image_url", sa.String(length=500), nullable=True))
+
+
+def downgrade() -> None:
+    """Drop the reading metadata columns."""
+    op.drop_column("blog_posts", "first_image_url")
+    op.drop_column("blog_posts", "reading_minutes")
+    op.drop_column("blog_posts", "word_count")
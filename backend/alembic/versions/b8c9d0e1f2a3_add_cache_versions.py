@@ -0,0 +1,35 @@
+"""add_cache_versions
+
+Revision ID: b8c9d0e1f2a3
+Revises: a7b8c9d0e1f2
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "b8c9d0e1f2a3"
+down_revision = "a7b8c9d0e1f2"
+branch_labels = None
+depends_on = None
+
+CACHE_TAGS = ("posts", "events", "users")
+
+
+def upgrade() -> None:
+    """Create cache_versions with a row per cache tag, so writers only ever update."""
+    cache_versions = op.create_table(
+        "cache_versions",
+        sa.Column("tag", sa.String(length=50), nullable=False),
+        sa.Column("version", sa.BigInteger(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), server_default=sa.text("CURRENT_TIMESTAMP")),
+        sa.PrimaryKeyConstraint("tag"),
+    )
+    op.bulk_insert(cache_versions, [{"tag": tag, "version": 0} for tag in CACHE_TAGS])
+
+
+def downgrade() -> None:
+    """Drop cache_versions."""
+    op.drop_table("cache_versions")
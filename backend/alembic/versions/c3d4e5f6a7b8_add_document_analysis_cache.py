@@ -0,0 +1,54 @@
+"""add_document_analysis_cache
+
+Revision ID: c3d4e5f6a7b8
+Revises: 0df00e14983a, abcd1234addpaysession
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision = "c3d4e5f6a7b8"
+# Also merges the two heads left by the post_type and payment_sessions migrations
+down_revision = ("0df00e14983a", "abcd1234addpaysession")
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create document_analysis_cache table."""
+    long_text = sa.Text().with_variant(mysql.LONGTEXT(), "mysql")
+    op.create_table(
+        "document_analysis_cache",
+        sa.Column("id", sa.String(length=255), nullable=False),
+        sa.Column("cache_key", sa.String(length=64), nullable=False),
+        sa.Column("content_sha256", sa.String(length=64), nullable=False),
+        sa.Column("filename", sa.String(length=500), nullable=True),
+        sa.Column("content", long_text, nullable=False),
+        sa.Column("seo_text", long_text, nullable=False),
+        sa.Column("preview_urls", sa.JSON(), nullable=False),
+        sa.Column("document_url", sa.String(length=1000), nullable=True),
+        sa.Column("page_count", sa.Integer(), nullable=True),
+        sa.Column("warning", sa.String(length=500), nullable=True),
+        sa.Column("size_bytes", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("hit_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.text("CURRENT_TIMESTAMP")),
+        sa.Column("last_used_at", sa.DateTime(), server_default=sa.text("CURRENT_TIMESTAMP")),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_document_analysis_cache_id", "document_analysis_cache", ["id"], unique=False)
+    op.create_index("ix_document_analysis_cache_cache_key", "document_analysis_cache", ["cache_key"], unique=True)
+    op.create_index("ix_document_analysis_cache_content_sha256", "document_analysis_cache", ["content_sha256"], unique=False)
+    op.create_index("ix_document_analysis_cache_last_used_at", "document_analysis_cache", ["last_used_at"], unique=False)
+
+
+def downgrade() -> None:
+    """Drop document_analysis_cache table."""
+    op.drop_index("ix_document_analysis_cache_last_used_at", table_name="document_analysis_cache")
+    op.drop_index("ix_document_analysis_cache_content_sha256", table_name="document_analysis_cache")
+    op.drop_index("ix_document_analysis_cache_cache_key", table_name="document_analysis_cache")
+    op.drop_index("ix_document_analysis_cache_id", table_name="document_analysis_cache")
+    op.drop_table("document_analysis_cache")
@@ -0,0 +1,28 @@
+"""add_document_job_slices
+
+Revision ID: c9d0e1f2a3b4
+Revises: b8c9d0e1f2a3
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "c9d0e1f2a3b4"
+down_revision = "b8c9d0e1f2a3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add the partial output and slice lease of document jobs processed within requests."""
+    op.add_column("document_jobs", sa.Column("partial", sa.JSON(), nullable=True))
+    op.add_column("document_jobs", sa.Column("lease_expires_at", sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Drop the slice columns."""
+    op.drop_column("document_jobs", "lease_expires_at")
+    op.drop_column("document_jobs", "partial")
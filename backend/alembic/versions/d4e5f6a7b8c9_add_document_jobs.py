@@ -0,0 +1,48 @@
+"""add_document_jobs
+
+Revision ID: d4e5f6a7b8c9
+Revises: c3d4e5f6a7b8
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "d4e5f6a7b8c9"
+down_revision = "c3d4e5f6a7b8"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create document_jobs table."""
+    op.create_table(
+        "document_jobs",
+        sa.Column("id", sa.String(length=255), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False, server_default="queued"),
+        sa.Column("filename", sa.String(length=500), nullable=True),
+        sa.Column("content_type", sa.String(length=255), nullable=True),
+        sa.Column("kind", sa.String(length=10), nullable=True),
+        sa.Column("source_key", sa.String(length=1000), nullable=True),
+        sa.Column("content_sha256", sa.String(length=64), nullable=True),
+        sa.Column("page_count", sa.Integer(), nullable=True),
+        sa.Column("pages_done", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("result", sa.JSON(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.text("CURRENT_TIMESTAMP")),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_document_jobs_id", "document_jobs", ["id"], unique=False)
+    op.create_index("ix_document_jobs_status", "document_jobs", ["status"], unique=False)
+
+
+def downgrade() -> None:
+    """Drop document_jobs table."""
+    op.drop_index("ix_document_jobs_status", table_name="document_jobs")
+    op.drop_index("ix_document_jobs_id", table_name="document_jobs")
+    op.drop_table("document_jobs")
@@ -0,0 +1,85 @@
+"""add_document_index
+
+Revision ID: e5f6a7b8c9d0
+Revises: d4e5f6a7b8c9
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision = "e5f6a7b8c9d0"
+down_revision = "d4e5f6a7b8c9"
+branch_labels = None
+depends_on = None
+
+LongText = sa.Text().with_variant(mysql.LONGTEXT(), "mysql")
+
+
+def upgrade() -> None:
+    """Create documents, their term index, asset URLs and post links."""
+    op.create_table(
+        "documents",
+        sa.Column("id", sa.String(length=255), nullable=False),
+        sa.Column("owner_id", sa.String(length=255), nullable=True),
+        sa.Column("filename", sa.String(length=500), nullable=True),
+        sa.Column("kind", sa.String(length=10), nullable=True),
+        sa.Column("content_type", sa.String(length=255), nullable=True),
+        sa.Column("content_sha256", sa.String(length=64), nullable=False),
+        sa.Column("storage_key", sa.String(length=1000), nullable=True),
+        sa.Column("url", sa.String(length=1000), nullable=True),
+        sa.Column("page_count", sa.Integer(), nullable=True),
+        sa.Column("text", LongText, nullable=False),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.text("CURRENT_TIMESTAMP")),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["owner_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_documents_id", "documents", ["id"], unique=False)
+    op.create_index("ix_documents_owner_id", "documents", ["owner_id"], unique=False)
+    op.create_index("ix_documents_content_sha256", "documents", ["content_sha256"], unique=True)
+
+    op.create_table(
+        "document_terms",
+        sa.Column("term", sa.String(length=64), nullable=False),
+        sa.Column("document_id", sa.String(length=255), nullable=False),
+        sa.ForeignKeyConstraint(["document_id"], ["documents.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("term", "document_id"),
+    )
+    op.create_index("ix_document_terms_document_id", "document_terms", ["document_id"], unique=False)
+
+    op.create_table(
+        "document_assets",
+        sa.Column("url_hash", sa.String(length=64), nullable=False),
+        sa.Column("document_id", sa.String(length=255), nullable=False),
+        sa.ForeignKeyConstraint(["document_id"], ["documents.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("url_hash", "document_id"),
+    )
+    op.create_index("ix_document_assets_document_id", "document_assets", ["document_id"], unique=False)
+
+    op.create_table(
+        "post_documents",
+        sa.Column("post_id", sa.String(length=255), nullable=False),
+        sa.Column("document_id", sa.String(length=255), nullable=False),
+        sa.ForeignKeyConstraint(["post_id"], ["blog_posts.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["document_id"], ["documents.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("post_id", "document_id"),
+    )
+    op.create_index("ix_post_documents_document_id", "post_documents", ["document_id"], unique=False)
+
+
+def downgrade() -> None:
+    """Drop the document index tables."""
+    op.drop_index("ix_post_documents_document_id", table_name="post_documents")
+    op.drop_table("post_documents")
+    op.drop_index("ix_document_assets_document_id", table_name="document_assets")
+    op.drop_table("document_assets")
+    op.drop_index("ix_document_terms_document_id", table_name="document_terms")
+    op.drop_table("document_terms")
+    op.drop_index("ix_documents_content_sha256", table_name="documents")
+    op.drop_index("ix_documents_owner_id", table_name="documents")
+    op.drop_index("ix_documents_id", table_name="documents")
+    op.drop_table("documents")
@@ -0,0 +1,39 @@
+"""add_image_assets
+
+Revision ID: f6a7b8c9d0e1
+Revises: e5f6a7b8c9d0
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "f6a7b8c9d0e1"
+down_revision = "e5f6a7b8c9d0"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create image_assets for cover image variants."""
+    op.create_table(
+        "image_assets",
+        sa.Column("id", sa.String(length=64), nullable=False),
+        sa.Column("width", sa.Integer(), nullable=False),
+        sa.Column("height", sa.Integer(), nullable=False),
+        sa.Column("thumbnail_url", sa.String(length=500), nullable=False),
+        sa.Column("card_url", sa.String(length=500), nullable=False),
+        sa.Column("hero_url", sa.String(length=500), nullable=False),
+        sa.Column("placeholder", sa.String(length=2000), nullable=False),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.text("CURRENT_TIMESTAMP")),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_image_assets_id", "image_assets", ["id"], unique=False)
+
+
+def downgrade() -> None:
+    """Drop image_assets."""
+    op.drop_index("ix_image_assets_id", table_name="image_assets")
+    op.drop_table("image_assets")
@@ -0,0 +1,49 @@
+"""
+Serve objects from the local or in-memory storage backend.
+
+Mounted at ``LOCAL_STORAGE_BASE_URL`` outside serverless environments; with
+the R2 backend it still serves legacy files from ``LOCAL_STORAGE_DIR``.
+"""
+import asyncio
+from typing import Optional, Union
+
+from fastapi import APIRouter, HTTPException, Request
+from starlette.responses import Response
+
+from app.core.config import settings
+from app.services.storage import (
+    LocalStorageBackend,
+    MemoryStorageBackend,
+    StorageError,
+    StorageObjectNotFound,
+    get_storage_backend,
+)
+
+router = APIRouter()
+
+_legacy_backend: Optional[LocalStorageBackend] = None
+
+
+def _serving_backend() -> Union[LocalStorageBackend, MemoryStorageBackend]:
+    global _legacy_backend
+    try:
+        backend = get_storage_backend()
+    except StorageError:
+        backend = None
+    if isinstance(backend, (LocalStorageBackend, MemoryStorageBackend)):
+        return backend
+    if _legacy_backend is None:
+        _legacy_backend = LocalStorageBackend(settings.LOCAL_STORAGE_DIR)
+    return _legacy_backend
+
+
+@router.api_route("/{key:path}", methods=["GET", "HEAD"], include_in_schema=False)
+async def serve_upload(key: str, request: Request) -> Response:
+    """Serve a stored object, honouring single byte-range requests."""
+    # stat, the metadata sidecar and backend setup are blocking filesystem calls
+    try:
+        return await asyncio.to_thread(
+            lambda: _serving_backend().serve(key, request.headers.get("range"), head=request.method == "HEAD")
+        )
+    except StorageObjectNotFound as exc:
+        raise HTTPException(status_code=404, detail="File not found") from exc
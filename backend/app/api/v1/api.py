@@ -7,11 +7,14 @@ from sqlalchemy import text
 from app.api.v1.endpoints import (
     admin,
     auth,
+    batch,
     blog,
     content,
     documents,
     email_subscriptions,
     events,
+    home,
+    images,
     notifications,
     password_reset,
     payment,
@@ -26,13 +29,16 @@ api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
 api_router.include_router(blog.router, prefix="/blog", tags=["blog"])
 api_router.include_router(content.router, prefix="/content", tags=["content"])
 api_router.include_router(events.router, prefix="/events", tags=["events"])
+api_router.include_router(home.router, prefix="/home", tags=["home"])
 api_router.include_router(payment.router, prefix="/payment", tags=["payment"])
 api_router.include_router(documents.router, prefix="/documents", tags=["documents"])
+api_router.include_router(images.router, prefix="/images", tags=["images"])
 api_router.include_router(admin.router, prefix="/admin", tags=["admin"])
 api_router.include_router(reports.router, prefix="/reports", tags=["reports"])
 api_router.include_router(notifications.router, prefix="/notifications", tags=["notifications"])
 api_router.include_router(email_subscriptions.router, prefix="/email", tags=["email-subscriptions"])
 api_router.include_router(password_reset.router, prefix="/password", tags=["password-reset"])
+api_router.include_router(batch.router, prefix="/batch", tags=["batch"])
 
 
 def extract_db_name_from_url(database_url: str) -> str:
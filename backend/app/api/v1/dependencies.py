@@ -1,7 +1,7 @@
 """
 Common dependencies for API endpoints
 """
-from fastapi import Header, HTTPException, status
+from fastapi import Depends, Header, HTTPException, status
 from typing import Optional
 from app.core.security import decode_access_token
 from app.core.database import get_db
@@ -11,7 +11,7 @@ from app.models.user import User
 
 def get_current_user(
     authorization: Optional[str] = Header(None, alias="Authorization"),
-    db: Session = get_db()
+    db: Session = Depends(get_db)
 ) -> User:
     """Get current authenticated user from token"""
     if not authorization or not authorization.startswith("Bearer "):
@@ -30,7 +30,7 @@ def get_current_user(
         )
     
     user_id = payload.get("sub")
-    user = db.query(User).filter(User.id == user_id).first()
+    user = db.get(User, user_id)
     
     if not user:
         raise HTTPException(
@@ -5,7 +5,9 @@ from typing import List, Optional, List as TypingList
 from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, status, Query, Header, Body
 from sqlalchemy.orm import Session
+from app.core.cache import EVENTS, POSTS, cache_metrics, mark_changed, response_cache
 from app.core.database import get_db
+from app.core.responses import FastJSONResponse
 from app.core.security import decode_access_token
 from app.models.user import User
 from app.models.blog import BlogPost
@@ -15,6 +17,10 @@ from app.models.report import Report
 from app.schemas.blog import BlogPostResponse
 from app.schemas.event import EventResponse
 from app.schemas.report import ReportResponse
+from app.services.documents import purge_analysis_cache
+from app.services.events import event_response
+from app.services.images import image_variants
+from app.services.posts import post_response
 from app.core.notifications import notify_blog_approved, notify_blog_rejected, notify_event_approved, notify_event_rejected
 from pydantic import BaseModel
 
@@ -70,7 +76,7 @@ def get_current_admin(
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
         
     user_id = payload.get("sub")
-    user = db.query(User).filter(User.id == user_id).first()
+    user = db.get(User, user_id)
     
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
@@ -121,23 +127,12 @@ async def get_admin_posts(
         
     posts = query.order_by(BlogPost.created_at.desc()).offset(offset).limit(limit).all()
     
+    images = image_variants(db, [post.image_url for post in posts])
     result = []
     for post in posts:
         author = db.query(User).filter(User.id == post.author_id).first()
-        result.append(BlogPostResponse(
-            id=post.id,
-            title=post.title,
-            content=post.content,
-            excerpt=post.excerpt,
-            category=post.category,
-            image_url=post.image_url,
-            author_id=post.author_id,
-            author_name=author.full_name if author else "Unknown",
-            status=post.status,
-            created_at=post.created_at,
-            updated_at=post.updated_at
-        ))
-    return result
+        result.append(post_response(post, author=author, image=images.get(post.image_url)))
+    return FastJSONResponse(result)
 
 @router.put("/posts/{post_id}/status")
 async def update_post_status(
@@ -152,6 +147,7 @@ async def update_post_status(
         raise HTTPException(status_code=404, detail="Post not found")
         
     post.status = status_update
+    mark_changed(db, POSTS)
     db.commit()
     
     # Create notification for the author
@@ -179,33 +175,13 @@ async def get_admin_events(
         
     events = query.order_by(Event.created_at.desc()).offset(offset).limit(limit).all()
     
+    images = image_variants(db, [event.image_url for event in events])
     result = []
     for event in events:
         # Simplified response logic, similar to events.py but lighter if needed
         organizer = db.query(User).filter(User.id == event.organizer_id).first()
-        result.append(EventResponse(
-            id=event.id,
-            title=event.title,
-            description=event.description,
-            full_description=event.full_description,
-            date=event.date,
-            time=event.time,
-            location=event.location,
-            address=event.address,
-            image_url=event.image_url,
-            max_participants=event.max_participants,
-            registration_deadline=event.registration_deadline,
-            categories=event.categories,
-            organizer_id=event.organizer_id,
-            organizer_name=organizer.full_name if organizer else "Unknown",
-            status=event.status,
-            bank_name=event.bank_name,
-            account_number=event.account_number,
-            account_holder_name=event.account_holder_name,
-            created_at=event.created_at,
-            updated_at=event.updated_at
-        ))
-    return result
+        result.append(event_response(event, organizer=organizer, image=images.get(event.image_url)))
+    return FastJSONResponse(result)
 
 @router.put("/events/{event_id}/status")
 async def update_event_status(
@@ -222,6 +198,7 @@ async def update_event_status(
         raise HTTPException(status_code=404, detail="Event not found")
         
     event.status = status_update
+    mark_changed(db, EVENTS)
     db.commit()
     
     # Create notification for the organizer
@@ -252,6 +229,7 @@ async def reject_event_with_reasons(
         raise HTTPException(status_code=404, detail="Event not found")
         
     event.status = "rejected"
+    mark_changed(db, EVENTS)
     db.commit()
     
     # Create notification with rejection reasons
@@ -316,6 +294,7 @@ async def resolve_report(
     post = db.query(BlogPost).filter(BlogPost.id == report.post_id).first()
     if post:
         db.delete(post)  # Delete the reported post
+        mark_changed(db, POSTS)
     
     report.status = "resolved"
     db.commit()
@@ -450,6 +429,7 @@ async def approve_registration(
         raise HTTPException(status_code=404, detail="Registration not found")
     
     registration.status = "approved"
+    mark_changed(db, EVENTS)
     db.commit()
     return {"message": "Registration approved"}
 
@@ -468,6 +448,29 @@ async def reject_registration(
     registration.status = "rejected"
     registration.rejection_reasons = rejection_data.reasons
     registration.rejection_description = rejection_data.description
+    mark_changed(db, EVENTS)
     db.commit()
     return {"message": "Registration rejected"}
 
+
+@router.delete("/documents/cache")
+async def purge_document_cache(
+    current_admin: User = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    """Clear cached document analysis results"""
+    deleted = purge_analysis_cache(db)
+    return {"message": "Document analysis cache purged", "deleted": deleted}
+
+
+@router.get("/cache")
+async def get_response_cache_metrics(current_admin: User = Depends(get_current_admin)):
+    """Hit/miss counters of this instance's response cache and its collapsed concurrent loads"""
+    return cache_metrics()
+
+
+@router.delete("/cache")
+async def clear_response_cache(current_admin: User = Depends(get_current_admin)):
+    """Drop this instance's cached list responses"""
+    response_cache.clear()
+    return {"message": "Response cache cleared"}
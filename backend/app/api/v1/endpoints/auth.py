@@ -1,6 +1,7 @@
 """
 Authentication endpoints
 """
+import asyncio
 from datetime import datetime, timedelta
 from typing import List, Optional
 import uuid
@@ -8,13 +9,15 @@ import secrets
 from urllib.parse import urlencode
 
 import httpx
-from fastapi import APIRouter, Depends, Header, HTTPException, Request, status
+from fastapi import APIRouter, Depends, File, Header, HTTPException, Request, UploadFile, status
 from fastapi.responses import RedirectResponse
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
+from app.core.cache import USERS, mark_changed
 from app.core.database import get_db
+from app.core.responses import FastJSONResponse
 from app.core.security import (
     create_access_token,
     decode_access_token,
@@ -26,6 +29,10 @@ from app.models.user import RunningExperienceEnum, User
 from app.schemas.auth import AuthResponse, LoginRequest, RegisterRequest
 from app.schemas.event import EventResponse
 from app.schemas.user import UserResponse, UserStats, UserUpdate
+from app.services.events import event_response
+from app.services.images import image_variants
+from app.services.storage import StorageError, get_storage_backend
+from app.services.users import MAX_AVATAR_BYTES, InvalidAvatar, prepare_avatar, store_avatar
 
 router = APIRouter()
 
@@ -382,7 +389,7 @@ async def get_current_user_info(
         )
     
     user_id = payload.get("sub")
-    user = db.query(User).filter(User.id == user_id).first()
+    user = db.get(User, user_id)
     
     if not user:
         raise HTTPException(
@@ -416,7 +423,7 @@ async def update_current_user_info(
         )
     
     user_id = payload.get("sub")
-    user = db.query(User).filter(User.id == user_id).first()
+    user = db.get(User, user_id)
     
     if not user:
         raise HTTPException(
@@ -425,9 +432,73 @@ async def update_current_user_info(
         )
     
     update_data = user_update.model_dump(exclude_unset=True)
+    if update_data.get("avatar"):
+        try:
+            update_data["avatar"] = await prepare_avatar(update_data["avatar"])
+        except InvalidAvatar as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     for field, value in update_data.items():
         setattr(user, field, value)
     
+    mark_changed(db, USERS)
+    db.commit()
+    db.refresh(user)
+    
+    return UserResponse.model_validate(user)
+
+
+@router.post("/me/avatar", response_model=UserResponse)
+async def upload_avatar(
+    file: UploadFile = File(...),
+    authorization: Optional[str] = Header(None, alias="Authorization"),
+    db: Session = Depends(get_db)
+):
+    """Upload a new avatar; it is resized and stored, and the user keeps its URL"""
+    if not authorization or not authorization.startswith("Bearer "):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+        )
+    
+    token = authorization.split(" ")[1]
+    payload = decode_access_token(token)
+    
+    if not payload:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token",
+        )
+    
+    user_id = payload.get("sub")
+    user = db.get(User, user_id)
+    
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found",
+        )
+    
+    data = await file.read(MAX_AVATAR_BYTES + 1)
+    if not data:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="File is empty")
+    if len(data) > MAX_AVATAR_BYTES:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Avatar is too large. Maximum allowed size is {MAX_AVATAR_BYTES // (1024 * 1024)}MB.",
+        )
+    
+    try:
+        storage = get_storage_backend()
+        user.avatar = await asyncio.to_thread(store_avatar, storage, data)
+    except InvalidAvatar as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except StorageError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Avatar storage is unavailable: {e}",
+        )
+    
+    mark_changed(db, USERS)
     db.commit()
     db.refresh(user)
     
@@ -464,6 +535,7 @@ async def get_joined_events(
     event_ids = [reg.event_id for reg in registrations]
     events = db.query(Event).filter(Event.id.in_(event_ids)).all()
     
+    images = image_variants(db, [event.image_url for event in events])
     result = []
     for event in events:
         organizer = db.query(User).filter(User.id == event.organizer_id).first()
@@ -471,30 +543,14 @@ async def get_joined_events(
             EventRegistration.event_id == event.id
         ).count()
         
-        result.append(EventResponse(
-            id=event.id,
-            title=event.title,
-            description=event.description,
-            full_description=event.full_description,
-            date=event.date,
-            time=event.time,
-            location=event.location,
-            address=event.address,
-            image_url=event.image_url,
-            max_participants=event.max_participants,
-            registration_deadline=event.registration_deadline,
-            categories=event.categories,
-            organizer_id=event.organizer_id,
-            organizer_name=organizer.full_name if organizer else "Unknown",
+        result.append(event_response(
+            event,
+            organizer=organizer,
             participants_count=participants_count,
-            bank_name=event.bank_name,
-            account_number=event.account_number,
-            account_holder_name=event.account_holder_name,
-            created_at=event.created_at,
-            updated_at=event.updated_at,
+            image=images.get(event.image_url),
         ))
         
-    return result
+    return FastJSONResponse(result)
 
 
 @router.get("/stats", response_model=UserStats)
@@ -519,7 +575,7 @@ async def get_user_stats(
         )
     
     user_id = payload.get("sub")
-    user = db.query(User).filter(User.id == user_id).first()
+    user = db.get(User, user_id)
     
     if not user:
         raise HTTPException(
@@ -0,0 +1,157 @@
+"""
+Batch request endpoint
+"""
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Request
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import SHARED_SESSION_SCOPE_KEY, get_db
+from app.core.http_cache import PRIVATE_CACHE_CONTROL
+from app.core.responses import FastJSONResponse
+from app.core.security import decode_access_token
+from app.models.user import User
+from app.schemas.batch import BatchRequest, BatchResponse, BatchSubRequest, BatchSubResponse
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# Sub-requests read; writes keep going through their own requests
+ALLOWED_METHODS = {"GET"}
+# Copied from the batch request: every sub-request acts as the same principal
+FORWARDED_HEADERS = {b"authorization", b"cookie", b"host"}
+# Response headers not worth sending back per sub-request
+DROPPED_RESPONSE_HEADERS = {"content-length", "vary"}
+
+
+def get_current_user_id(authorization: Optional[str] = None) -> Optional[str]:
+    """Extract user ID from authorization token"""
+    if not authorization or not authorization.startswith("Bearer "):
+        return None
+
+    token = authorization.split(" ")[1]
+    payload = decode_access_token(token)
+    if payload:
+        return payload.get("sub")
+    return None
+
+
+def sub_request_scope(request: Request, prefix: str, sub: BatchSubRequest, db: Session) -> Dict[str, Any]:
+    """ASGI scope of ``sub``, carrying the batch's credentials and database session."""
+    target = urlsplit(sub.path)
+    path = prefix + target.path
+    headers: List[Tuple[bytes, bytes]] = [
+        (name, value) for name, value in request.scope["headers"] if name in FORWARDED_HEADERS
+    ]
+    for name, value in sub.headers.items():
+        key = name.lower().encode("latin-1")
+        if key not in FORWARDED_HEADERS and key != b"content-length":
+            headers.append((key, value.encode("latin-1")))
+    return {
+        "type": "http",
+        "asgi": request.scope.get("asgi", {"version": "3.0"}),
+        "http_version": request.scope.get("http_version", "1.1"),
+        "method": sub.method.upper(),
+        "scheme": request.scope.get("scheme", "http"),
+        "server": request.scope.get("server"),
+        "client": request.scope.get("client"),
+        "root_path": request.scope.get("root_path", ""),
+        "path": path,
+        "raw_path": path.encode("utf-8"),
+        "query_string": target.query.encode("latin-1"),
+        "headers": headers,
+        SHARED_SESSION_SCOPE_KEY: db,
+    }
+
+
+async def dispatch(request: Request, scope: Dict[str, Any], sub_id: Optional[str]) -> BatchSubResponse:
+    """Run one sub-request through the application and collect its response."""
+    start: Dict[str, Any] = {}
+    chunks: List[bytes] = []
+
+    async def receive() -> Dict[str, Any]:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: Dict[str, Any]) -> None:
+        if message["type"] == "http.response.start":
+            start.update(message)
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    try:
+        await request.app(scope, receive, send)
+    except Exception as e:
+        # The error middleware already answered 500 (if it got that far); the other sub-requests go on
+        logger.error(f"Batch sub-request {scope['method']} {scope['path']} failed: {e}", exc_info=True)
+        scope[SHARED_SESSION_SCOPE_KEY].rollback()
+        return BatchSubResponse(id=sub_id, status=status.HTTP_500_INTERNAL_SERVER_ERROR, headers={})
+
+    headers = {
+        name.decode("latin-1"): value.decode("latin-1")
+        for name, value in start.get("headers", [])
+        if name.decode("latin-1") not in DROPPED_RESPONSE_HEADERS
+    }
+    body: Any = b"".join(chunks)
+    if not body:
+        body = None
+    elif headers.get("content-type", "").startswith("application/json"):
+        body = orjson.loads(body)
+    else:
+        body = body.decode("utf-8", errors="replace")
+    return BatchSubResponse(id=sub_id, status=start.get("status", 500), headers=headers, body=body)
+
+
+@router.post("", response_model=BatchResponse)
+async def batch(
+    batch_request: BatchRequest,
+    request: Request,
+    authorization: Optional[str] = Header(None, alias="Authorization"),
+    db: Session = Depends(get_db)
+):
+    """
+    Run several GET requests to this API in one round trip.
+
+    Sub-requests run in order, in process, as the batch's user and on the
+    batch's database session; the user is looked up once and reused from
+    the session by every sub-request. Each response keeps its own status,
+    headers (ETag etc.) and body, so a failing sub-request doesn't fail the
+    batch.
+    """
+    if len(batch_request.requests) > settings.BATCH_MAX_REQUESTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.BATCH_MAX_REQUESTS} requests per batch",
+        )
+
+    # Sub-request paths are relative to the router this endpoint is mounted on
+    prefix = request.url.path[: -len("/batch")] if request.url.path.endswith("/batch") else ""
+    for sub in batch_request.requests:
+        if sub.method.upper() not in ALLOWED_METHODS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unsupported method {sub.method}; batches may only contain GET requests",
+            )
+        target = urlsplit(sub.path)
+        if not sub.path.startswith("/") or target.netloc or target.path.rstrip("/") == "/batch":
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid path {sub.path!r}",
+            )
+
+    # Resolve the principal once; the sub-requests' lookups find it in the shared session
+    user_id = get_current_user_id(authorization)
+    if user_id:
+        db.get(User, user_id)
+
+    responses = [
+        await dispatch(request, sub_request_scope(request, prefix, sub, db), sub.id)
+        for sub in batch_request.requests
+    ]
+    return FastJSONResponse(
+        BatchResponse(responses=responses),
+        headers={"Cache-Control": PRIVATE_CACHE_CONTROL},
+    )
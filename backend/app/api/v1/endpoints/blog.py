@@ -2,14 +2,29 @@
 Blog endpoints
 """
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Header
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Header, Request
 from sqlalchemy.orm import Session
 from sqlalchemy import or_
+from app.core.cache import POSTS, USERS, CachedResponse, cached_response, mark_changed
 from app.core.database import get_db
+from app.core.http_cache import Validators
+from app.core.responses import FastJSONResponse, dumps
 from app.core.security import decode_access_token
 from app.models.blog import BlogPost, BlogPostLike
 from app.models.user import User
 from app.schemas.blog import BlogPostCreate, BlogPostUpdate, BlogPostResponse
+from app.services.documents.index import link_post_documents
+from app.services.images import get_image_variants
+from app.services.posts import (
+    POST_FIELDS,
+    apply_post_metadata,
+    post_list_validators,
+    post_response,
+    post_validators,
+    prepare_post_content,
+    project_posts,
+    serialize_posts,
+)
 from app.core.notifications import notify_post_liked
 import uuid
 from datetime import datetime
@@ -31,95 +46,94 @@ def get_current_user_id(authorization: Optional[str] = None) -> Optional[str]:
 
 @router.get("/posts", response_model=dict)
 async def get_blog_posts(
+    request: Request,
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1, le=100),
     author_id: Optional[str] = None,
     status_filter: str = "approved", # Default to approved
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,title,image"),
+    view: Optional[str] = Query(None, description="Field preset: card or full (default)"),
     db: Session = Depends(get_db)
 ):
     """Get all blog posts with pagination"""
     offset = (page - 1) * limit
-    
-    # Only get blog posts (post_type="blog" or NULL for backward compatibility)
-    query = db.query(BlogPost).filter(
-        or_(BlogPost.post_type == "blog", BlogPost.post_type.is_(None))
-    )
-    
-    # Filter by status (unless specifically asking for all, mainly for admin later)
-    if status_filter != "all":
-        query = query.filter(BlogPost.status == status_filter)
+    try:
+        selection = POST_FIELDS.select(fields, view)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    def posts_query(db: Session):
+        # Only get blog posts (post_type="blog" or NULL for backward compatibility)
+        query = db.query(BlogPost).filter(
+            or_(BlogPost.post_type == "blog", BlogPost.post_type.is_(None))
+        )
         
-    if author_id:
-        query = query.filter(BlogPost.author_id == author_id)
-    
-    posts = query.order_by(BlogPost.created_at.desc()).offset(offset).limit(limit).all()
-    total = query.count()
+        # Filter by status (unless specifically asking for all, mainly for admin later)
+        if status_filter != "all":
+            query = query.filter(BlogPost.status == status_filter)
+            
+        if author_id:
+            query = query.filter(BlogPost.author_id == author_id)
+        return query
+    
+    def validate(db: Session) -> Validators:
+        return post_list_validators(
+            db, posts_query(db), page, limit, author_id, status_filter, sorted(selection),
+            public=status_filter == "approved",
+        )
     
-    result = []
-    for post in posts:
-        author = db.query(User).filter(User.id == post.author_id).first()
-        likes_count = db.query(BlogPostLike).filter(BlogPostLike.post_id == post.id).count()
+    def load(db: Session) -> CachedResponse:
+        query = posts_query(db)
+        validators = validate(db)
+        posts = project_posts(query, selection).order_by(BlogPost.created_at.desc()).offset(offset).limit(limit).all()
+        total = query.count()
         
-        # Generate excerpt from content if not set
-        excerpt = post.excerpt
-        if not excerpt and post.content:
-            excerpt = post.content[:200] + "..." if len(post.content) > 200 else post.content
+        result = serialize_posts(db, posts, selection)
         
-        result.append(BlogPostResponse(
-            id=post.id,
-            title=post.title,
-            content=post.content,
-            excerpt=excerpt,
-            category=post.category,
-            image_url=post.image_url,
-            author_id=post.author_id,
-            author_name=author.full_name if author else "Unknown",
-            author_avatar=author.avatar if author else None,
-            status=post.status,
-            likes_count=likes_count,
-            comments_count=0,
-            created_at=post.created_at,
-            updated_at=post.updated_at,
-        ))
-    
-    return {
-        "posts": result,
-        "total": total,
-        "page": page,
-        "limit": limit,
-    }
+        return CachedResponse(dumps({
+            "posts": result,
+            "total": total,
+            "page": page,
+            "limit": limit,
+        }), validators)
+    
+    cache_key = ("blog_posts", page, limit, author_id, status_filter, selection)
+    return await cached_response(request, db, cache_key, load, validate=validate, tags=(POSTS, USERS))
 
 
 @router.get("/posts/{post_id}", response_model=BlogPostResponse)
-async def get_blog_post(post_id: str, db: Session = Depends(get_db)):
+async def get_blog_post(post_id: str, request: Request, db: Session = Depends(get_db)):
     """Get single blog post by ID"""
-    post = db.query(BlogPost).filter(BlogPost.id == post_id).first()
+    def validate(db: Session) -> Optional[Validators]:
+        return post_validators(db, post_id)
     
-    if not post:
+    def load(db: Session) -> Optional[CachedResponse]:
+        validators = validate(db)
+        if validators is None:
+            return None
+        
+        post = db.query(BlogPost).filter(BlogPost.id == post_id).one()
+        author = db.query(User).filter(User.id == post.author_id).first()
+        likes_count = db.query(BlogPostLike).filter(BlogPostLike.post_id == post.id).count()
+        
+        return CachedResponse(dumps(post_response(
+            post,
+            author=author,
+            likes_count=likes_count,
+            image=get_image_variants(db, post.image_url),
+        )), validators)
+    
+    response = await cached_response(
+        request, db, ("post", post_id), load, validate=validate, tags=(POSTS, USERS)
+    )
+    
+    if response is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Blog post not found",
         )
     
-    author = db.query(User).filter(User.id == post.author_id).first()
-    likes_count = db.query(BlogPostLike).filter(BlogPostLike.post_id == post.id).count()
-    
-    return BlogPostResponse(
-        id=post.id,
-        title=post.title,
-        content=post.content,
-        excerpt=post.excerpt,
-        category=post.category,
-        image_url=post.image_url,
-        author_id=post.author_id,
-        author_name=author.full_name if author else "Unknown",
-        author_avatar=author.avatar if author else None,
-        status=post.status,
-        likes_count=likes_count,
-        comments_count=0,
-        created_at=post.created_at,
-        updated_at=post.updated_at,
-    )
+    return response
 
 
 @router.post("/posts", response_model=BlogPostResponse, status_code=status.HTTP_201_CREATED)
@@ -141,35 +155,30 @@ async def create_blog_post(
     new_post = BlogPost(
         id=post_id,
         title=post_data.title,
-        content=post_data.content,
+        content=await prepare_post_content(post_data.content),
         category=post_data.category,
         image_url=post_data.image_url,
         status="pending",
         post_type="blog",  # Mark as blog post
         author_id=user_id,
     )
+    apply_post_metadata(new_post)
     
     db.add(new_post)
+    mark_changed(db, POSTS)
     db.commit()
     db.refresh(new_post)
+    link_post_documents(db, new_post)
+    
+    author = db.get(User, user_id)
     
-    author = db.query(User).filter(User.id == user_id).first()
-    
-    return BlogPostResponse(
-        id=new_post.id,
-        title=new_post.title,
-        content=new_post.content,
-        excerpt=new_post.excerpt,
-        category=new_post.category,
-        image_url=new_post.image_url,
-        author_id=new_post.author_id,
-        author_name=author.full_name if author else "Unknown",
-        author_avatar=author.avatar if author else None,
-        status=new_post.status,
-        likes_count=0,
-        comments_count=0,
-        created_at=new_post.created_at,
-        updated_at=new_post.updated_at,
+    return FastJSONResponse(
+        post_response(
+            new_post,
+            author=author,
+            image=get_image_variants(db, new_post.image_url),
+        ),
+        status_code=status.HTTP_201_CREATED,
     )
 
 
@@ -205,31 +214,28 @@ async def update_blog_post(
     
     # Update fields
     update_data = post_data.dict(exclude_unset=True)
+    if "content" in update_data:
+        update_data["content"] = await prepare_post_content(update_data["content"])
     for field, value in update_data.items():
         setattr(post, field, value)
+    if "content" in update_data:
+        apply_post_metadata(post)
     
+    mark_changed(db, POSTS)
     db.commit()
     db.refresh(post)
+    if "content" in update_data:
+        link_post_documents(db, post)
     
     author = db.query(User).filter(User.id == post.author_id).first()
     likes_count = db.query(BlogPostLike).filter(BlogPostLike.post_id == post.id).count()
     
-    return BlogPostResponse(
-        id=post.id,
-        title=post.title,
-        content=post.content,
-        excerpt=post.excerpt,
-        category=post.category,
-        image_url=post.image_url,
-        author_id=post.author_id,
-        author_name=author.full_name if author else "Unknown",
-        author_avatar=author.avatar if author else None,
-        status=post.status,
+    return FastJSONResponse(post_response(
+        post,
+        author=author,
         likes_count=likes_count,
-        comments_count=0,
-        created_at=post.created_at,
-        updated_at=post.updated_at,
-    )
+        image=get_image_variants(db, post.image_url),
+    ))
 
 
 @router.delete("/posts/{post_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -262,6 +268,7 @@ async def delete_blog_post(
         )
     
     db.delete(post)
+    mark_changed(db, POSTS)
     db.commit()
 
 
@@ -297,6 +304,7 @@ async def like_blog_post(
     if existing_like:
         # Unlike
         db.delete(existing_like)
+        mark_changed(db, POSTS)
         db.commit()
         return {"message": "Post unliked"}
     
@@ -309,11 +317,12 @@ async def like_blog_post(
     )
     
     db.add(new_like)
+    mark_changed(db, POSTS)
     db.commit()
     
     # Create notification for post author (if not self-like)
     if post.author_id != user_id:
-        liker = db.query(User).filter(User.id == user_id).first()
+        liker = db.get(User, user_id)
         liker_name = liker.full_name if liker else "Ai đó"
         notify_post_liked(db, post.author_id, liker_name, post.id)
     
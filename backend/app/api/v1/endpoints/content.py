@@ -5,13 +5,28 @@ Content posts are automatically approved and displayed immediately,
 unlike blog posts which require admin approval.
 """
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Header
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Header, Request
 from sqlalchemy.orm import Session
+from app.core.cache import POSTS, USERS, CachedResponse, cached_response, mark_changed
 from app.core.database import get_db
+from app.core.http_cache import Validators
+from app.core.responses import FastJSONResponse, dumps
 from app.core.security import decode_access_token
 from app.models.blog import BlogPost, BlogPostLike
 from app.models.user import User
 from app.schemas.blog import BlogPostCreate, BlogPostUpdate, BlogPostResponse
+from app.services.documents.index import link_post_documents
+from app.services.images import get_image_variants
+from app.services.posts import (
+    POST_FIELDS,
+    apply_post_metadata,
+    post_list_validators,
+    post_response,
+    post_validators,
+    prepare_post_content,
+    project_posts,
+    serialize_posts,
+)
 import uuid
 
 router = APIRouter()
@@ -31,9 +46,12 @@ def get_current_user_id(authorization: Optional[str] = None) -> Optional[str]:
 
 @router.get("/posts", response_model=dict)
 async def get_content_posts(
+    request: Request,
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1, le=100),
     author_id: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,title,image"),
+    view: Optional[str] = Query(None, description="Field preset: card or full (default)"),
     db: Session = Depends(get_db)
 ):
     """
@@ -41,87 +59,77 @@ async def get_content_posts(
     Content posts are always approved, so we only return approved posts.
     """
     offset = (page - 1) * limit
+    try:
+        selection = POST_FIELDS.select(fields, view)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     
-    # Only get content posts (post_type="content") that are approved
-    query = db.query(BlogPost).filter(
-        BlogPost.status == "approved",
-        BlogPost.post_type == "content"
-    )
-    
-    if author_id:
-        query = query.filter(BlogPost.author_id == author_id)
+    def posts_query(db: Session):
+        # Only get content posts (post_type="content") that are approved
+        query = db.query(BlogPost).filter(
+            BlogPost.status == "approved",
+            BlogPost.post_type == "content"
+        )
+        
+        if author_id:
+            query = query.filter(BlogPost.author_id == author_id)
+        return query
     
-    posts = query.order_by(BlogPost.created_at.desc()).offset(offset).limit(limit).all()
-    total = query.count()
+    def validate(db: Session) -> Validators:
+        return post_list_validators(db, posts_query(db), page, limit, author_id, sorted(selection))
     
-    result = []
-    for post in posts:
-        author = db.query(User).filter(User.id == post.author_id).first()
-        likes_count = db.query(BlogPostLike).filter(BlogPostLike.post_id == post.id).count()
+    def load(db: Session) -> CachedResponse:
+        query = posts_query(db)
+        validators = validate(db)
+        posts = project_posts(query, selection).order_by(BlogPost.created_at.desc()).offset(offset).limit(limit).all()
+        total = query.count()
         
-        # Generate excerpt from content if not set
-        excerpt = post.excerpt
-        if not excerpt and post.content:
-            excerpt = post.content[:200] + "..." if len(post.content) > 200 else post.content
+        result = serialize_posts(db, posts, selection)
         
-        result.append(BlogPostResponse(
-            id=post.id,
-            title=post.title,
-            content=post.content,
-            excerpt=excerpt,
-            category=post.category,
-            image_url=post.image_url,
-            author_id=post.author_id,
-            author_name=author.full_name if author else "Unknown",
-            author_avatar=author.avatar if author else None,
-            status=post.status,
-            likes_count=likes_count,
-            comments_count=0,
-            created_at=post.created_at,
-            updated_at=post.updated_at,
-        ))
+        return CachedResponse(dumps({
+            "posts": result,
+            "total": total,
+            "page": page,
+            "limit": limit,
+        }), validators)
     
-    return {
-        "posts": result,
-        "total": total,
-        "page": page,
-        "limit": limit,
-    }
+    cache_key = ("content_posts", page, limit, author_id, selection)
+    return await cached_response(request, db, cache_key, load, validate=validate, tags=(POSTS, USERS))
 
 
 @router.get("/posts/{post_id}", response_model=BlogPostResponse)
-async def get_content_post(post_id: str, db: Session = Depends(get_db)):
+async def get_content_post(post_id: str, request: Request, db: Session = Depends(get_db)):
     """Get single content post by ID"""
-    post = db.query(BlogPost).filter(
-        BlogPost.id == post_id,
-        BlogPost.post_type == "content"
-    ).first()
+    def validate(db: Session) -> Optional[Validators]:
+        return post_validators(db, post_id, post_type="content")
     
-    if not post:
+    def load(db: Session) -> Optional[CachedResponse]:
+        validators = validate(db)
+        if validators is None:
+            return None
+        
+        post = db.query(BlogPost).filter(BlogPost.id == post_id).one()
+        author = db.query(User).filter(User.id == post.author_id).first()
+        likes_count = db.query(BlogPostLike).filter(BlogPostLike.post_id == post.id).count()
+        
+        return CachedResponse(dumps(post_response(
+            post,
+            author=author,
+            likes_count=likes_count,
+            image=get_image_variants(db, post.image_url),
+        )), validators)
+    
+    response = await cached_response(
+        request, db, ("content_post", post_id), load, validate=validate, tags=(POSTS, USERS)
+    )
+    
+    if response is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Content post not found",
         )
     
-    author = db.query(User).filter(User.id == post.author_id).first()
-    likes_count = db.query(BlogPostLike).filter(BlogPostLike.post_id == post.id).count()
-    
-    return BlogPostResponse(
-        id=post.id,
-        title=post.title,
-        content=post.content,
-        excerpt=post.excerpt,
-        category=post.category,
-        image_url=post.image_url,
-        author_id=post.author_id,
-        author_name=author.full_name if author else "Unknown",
-        author_avatar=author.avatar if author else None,
-        status=post.status,
-        likes_count=likes_count,
-        comments_count=0,
-        created_at=post.created_at,
-        updated_at=post.updated_at,
-    )
+    return response
 
 
 @router.post("/posts", response_model=BlogPostResponse, status_code=status.HTTP_201_CREATED)
@@ -146,35 +154,30 @@ async def create_content_post(
     new_post = BlogPost(
         id=post_id,
         title=post_data.title,
-        content=post_data.content,
+        content=await prepare_post_content(post_data.content),
         category=post_data.category,
         image_url=post_data.image_url,
         status="approved",  # Auto-approved for content posts
         post_type="content",  # Mark as content post
         author_id=user_id,
     )
+    apply_post_metadata(new_post)
     
     db.add(new_post)
+    mark_changed(db, POSTS)
     db.commit()
     db.refresh(new_post)
+    link_post_documents(db, new_post)
     
-    author = db.query(User).filter(User.id == user_id).first()
+    author = db.get(User, user_id)
     
-    return BlogPostResponse(
-        id=new_post.id,
-        title=new_post.title,
-        content=new_post.content,
-        excerpt=new_post.excerpt,
-        category=new_post.category,
-        image_url=new_post.image_url,
-        author_id=new_post.author_id,
-        author_name=author.full_name if author else "Unknown",
-        author_avatar=author.avatar if author else None,
-        status=new_post.status,
-        likes_count=0,
-        comments_count=0,
-        created_at=new_post.created_at,
-        updated_at=new_post.updated_at,
+    return FastJSONResponse(
+        post_response(
+            new_post,
+            author=author,
+            image=get_image_variants(db, new_post.image_url),
+        ),
+        status_code=status.HTTP_201_CREATED,
     )
 
 
@@ -213,31 +216,28 @@ async def update_content_post(
     
     # Update fields
     update_data = post_data.dict(exclude_unset=True)
+    if "content" in update_data:
+        update_data["content"] = await prepare_post_content(update_data["content"])
     for field, value in update_data.items():
         setattr(post, field, value)
+    if "content" in update_data:
+        apply_post_metadata(post)
     
+    mark_changed(db, POSTS)
     db.commit()
     db.refresh(post)
+    if "content" in update_data:
+        link_post_documents(db, post)
     
     author = db.query(User).filter(User.id == post.author_id).first()
     likes_count = db.query(BlogPostLike).filter(BlogPostLike.post_id == post.id).count()
     
-    return BlogPostResponse(
-        id=post.id,
-        title=post.title,
-        content=post.content,
-        excerpt=post.excerpt,
-        category=post.category,
-        image_url=post.image_url,
-        author_id=post.author_id,
-        author_name=author.full_name if author else "Unknown",
-        author_avatar=author.avatar if author else None,
-        status=post.status,
+    return FastJSONResponse(post_response(
+        post,
+        author=author,
         likes_count=likes_count,
-        comments_count=0,
-        created_at=post.created_at,
-        updated_at=post.updated_at,
-    )
+        image=get_image_variants(db, post.image_url),
+    ))
 
 
 @router.delete("/posts/{post_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -273,5 +273,6 @@ async def delete_content_post(
         )
     
     db.delete(post)
+    mark_changed(db, POSTS)
     db.commit()
 
@@ -1,15 +1,57 @@
-import base64
+import asyncio
+import hashlib
+import json
 import logging
-import os
-import shutil
-import tempfile
-from typing import List, Optional
+from typing import AsyncIterator, Optional
 
-import pymupdf  # PyMuPDF
-from docx import Document
-from fastapi import APIRouter, File, HTTPException, UploadFile
+from fastapi import APIRouter, Depends, File, Form, Header, HTTPException, Query, UploadFile
+from fastapi.responses import RedirectResponse, StreamingResponse
+from sqlalchemy.orm import Session, sessionmaker
 
-from app.services.storage import R2StorageService, StorageError, StoredObject
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.security import decode_access_token
+from app.models.document import DocumentJob
+from app.schemas.document import (
+    DocumentJobResponse,
+    DocumentPostSummary,
+    DocumentSearchResponse,
+    DocumentSearchResult,
+)
+from app.services.documents import (
+    DocumentAnalysis,
+    DocumentPageNotFound,
+    DocumentRenderError,
+    DocumentRenderTimeout,
+    InvalidDocumentError,
+    JOB_PROCESSING,
+    JOB_QUEUED,
+    UploadPipeline,
+    analysis_cache_key,
+    create_job,
+    document_kind,
+    get_cached_analysis,
+    get_page,
+    index_analysis,
+    is_document_id,
+    job_progress,
+    job_runner,
+    page_image_html,
+    page_text_html,
+    process_job,
+    process_job_slice,
+    search_documents,
+    snippet,
+    store_analysis,
+)
+from app.services.documents.jobs import complete_job, expire_stale_job, is_abandoned
+from app.services.storage import (
+    DEFAULT_CHUNK_SIZE,
+    StorageBackend,
+    StorageError,
+    StorageSizeLimitError,
+    get_storage_backend,
+)
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -21,37 +63,57 @@ ALLOWED_DOC_TYPES = {
 MAX_DOCUMENT_BYTES = 10 * 1024 * 1024  # 10MB
 
 
+def get_current_user_id(authorization: Optional[str] = None) -> Optional[str]:
+    """Extract user ID from authorization token"""
+    if not authorization or not authorization.startswith("Bearer "):
+        return None
+
+    token = authorization.split(" ")[1]
+    payload = decode_access_token(token)
+    if payload:
+        return payload.get("sub")
+    return None
+
+
+async def _iter_upload(file: UploadFile, chunk_size: int = DEFAULT_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """Yield an upload in chunks so it never has to be fully buffered."""
+    while True:
+        chunk = await file.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
 @router.post("/upload")
 async def upload_document(file: UploadFile = File(...)):
-    """Upload a DOCX/PDF file to Cloudflare R2 and return its URL."""
+    """Upload a DOCX/PDF file to the configured storage backend and return its URL."""
     if file.content_type not in ALLOWED_DOC_TYPES:
         raise HTTPException(
             status_code=400,
             detail="Unsupported file type. Only PDF and DOCX are allowed.",
         )
 
-    file_bytes = await file.read()
-    if len(file_bytes) > MAX_DOCUMENT_BYTES:
-        raise HTTPException(
-            status_code=400,
-            detail="File is too large. Maximum allowed size is 10MB.",
-        )
-
     try:
-        storage_service = R2StorageService()
+        storage_service = get_storage_backend()
     except StorageError as exc:
-        logger.error("R2 unavailable for document upload: %s", exc)
+        logger.error("Storage unavailable for document upload: %s", exc)
         raise HTTPException(
             status_code=503,
             detail="Document storage is temporarily unavailable. Please try again later.",
         ) from exc
 
     try:
-        stored_document = storage_service.upload_bytes(
-            file_bytes,
+        stored_document = await storage_service.upload_chunks(
+            _iter_upload(file),
             content_type=file.content_type or "application/octet-stream",
             prefix="documents/originals",
+            max_bytes=MAX_DOCUMENT_BYTES,
         )
+    except StorageSizeLimitError as exc:
+        raise HTTPException(
+            status_code=400,
+            detail="File is too large. Maximum allowed size is 10MB.",
+        ) from exc
     except StorageError as exc:
         logger.error("Failed to upload document to storage: %s", exc)
         raise HTTPException(
@@ -71,286 +133,150 @@ async def upload_document(file: UploadFile = File(...)):
         "url": stored_document.url,
         "content_type": stored_document.content_type,
         "size": stored_document.size,
-        "provider": "cloudflare-r2",
+        "checksum": stored_document.checksum,
+        "provider": storage_service.name,
     }
 
 
+def _validate_document(file: UploadFile, file_bytes: bytes) -> str:
+    """Check size, content type and extension; return the lower-cased filename."""
+    file_size = len(file_bytes)
+
+    # Validate file size - do this early (before any processing)
+    if file_size == 0:
+        logger.warning("Empty file uploaded: %s", file.filename)
+        raise HTTPException(status_code=400, detail="File is empty")
+
+    if file_size > MAX_DOCUMENT_BYTES:
+        logger.warning("File too large: %s (%d bytes, max %d)", file.filename, file_size, MAX_DOCUMENT_BYTES)
+        raise HTTPException(
+            status_code=400,
+            detail=f"File is too large ({file_size} bytes). Maximum allowed size is {MAX_DOCUMENT_BYTES} bytes."
+        )
+
+    logger.info("File read successfully: %d bytes", file_size)
+
+    # Validate file type - check both content_type and extension
+    file_ext = ""
+    if file.filename:
+        file_ext = file.filename.lower()
+
+    # Check content type
+    if file.content_type and file.content_type not in ALLOWED_DOC_TYPES:
+        logger.warning("Unsupported content type: %s for file %s", file.content_type, file.filename)
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported file type: {file.content_type}. Only PDF and DOCX are allowed."
+        )
+
+    # Check file extension as fallback
+    if not file_ext.endswith(('.pdf', '.docx')):
+        logger.warning("Unsupported file extension: %s for file %s", file_ext, file.filename)
+        raise HTTPException(
+            status_code=400,
+            detail="Unsupported file type. Please upload a PDF (.pdf) or DOCX (.docx) file."
+        )
+
+    return file_ext
+
+
+def _analysis_storage() -> Optional[StorageBackend]:
+    """Return the storage backend, or None so analysis can fall back to inline images."""
+    try:
+        storage_service = get_storage_backend()
+        logger.info("Storage backend %s initialized successfully", storage_service.name)
+        return storage_service
+    except StorageError as exc:
+        logger.warning("Storage unavailable for document analysis: %s", exc)
+    except Exception as exc:
+        logger.warning("Unexpected error initializing storage: %s", exc)
+    return None
+
+
+def _analysis_http_error(exc: DocumentRenderError) -> HTTPException:
+    """Map analysis failures to the HTTP errors /analyze has always returned."""
+    if isinstance(exc, InvalidDocumentError):
+        logger.error("Failed to open document: %s", exc)
+        return HTTPException(status_code=400, detail=str(exc))
+    if isinstance(exc, DocumentRenderTimeout):
+        logger.error("PDF rendering timed out: %s", exc)
+        return HTTPException(status_code=504, detail="Document rendering timed out. Try a smaller file.")
+    logger.error("PDF rendering failed: %s", exc)
+    return HTTPException(status_code=500, detail=str(exc))
+
+
 @router.post("/analyze")
-async def analyze_document(file: UploadFile = File(...)):
+async def analyze_document(
+    file: UploadFile = File(...),
+    authorization: Optional[str] = Header(None, alias="Authorization"),
+    db: Session = Depends(get_db),
+):
     """Analyze a PDF or DOCX document and convert to HTML with images."""
     logger.info("Starting document analysis for file: %s (content_type: %s)", 
                 file.filename, file.content_type)
     
     # Initialize variables that might be used in exception handlers
-    temp_filename = None
-    content_html = ""
-    text_html = ""
-    
-    # Create a unique temp file path
-    temp_dir = tempfile.gettempdir()
-    temp_filename = os.path.join(temp_dir, f"upload_{os.urandom(8).hex()}_{file.filename or 'document'}")
+    uploads: Optional[UploadPipeline] = None
+    analysis: Optional[DocumentAnalysis] = None
     
+    # The whole pipeline works on the in-memory upload (at most MAX_DOCUMENT_BYTES):
+    # PyMuPDF and python-docx read from the buffer and storage uploads from bytes.
     try:
         # Read file content first
         file_bytes = await file.read()
-        file_size = len(file_bytes)
-        
-        # Validate file size - do this early (before writing to temp file)
-        if file_size == 0:
-            logger.warning("Empty file uploaded: %s", file.filename)
-            raise HTTPException(status_code=400, detail="File is empty")
-        
-        if file_size > MAX_DOCUMENT_BYTES:
-            logger.warning("File too large: %s (%d bytes, max %d)", file.filename, file_size, MAX_DOCUMENT_BYTES)
-            raise HTTPException(
-                status_code=400,
-                detail=f"File is too large ({file_size} bytes). Maximum allowed size is {MAX_DOCUMENT_BYTES} bytes."
-            )
-        
-        logger.info("File read successfully: %d bytes", file_size)
-        
-        # Validate file type - check both content_type and extension
-        file_ext = ""
-        if file.filename:
-            file_ext = file.filename.lower()
-        
-        # Check content type
-        if file.content_type and file.content_type not in ALLOWED_DOC_TYPES:
-            logger.warning("Unsupported content type: %s for file %s", file.content_type, file.filename)
-            raise HTTPException(
-                status_code=400,
-                detail=f"Unsupported file type: {file.content_type}. Only PDF and DOCX are allowed."
-            )
-        
-        # Check file extension as fallback
-        if not file_ext.endswith(('.pdf', '.docx')):
-            logger.warning("Unsupported file extension: %s for file %s", file_ext, file.filename)
-            raise HTTPException(
-                status_code=400,
-                detail="Unsupported file type. Please upload a PDF (.pdf) or DOCX (.docx) file."
-            )
-        
-        # Write to temp file
-        try:
-            with open(temp_filename, "wb") as buffer:
-                buffer.write(file_bytes)
-            logger.debug("Temporary file created: %s", temp_filename)
-        except IOError as e:
-            logger.error("Failed to write temp file: %s", e)
-            raise HTTPException(status_code=500, detail=f"Failed to create temporary file: {str(e)}")
-        
-        # Validate temp file exists and is readable
-        if not os.path.exists(temp_filename):
-            raise HTTPException(status_code=500, detail="Temporary file was not created")
-        
-        if not os.access(temp_filename, os.R_OK):
-            raise HTTPException(status_code=500, detail="Temporary file is not readable")
+        file_ext = _validate_document(file, file_bytes)
 
         # Initialize storage service
-        storage_service = None
-        try:
-            storage_service = R2StorageService()
-            logger.info("R2 storage service initialized successfully")
-        except StorageError as exc:
-            logger.warning("R2 unavailable for document analysis: %s", exc)
-            storage_service = None
-        except Exception as exc:
-            logger.warning("Unexpected error initializing R2 storage: %s", exc)
-            storage_service = None
-
-        stored_document: Optional[StoredObject] = None
-        preview_urls: List[str] = []
-        
-        logger.debug("File extension detected: %s", file_ext)
-        
-        # Analyze DOCX
-        if file_ext.endswith('.docx'):
-            logger.info("Processing DOCX file")
-            try:
-                doc = Document(temp_filename)
-                logger.debug("DOCX file opened successfully")
-            except Exception as e:
-                logger.error("Failed to open DOCX file: %s", e)
-                raise HTTPException(status_code=400, detail=f"Invalid DOCX file: {str(e)}")
-            for para in doc.paragraphs:
-                text = para.text.strip()
-                if not text:
-                    continue
-                
-                # For DOCX, currently we just put everything in content_html as text
-                # because docx doesn't easily support "render pages to images" without complex tools.
-                # So we keep the previous behavior for DOCX for now (or user accepts text only).
-                style_name = para.style.name
-                tag = "p"
-                if style_name.startswith('Heading 1'): tag = "h1"
-                elif style_name.startswith('Heading 2'): tag = "h2"
-                elif style_name.startswith('Heading 3'): tag = "h3"
-                elif style_name.startswith('List Bullet'): 
-                    content_html += f"<ul><li>{text}</li></ul>"
-                    continue
-                elif style_name.startswith('List Number'):
-                    content_html += f"<ol><li>{text}</li></ol>"
-                    continue
-                
-                content_html += f"<{tag}>{text}</{tag}>"
-                text_html += f"<{tag}>{text}</{tag}>" # Also keep for SEO if needed
-
-        # Analyze PDF with PyMuPDF (Render to Images + Text Extraction)
-        elif file_ext.endswith('.pdf'):
-            logger.info("Processing PDF file")
-            try:
-                # Try to open and validate PDF
-                doc = pymupdf.open(temp_filename)
-                page_count = len(doc)
-                if page_count == 0:
-                    doc.close()
-                    raise HTTPException(status_code=400, detail="PDF file contains no pages")
-                logger.info("PDF file opened successfully: %d pages", page_count)
-            except HTTPException:
-                # Re-raise HTTP exceptions
-                raise
-            except Exception as e:
-                logger.error("Failed to open PDF file: %s", e)
-                # Check if it's a known error type
-                error_msg = str(e).lower()
-                if "empty" in error_msg or "cannot open" in error_msg:
-                    raise HTTPException(status_code=400, detail=f"Invalid or corrupted PDF file: {str(e)}")
-                raise HTTPException(status_code=400, detail=f"Invalid PDF file: {str(e)}")
-            
-            try:
-                for page_num, page in enumerate(doc):
-                    try:
-                        logger.debug("Processing PDF page %d/%d", page_num + 1, page_count)
-                        
-                        # 1. Render page to image
-                        try:
-                            pix = page.get_pixmap(matrix=pymupdf.Matrix(2, 2))  # High resolution (2x zoom)
-                            image_bytes = pix.tobytes("png")
-                        except Exception as e:
-                            logger.error("Failed to render PDF page %d to image: %s", page_num + 1, e)
-                            # Try to extract text even if image rendering fails
-                            try:
-                                text = page.get_text()
-                                if text.strip():
-                                    text_html += f"<p>{text.replace(chr(10), '<br>')}</p>"
-                            except:
-                                pass
-                            continue
-                        
-                        # Validate image bytes
-                        if not image_bytes or len(image_bytes) == 0:
-                            logger.warning("Empty image bytes for page %d, skipping", page_num + 1)
-                            # Still try to extract text
-                            try:
-                                text = page.get_text()
-                                if text.strip():
-                                    text_html += f"<p>{text.replace(chr(10), '<br>')}</p>"
-                            except:
-                                pass
-                            continue
-                        
-                        logger.debug("Rendered page %d to image: %d bytes", page_num + 1, len(image_bytes))
-
-                        # Try to upload preview image, with fallback to base64
-                        image_url = None
-                        if storage_service:
-                            try:
-                                preview_object = storage_service.upload_bytes(
-                                    image_bytes,
-                                    content_type="image/png",
-                                    prefix="documents/previews",
-                                )
-                                image_url = preview_object.url
-                                preview_urls.append(image_url)
-                                logger.info("Stored PDF preview page %d: %s", page_num + 1, preview_object.key)
-                            except (StorageError, Exception) as e:
-                                logger.error("Failed to upload PDF preview page %d: %s", page_num + 1, e)
-                                # Fallback to base64 - this should never fail
-                                try:
-                                    data_url = f"data:image/png;base64,{base64.b64encode(image_bytes).decode()}"
-                                    image_url = data_url
-                                    logger.warning("Using base64 fallback for page %d", page_num + 1)
-                                except Exception as base64_error:
-                                    logger.error("Even base64 encoding failed for page %d: %s", page_num + 1, base64_error)
-                                    # Skip this page if even base64 fails
-                                    continue
-                        else:
-                            # No storage service, use base64
-                            try:
-                                data_url = f"data:image/png;base64,{base64.b64encode(image_bytes).decode()}"
-                                image_url = data_url
-                                logger.debug("Using inline base64 preview due to missing storage.")
-                            except Exception as e:
-                                logger.error("Base64 encoding failed for page %d: %s", page_num + 1, e)
-                                continue
-
-                        # Add image to content HTML
-                        if image_url:
-                            content_html += f'<img src="{image_url}" alt="Page {page_num + 1}" class="w-full h-auto mb-4 rounded-lg shadow-md" />'
-                        
-                        # 2. Extract text for SEO (hidden/collapsible content)
-                        try:
-                            text = page.get_text()
-                            if text.strip():
-                                text_html += f"<p>{text.replace(chr(10), '<br>')}</p>"
-                        except Exception as e:
-                            logger.warning("Failed to extract text from page %d: %s", page_num + 1, e)
-                    except Exception as e:
-                        logger.error("Error processing PDF page %d: %s", page_num + 1, e, exc_info=True)
-                        # Continue with next page instead of failing completely
-                        continue
-            finally:
-                doc.close()
-                logger.debug("PDF document closed")
-        
-        else:
-            raise HTTPException(status_code=400, detail="Unsupported file type. Please upload .docx or .pdf")
-
-        # Upload original document to storage
-        if storage_service:
-            # Validate temp file exists before upload
-            if not os.path.exists(temp_filename):
-                logger.error("Temp file does not exist for upload: %s", temp_filename)
-                stored_document = None
-            else:
-                try:
-                    logger.info("Uploading original document to R2")
-                    stored_document = storage_service.upload_file(
-                        temp_filename,
-                        content_type=file.content_type or "application/octet-stream",
-                        prefix="documents/originals",
-                    )
-                    logger.info("Stored analyzed document: %s", stored_document.key)
-                except StorageError as e:
-                    logger.error("Failed to store analyzed document: %s", e)
-                    # Don't fail the whole request if document storage fails - we still have content
-                    stored_document = None
-                except Exception as e:
-                    logger.error("Unexpected error storing document: %s", e, exc_info=True)
-                    # Don't fail the whole request
-                    stored_document = None
-        else:
-            logger.warning("Document stored only in-memory; R2 unavailable.")
-            stored_document = None
+        storage_service = _analysis_storage()
 
-        # Build response - always return content even if storage fails
-        response = {
-            "content": content_html,  # Images (for PDF) or styled text (for DOCX)
-            "seo_text": text_html,    # Raw text for SEO
-        }
+        # Repeated uploads of the same file are answered from the result cache.
+        # Results are only cached when storage is available, so no inline images.
+        cache_key: Optional[str] = None
+        content_sha256: Optional[str] = None
+        if settings.DOCUMENT_CACHE_ENABLED and storage_service is not None:
+            content_sha256 = await asyncio.to_thread(lambda: hashlib.sha256(file_bytes).hexdigest())
+            cache_key = analysis_cache_key(content_sha256, storage_name=storage_service.name)
+            cached = get_cached_analysis(db, cache_key)
+            if cached is not None:
+                logger.info("Serving cached analysis for %s (sha256=%s)", file.filename, content_sha256)
+                await index_analysis(
+                    db,
+                    file_bytes,
+                    cached,
+                    content_sha256=content_sha256,
+                    filename=file.filename,
+                    kind=document_kind(file_ext),
+                    content_type=file.content_type,
+                    owner_id=get_current_user_id(authorization),
+                )
+                cached["cached"] = True
+                return cached
 
-        if stored_document:
-            response["document_url"] = stored_document.url
-            logger.info("Response includes document URL: %s", stored_document.url)
+        # Uploads run in the background while the document is parsed/rendered.
+        # For PDFs, rasterization runs in the render pool so the event loop keeps
+        # serving other requests, and each page's preview upload overlaps with
+        # rendering of later pages.
+        uploads = UploadPipeline(storage_service)
+        analysis = DocumentAnalysis(
+            file_bytes,
+            kind=document_kind(file_ext),
+            content_type=file.content_type or "application/octet-stream",
+            uploads=uploads,
+        )
+        logger.info("Processing %s file", analysis.kind.upper())
+        try:
+            await analysis.run()
+        except DocumentRenderError as e:
+            raise _analysis_http_error(e)
+
+        response = analysis.response()
+        if analysis.document:
+            logger.info("Response includes document URL: %s", analysis.document.url)
         else:
             logger.warning("Response does not include document URL (storage failed or unavailable)")
         
-        if preview_urls:
-            response["preview_urls"] = preview_urls
-            logger.info("Response includes %d preview URLs", len(preview_urls))
-        
         # Validate that we have some content to return
-        if not content_html and not text_html:
+        if not analysis.content_html and not analysis.text_html:
             logger.error("No content extracted from document")
             raise HTTPException(
                 status_code=400, 
@@ -358,7 +284,29 @@ async def analyze_document(file: UploadFile = File(...)):
             )
         
         logger.info("Document analysis completed successfully. Content length: %d chars, SEO text length: %d chars", 
-                   len(content_html), len(text_html))
+                   len(analysis.content_html), len(analysis.text_html))
+
+        # Keep the extracted text searchable instead of throwing it away
+        await index_analysis(
+            db,
+            file_bytes,
+            response,
+            content_sha256=content_sha256,
+            filename=file.filename,
+            kind=analysis.kind,
+            content_type=file.content_type,
+            storage_key=analysis.document.key if analysis.document else None,
+            owner_id=get_current_user_id(authorization),
+        )
+
+        if cache_key and analysis.document and not analysis.inline_previews:
+            store_analysis(
+                db,
+                cache_key,
+                content_sha256=content_sha256,
+                filename=file.filename,
+                response=response,
+            )
         return response
 
     except HTTPException:
@@ -367,11 +315,11 @@ async def analyze_document(file: UploadFile = File(...)):
     except StorageError as storage_error:
         logger.exception("Storage error in analyze_document: %s", storage_error)
         # Always try to return content if we have any, even if storage failed
-        if content_html or text_html:
+        if analysis and (analysis.content_html or analysis.text_html):
             logger.warning("Storage error but returning extracted content")
             return {
-                "content": content_html,
-                "seo_text": text_html,
+                "content": analysis.content_html,
+                "seo_text": analysis.text_html,
                 "warning": "Document storage failed, but content was extracted successfully"
             }
         # Only fail if we have no content at all
@@ -379,20 +327,366 @@ async def analyze_document(file: UploadFile = File(...)):
     except Exception as e:
         logger.exception("Unexpected error processing document: %s", e, exc_info=True)
         # Always try to return content if we have any
-        if content_html or text_html:
+        if analysis and (analysis.content_html or analysis.text_html):
             logger.warning("Unexpected error but returning extracted content")
             return {
-                "content": content_html,
-                "seo_text": text_html,
+                "content": analysis.content_html,
+                "seo_text": analysis.text_html,
                 "warning": f"Error occurred during processing: {str(e)}"
             }
         # Only fail if we have no content at all
         raise HTTPException(status_code=500, detail=f"Error processing document: {str(e)}")
     
     finally:
-        # Cleanup temp file
-        if os.path.exists(temp_filename):
+        if uploads is not None:
+            await uploads.aclose()
+
+
+STREAM_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream",
+}
+
+
+def _encode_event(event: dict, stream_format: str) -> bytes:
+    payload = json.dumps(event, ensure_ascii=False)
+    if stream_format == "sse":
+        return f"event: {event['event']}\ndata: {payload}\n\n".encode()
+    return f"{payload}\n".encode()
+
+
+async def _analysis_events(
+    analysis: DocumentAnalysis,
+    *,
+    filename: Optional[str],
+    db: Optional[Session] = None,
+    owner_id: Optional[str] = None,
+) -> AsyncIterator[dict]:
+    """Yield the events of a streamed analysis; errors become a final ``error`` event."""
+    try:
+        yield {
+            "event": "start",
+            "filename": filename,
+            "type": analysis.kind,
+            "page_count": analysis.page_count,
+        }
+
+        if analysis.kind == "docx":
+            await analysis.run()
+            yield {"event": "content", "content": analysis.content_html, "seo_text": analysis.text_html}
+        else:
+            async for page, preview in analysis.iter_pages():
+                yield {
+                    "event": "page",
+                    "page": page.number,
+                    "image_url": preview.url if preview else None,
+                    "thumbnail_url": preview.thumbnail_url if preview else None,
+                    "content": page_image_html(preview, page.number) if preview else "",
+                    "seo_text": page_text_html(page.text),
+                }
+
+        stored_document = await analysis.finish()
+        summary = {
+            "event": "done",
+            "document_url": stored_document.url if stored_document else None,
+            "preview_urls": analysis.preview_urls,
+            "page_count": analysis.page_count,
+        }
+        if analysis.warning:
+            summary["warning"] = analysis.warning
+        if db is not None and (analysis.content_html or analysis.text_html):
+            record = await index_analysis(
+                db,
+                analysis.data,
+                analysis.response(),
+                filename=filename,
+                kind=analysis.kind,
+                content_type=analysis.content_type,
+                storage_key=stored_document.key if stored_document else None,
+                owner_id=owner_id,
+            )
+            if record is not None:
+                summary["document_id"] = record.id
+        yield summary
+    except DocumentRenderError as e:
+        error = _analysis_http_error(e)
+        yield {"event": "error", "status": error.status_code, "detail": error.detail}
+    except Exception as e:
+        logger.exception("Unexpected error streaming document analysis: %s", e)
+        yield {"event": "error", "status": 500, "detail": f"Error processing document: {str(e)}"}
+    finally:
+        await analysis.uploads.aclose()
+
+
+@router.post("/analyze/stream")
+async def analyze_document_stream(
+    file: UploadFile = File(...),
+    format: str = Query("ndjson", pattern="^(ndjson|sse)$"),
+    authorization: Optional[str] = Header(None, alias="Authorization"),
+    db: Session = Depends(get_db),
+):
+    """
+    Streaming variant of ``/analyze``.
+
+    Emits one event per line (NDJSON) or as server-sent events: ``start``, then
+    a ``page`` event per PDF page (or one ``content`` event for DOCX) as soon as
+    it is ready, then a ``done`` summary with the document URL. Validation
+    errors are returned as normal HTTP errors before the stream starts; later
+    failures arrive as a final ``error`` event.
+    """
+    logger.info("Starting streamed document analysis for file: %s (content_type: %s)",
+                file.filename, file.content_type)
+
+    file_bytes = await file.read()
+    file_ext = _validate_document(file, file_bytes)
+
+    analysis = DocumentAnalysis(
+        file_bytes,
+        kind=document_kind(file_ext),
+        content_type=file.content_type or "application/octet-stream",
+        uploads=UploadPipeline(_analysis_storage()),
+    )
+    try:
+        await analysis.open()
+    except DocumentRenderError as e:
+        await analysis.uploads.aclose()
+        raise _analysis_http_error(e)
+    events = _analysis_events(
+        analysis, filename=file.filename, db=db, owner_id=get_current_user_id(authorization)
+    )
+
+    async def body() -> AsyncIterator[bytes]:
+        async for event in events:
+            yield _encode_event(event, format)
+
+    return StreamingResponse(
+        body(),
+        media_type=STREAM_MEDIA_TYPES[format],
+        # Ask proxies not to buffer, otherwise the first page arrives with the last
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+JOB_SOURCE_PREFIX = "documents/originals/"
+DOC_CONTENT_TYPES = {
+    "pdf": "application/pdf",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+}
+
+
+def _job_response(job: DocumentJob) -> DocumentJobResponse:
+    return DocumentJobResponse(
+        id=job.id,
+        status=job.status,
+        filename=job.filename,
+        page_count=job.page_count,
+        pages_done=job.pages_done or 0,
+        progress=job_progress(job),
+        result=job.result,
+        error=job.error,
+        created_at=job.created_at,
+        updated_at=job.updated_at,
+        finished_at=job.finished_at,
+    )
+
+
+def _job_sessions(db: Session) -> sessionmaker:
+    """Session factory for job workers; they outlive the request's session."""
+    return sessionmaker(autocommit=False, autoflush=False, bind=db.get_bind())
+
+
+@router.post("/jobs", response_model=DocumentJobResponse, status_code=202)
+async def create_document_job(
+    file: Optional[UploadFile] = File(None),
+    storage_key: Optional[str] = Form(None),
+    filename: Optional[str] = Form(None),
+    db: Session = Depends(get_db),
+):
+    """
+    Queue a document for background analysis and return the job.
+
+    Send either the file itself or the ``storage_key`` of a document previously
+    stored via ``/documents/upload``. Poll ``GET /documents/jobs/{id}`` for
+    progress; the final ``result`` has the same shape as ``/documents/analyze``.
+    With ``DOCUMENT_JOB_INLINE`` this request and each poll process a slice of it.
+    """
+    if (file is None) == (not storage_key):
+        raise HTTPException(status_code=400, detail="Provide either a file or a storage_key")
+
+    storage_service = _analysis_storage()
+    file_bytes: Optional[bytes] = None
+    content_sha256: Optional[str] = None
+    source_key: Optional[str] = None
+
+    if file is not None:
+        file_bytes = await file.read()
+        file_ext = _validate_document(file, file_bytes)
+        name = file.filename
+        kind = document_kind(file_ext)
+        content_type = file.content_type or DOC_CONTENT_TYPES[kind]
+        content_sha256 = await asyncio.to_thread(lambda: hashlib.sha256(file_bytes).hexdigest())
+
+        if storage_service is not None:
+            # Persist the original first so another instance can resume the job
             try:
-                os.remove(temp_filename)
-            except Exception:
-                pass
+                stored = await storage_service.aupload_bytes(
+                    file_bytes,
+                    content_type=content_type,
+                    prefix="documents/originals",
+                    content_addressed=True,
+                )
+                source_key = stored.key
+            except StorageError as exc:
+                logger.error("Failed to store document for job: %s", exc)
+    else:
+        if storage_service is None:
+            raise HTTPException(
+                status_code=503,
+                detail="Document storage is temporarily unavailable. Please try again later.",
+            )
+        if not storage_key.startswith(JOB_SOURCE_PREFIX) or ".." in storage_key:
+            raise HTTPException(status_code=400, detail="storage_key must refer to an uploaded document")
+        if not await storage_service.aobject_exists(storage_key):
+            raise HTTPException(status_code=404, detail="Document not found in storage")
+        source_key = storage_key
+        name = filename or storage_key.rsplit("/", 1)[-1]
+        # Content-addressed keys have no extension; the worker sniffs the file then
+        kind = document_kind(name)
+        content_type = DOC_CONTENT_TYPES.get(kind)
+
+    job = create_job(
+        db,
+        filename=name,
+        content_type=content_type,
+        kind=kind,
+        source_key=source_key,
+        content_sha256=content_sha256,
+    )
+
+    if content_sha256 and settings.DOCUMENT_CACHE_ENABLED and storage_service is not None:
+        cached = get_cached_analysis(db, analysis_cache_key(content_sha256, storage_name=storage_service.name))
+        if cached is not None:
+            logger.info("Completing document job %s from the analysis cache", job.id)
+            complete_job(db, job, cached)
+            return _job_response(job)
+
+    if settings.DOCUMENT_JOB_INLINE:
+        # Nothing may run after the response: start the job now, polls continue it
+        if source_key:
+            await process_job_slice(db, job.id, data=file_bytes, storage=storage_service)
+        else:
+            # Later requests could not read the document back; finish it here
+            await process_job(job.id, _job_sessions(db), data=file_bytes, storage=storage_service)
+            db.refresh(job)
+        return _job_response(job)
+
+    job_runner.submit(job.id, _job_sessions(db), data=file_bytes, storage=storage_service)
+    logger.info("Queued document job %s for %s", job.id, name)
+    return _job_response(job)
+
+
+@router.get("/jobs/{job_id}", response_model=DocumentJobResponse)
+async def get_document_job(job_id: str, db: Session = Depends(get_db)):
+    """Return a document job's status, per-page progress and, once done, its result."""
+    job = db.query(DocumentJob).filter(DocumentJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    expire_stale_job(db, job)
+    if settings.DOCUMENT_JOB_INLINE:
+        if job.status in (JOB_QUEUED, JOB_PROCESSING):
+            await process_job_slice(db, job.id)
+    elif is_abandoned(job) and job.id not in job_runner:
+        # The submitting instance went away before starting it; resume from storage
+        logger.info("Resuming abandoned document job %s", job.id)
+        job_runner.submit(job.id, _job_sessions(db))
+
+    return _job_response(job)
+
+
+@router.get("/search", response_model=DocumentSearchResponse)
+async def search_document_text(
+    q: str = Query(..., min_length=1, max_length=200),
+    page: int = Query(1, ge=1),
+    limit: int = Query(20, ge=1, le=50),
+    authorization: Optional[str] = Header(None, alias="Authorization"),
+    db: Session = Depends(get_db),
+):
+    """
+    Find analyzed documents containing every word of ``q``, with the posts embedding them.
+
+    Answered from the term index; documents are public once an approved post
+    embeds them, and visible to their owner before that.
+    """
+    found = search_documents(
+        db, q, user_id=get_current_user_id(authorization), limit=limit, offset=(page - 1) * limit
+    )
+
+    results = []
+    posts = {}
+    for record in found["documents"]:
+        summaries = [
+            DocumentPostSummary(id=post.id, title=post.title, post_type=post.post_type, created_at=post.created_at)
+            for post in found["posts"][record.id]
+        ]
+        for summary in summaries:
+            posts.setdefault(summary.id, summary)
+        results.append(DocumentSearchResult(
+            id=record.id,
+            filename=record.filename,
+            url=record.url,
+            page_count=record.page_count,
+            snippet=snippet(record.text, found["terms"]),
+            created_at=record.created_at,
+            posts=summaries,
+        ))
+
+    return DocumentSearchResponse(
+        documents=results,
+        posts=list(posts.values()),
+        total=found["total"],
+        page=page,
+        limit=limit,
+    )
+
+
+@router.get("/{doc_id}/pages/{number}")
+async def get_document_page(
+    doc_id: str,
+    number: int,
+    width: Optional[int] = Query(None, ge=1),
+):
+    """
+    Redirect to the preview image of one page of an analyzed PDF.
+
+    Pages past the eagerly rendered ones are rendered on first request and
+    stored, so later requests only cost a storage lookup. ``width`` picks a
+    smaller rendition (snapped to a few fixed widths).
+    """
+    if not is_document_id(doc_id) or number < 1:
+        raise HTTPException(status_code=404, detail="Page not found")
+
+    try:
+        storage_service = get_storage_backend()
+    except StorageError as exc:
+        logger.error("Storage unavailable for page rendering: %s", exc)
+        raise HTTPException(
+            status_code=503,
+            detail="Document storage is temporarily unavailable. Please try again later.",
+        ) from exc
+
+    try:
+        stored = await get_page(storage_service, doc_id, number, width=width)
+    except DocumentPageNotFound as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+    except DocumentRenderError as e:
+        raise _analysis_http_error(e)
+    except StorageError as exc:
+        logger.error("Failed to store rendered page %d of %s: %s", number, doc_id, exc)
+        raise HTTPException(
+            status_code=503,
+            detail="Document storage is temporarily unavailable. Please try again later.",
+        ) from exc
+
+    # The target depends on the preview settings, so don't let clients pin it forever
+    return RedirectResponse(stored.url, headers={"Cache-Control": "public, max-age=86400"})
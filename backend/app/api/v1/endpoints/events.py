@@ -2,13 +2,25 @@
 Events endpoints
 """
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Header
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Header, Request
 from sqlalchemy.orm import Session
+from app.core.cache import EVENTS, USERS, CachedResponse, cached_response, mark_changed
 from app.core.database import get_db
+from app.core.http_cache import Validators
+from app.core.responses import FastJSONResponse, dumps
 from app.core.security import decode_access_token
 from app.models.event import Event, EventRegistration
 from app.models.user import User
 from app.schemas.event import EventCreate, EventUpdate, EventResponse, EventRegistrationRequest
+from app.services.events import (
+    EVENT_FIELDS,
+    event_list_validators,
+    event_response,
+    event_validators,
+    project_events,
+    serialize_events,
+)
+from app.services.images import get_image_variants
 import uuid
 from datetime import datetime
 
@@ -29,97 +41,84 @@ def get_current_user_id(authorization: Optional[str] = None) -> Optional[str]:
 
 @router.get("", response_model=dict)
 async def get_events(
+    request: Request,
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1, le=100),
     organizer_id: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,title,image"),
+    view: Optional[str] = Query(None, description="Field preset: card or full (default)"),
     db: Session = Depends(get_db)
 ):
     """Get all events with pagination"""
     offset = (page - 1) * limit
+    try:
+        selection = EVENT_FIELDS.select(fields, view)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    def events_query(db: Session):
+        query = db.query(Event)
+        if organizer_id:
+            query = query.filter(Event.organizer_id == organizer_id)
+        return query
+    
+    def validate(db: Session) -> Validators:
+        return event_list_validators(db, events_query(db), page, limit, organizer_id, sorted(selection))
+    
+    def load(db: Session) -> CachedResponse:
+        query = events_query(db)
+        validators = validate(db)
+        events = project_events(query, selection).order_by(Event.date.asc()).offset(offset).limit(limit).all()
+        total = query.count()
+        
+        result = serialize_events(db, events, selection)
+        
+        return CachedResponse(dumps({
+            "events": result,
+            "total": total,
+            "page": page,
+            "limit": limit,
+        }), validators)
+    
+    cache_key = ("events", page, limit, organizer_id, selection)
+    return await cached_response(request, db, cache_key, load, validate=validate, tags=(EVENTS, USERS))
+
+
+@router.get("/{event_id}", response_model=EventResponse)
+async def get_event(event_id: str, request: Request, db: Session = Depends(get_db)):
+    """Get single event by ID"""
+    def validate(db: Session) -> Optional[Validators]:
+        return event_validators(db, event_id)
     
-    query = db.query(Event)
-    if organizer_id:
-        query = query.filter(Event.organizer_id == organizer_id)
-    
-    events = query.order_by(Event.date.asc()).offset(offset).limit(limit).all()
-    total = query.count()
-    
-    result = []
-    for event in events:
+    def load(db: Session) -> Optional[CachedResponse]:
+        validators = validate(db)
+        if validators is None:
+            return None
+        
+        event = db.query(Event).filter(Event.id == event_id).one()
         organizer = db.query(User).filter(User.id == event.organizer_id).first()
         participants_count = db.query(EventRegistration).filter(
             EventRegistration.event_id == event.id
         ).count()
         
-        result.append(EventResponse(
-            id=event.id,
-            title=event.title,
-            description=event.description,
-            full_description=event.full_description,
-            date=event.date,
-            time=event.time,
-            location=event.location,
-            address=event.address,
-            image_url=event.image_url,
-            max_participants=event.max_participants,
-            registration_deadline=event.registration_deadline,
-            categories=event.categories,
-            organizer_id=event.organizer_id,
-            organizer_name=organizer.full_name if organizer else "Unknown",
+        return CachedResponse(dumps(event_response(
+            event,
+            organizer=organizer,
             participants_count=participants_count,
-            bank_name=event.bank_name,
-            account_number=event.account_number,
-            account_holder_name=event.account_holder_name,
-            created_at=event.created_at,
-            updated_at=event.updated_at,
-        ))
-    
-    return {
-        "events": result,
-        "total": total,
-        "page": page,
-        "limit": limit,
-    }
-
-
-@router.get("/{event_id}", response_model=EventResponse)
-async def get_event(event_id: str, db: Session = Depends(get_db)):
-    """Get single event by ID"""
-    event = db.query(Event).filter(Event.id == event_id).first()
+            image=get_image_variants(db, event.image_url),
+        )), validators)
     
-    if not event:
+    response = await cached_response(
+        request, db, ("event", event_id), load, validate=validate, tags=(EVENTS, USERS)
+    )
+    
+    if response is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Event not found",
         )
     
-    organizer = db.query(User).filter(User.id == event.organizer_id).first()
-    participants_count = db.query(EventRegistration).filter(
-        EventRegistration.event_id == event.id
-    ).count()
-    
-    return EventResponse(
-        id=event.id,
-        title=event.title,
-        description=event.description,
-        full_description=event.full_description,
-        date=event.date,
-        time=event.time,
-        location=event.location,
-        address=event.address,
-        image_url=event.image_url,
-        max_participants=event.max_participants,
-        registration_deadline=event.registration_deadline,
-        categories=event.categories,
-        organizer_id=event.organizer_id,
-        organizer_name=organizer.full_name if organizer else "Unknown",
-        participants_count=participants_count,
-        bank_name=event.bank_name,
-        account_number=event.account_number,
-        account_holder_name=event.account_holder_name,
-        created_at=event.created_at,
-        updated_at=event.updated_at,
-    )
+    return response
 
 
 @router.post("", response_model=EventResponse, status_code=status.HTTP_201_CREATED)
@@ -158,32 +157,19 @@ async def create_event(
     )
     
     db.add(new_event)
+    mark_changed(db, EVENTS)
     db.commit()
     db.refresh(new_event)
     
-    organizer = db.query(User).filter(User.id == user_id).first()
-    
-    return EventResponse(
-        id=new_event.id,
-        title=new_event.title,
-        description=new_event.description,
-        full_description=new_event.full_description,
-        date=new_event.date,
-        time=new_event.time,
-        location=new_event.location,
-        address=new_event.address,
-        image_url=new_event.image_url,
-        max_participants=new_event.max_participants,
-        registration_deadline=new_event.registration_deadline,
-        categories=new_event.categories,
-        organizer_id=new_event.organizer_id,
-        organizer_name=organizer.full_name if organizer else "Unknown",
-        participants_count=0,
-        bank_name=new_event.bank_name,
-        account_number=new_event.account_number,
-        account_holder_name=new_event.account_holder_name,
-        created_at=new_event.created_at,
-        updated_at=new_event.updated_at,
+    organizer = db.get(User, user_id)
+    
+    return FastJSONResponse(
+        event_response(
+            new_event,
+            organizer=organizer,
+            image=get_image_variants(db, new_event.image_url),
+        ),
+        status_code=status.HTTP_201_CREATED,
     )
 
 
@@ -222,6 +208,7 @@ async def update_event(
     for field, value in update_data.items():
         setattr(event, field, value)
     
+    mark_changed(db, EVENTS)
     db.commit()
     db.refresh(event)
     
@@ -230,28 +217,12 @@ async def update_event(
         EventRegistration.event_id == event.id
     ).count()
     
-    return EventResponse(
-        id=event.id,
-        title=event.title,
-        description=event.description,
-        full_description=event.full_description,
-        date=event.date,
-        time=event.time,
-        location=event.location,
-        address=event.address,
-        image_url=event.image_url,
-        max_participants=event.max_participants,
-        registration_deadline=event.registration_deadline,
-        categories=event.categories,
-        organizer_id=event.organizer_id,
-        organizer_name=organizer.full_name if organizer else "Unknown",
+    return FastJSONResponse(event_response(
+        event,
+        organizer=organizer,
         participants_count=participants_count,
-        bank_name=event.bank_name,
-        account_number=event.account_number,
-        account_holder_name=event.account_holder_name,
-        created_at=event.created_at,
-        updated_at=event.updated_at,
-    )
+        image=get_image_variants(db, event.image_url),
+    ))
 
 
 @router.delete("/{event_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -284,6 +255,7 @@ async def delete_event(
         )
     
     db.delete(event)
+    mark_changed(db, EVENTS)
     db.commit()
 
 
@@ -358,6 +330,7 @@ async def register_for_event(
     )
     
     db.add(new_registration)
+    mark_changed(db, EVENTS)
     db.commit()
     
     return {"message": "Successfully registered for event"}
@@ -390,6 +363,7 @@ async def cancel_event_registration(
         )
     
     db.delete(registration)
+    mark_changed(db, EVENTS)
     db.commit()
     
     return {"message": "Registration cancelled"}
@@ -0,0 +1,85 @@
+"""
+Home page endpoint
+"""
+import hashlib
+from datetime import datetime, time
+
+from fastapi import APIRouter, Depends, Query, Request
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+from app.core.cache import EVENTS, POSTS, USERS, CachedResponse, cached_load
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.http_cache import make_validators
+from app.core.responses import dumps
+from app.models.blog import BlogPost
+from app.models.event import Event
+from app.models.user import User
+from app.services.events import EVENT_FIELDS, project_events, serialize_events
+from app.services.posts import POST_FIELDS, project_posts, serialize_posts
+
+router = APIRouter()
+
+
+@router.get("", response_model=dict)
+async def get_home(
+    request: Request,
+    events_limit: int = Query(12, ge=0, le=50),
+    posts_limit: int = Query(4, ge=0, le=20),
+    db: Session = Depends(get_db)
+):
+    """
+    Everything the home page shows on first paint: upcoming approved events,
+    the latest approved blog and content posts (card fields) and site counts.
+    """
+    # Event dates are stored naive, in UTC; "upcoming" includes the rest of today
+    today = datetime.combine(datetime.utcnow().date(), time.min)
+
+    def load(db: Session) -> CachedResponse:
+        upcoming = db.query(Event).filter(Event.status == "approved", Event.date >= today)
+        blog_posts = db.query(BlogPost).filter(
+            BlogPost.status == "approved",
+            or_(BlogPost.post_type == "blog", BlogPost.post_type.is_(None)),
+        )
+        content_posts = db.query(BlogPost).filter(
+            BlogPost.status == "approved",
+            BlogPost.post_type == "content",
+        )
+
+        # All counters in one round trip
+        counts = db.query(
+            upcoming.with_entities(func.count(Event.id)).scalar_subquery().label("upcoming_events"),
+            blog_posts.with_entities(func.count(BlogPost.id)).scalar_subquery().label("blog_posts"),
+            content_posts.with_entities(func.count(BlogPost.id)).scalar_subquery().label("content_posts"),
+            db.query(func.count(User.id)).scalar_subquery().label("users"),
+        ).one()
+
+        event_selection = EVENT_FIELDS.select(view="card")
+        events = (
+            project_events(upcoming, event_selection).order_by(Event.date.asc()).limit(events_limit).all()
+            if events_limit else []
+        )
+
+        post_selection = POST_FIELDS.select(view="card")
+        blogs, contents = (
+            project_posts(query, post_selection).order_by(BlogPost.created_at.desc()).limit(posts_limit).all()
+            if posts_limit else []
+            for query in (blog_posts, content_posts)
+        )
+        # One author/likes lookup for both feeds
+        posts = serialize_posts(db, blogs + contents, post_selection)
+
+        body = dumps({
+            "upcoming_events": serialize_events(db, events, event_selection),
+            "blog_posts": posts[:len(blogs)],
+            "content_posts": posts[len(blogs):],
+            "counts": dict(counts._mapping),
+        })
+        # The aggregate has no single timestamp to validate against; the body itself is the version
+        return CachedResponse(body, make_validators("home", hashlib.blake2b(body, digest_size=16).hexdigest()))
+
+    cache_key = ("home", today, events_limit, posts_limit)
+    response = await cached_load(
+        db, cache_key, load, tags=(EVENTS, POSTS, USERS), ttl=settings.HOME_CACHE_TTL_SECONDS
+    )
+    return response.respond(request)
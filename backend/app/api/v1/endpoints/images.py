@@ -0,0 +1,81 @@
+"""
+Image endpoints
+"""
+import logging
+from typing import Optional
+
+from fastapi import APIRouter, Depends, File, Header, HTTPException, UploadFile, status
+from sqlalchemy.orm import Session
+
+from app.core.database import get_db
+from app.core.security import decode_access_token
+from app.schemas.image import ImageUploadResponse
+from app.services.images import MAX_IMAGE_BYTES, InvalidImage, ingest_image
+from app.services.storage import StorageError, get_storage_backend
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+def get_current_user_id(authorization: Optional[str] = None) -> Optional[str]:
+    """Extract user ID from authorization token"""
+    if not authorization or not authorization.startswith("Bearer "):
+        return None
+
+    token = authorization.split(" ")[1]
+    payload = decode_access_token(token)
+    if payload:
+        return payload.get("sub")
+    return None
+
+
+@router.post("", response_model=ImageUploadResponse, status_code=status.HTTP_201_CREATED)
+async def upload_image(
+    file: UploadFile = File(...),
+    authorization: Optional[str] = Header(None, alias="Authorization"),
+    db: Session = Depends(get_db)
+):
+    """
+    Ingest a cover image for a post or event.
+
+    The image is resized into WebP thumbnail/card/hero variants with a blurred
+    placeholder. Save the returned ``url`` as ``image_url``; post and event
+    responses then include the variants under ``image``.
+    """
+    if not get_current_user_id(authorization):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+        )
+
+    data = await file.read(MAX_IMAGE_BYTES + 1)
+    if not data:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="File is empty")
+    if len(data) > MAX_IMAGE_BYTES:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Image is too large. Maximum allowed size is {MAX_IMAGE_BYTES // (1024 * 1024)}MB.",
+        )
+
+    try:
+        storage = get_storage_backend()
+        asset = await ingest_image(db, storage, data)
+    except InvalidImage as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    except StorageError as exc:
+        logger.error("Failed to store image variants: %s", exc)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Image storage is temporarily unavailable. Please try again later.",
+        ) from exc
+
+    return ImageUploadResponse(
+        id=asset.id,
+        url=asset.hero_url,
+        thumbnail_url=asset.thumbnail_url,
+        card_url=asset.card_url,
+        hero_url=asset.hero_url,
+        placeholder=asset.placeholder,
+        width=asset.width,
+        height=asset.height,
+    )
@@ -8,6 +8,7 @@ import uuid
 from fastapi import APIRouter, Depends, Header, HTTPException, status
 from sqlalchemy.orm import Session
 
+from app.core.cache import EVENTS, mark_changed
 from app.core.database import get_db
 from app.core.security import decode_access_token
 from app.models.event import Event, EventRegistration
@@ -154,6 +155,7 @@ async def confirm_payment(
         )
         db.add(registration)
 
+    mark_changed(db, EVENTS)
     db.commit()
     return {"status": "success"}
 
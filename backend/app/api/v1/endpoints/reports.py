@@ -77,7 +77,7 @@ async def create_report(
     db.commit()
     db.refresh(new_report)
     
-    reporter = db.query(User).filter(User.id == user_id).first()
+    reporter = db.get(User, user_id)
     
     return ReportResponse(
         id=new_report.id,
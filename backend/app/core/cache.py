@@ -0,0 +1,356 @@
+"""
+In-process response cache for public read endpoints.
+
+``TTLCache`` is a bounded LRU whose entries expire after a TTL and carry
+tags. Write paths call ``mark_changed(db, POSTS)`` etc. before committing:
+it bumps the tag's row in ``cache_versions`` in the same transaction, and
+once the transaction commits this instance drops every entry tagged with
+it. Other workers/instances read ``cache_versions`` at most every
+``CACHE_VERSION_CHECK_SECONDS`` and drop the tags whose version moved, so
+they stop serving stale responses without a shared cache service.
+
+List and detail endpoints store the rendered body with its validators
+(``CachedResponse``), so a hit answers without touching the database,
+``304`` included. On a miss, ``cached_response`` answers a conditional
+request from the cheap validators alone when the client's copy is current,
+and otherwise goes through ``cached_load``, which runs the blocking load
+in a worker thread once per key however many requests are waiting for it
+(single-flight). Loads use their own session: the requests sharing one may
+be cancelled (and their sessions closed) before it finishes.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Set, Tuple, TypeVar
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from starlette.responses import Response
+
+from app.core.config import settings
+from app.core.http_cache import Validators, not_modified
+from app.core.singleflight import SingleFlight
+from app.models.cache import CacheVersion
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+# Tags of cached responses, invalidated by the write paths
+POSTS = "posts"
+EVENTS = "events"
+USERS = "users"  # Author/organizer names and avatars
+
+
+@dataclass
+class _Entry:
+    value: Any
+    expires_at: float
+    tags: Tuple[str, ...]
+
+
+class TTLCache:
+    """Thread-safe LRU of at most ``max_entries`` values, each valid for ``ttl`` seconds."""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._tags: Dict[str, Set[Hashable]] = {}
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0, "invalidations": 0}
+
+    @property
+    def generation(self) -> int:
+        """Incremented by every invalidation; loads started before one must not be stored."""
+        return self._generation
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """The cached value of ``key``, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= time.monotonic():
+                self._remove(key)
+                self._stats["expired"] += 1
+                entry = None
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry.value
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        *,
+        tags: Iterable[str] = (),
+        ttl: Optional[float] = None,
+        generation: Optional[int] = None,
+    ) -> None:
+        """Store ``value``; with ``generation``, only if nothing was invalidated since it was read."""
+        if self.max_entries <= 0:
+            return
+        tags = tuple(tags)
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _Entry(value, time.monotonic() + (self.ttl if ttl is None else ttl), tags)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self._stats["evictions"] += 1
+
+    def invalidate(self, *tags: str) -> int:
+        """Drop every entry tagged with any of ``tags``; returns how many."""
+        with self._lock:
+            keys = set()
+            for tag in tags:
+                keys.update(self._tags.get(tag, ()))
+            for key in keys:
+                self._remove(key)
+            self._generation += 1
+            self._stats["invalidations"] += len(keys)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+            self._generation += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "hit_ratio": round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+            }
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry.tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    """A rendered JSON body with the validators it was sent with."""
+
+    body: bytes
+    validators: Validators
+
+    def respond(self, request: Request) -> Response:
+        cached = not_modified(request, self.validators)
+        if cached is not None:
+            return cached
+        return Response(self.body, media_type="application/json", headers=self.validators.headers)
+
+
+response_cache = TTLCache(
+    max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES if settings.RESPONSE_CACHE_ENABLED else 0,
+    ttl=settings.RESPONSE_CACHE_TTL_SECONDS,
+)
+
+
+loads = SingleFlight()
+
+# Session.info key of the tags a transaction changed
+_CHANGED_TAGS = "cache_changed_tags"
+
+# Versions of cache_versions this instance has seen, and when it last looked
+_seen_versions: Dict[str, int] = {}
+_checked_at = float("-inf")
+_versions_lock = threading.Lock()
+
+
+def invalidate(*tags: str) -> int:
+    """Drop this instance's cached responses tagged with ``tags``."""
+    return response_cache.invalidate(*tags)
+
+
+def mark_changed(db: Session, *tags: str) -> None:
+    """
+    Record that the transaction in progress on ``db`` changes ``tags``.
+
+    Their ``cache_versions`` rows are bumped in the same transaction, so
+    other instances see the change exactly when it commits; this instance
+    drops the tags right after the commit.
+    """
+    tags = tuple(sorted(set(tags)))
+    try:
+        updated = (
+            db.query(CacheVersion)
+            .filter(CacheVersion.tag.in_(tags))
+            .update({CacheVersion.version: CacheVersion.version + 1}, synchronize_session=False)
+        )
+        if updated < len(tags):
+            # Rows are created by the migration; this only runs on databases made with create_all
+            existing = {tag for (tag,) in db.query(CacheVersion.tag).filter(CacheVersion.tag.in_(tags))}
+            for tag in set(tags) - existing:
+                db.add(CacheVersion(tag=tag, version=1))
+    except SQLAlchemyError as exc:
+        logger.warning("Failed to bump cache versions %s; other instances rely on the TTL: %s", tags, exc)
+    db.info.setdefault(_CHANGED_TAGS, set()).update(tags)
+
+
+def tag_version(db: Session, tag: str):
+    """
+    ``cache_versions`` value of ``tag`` as a scalar subquery, for validators:
+    it moves on every write, even two within one timestamp's precision.
+    """
+    return db.query(CacheVersion.version).filter(CacheVersion.tag == tag).scalar_subquery()
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session) -> None:
+    tags = session.info.pop(_CHANGED_TAGS, None)
+    if tags:
+        invalidate(*tags)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back(session: Session) -> None:
+    session.info.pop(_CHANGED_TAGS, None)
+
+
+def sync_cache_versions(db: Session) -> int:
+    """
+    Drop cached responses whose tags another instance bumped; returns how many.
+
+    Reads ``cache_versions`` at most once per ``CACHE_VERSION_CHECK_SECONDS``
+    (0 = every call).
+    """
+    global _checked_at
+    now = time.monotonic()
+    with _versions_lock:
+        if now - _checked_at < settings.CACHE_VERSION_CHECK_SECONDS:
+            return 0
+        _checked_at = now
+    try:
+        versions = dict(db.query(CacheVersion.tag, CacheVersion.version).all())
+    except SQLAlchemyError as exc:
+        db.rollback()
+        logger.warning("Failed to read cache versions: %s", exc)
+        return 0
+    with _versions_lock:
+        changed = [tag for tag, version in versions.items() if _seen_versions.get(tag) != version]
+        _seen_versions.update(versions)
+    return invalidate(*changed) if changed else 0
+
+
+def _in_own_session(bind: Any, load: Callable[[Session], T]) -> T:
+    # Runs in a worker thread, on a session no request can close under it
+    db = Session(bind=bind, autoflush=False)
+    try:
+        return load(db)
+    finally:
+        db.close()
+
+
+async def cached_load(
+    db: Session,
+    key: Hashable,
+    load: Callable[[Session], Optional[CachedResponse]],
+    *,
+    tags: Iterable[str],
+    ttl: Optional[float] = None,
+) -> Optional[CachedResponse]:
+    """
+    The cached response of ``key``, else the result of the blocking
+    ``load(session)`` (None for "not found", which isn't cached), kept for
+    ``ttl`` seconds (default ``RESPONSE_CACHE_TTL_SECONDS``).
+
+    Concurrent misses of a key share one ``load`` run in a worker thread on
+    a session of its own (bound like ``db``). Requests arriving after an
+    invalidation start a new load rather than joining one that may have
+    read the data from before the write.
+    """
+    sync_cache_versions(db)
+    hit = response_cache.get(key)
+    if hit is not None:
+        return hit
+    return await _load(db, key, load, tags=tags, ttl=ttl)
+
+
+async def _load(
+    db: Session,
+    key: Hashable,
+    load: Callable[[Session], Optional[CachedResponse]],
+    *,
+    tags: Iterable[str],
+    ttl: Optional[float],
+) -> Optional[CachedResponse]:
+    generation = response_cache.generation
+    bind = db.get_bind()
+
+    async def run() -> Optional[CachedResponse]:
+        response = await asyncio.to_thread(_in_own_session, bind, load)
+        if response is not None:
+            response_cache.set(key, response, tags=tags, ttl=ttl, generation=generation)
+        return response
+
+    return await loads.do((generation, key), run)
+
+
+def _is_conditional(request: Request) -> bool:
+    return "if-none-match" in request.headers or "if-modified-since" in request.headers
+
+
+async def cached_response(
+    request: Request,
+    db: Session,
+    key: Hashable,
+    load: Callable[[Session], Optional[CachedResponse]],
+    *,
+    validate: Callable[[Session], Optional[Validators]],
+    tags: Iterable[str],
+    ttl: Optional[float] = None,
+) -> Optional[Response]:
+    """
+    Answer ``request`` from the cache, else from ``load`` (see ``cached_load``);
+    None when the resource doesn't exist.
+
+    A conditional request that misses the cache first runs the cheap
+    ``validate(session)`` and gets its ``304`` without the full load.
+    """
+    sync_cache_versions(db)
+    hit = response_cache.get(key)
+    if hit is not None:
+        return hit.respond(request)
+    if _is_conditional(request):
+        validators = await asyncio.to_thread(_in_own_session, db.get_bind(), validate)
+        if validators is None:
+            return None
+        cached = not_modified(request, validators)
+        if cached is not None:
+            return cached
+    response = await _load(db, key, load, tags=tags, ttl=ttl)
+    return None if response is None else response.respond(request)
+
+
+def cache_metrics() -> Dict[str, Any]:
+    return {**response_cache.metrics(), "single_flight": loads.metrics()}
@@ -6,6 +6,13 @@ from typing import List
 import os
 
 
+def _default_workers(limit: int) -> str:
+    """Default size of a worker process pool: none on Vercel, whose functions can't fork worker processes."""
+    if os.getenv("VERCEL"):
+        return "0"
+    return str(min(os.cpu_count() or 1, limit))
+
+
 class Settings(BaseSettings):
     """Application settings"""
     
@@ -69,6 +76,82 @@ class Settings(BaseSettings):
     CLOUDFLARE_R2_BUCKET: str | None = os.getenv("CLOUDFLARE_R2_BUCKET")
     CLOUDFLARE_R2_ENDPOINT: str | None = os.getenv("CLOUDFLARE_R2_ENDPOINT")
     CLOUDFLARE_R2_PUBLIC_DOMAIN: str | None = os.getenv("CLOUDFLARE_R2_PUBLIC_DOMAIN")
+    # Streaming uploads: objects larger than one part go through S3 multipart upload.
+    # R2/S3 require every part except the last to be at least 5MB.
+    R2_MULTIPART_PART_SIZE: int = int(os.getenv("R2_MULTIPART_PART_SIZE", str(8 * 1024 * 1024)))
+    R2_MULTIPART_CONCURRENCY: int = int(os.getenv("R2_MULTIPART_CONCURRENCY", "4"))
+
+    # Storage backend: "r2" (Cloudflare R2 / S3), "local" (files under LOCAL_STORAGE_DIR,
+    # served at LOCAL_STORAGE_BASE_URL) or "memory" (process-local, for tests and benchmarks)
+    STORAGE_BACKEND: str = os.getenv("STORAGE_BACKEND", "r2")
+    LOCAL_STORAGE_DIR: str = os.getenv("LOCAL_STORAGE_DIR", "public/uploads")
+    LOCAL_STORAGE_BASE_URL: str = os.getenv("LOCAL_STORAGE_BASE_URL", "/uploads")
+    # Content-addressed mode keys objects by SHA-256 so identical payloads are stored once.
+    # Callers can still opt in or out per upload.
+    STORAGE_CONTENT_ADDRESSED_KEYS: bool = os.getenv("STORAGE_CONTENT_ADDRESSED_KEYS", "false").lower() == "true"
+
+    # Document analysis: PDF pages are rasterized in a process pool so large files
+    # don't block the event loop. 0 workers renders in a background thread instead,
+    # the default on Vercel, where functions can't start worker processes.
+    DOCUMENT_RENDER_WORKERS: int = int(os.getenv("DOCUMENT_RENDER_WORKERS", _default_workers(4)))
+    DOCUMENT_RENDER_PAGES_PER_TASK: int = int(os.getenv("DOCUMENT_RENDER_PAGES_PER_TASK", "4"))
+    DOCUMENT_MAX_PAGES: int = int(os.getenv("DOCUMENT_MAX_PAGES", "100"))
+    DOCUMENT_RENDER_TIMEOUT_SECONDS: float = float(os.getenv("DOCUMENT_RENDER_TIMEOUT_SECONDS", "60"))
+    # Pages after the first EAGER_PAGES are rendered when first viewed via
+    # /documents/{doc_id}/pages/{n} and kept in storage (0 = render every page up front)
+    DOCUMENT_EAGER_PAGES: int = int(os.getenv("DOCUMENT_EAGER_PAGES", "5"))
+    # Page preview encoding: webp, jpeg or png. Pages render at up to MAX_DPI but never
+    # wider than MAX_WIDTH pixels; a THUMBNAIL_WIDTH variant (0 = off) feeds srcset.
+    DOCUMENT_PREVIEW_FORMAT: str = os.getenv("DOCUMENT_PREVIEW_FORMAT", "webp")
+    DOCUMENT_PREVIEW_QUALITY: int = int(os.getenv("DOCUMENT_PREVIEW_QUALITY", "75"))
+    DOCUMENT_PREVIEW_MAX_WIDTH: int = int(os.getenv("DOCUMENT_PREVIEW_MAX_WIDTH", "1600"))
+    DOCUMENT_PREVIEW_MAX_DPI: int = int(os.getenv("DOCUMENT_PREVIEW_MAX_DPI", "144"))
+    DOCUMENT_PREVIEW_THUMBNAIL_WIDTH: int = int(os.getenv("DOCUMENT_PREVIEW_THUMBNAIL_WIDTH", "320"))
+    # Preview/original uploads in flight at once per analyzed document
+    DOCUMENT_UPLOAD_CONCURRENCY: int = int(os.getenv("DOCUMENT_UPLOAD_CONCURRENCY", "4"))
+    # Keep a record of every analyzed document with its text in a keyword index
+    # (GET /documents/search)
+    DOCUMENT_INDEX_ENABLED: bool = os.getenv("DOCUMENT_INDEX_ENABLED", "true").lower() == "true"
+    # Background analysis jobs (POST /documents/jobs): concurrent jobs per instance
+    # and the render budget per job, which can be far above a request's time limit.
+    DOCUMENT_JOB_WORKERS: int = int(os.getenv("DOCUMENT_JOB_WORKERS", "2"))
+    DOCUMENT_JOB_TIMEOUT_SECONDS: float = float(os.getenv("DOCUMENT_JOB_TIMEOUT_SECONDS", "600"))
+    # Process jobs a slice per request (the submission and each poll) instead of in
+    # background tasks; on by default on Vercel, which freezes a function once it has
+    # responded. A slice stops taking new pages after DOCUMENT_JOB_SLICE_SECONDS, which
+    # must leave room under the function's time limit.
+    DOCUMENT_JOB_INLINE: bool = os.getenv("DOCUMENT_JOB_INLINE", "true" if os.getenv("VERCEL") else "false").lower() == "true"
+    DOCUMENT_JOB_SLICE_SECONDS: float = float(os.getenv("DOCUMENT_JOB_SLICE_SECONDS", "5"))
+    # Re-uploads of the same file reuse the stored analysis instead of re-rendering.
+    # Entries are evicted least-recently-used once their total size passes the limit.
+    DOCUMENT_CACHE_ENABLED: bool = os.getenv("DOCUMENT_CACHE_ENABLED", "true").lower() == "true"
+    DOCUMENT_CACHE_MAX_BYTES: int = int(os.getenv("DOCUMENT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+    # Cover images (POST /images): decoded once and resized into WebP variants in
+    # worker processes (0 = a background thread, the default on Vercel), at IMAGE_QUALITY.
+    IMAGE_WORKERS: int = int(os.getenv("IMAGE_WORKERS", _default_workers(2)))
+    IMAGE_QUALITY: int = int(os.getenv("IMAGE_QUALITY", "80"))
+
+    # Cache-Control of public GETs (post/event details and lists): browsers revalidate
+    # with the ETag after HTTP_CACHE_MAX_AGE seconds, the edge keeps responses for
+    # HTTP_CACHE_S_MAXAGE and may serve them stale while it revalidates in the background.
+    HTTP_CACHE_MAX_AGE: int = int(os.getenv("HTTP_CACHE_MAX_AGE", "0"))
+    HTTP_CACHE_S_MAXAGE: int = int(os.getenv("HTTP_CACHE_S_MAXAGE", "10"))
+    HTTP_CACHE_STALE_WHILE_REVALIDATE: int = int(os.getenv("HTTP_CACHE_STALE_WHILE_REVALIDATE", "60"))
+    # Mixed into every ETag, so a deploy that changes response shapes invalidates cached copies
+    HTTP_CACHE_ETAG_SALT: str = os.getenv("HTTP_CACHE_ETAG_SALT", os.getenv("VERCEL_GIT_COMMIT_SHA", ""))
+    # In-process cache of public list and detail responses, dropped on writes
+    # (see CACHE_VERSION_CHECK_SECONDS for other instances' writes).
+    RESPONSE_CACHE_ENABLED: bool = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+    RESPONSE_CACHE_MAX_ENTRIES: int = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "512"))
+    RESPONSE_CACHE_TTL_SECONDS: float = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "30"))
+    # The home page aggregate mixes every tag, so it is kept for less
+    HOME_CACHE_TTL_SECONDS: float = float(os.getenv("HOME_CACHE_TTL_SECONDS", "10"))
+    # How often an instance reads cache_versions to notice other instances' writes
+    # (0 = on every cached request)
+    CACHE_VERSION_CHECK_SECONDS: float = float(os.getenv("CACHE_VERSION_CHECK_SECONDS", "1"))
+    # Most sub-requests accepted by one POST /batch
+    BATCH_MAX_REQUESTS: int = int(os.getenv("BATCH_MAX_REQUESTS", "20"))
 
     # Pydantic v2 config
     model_config = SettingsConfigDict(
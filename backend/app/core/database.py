@@ -3,6 +3,7 @@ Database configuration and session management
 """
 import logging
 import re
+from fastapi import Request
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
@@ -87,13 +88,29 @@ except Exception as e:
 Base = declarative_base()
 
 
-def get_db():
+# ASGI scope key of a session shared by the sub-requests of POST /batch
+SHARED_SESSION_SCOPE_KEY = "shared_db_session"
+
+
+def get_db(request: Request):
     """
     Dependency for getting database session.
     
+    Sub-requests of a batch reuse the batch's session (``SHARED_SESSION_SCOPE_KEY``
+    in the ASGI scope), which the batch closes once they have all run.
+    
     Raises:
         RuntimeError: If database session factory is not available
     """
+    shared = request.scope.get(SHARED_SESSION_SCOPE_KEY)
+    if shared is not None:
+        try:
+            yield shared
+        except Exception:
+            shared.rollback()
+            raise
+        return
+    
     if SessionLocal is None:
         error_msg = "Database session factory is not available. Check database configuration and connection."
         logger.error(error_msg)
@@ -108,4 +125,3 @@ def get_db():
         raise
     finally:
         db.close()
-
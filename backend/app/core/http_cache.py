@@ -0,0 +1,113 @@
+"""
+HTTP conditional requests for public GET endpoints.
+
+Endpoints compute ``Validators`` (an ETag and Last-Modified) from a cheap
+query of timestamps and counters, answer ``304 Not Modified`` from them
+before loading or serializing anything, and send them with the full
+response otherwise. ``Cache-Control`` lets browsers and the edge (Vercel)
+keep public responses briefly and serve them stale while revalidating.
+"""
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Iterable, Optional
+
+from fastapi import Request
+from starlette.responses import Response
+
+from app.core.config import settings
+
+
+PRIVATE_CACHE_CONTROL = "private, no-cache"
+
+
+def public_cache_control() -> str:
+    return (
+        f"public, max-age={settings.HTTP_CACHE_MAX_AGE}, s-maxage={settings.HTTP_CACHE_S_MAXAGE}, "
+        f"stale-while-revalidate={settings.HTTP_CACHE_STALE_WHILE_REVALIDATE}"
+    )
+
+
+@dataclass(frozen=True)
+class Validators:
+    etag: str
+    last_modified: Optional[datetime] = None
+    cache_control: str = PRIVATE_CACHE_CONTROL
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        headers = {"ETag": self.etag, "Cache-Control": self.cache_control}
+        if self.last_modified is not None:
+            headers["Last-Modified"] = format_datetime(_utc(self.last_modified), usegmt=True)
+        return headers
+
+
+def _utc(value: datetime) -> datetime:
+    # Timestamps are stored naive, in UTC
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).replace(microsecond=0)
+
+
+def make_etag(*parts: Any) -> str:
+    """Weak ETag over ``parts`` (ids, timestamps, counters, query parameters)."""
+    digest = hashlib.blake2b(repr((settings.HTTP_CACHE_ETAG_SALT, parts)).encode(), digest_size=16).hexdigest()
+    return f'W/"{digest}"'
+
+
+def latest(values: Iterable[Optional[datetime]]) -> Optional[datetime]:
+    """The most recent of ``values``, ignoring NULLs."""
+    present = [value for value in values if value is not None]
+    return max(present) if present else None
+
+
+def make_validators(*parts: Any, last_modified: Optional[datetime] = None, public: bool = True) -> Validators:
+    return Validators(
+        etag=make_etag(*parts),
+        last_modified=last_modified,
+        cache_control=public_cache_control() if public else PRIVATE_CACHE_CONTROL,
+    )
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def is_fresh(request: Request, validators: Validators) -> bool:
+    """Whether the client's cached copy (If-None-Match / If-Modified-Since) is still current."""
+    if request.method not in ("GET", "HEAD"):
+        return False
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-Modified-Since is ignored when If-None-Match is present (RFC 9110)
+        return _etag_matches(if_none_match, validators.etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and validators.last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return _utc(validators.last_modified) <= since
+    return False
+
+
+def not_modified(request: Request, validators: Validators) -> Optional[Response]:
+    """A ``304`` response if the client's copy is current, else None."""
+    if is_fresh(request, validators):
+        return Response(status_code=304, headers=validators.headers)
+    return None
@@ -0,0 +1,105 @@
+"""
+Field projection (sparse fieldsets) for list endpoints.
+
+A ``FieldSet`` describes the fields a list item can return, which model
+columns each one needs, and named presets (``view=card|full``). Endpoints
+turn ``?fields=`` / ``?view=`` into a selection, load only the needed
+columns, and serialize items with a response model trimmed to the selection.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, FrozenSet, Iterable, Mapping, Optional, Sequence, Type
+
+from pydantic import BaseModel, create_model
+from sqlalchemy.orm import load_only
+
+# Trimmed models are cached per selection; arbitrary ?fields= combinations beyond this are built per request
+MAX_CACHED_MODELS = 256
+
+
+class FieldSet:
+    """
+    Selectable fields of one list resource.
+
+    ``columns`` maps derived response fields to the model columns they need
+    (e.g. ``author_name`` needs ``author_id``); other fields are read from
+    the column of the same name, if the model has one. ``required`` fields
+    are always returned.
+    """
+
+    def __init__(
+        self,
+        model: Any,
+        response_model: Type[BaseModel],
+        *,
+        presets: Mapping[str, Iterable[str]],
+        columns: Optional[Mapping[str, Sequence[str]]] = None,
+        required: Iterable[str] = ("id",),
+        default_view: str = "full",
+    ):
+        self.model = model
+        self.response_model = response_model
+        self.names: FrozenSet[str] = frozenset(response_model.model_fields)
+        self.required = frozenset(required)
+        self.default_view = default_view
+        self.presets = {"full": self.names, **{name: frozenset(fields) for name, fields in presets.items()}}
+        self._columns = dict(columns or {})
+        self._model_columns = frozenset(model.__table__.columns.keys())
+        self._models: Dict[FrozenSet[str], Type[BaseModel]] = {self.names: response_model}
+        for name, fields in self.presets.items():
+            unknown = fields - self.names
+            if unknown:
+                raise ValueError(f"Preset {name!r} has unknown fields: {', '.join(sorted(unknown))}")
+
+    def select(self, fields: Optional[str] = None, view: Optional[str] = None) -> FrozenSet[str]:
+        """
+        Resolve ``?fields=a,b`` or ``?view=`` to the set of fields to return.
+
+        ``fields`` wins over ``view``; neither means the default view.
+
+        Raises:
+            ValueError: On an unknown field or view
+        """
+        if fields:
+            selection = frozenset(name.strip() for name in fields.split(",") if name.strip())
+            unknown = selection - self.names
+            if unknown:
+                raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+            return selection | self.required
+        view = view or self.default_view
+        if view not in self.presets:
+            raise ValueError(f"Unknown view {view!r}; expected one of: {', '.join(sorted(self.presets))}")
+        return self.presets[view] | self.required
+
+    def columns_for(self, selection: Iterable[str]) -> FrozenSet[str]:
+        """Model columns needed to produce ``selection``."""
+        needed = set()
+        for name in selection:
+            if name in self._columns:
+                needed.update(self._columns[name])
+            elif name in self._model_columns:
+                needed.add(name)
+        return frozenset(needed | (self.required & self._model_columns))
+
+    def load_only(self, selection: Iterable[str]):
+        """Query option loading only the columns ``selection`` needs."""
+        return load_only(*(getattr(self.model, name) for name in sorted(self.columns_for(selection))))
+
+    def response_model_for(self, selection: FrozenSet[str]) -> Type[BaseModel]:
+        """The response model with only the selected fields (cached per selection)."""
+        key = frozenset(selection)
+        model = self._models.get(key)
+        if model is None:
+            definitions = {
+                name: (info.annotation, info)
+                for name, info in self.response_model.model_fields.items()
+                if name in selection
+            }
+            model = create_model(f"{self.response_model.__name__}Fields", **definitions)
+            if len(self._models) < MAX_CACHED_MODELS:
+                self._models[key] = model
+        return model
+
+    def serialize(self, values: Dict[str, Any], selection: FrozenSet[str]) -> BaseModel:
+        """Build an item from trusted ``values`` (read from the database), skipping validation."""
+        return self.response_model_for(selection).model_construct(**values)
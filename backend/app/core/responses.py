@@ -0,0 +1,31 @@
+"""
+Fast JSON responses.
+
+Routes that return a ``Response`` skip FastAPI's response_model validation
+and ``jsonable_encoder`` pass. ``FastJSONResponse`` is for handlers whose
+content is already built from trusted data (ORM rows mapped with
+``model_construct``); orjson encodes datetimes, enums and nested models
+directly.
+"""
+from typing import Any
+
+import orjson
+from pydantic import BaseModel
+from starlette.responses import JSONResponse
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson, pydantic models included."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
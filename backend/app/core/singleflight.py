@@ -0,0 +1,60 @@
+"""
+Single-flight: concurrent identical loads share one computation.
+
+When a popular page is requested by many clients at once, every request
+misses the cache at the same moment. ``SingleFlight.do`` runs the load for
+the first request of a key and hands the same result (or exception) to
+every request that arrives while it is in flight, so the database sees one
+load per distinct key instead of one per client.
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+
+T = TypeVar("T")
+
+
+def _consume_exception(task: "asyncio.Task[Any]") -> None:
+    # A flight whose callers were all cancelled must not log "exception never retrieved"
+    if not task.cancelled():
+        task.exception()
+
+
+class SingleFlight:
+    """Per-key deduplication of in-flight coroutines, within one event loop."""
+
+    def __init__(self):
+        self._flights: Dict[Hashable, "asyncio.Task[Any]"] = {}
+        self._lock = threading.Lock()
+        self._stats = {"flights": 0, "collapsed": 0}
+
+    async def do(self, key: Hashable, load: Callable[[], Awaitable[T]]) -> T:
+        """
+        Await ``load()`` for ``key``, or the call already in flight for it.
+
+        The load runs as its own task: a caller that is cancelled (e.g. the
+        client disconnected) doesn't cancel it for the others.
+        """
+        with self._lock:
+            task = self._flights.get(key)
+            if task is None or task.get_loop() is not asyncio.get_running_loop():
+                task = asyncio.ensure_future(load())
+                task.add_done_callback(_consume_exception)
+                task.add_done_callback(lambda done: self._finish(key, done))
+                self._flights[key] = task
+                self._stats["flights"] += 1
+            else:
+                self._stats["collapsed"] += 1
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: "asyncio.Task[Any]") -> None:
+        with self._lock:
+            if self._flights.get(key) is task:
+                del self._flights[key]
+
+    def metrics(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._stats, "in_flight": len(self._flights)}
@@ -14,10 +14,12 @@ try:
     # Đặt toàn bộ các dòng import của bạn ở đây
     from fastapi import FastAPI
     from fastapi.middleware.cors import CORSMiddleware
-    from fastapi.staticfiles import StaticFiles
     from app.core.config import settings
     from app.core.database import Base, engine
     from app.api.v1.api import api_router
+    from app.api.uploads import router as uploads_router
+    from app.services.documents import job_runner, shutdown_render_pool
+    from app.services.images import shutdown_image_pool
     
     # Configure logging
     logging.basicConfig(
@@ -48,14 +50,14 @@ try:
         allow_headers=["*"],
     )
 
-    # Serve static files (uploads)
+    # Serve static files (uploads) from the local/in-memory storage backend, with Range support
     # Note: Vercel serverless functions have read-only file system
     # Static file serving is handled by Vercel's static file system
     # Only create directory if not in serverless environment
     if not os.getenv("VERCEL"):
         try:
-            os.makedirs("public/uploads", exist_ok=True)
-            app.mount("/uploads", StaticFiles(directory="public/uploads"), name="uploads")
+            os.makedirs(settings.LOCAL_STORAGE_DIR, exist_ok=True)
+            app.include_router(uploads_router, prefix=settings.LOCAL_STORAGE_BASE_URL.rstrip("/"))
         except OSError:
             # Read-only file system (e.g., Vercel serverless)
             logger.warning("Cannot create uploads directory (read-only file system). Static files will be handled by Vercel.")
@@ -64,6 +66,11 @@ try:
     
     # Include API router
     app.include_router(api_router, prefix="/api/v1")
+
+    # Cancel in-flight document jobs and stop PDF render/image worker processes with the app
+    app.add_event_handler("shutdown", job_runner.shutdown)
+    app.add_event_handler("shutdown", shutdown_render_pool)
+    app.add_event_handler("shutdown", shutdown_image_pool)
     
 except ImportError as ie:
     # Import errors - in chi tiết
@@ -7,6 +7,16 @@ from app.models.report import Report
 from app.models.notification import Notification
 from app.models.email_subscription import EmailSubscription
 from app.models.password_reset import PasswordResetToken
+from app.models.document import (
+    DocumentAnalysisCache,
+    DocumentAsset,
+    DocumentJob,
+    DocumentRecord,
+    DocumentTerm,
+    PostDocument,
+)
+from app.models.image import ImageAsset
+from app.models.cache import CacheVersion
 
 __all__ = [
     "User",
@@ -19,6 +29,14 @@ __all__ = [
     "Notification",
     "EmailSubscription",
     "PasswordResetToken",
+    "DocumentAnalysisCache",
+    "DocumentJob",
+    "DocumentRecord",
+    "DocumentTerm",
+    "DocumentAsset",
+    "PostDocument",
+    "ImageAsset",
+    "CacheVersion",
 ]
 
 
@@ -3,7 +3,7 @@ Blog models
 """
 from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Integer
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import query_expression, relationship
 from app.core.database import Base
 
 
@@ -14,15 +14,22 @@ class BlogPost(Base):
     id = Column(String(255), primary_key=True, index=True)
     title = Column(String(500), nullable=False, index=True)
     content = Column(Text, nullable=False)
-    excerpt = Column(Text)
+    excerpt = Column(Text)  # Plain text, computed from content on save
     category = Column(String(100), nullable=False)
     image_url = Column(String(500))
+    # Reading metadata computed from content on save (NULL until backfilled for older posts)
+    word_count = Column(Integer)
+    reading_minutes = Column(Integer)
+    first_image_url = Column(String(500))
     status = Column(String(20), default="pending", nullable=False)  # pending, approved, rejected
     post_type = Column(String(20), default="blog", nullable=False, index=True)  # blog, content - to distinguish between blog posts and content posts
     author_id = Column(String(255), ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, onupdate=func.now())
 
+    # Start of the content, loaded instead of the full text when only the excerpt is needed
+    content_preview = query_expression()
+
     # Relationships
     author = relationship("User", back_populates="blog_posts")
     likes = relationship("BlogPostLike", back_populates="post", cascade="all, delete-orphan")
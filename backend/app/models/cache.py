@@ -0,0 +1,21 @@
+"""
+Cache coherency models
+"""
+from sqlalchemy import BigInteger, Column, DateTime, String
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+
+class CacheVersion(Base):
+    """
+    Version of one cache tag (posts, events, users), bumped by every write
+    in the writing transaction. Instances compare it with the version they
+    last saw to drop cached responses another instance made stale.
+    """
+
+    __tablename__ = "cache_versions"
+
+    tag = Column(String(50), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
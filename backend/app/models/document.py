@@ -0,0 +1,105 @@
+"""
+Document analysis models
+"""
+from sqlalchemy import JSON, Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy.dialects import mysql
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+
+# Analysis HTML can outgrow MySQL's 64KB TEXT for long documents
+LongText = Text().with_variant(mysql.LONGTEXT(), "mysql")
+
+
+class DocumentAnalysisCache(Base):
+    """Stored result of /documents/analyze, keyed by file hash and render settings."""
+
+    __tablename__ = "document_analysis_cache"
+
+    id = Column(String(255), primary_key=True, index=True)
+    cache_key = Column(String(64), nullable=False, unique=True, index=True)
+    content_sha256 = Column(String(64), nullable=False, index=True)
+    filename = Column(String(500), nullable=True)
+    content = Column(LongText, nullable=False)
+    seo_text = Column(LongText, nullable=False)
+    preview_urls = Column(JSON, nullable=False)  # List of preview image URLs
+    document_url = Column(String(1000), nullable=True)
+    page_count = Column(Integer, nullable=True)
+    warning = Column(String(500), nullable=True)
+    size_bytes = Column(Integer, nullable=False, default=0)  # Approximate row size, used for eviction
+    hit_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, server_default=func.now())
+    last_used_at = Column(DateTime, server_default=func.now(), index=True)
+
+
+class DocumentJob(Base):
+    """Background document analysis job; the record is the source of truth for polling."""
+
+    __tablename__ = "document_jobs"
+
+    id = Column(String(255), primary_key=True, index=True)
+    status = Column(String(20), nullable=False, default="queued", index=True)  # queued, processing, completed, failed
+    filename = Column(String(500), nullable=True)
+    content_type = Column(String(255), nullable=True)
+    kind = Column(String(10), nullable=True)  # pdf, docx (detected from the file when not known up front)
+    source_key = Column(String(1000), nullable=True)  # Storage key of the original document
+    content_sha256 = Column(String(64), nullable=True)
+    page_count = Column(Integer, nullable=True)
+    pages_done = Column(Integer, nullable=False, default=0)
+    result = Column(JSON, nullable=True)  # /analyze response body once completed
+    error = Column(Text, nullable=True)
+    # Jobs processed a slice per request (DOCUMENT_JOB_INLINE): the output of the
+    # first pages_done pages, and until when a request is working on the next slice
+    partial = Column(JSON, nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, onupdate=func.now())
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+
+class DocumentRecord(Base):
+    """An analyzed document with its extracted text, searchable via ``DocumentTerm``."""
+
+    __tablename__ = "documents"
+
+    id = Column(String(255), primary_key=True, index=True)
+    owner_id = Column(String(255), ForeignKey("users.id"), nullable=True, index=True)
+    filename = Column(String(500), nullable=True)
+    kind = Column(String(10), nullable=True)  # pdf, docx
+    content_type = Column(String(255), nullable=True)
+    content_sha256 = Column(String(64), nullable=False, unique=True, index=True)
+    storage_key = Column(String(1000), nullable=True)
+    url = Column(String(1000), nullable=True)
+    page_count = Column(Integer, nullable=True)
+    text = Column(LongText, nullable=False)  # Plain extracted text
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, onupdate=func.now())
+
+
+class DocumentTerm(Base):
+    """Inverted index: one row per distinct (folded) word of a document."""
+
+    __tablename__ = "document_terms"
+
+    term = Column(String(64), primary_key=True)
+    document_id = Column(String(255), ForeignKey("documents.id", ondelete="CASCADE"), primary_key=True, index=True)
+
+
+class DocumentAsset(Base):
+    """URLs (original, page previews) that identify a document inside post HTML."""
+
+    __tablename__ = "document_assets"
+
+    url_hash = Column(String(64), primary_key=True)  # SHA-256 of the URL without query string
+    document_id = Column(String(255), ForeignKey("documents.id", ondelete="CASCADE"), primary_key=True, index=True)
+
+
+class PostDocument(Base):
+    """Documents embedded in a post, refreshed whenever the post content is saved."""
+
+    __tablename__ = "post_documents"
+
+    post_id = Column(String(255), ForeignKey("blog_posts.id", ondelete="CASCADE"), primary_key=True)
+    document_id = Column(String(255), ForeignKey("documents.id", ondelete="CASCADE"), primary_key=True, index=True)
@@ -0,0 +1,22 @@
+"""
+Image models
+"""
+from sqlalchemy import Column, DateTime, Integer, String
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+
+class ImageAsset(Base):
+    """An ingested cover image and its stored WebP variants."""
+
+    __tablename__ = "image_assets"
+
+    id = Column(String(64), primary_key=True, index=True)  # SHA-256 of the uploaded file
+    width = Column(Integer, nullable=False)  # Of the hero variant
+    height = Column(Integer, nullable=False)
+    thumbnail_url = Column(String(500), nullable=False)
+    card_url = Column(String(500), nullable=False)
+    hero_url = Column(String(500), nullable=False)
+    placeholder = Column(String(2000), nullable=False)  # Tiny blurred WebP as a data URL (LQIP)
+    created_at = Column(DateTime, server_default=func.now())
@@ -0,0 +1,31 @@
+"""
+Batch request schemas
+"""
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, Field
+
+
+class BatchSubRequest(BaseModel):
+    """One request of a batch, addressed like the API client does (relative to /api/v1)"""
+    id: Optional[str] = None
+    method: str = "GET"
+    path: str = Field(..., description="e.g. /events/123 or /notifications/unread-count?limit=5")
+    headers: Dict[str, str] = Field(default_factory=dict)
+
+
+class BatchRequest(BaseModel):
+    """Schema for a batch of sub-requests"""
+    requests: List[BatchSubRequest]
+
+
+class BatchSubResponse(BaseModel):
+    """Schema for the response of one sub-request"""
+    id: Optional[str] = None
+    status: int
+    headers: Dict[str, str]
+    body: Any = None
+
+
+class BatchResponse(BaseModel):
+    """Schema for batch responses, in request order"""
+    responses: List[BatchSubResponse]
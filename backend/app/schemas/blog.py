@@ -4,6 +4,7 @@ Blog schemas
 from pydantic import BaseModel
 from datetime import datetime
 from typing import Optional
+from app.schemas.image import ImageVariants
 
 
 class BlogPostBase(BaseModel):
@@ -34,11 +35,15 @@ class BlogPostResponse(BlogPostBase):
     author_name: str
     author_avatar: Optional[str] = None
     excerpt: Optional[str] = None
+    word_count: Optional[int] = None
+    reading_minutes: Optional[int] = None
+    first_image_url: Optional[str] = None
     status: str
     likes_count: int = 0
     comments_count: int = 0
     created_at: datetime
     updated_at: Optional[datetime] = None
+    image: Optional[ImageVariants] = None  # Set when image_url is an ingested image
 
     class Config:
         from_attributes = True
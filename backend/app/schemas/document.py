@@ -0,0 +1,52 @@
+"""
+Document schemas
+"""
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel
+from datetime import datetime
+
+
+class DocumentJobResponse(BaseModel):
+    """Schema for a background document analysis job"""
+    id: str
+    status: str  # queued, processing, completed, failed
+    filename: Optional[str] = None
+    page_count: Optional[int] = None
+    pages_done: int = 0
+    progress: float = 0.0  # 0..1
+    result: Optional[Dict[str, Any]] = None  # Same body as /documents/analyze
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class DocumentPostSummary(BaseModel):
+    """Schema for a post that embeds a document"""
+    id: str
+    title: str
+    post_type: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+
+class DocumentSearchResult(BaseModel):
+    """Schema for a document matching a text search"""
+    id: str
+    filename: Optional[str] = None
+    url: Optional[str] = None
+    page_count: Optional[int] = None
+    snippet: str = ""
+    created_at: Optional[datetime] = None
+    posts: List[DocumentPostSummary] = []
+
+
+class DocumentSearchResponse(BaseModel):
+    """Schema for document search results"""
+    documents: List[DocumentSearchResult]
+    posts: List[DocumentPostSummary]  # Distinct posts embedding any matching document
+    total: int
+    page: int
+    limit: int
@@ -4,6 +4,7 @@ Event schemas
 from pydantic import BaseModel
 from datetime import datetime
 from typing import Optional, List
+from app.schemas.image import ImageVariants
 
 
 class EventBase(BaseModel):
@@ -58,6 +59,7 @@ class EventResponse(EventBase):
     participants_count: int = 0
     created_at: datetime
     updated_at: Optional[datetime] = None
+    image: Optional[ImageVariants] = None  # Set when image_url is an ingested image
 
     class Config:
         from_attributes = True
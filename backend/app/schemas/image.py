@@ -0,0 +1,23 @@
+"""
+Image schemas
+"""
+from pydantic import BaseModel
+
+
+class ImageVariants(BaseModel):
+    """Resized WebP variants of a cover image"""
+    thumbnail_url: str
+    card_url: str
+    hero_url: str
+    placeholder: str  # Tiny blurred preview as a data URL, shown while the variant loads
+    width: int
+    height: int
+
+    class Config:
+        from_attributes = True
+
+
+class ImageUploadResponse(ImageVariants):
+    """Result of POST /images; ``url`` is what to save as a post or event ``image_url``"""
+    id: str
+    url: str
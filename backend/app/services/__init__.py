@@ -1,5 +1,19 @@
 """Service layer package for reusable backend helpers."""
 
-from app.services.storage import R2StorageService, StorageError, StoredObject
+from app.services.storage import (
+    R2StorageService,
+    StorageBackend,
+    StorageError,
+    StorageSizeLimitError,
+    StoredObject,
+    get_storage_backend,
+)
 
-__all__ = ["R2StorageService", "StorageError", "StoredObject"]
+__all__ = [
+    "R2StorageService",
+    "StorageBackend",
+    "StorageError",
+    "StorageSizeLimitError",
+    "StoredObject",
+    "get_storage_backend",
+]
@@ -0,0 +1,108 @@
+"""Document analysis helpers (PDF rendering, conversion)."""
+
+from app.services.documents.analysis import (
+    DocumentAnalysis,
+    InvalidDocumentError,
+    document_kind,
+    open_docx,
+)
+from app.services.documents.cache import (
+    ANALYSIS_CACHE_VERSION,
+    analysis_cache_key,
+    evict_analysis_cache,
+    get_cached_analysis,
+    purge_analysis_cache,
+    store_analysis,
+)
+from app.services.documents.docx_html import DocxHtmlConverter, docx_to_html
+from app.services.documents.index import (
+    index_analysis,
+    index_document,
+    link_post_documents,
+    search_documents,
+    snippet,
+    tokenize,
+)
+from app.services.documents.jobs import (
+    JOB_COMPLETED,
+    JOB_FAILED,
+    JOB_PROCESSING,
+    JOB_QUEUED,
+    DocumentJobRunner,
+    create_job,
+    job_progress,
+    job_runner,
+    process_job,
+    process_job_slice,
+)
+from app.services.documents.pages import (
+    DocumentPageNotFound,
+    document_id,
+    get_page,
+    is_document_id,
+    page_url,
+)
+from app.services.documents.rendering import (
+    DocumentRenderError,
+    DocumentRenderTimeout,
+    PreviewOptions,
+    RenderedPage,
+    RenderResult,
+    count_pdf_pages,
+    iter_pdf_pages,
+    render_pdf,
+    shutdown_render_pool,
+)
+from app.services.documents.pipeline import iter_page_previews, page_image_html, page_text_html
+from app.services.documents.uploads import PreviewImage, UploadPipeline, inline_image
+
+__all__ = [
+    "ANALYSIS_CACHE_VERSION",
+    "JOB_COMPLETED",
+    "JOB_FAILED",
+    "JOB_PROCESSING",
+    "JOB_QUEUED",
+    "DocumentAnalysis",
+    "DocumentJobRunner",
+    "DocumentPageNotFound",
+    "DocumentRenderError",
+    "DocumentRenderTimeout",
+    "DocxHtmlConverter",
+    "InvalidDocumentError",
+    "PreviewImage",
+    "PreviewOptions",
+    "RenderedPage",
+    "RenderResult",
+    "UploadPipeline",
+    "analysis_cache_key",
+    "count_pdf_pages",
+    "create_job",
+    "document_id",
+    "document_kind",
+    "docx_to_html",
+    "evict_analysis_cache",
+    "get_cached_analysis",
+    "get_page",
+    "index_analysis",
+    "index_document",
+    "inline_image",
+    "is_document_id",
+    "iter_page_previews",
+    "iter_pdf_pages",
+    "job_progress",
+    "job_runner",
+    "link_post_documents",
+    "open_docx",
+    "page_image_html",
+    "page_text_html",
+    "page_url",
+    "process_job",
+    "process_job_slice",
+    "purge_analysis_cache",
+    "render_pdf",
+    "search_documents",
+    "shutdown_render_pool",
+    "snippet",
+    "store_analysis",
+    "tokenize",
+]
@@ -0,0 +1,279 @@
+"""
+Document to post-HTML conversion shared by /analyze, its streaming variant and
+background jobs.
+
+PDFs become one preview image per page (plus extracted text for SEO); DOCX
+files are converted to HTML by :mod:`docx_html`. ``DocumentAnalysis`` keeps its partial state
+readable while running, so callers can report progress or salvage content
+when a later step fails.
+"""
+from __future__ import annotations
+
+import asyncio
+import io
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from docx import Document
+
+from app.core.config import settings
+from app.services.documents.docx_html import docx_to_html
+from app.services.documents.pages import document_id, lazy_preview
+from app.services.documents.pipeline import iter_page_previews, page_image_html, page_text_html
+from app.services.documents.rendering import (
+    DocumentRenderError,
+    PreviewOptions,
+    RenderedPage,
+    count_pdf_pages,
+    describe_page_range,
+    page_budget,
+)
+from app.services.documents.uploads import PreviewImage, UploadPipeline
+from app.services.storage import StoredObject
+
+
+logger = logging.getLogger(__name__)
+
+DOCUMENT_KINDS = ("pdf", "docx")
+# On-demand pages are described (text and size) this many at a time
+DESCRIBED_PAGES_PER_CALL = 20
+
+
+class InvalidDocumentError(DocumentRenderError):
+    """Raised when the payload is not a readable PDF/DOCX file."""
+
+
+def document_kind(filename: Optional[str], data: Optional[bytes] = None) -> Optional[str]:
+    """
+    Return ``"pdf"``/``"docx"`` from the file extension, falling back to the
+    file signature when there is no usable name (e.g. a storage key).
+    """
+    name = (filename or "").lower()
+    if name.endswith(".pdf"):
+        return "pdf"
+    if name.endswith(".docx"):
+        return "docx"
+    if data is not None:
+        if data.startswith(b"%PDF"):
+            return "pdf"
+        if data.startswith(b"PK\x03\x04"):
+            return "docx"
+    return None
+
+
+def open_docx(data: bytes):
+    """Open a DOCX payload from memory."""
+    try:
+        return Document(io.BytesIO(data))
+    except Exception as exc:
+        raise InvalidDocumentError(f"Invalid DOCX file: {str(exc)}") from exc
+
+
+def truncation_warning(rendered_count: int, page_count: int) -> str:
+    return f"Only the first {rendered_count} of {page_count} pages were processed"
+
+
+async def count_pages(data: bytes) -> int:
+    """Return the page count of a PDF payload, raising ``InvalidDocumentError``."""
+    try:
+        return await asyncio.to_thread(count_pdf_pages, data)
+    except DocumentRenderError as exc:
+        raise InvalidDocumentError(str(exc)) from exc
+
+
+class DocumentAnalysis:
+    """Converts one document to post HTML and tracks the result as it grows."""
+
+    def __init__(
+        self,
+        data: bytes,
+        *,
+        kind: str,
+        content_type: str,
+        uploads: UploadPipeline,
+        original: Optional[StoredObject] = None,
+        eager_pages: Optional[int] = None,
+    ):
+        if kind not in DOCUMENT_KINDS:
+            raise InvalidDocumentError(f"Unsupported document type: {kind}")
+        self.data = data
+        self.kind = kind
+        self.content_type = content_type
+        self.uploads = uploads
+        self.document = original
+        self.content_html = ""
+        self.text_html = ""
+        self.preview_urls: List[str] = []
+        self.page_count: Optional[int] = None
+        self.rendered_pages = 0
+        self.inline_previews = False
+        # PDF pages past this many are rendered on first view (0 = render all now)
+        self.eager_pages = settings.DOCUMENT_EAGER_PAGES if eager_pages is None else eager_pages
+        self.lazy_pages = 0
+        self._original_upload: Optional[asyncio.Task] = None
+        self._docx = None
+        self._opened = False
+
+    async def open(self) -> None:
+        """
+        Validate the document and start the original upload in the background.
+
+        Raises:
+            InvalidDocumentError: If the payload cannot be opened
+        """
+        if self._opened:
+            return
+        if self.kind == "docx":
+            self._docx = await asyncio.to_thread(open_docx, self.data)
+            logger.debug("DOCX file opened successfully")
+        else:
+            self.page_count = await count_pages(self.data)
+            logger.info("PDF file opened successfully: %d pages", self.page_count)
+        if self.document is None:
+            self._original_upload = self.uploads.original(self.data, content_type=self.content_type)
+        self._opened = True
+
+    async def run(
+        self,
+        *,
+        on_page: Optional[Callable[["DocumentAnalysis"], Awaitable[None]]] = None,
+        timeout: Optional[float] = None,
+    ) -> "DocumentAnalysis":
+        """
+        Open (if needed) and convert the whole document.
+
+        ``on_page`` is awaited after every PDF page, e.g. to persist progress.
+
+        Raises:
+            InvalidDocumentError: If the payload cannot be opened
+            DocumentRenderTimeout: If rendering exceeds ``timeout``
+            DocumentRenderError: If the renderer fails
+        """
+        await self.open()
+        if self.kind == "docx":
+            # Images are stored from the converter thread (storage calls are blocking)
+            self.content_html, self.text_html = await asyncio.to_thread(
+                docx_to_html, self._docx, storage=self.uploads.storage
+            )
+        else:
+            async for _page, _preview in self.iter_pages(timeout=timeout):
+                if on_page is not None:
+                    await on_page(self)
+
+        await self.finish()
+        return self
+
+    async def iter_pages(
+        self, *, timeout: Optional[float] = None, start: int = 0
+    ) -> AsyncIterator[Tuple[RenderedPage, Optional[PreviewImage]]]:
+        """
+        Render PDF pages in order, adding each to the result before yielding it.
+
+        Only the first ``eager_pages`` pages are rasterized; later pages get
+        their text and a preview URL that renders the page on first view. That
+        needs the stored original, so without storage every page is rendered.
+        ``start`` (0-based) resumes after pages added by an earlier request.
+        """
+        budget = page_budget(self.page_count)
+        eager = budget
+        if self.eager_pages > 0 and self.uploads.storage is not None:
+            eager = min(self.eager_pages, budget)
+
+        if start < eager:
+            async for page, preview in iter_page_previews(
+                self.data, page_count=self.page_count, uploads=self.uploads,
+                max_pages=eager, timeout=timeout, start=start,
+            ):
+                self.add_page(page, preview)
+                yield page, preview
+        if eager >= budget:
+            return
+        start = max(start, eager)
+
+        doc_id = document_id(await self.finish())
+        if doc_id is None:
+            logger.warning("Original not stored; rendering all %d pages now", budget)
+            async for page, preview in iter_page_previews(
+                self.data, page_count=self.page_count, uploads=self.uploads,
+                max_pages=budget, timeout=timeout, start=start,
+            ):
+                self.add_page(page, preview)
+                yield page, preview
+            return
+
+        options = PreviewOptions.from_settings()
+        for first in range(start, budget, DESCRIBED_PAGES_PER_CALL):
+            last = min(first + DESCRIBED_PAGES_PER_CALL, budget)
+            pages = await asyncio.to_thread(describe_page_range, self.data, first, last, options)
+            for page in pages:
+                preview = lazy_preview(doc_id, page.width, page.height, page.number)
+                self.lazy_pages += 1
+                self.add_page(page, preview)
+                yield page, preview
+
+    def add_page(self, page: RenderedPage, preview: Optional[PreviewImage]) -> None:
+        self.rendered_pages += 1
+        if preview is None:
+            logger.error("Failed to render PDF page %d to image: %s", page.number, page.error)
+        else:
+            if preview.stored:
+                self.preview_urls.append(preview.url)
+            else:
+                self.inline_previews = True
+            # Add image to content HTML
+            self.content_html += page_image_html(preview, page.number)
+
+        # Extracted text for SEO (hidden/collapsible content)
+        self.text_html += page_text_html(page.text)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """The output of the pages added so far, for :meth:`restore` in a later request."""
+        return {
+            "content": self.content_html,
+            "seo_text": self.text_html,
+            "preview_urls": list(self.preview_urls),
+            "rendered_pages": self.rendered_pages,
+            "lazy_pages": self.lazy_pages,
+            "inline_previews": self.inline_previews,
+        }
+
+    def restore(self, snapshot: Dict[str, Any]) -> None:
+        """Continue from a :meth:`snapshot`; the next page is ``rendered_pages``."""
+        self.content_html = snapshot["content"]
+        self.text_html = snapshot["seo_text"]
+        self.preview_urls = list(snapshot["preview_urls"])
+        self.rendered_pages = snapshot["rendered_pages"]
+        self.lazy_pages = snapshot["lazy_pages"]
+        self.inline_previews = snapshot["inline_previews"]
+
+    async def finish(self) -> Optional[StoredObject]:
+        """Wait for the original upload started by :meth:`open`."""
+        if self._original_upload is not None:
+            self.document = await self._original_upload
+            self._original_upload = None
+        return self.document
+
+    @property
+    def truncated(self) -> bool:
+        return self.page_count is not None and self.rendered_pages < self.page_count
+
+    @property
+    def warning(self) -> Optional[str]:
+        if self.truncated:
+            return truncation_warning(self.rendered_pages, self.page_count)
+        return None
+
+    def response(self) -> Dict[str, Any]:
+        """Return the /analyze response body for the current state."""
+        response: Dict[str, Any] = {
+            "content": self.content_html,  # Images (for PDF) or styled text (for DOCX)
+            "seo_text": self.text_html,    # Raw text for SEO
+        }
+        if self.document:
+            response["document_url"] = self.document.url
+        if self.preview_urls:
+            response["preview_urls"] = list(self.preview_urls)
+        if self.truncated:
+            response["page_count"] = self.page_count
+            response["warning"] = self.warning
+        return response
@@ -0,0 +1,150 @@
+"""
+Result cache for document analysis.
+
+Entries are keyed by the SHA-256 of the uploaded bytes combined with
+everything that changes the produced HTML (preview encoding, page budget,
+storage backend, cache format version), so a settings change never serves a stale
+result. Total entry size is bounded by ``DOCUMENT_CACHE_MAX_BYTES``; the least
+recently used entries are evicted first.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy import func
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.document import DocumentAnalysisCache
+from app.services.documents.rendering import PreviewOptions
+
+
+logger = logging.getLogger(__name__)
+
+# Bump when the analysis output format changes to invalidate existing entries
+ANALYSIS_CACHE_VERSION = 3
+
+
+def analysis_cache_key(content_sha256: str, *, storage_name: str) -> str:
+    """Return the cache key for a file digest under the current render settings."""
+    fingerprint = "|".join([
+        f"v{ANALYSIS_CACHE_VERSION}",
+        content_sha256,
+        f"preview={PreviewOptions.from_settings().fingerprint}",
+        f"max_pages={settings.DOCUMENT_MAX_PAGES}",
+        f"eager_pages={settings.DOCUMENT_EAGER_PAGES}",
+        f"storage={storage_name}",
+    ])
+    return hashlib.sha256(fingerprint.encode()).hexdigest()
+
+
+def get_cached_analysis(db: Session, cache_key: str) -> Optional[Dict[str, Any]]:
+    """Return the cached analysis response for ``cache_key`` and record the hit."""
+    try:
+        entry = db.query(DocumentAnalysisCache).filter(DocumentAnalysisCache.cache_key == cache_key).first()
+        if entry is None:
+            return None
+        entry.hit_count = (entry.hit_count or 0) + 1
+        entry.last_used_at = datetime.utcnow()
+        db.commit()
+    except SQLAlchemyError as exc:
+        db.rollback()
+        logger.warning("Document analysis cache lookup failed: %s", exc)
+        return None
+    return _response_from_entry(entry)
+
+
+def store_analysis(
+    db: Session,
+    cache_key: str,
+    *,
+    content_sha256: str,
+    filename: Optional[str],
+    response: Dict[str, Any],
+) -> None:
+    """Save an analysis response, then evict old entries past the size limit."""
+    size_bytes = _entry_size(response)
+    if size_bytes > settings.DOCUMENT_CACHE_MAX_BYTES:
+        logger.info("Analysis result too large to cache (%d bytes)", size_bytes)
+        return
+
+    try:
+        entry = db.query(DocumentAnalysisCache).filter(DocumentAnalysisCache.cache_key == cache_key).first()
+        if entry is None:
+            entry = DocumentAnalysisCache(id=str(uuid.uuid4()), cache_key=cache_key, hit_count=0)
+            db.add(entry)
+        entry.content_sha256 = content_sha256
+        entry.filename = (filename or "")[:500] or None
+        entry.content = response.get("content", "")
+        entry.seo_text = response.get("seo_text", "")
+        entry.preview_urls = list(response.get("preview_urls", []))
+        entry.document_url = response.get("document_url")
+        entry.page_count = response.get("page_count")
+        entry.warning = response.get("warning")
+        entry.size_bytes = size_bytes
+        entry.last_used_at = datetime.utcnow()
+        db.commit()
+        evict_analysis_cache(db)
+    except SQLAlchemyError as exc:
+        db.rollback()
+        logger.warning("Failed to cache document analysis: %s", exc)
+
+
+def evict_analysis_cache(db: Session, max_bytes: Optional[int] = None) -> int:
+    """Delete least recently used entries until the cache fits ``max_bytes``."""
+    max_bytes = settings.DOCUMENT_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    total = db.query(func.coalesce(func.sum(DocumentAnalysisCache.size_bytes), 0)).scalar() or 0
+    if total <= max_bytes:
+        return 0
+
+    evicted = []
+    rows = (
+        db.query(DocumentAnalysisCache.id, DocumentAnalysisCache.size_bytes)
+        .order_by(DocumentAnalysisCache.last_used_at.asc(), DocumentAnalysisCache.created_at.asc())
+        .all()
+    )
+    for entry_id, size_bytes in rows:
+        if total <= max_bytes:
+            break
+        evicted.append(entry_id)
+        total -= size_bytes or 0
+
+    if evicted:
+        db.query(DocumentAnalysisCache).filter(DocumentAnalysisCache.id.in_(evicted)).delete(synchronize_session=False)
+        db.commit()
+        logger.info("Evicted %d document analysis cache entries", len(evicted))
+    return len(evicted)
+
+
+def purge_analysis_cache(db: Session) -> int:
+    """Delete every cached analysis and return how many entries were removed."""
+    deleted = db.query(DocumentAnalysisCache).delete(synchronize_session=False)
+    db.commit()
+    logger.info("Purged %d document analysis cache entries", deleted)
+    return deleted
+
+
+def _entry_size(response: Dict[str, Any]) -> int:
+    return len(json.dumps(response, ensure_ascii=False).encode())
+
+
+def _response_from_entry(entry: DocumentAnalysisCache) -> Dict[str, Any]:
+    response: Dict[str, Any] = {
+        "content": entry.content,
+        "seo_text": entry.seo_text,
+    }
+    if entry.document_url:
+        response["document_url"] = entry.document_url
+    if entry.preview_urls:
+        response["preview_urls"] = list(entry.preview_urls)
+    if entry.page_count is not None:
+        response["page_count"] = entry.page_count
+    if entry.warning:
+        response["warning"] = entry.warning
+    return response
@@ -0,0 +1,294 @@
+"""
+DOCX to post-HTML conversion.
+
+The body is walked once in document order and HTML is collected in a list
+that is joined at the end, so conversion time grows linearly with the
+document. Consecutive list paragraphs are grouped into one (nested)
+``<ul>``/``<ol>``, tables keep their merged cells, and embedded images are
+stored once per distinct payload (content-addressed) and referenced by URL.
+"""
+from __future__ import annotations
+
+import hashlib
+import html
+import logging
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from docx.document import Document as DocxDocument
+from docx.oxml.ns import qn
+from docx.table import Table
+from docx.text.hyperlink import Hyperlink
+from docx.text.paragraph import Paragraph
+from docx.text.run import Run
+
+from app.services.documents.uploads import inline_image
+from app.services.storage import StorageBackend
+
+
+logger = logging.getLogger(__name__)
+
+HEADING_TAGS = {f"Heading {level}": f"h{level}" for level in range(1, 7)}
+IMAGE_CLASS = "max-w-full h-auto my-4 rounded-lg"
+TABLE_CLASS = "w-full border-collapse my-4"
+EMU_PER_PIXEL = 9525
+
+Block = Union[Paragraph, Table]
+
+
+def iter_blocks(element, parent) -> Iterator[Block]:
+    """Yield the paragraphs and tables directly inside ``element``, in order."""
+    for child in element.iterchildren():
+        if child.tag == qn("w:p"):
+            yield Paragraph(child, parent)
+        elif child.tag == qn("w:tbl"):
+            yield Table(child, parent)
+
+
+class DocxHtmlConverter:
+    """
+    Converts one DOCX document to ``(content_html, seo_text)``.
+
+    ``storage`` receives embedded images (under ``documents/images``); without
+    it, or if an upload fails, images are inlined as data URLs.
+    """
+
+    def __init__(self, doc: DocxDocument, *, storage: Optional[StorageBackend] = None):
+        self.doc = doc
+        self.storage = storage
+        self.images_stored = 0
+        self._content: List[str] = []
+        self._seo: List[str] = []
+        self._lists: List[str] = []  # Open list tags, outermost first
+        self._style_names: Dict[Optional[str], str] = {}
+        self._image_urls: Dict[str, str] = {}  # sha256 -> URL
+        self._number_formats: Dict[Tuple[int, int], Optional[str]] = {}
+
+    def convert(self) -> Tuple[str, str]:
+        self._content, self._seo = [], []
+        self._write_blocks(self.doc.element.body, self.doc, self._content)
+        self._close_lists(self._content)
+        return "".join(self._content), "".join(self._seo)
+
+    def _write_blocks(self, element, parent, out: List[str]) -> None:
+        for block in iter_blocks(element, parent):
+            if isinstance(block, Table):
+                self._close_lists(out)
+                self._write_table(block, out)
+            else:
+                self._write_paragraph(block, out)
+
+    def _write_paragraph(self, para: Paragraph, out: List[str]) -> None:
+        body = self._inline_html(para)
+        text = para.text.strip()
+        if not text and "<img" not in body:
+            return
+
+        style_name = self._style_name(para)
+        list_tag = self._list_tag(para, style_name)
+        if list_tag:
+            self._open_list_item(list_tag, self._list_level(para, style_name), out)
+            out.append(body)
+            self._seo.append(f"<p>{html.escape(text)}</p>")
+            return
+
+        self._close_lists(out)
+        tag = HEADING_TAGS.get(style_name, "p")
+        out.append(f"<{tag}>{body}</{tag}>")
+        if text:
+            self._seo.append(f"<{tag}>{html.escape(text)}</{tag}>")
+
+    def _style_name(self, para: Paragraph) -> str:
+        # Resolving a style walks the styles part; cache by style id
+        style_id = para._p.style
+        name = self._style_names.get(style_id)
+        if name is None:
+            name = para.style.name if para.style is not None else ""
+            self._style_names[style_id] = name
+        return name
+
+    def _list_tag(self, para: Paragraph, style_name: str) -> Optional[str]:
+        if style_name.startswith("List Number"):
+            return "ol"
+        if style_name.startswith("List Bullet"):
+            return "ul"
+        pPr = para._p.pPr
+        if pPr is None or pPr.numPr is None or pPr.numPr.numId is None:
+            return None
+        level = pPr.numPr.ilvl.val if pPr.numPr.ilvl is not None else 0
+        number_format = self._number_format(pPr.numPr.numId.val, level)
+        return "ul" if number_format in (None, "bullet", "none") else "ol"
+
+    def _number_format(self, num_id: int, level: int) -> Optional[str]:
+        """Return the numbering format (``bullet``, ``decimal``, ...) of a list level."""
+        key = (num_id, level)
+        if key not in self._number_formats:
+            self._number_formats[key] = self._lookup_number_format(num_id, level)
+        return self._number_formats[key]
+
+    def _lookup_number_format(self, num_id: int, level: int) -> Optional[str]:
+        try:
+            numbering = self.doc.part.numbering_part.element
+        except Exception:
+            return None
+        abstract_ids = numbering.xpath(f'./w:num[@w:numId="{num_id}"]/w:abstractNumId/@w:val')
+        if not abstract_ids:
+            return None
+        formats = numbering.xpath(
+            f'./w:abstractNum[@w:abstractNumId="{abstract_ids[0]}"]/w:lvl[@w:ilvl="{level}"]/w:numFmt/@w:val'
+        )
+        return formats[0] if formats else None
+
+    @staticmethod
+    def _list_level(para: Paragraph, style_name: str) -> int:
+        pPr = para._p.pPr
+        if pPr is not None and pPr.numPr is not None and pPr.numPr.ilvl is not None:
+            return pPr.numPr.ilvl.val
+        # "List Bullet 2" -> level 1
+        suffix = style_name.rsplit(" ", 1)[-1]
+        return int(suffix) - 1 if suffix.isdigit() else 0
+
+    def _open_list_item(self, tag: str, level: int, out: List[str]) -> None:
+        lists = self._lists
+        while len(lists) > level + 1:
+            out.append(f"</li></{lists.pop()}>")
+        if len(lists) == level + 1:
+            if lists[-1] == tag:
+                out.append("</li>")
+            else:
+                out.append(f"</li></{lists.pop()}>")
+        while len(lists) < level + 1:
+            # A nested list opens inside the previous item's <li>
+            out.append(f"<{tag}>")
+            lists.append(tag)
+        out.append("<li>")
+
+    def _close_lists(self, out: List[str]) -> None:
+        while self._lists:
+            out.append(f"</li></{self._lists.pop()}>")
+
+    def _inline_html(self, para: Paragraph) -> str:
+        parts: List[str] = []
+        for item in para.iter_inner_content():
+            if isinstance(item, Hyperlink):
+                text = "".join(self._run_html(run) for run in item.runs)
+                if item.address:
+                    parts.append(f'<a href="{html.escape(item.url)}">{text}</a>')
+                else:
+                    parts.append(text)
+            else:
+                parts.append(self._run_html(item))
+        return "".join(parts)
+
+    def _run_html(self, run: Run) -> str:
+        text = html.escape(run.text)
+        if text:
+            if run.bold:
+                text = f"<strong>{text}</strong>"
+            if run.italic:
+                text = f"<em>{text}</em>"
+        images = "".join(self._image_html(drawing) for drawing in run._r.xpath(".//w:drawing"))
+        return text + images
+
+    def _image_html(self, drawing) -> str:
+        rel_ids = drawing.xpath(".//a:blip/@r:embed")
+        if not rel_ids:
+            return ""
+        try:
+            part = self.doc.part.related_parts[rel_ids[0]]
+        except KeyError:
+            logger.warning("DOCX image relationship %s not found", rel_ids[0])
+            return ""
+
+        attributes = [f'src="{self._image_url(part.blob, part.content_type)}"']
+        extents = drawing.xpath(".//wp:extent")
+        if extents:
+            width = int(extents[0].get("cx", 0)) // EMU_PER_PIXEL
+            height = int(extents[0].get("cy", 0)) // EMU_PER_PIXEL
+            if width and height:
+                attributes.append(f'width="{width}" height="{height}"')
+        descriptions = drawing.xpath(".//wp:docPr/@descr")
+        attributes.append(f'alt="{html.escape(descriptions[0]) if descriptions else ""}"')
+        attributes.append('loading="lazy"')
+        attributes.append(f'class="{IMAGE_CLASS}"')
+        return f"<img {' '.join(attributes)} />"
+
+    def _image_url(self, data: bytes, content_type: str) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        url = self._image_urls.get(digest)
+        if url is not None:
+            return url
+        url = None
+        if self.storage is not None:
+            try:
+                url = self.storage.upload_bytes(
+                    data,
+                    content_type=content_type,
+                    prefix="documents/images",
+                    content_addressed=True,
+                ).url
+                self.images_stored += 1
+            except Exception as exc:
+                logger.error("Failed to store DOCX image: %s", exc)
+        if url is None:
+            url = inline_image(data, content_type)
+        self._image_urls[digest] = url
+        return url
+
+    def _write_table(self, table: Table, out: List[str]) -> None:
+        """Write a table, turning gridSpan/vMerge into colspan/rowspan."""
+        rows = []
+        for tr in table._tbl.tr_lst:
+            column = 0
+            cells = []
+            for tc in tr.tc_lst:
+                span = tc.grid_span
+                cells.append((tc, column, span))
+                column += span
+            rows.append(cells)
+
+        # vMerge="restart" starts a vertical merge; following "continue" cells
+        # in the same column extend it and are not written
+        continued = {
+            (row_index, column)
+            for row_index, cells in enumerate(rows)
+            for tc, column, _span in cells
+            if tc.vMerge == "continue"
+        }
+
+        out.append(f'<table class="{TABLE_CLASS}"><tbody>')
+        for row_index, cells in enumerate(rows):
+            out.append("<tr>")
+            seo_cells = []
+            for tc, column, span in cells:
+                if (row_index, column) in continued:
+                    continue
+                rowspan = 1
+                if tc.vMerge == "restart":
+                    while (row_index + rowspan, column) in continued:
+                        rowspan += 1
+                attributes = ""
+                if span > 1:
+                    attributes += f' colspan="{span}"'
+                if rowspan > 1:
+                    attributes += f' rowspan="{rowspan}"'
+                out.append(f'<td class="border px-2 py-1"{attributes}>')
+                cell_start = len(self._seo)
+                self._write_blocks(tc, table, out)
+                self._close_lists(out)
+                seo_cells.extend(self._seo[cell_start:])
+                del self._seo[cell_start:]
+                out.append("</td>")
+            out.append("</tr>")
+            if seo_cells:
+                self._seo.append("<p>" + " | ".join(_strip_block(cell) for cell in seo_cells) + "</p>")
+        out.append("</tbody></table>")
+
+
+def _strip_block(block: str) -> str:
+    """Return the escaped text of a ``<tag>text</tag>`` SEO block."""
+    return block[block.index(">") + 1:block.rindex("<")]
+
+
+def docx_to_html(doc: DocxDocument, *, storage: Optional[StorageBackend] = None) -> Tuple[str, str]:
+    """Convert a DOCX document to ``(content_html, seo_text)``."""
+    return DocxHtmlConverter(doc, storage=storage).convert()
@@ -0,0 +1,264 @@
+"""
+Persisted document records and their keyword index.
+
+Every analyzed document gets a ``DocumentRecord`` holding its extracted text
+(once per file hash). The text is tokenized into ``DocumentTerm`` rows, an
+inverted index that keyword search queries directly. Words are lower-cased
+and accent-folded, so "ha noi" finds "Hà Nội".
+
+Posts are linked to the documents they embed when they are saved: the URLs in
+the post HTML are matched against each document's ``DocumentAsset`` rows
+(original and page preview URLs).
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import html
+import logging
+import re
+import unicodedata
+import uuid
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import func, or_
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.blog import BlogPost
+from app.models.document import DocumentAsset, DocumentRecord, DocumentTerm, PostDocument
+
+
+logger = logging.getLogger(__name__)
+
+MIN_TERM_LENGTH = 2
+MAX_TERM_LENGTH = 64
+MAX_TERMS_PER_DOCUMENT = 50_000
+MAX_QUERY_TERMS = 8
+
+_WORD = re.compile(r"\w+")
+_TAG = re.compile(r"<[^>]+>")
+_BLOCK_END = re.compile(r"<br\s*/?>|</(?:p|h[1-6]|li|tr)>", re.IGNORECASE)
+_EMBEDDED_URL = re.compile(r"""(?:src|href)\s*=\s*["']([^"']+)["']""", re.IGNORECASE)
+
+
+def fold(text: str) -> str:
+    """Lower-case ``text`` and strip diacritics (đ becomes d)."""
+    decomposed = unicodedata.normalize("NFKD", text.lower().replace("đ", "d"))
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def tokenize(text: str) -> List[str]:
+    """Return the distinct index terms of ``text`` in first-seen order."""
+    terms: Dict[str, None] = {}
+    for word in _WORD.findall(fold(text)):
+        if MIN_TERM_LENGTH <= len(word) <= MAX_TERM_LENGTH:
+            terms.setdefault(word)
+    return list(terms)
+
+
+def html_to_text(markup: str) -> str:
+    """Turn analysis HTML (``seo_text``) into plain text, one block per line."""
+    text = _BLOCK_END.sub("\n", markup or "")
+    return html.unescape(_TAG.sub("", text)).strip()
+
+
+def url_hash(url: str) -> str:
+    """Hash of ``url`` without its query string, as stored in ``DocumentAsset``."""
+    return hashlib.sha256(url.split("?", 1)[0].split("#", 1)[0].encode()).hexdigest()
+
+
+def embedded_urls(content: Optional[str]) -> Set[str]:
+    """Return the ``src``/``href`` URLs in post HTML, skipping inline data URLs."""
+    return {url for url in _EMBEDDED_URL.findall(content or "") if not url.startswith("data:")}
+
+
+def index_document(
+    db: Session,
+    *,
+    response: Dict[str, Any],
+    content_sha256: str,
+    filename: Optional[str],
+    kind: Optional[str],
+    content_type: Optional[str],
+    storage_key: Optional[str] = None,
+    owner_id: Optional[str] = None,
+) -> Optional[DocumentRecord]:
+    """
+    Create (or refresh) the record of an analyzed document from its /analyze response.
+
+    The text is only indexed the first time a file hash is seen; later
+    analyses of the same file just register any new asset URLs. Returns None
+    if the database write fails.
+    """
+    asset_urls = list(response.get("preview_urls", []))
+    if response.get("document_url"):
+        asset_urls.append(response["document_url"])
+
+    try:
+        record = db.query(DocumentRecord).filter(DocumentRecord.content_sha256 == content_sha256).first()
+        if record is None:
+            text = html_to_text(response.get("seo_text", ""))
+            record = DocumentRecord(
+                id=str(uuid.uuid4()),
+                owner_id=owner_id,
+                filename=(filename or "")[:500] or None,
+                kind=kind,
+                content_type=content_type,
+                content_sha256=content_sha256,
+                storage_key=storage_key,
+                url=response.get("document_url"),
+                page_count=response.get("page_count") or None,
+                text=text,
+            )
+            db.add(record)
+            db.flush()
+            terms = tokenize(f"{filename or ''}\n{text}")[:MAX_TERMS_PER_DOCUMENT]
+            if terms:
+                db.execute(
+                    DocumentTerm.__table__.insert(),
+                    [{"term": term, "document_id": record.id} for term in terms],
+                )
+            logger.info("Indexed document %s (%d terms)", record.id, len(terms))
+        else:
+            record.url = record.url or response.get("document_url")
+            record.storage_key = record.storage_key or storage_key
+            record.owner_id = record.owner_id or owner_id
+
+        _add_assets(db, record.id, asset_urls)
+        db.commit()
+        return record
+    except SQLAlchemyError as exc:
+        db.rollback()
+        logger.warning("Failed to index document %s: %s", filename, exc)
+        return None
+
+
+def _add_assets(db: Session, document_id: str, urls: Iterable[str]) -> None:
+    hashes = {url_hash(url) for url in urls if url and not url.startswith("data:")}
+    if not hashes:
+        return
+    known = {
+        row.url_hash
+        for row in db.query(DocumentAsset.url_hash).filter(
+            DocumentAsset.document_id == document_id, DocumentAsset.url_hash.in_(hashes)
+        )
+    }
+    missing = hashes - known
+    if missing:
+        db.execute(
+            DocumentAsset.__table__.insert(),
+            [{"url_hash": value, "document_id": document_id} for value in missing],
+        )
+
+
+def link_post_documents(db: Session, post: BlogPost) -> int:
+    """
+    Point ``post`` at the documents its content embeds; returns how many.
+
+    Failures are logged and swallowed: linking must never fail a post save.
+    """
+    hashes = {url_hash(url) for url in embedded_urls(post.content)}
+    try:
+        document_ids = set()
+        if hashes:
+            document_ids = {
+                row.document_id
+                for row in db.query(DocumentAsset.document_id).filter(DocumentAsset.url_hash.in_(hashes)).distinct()
+            }
+        db.query(PostDocument).filter(PostDocument.post_id == post.id).delete(synchronize_session=False)
+        for document_id in document_ids:
+            db.add(PostDocument(post_id=post.id, document_id=document_id))
+        db.commit()
+        return len(document_ids)
+    except SQLAlchemyError as exc:
+        db.rollback()
+        logger.warning("Failed to link documents of post %s: %s", post.id, exc)
+        return 0
+
+
+def snippet(text: str, terms: List[str], width: int = 160) -> str:
+    """Return the part of ``text`` around the first query term."""
+    folded = fold(text)
+    positions = [folded.find(term) for term in terms]
+    positions = [position for position in positions if position >= 0]
+    start = max(min(positions) - width // 3, 0) if positions else 0
+    excerpt = " ".join(text[start:start + width].split())
+    prefix = "..." if start > 0 else ""
+    suffix = "..." if start + width < len(text) else ""
+    return f"{prefix}{excerpt}{suffix}"
+
+
+def search_documents(
+    db: Session,
+    query: str,
+    *,
+    user_id: Optional[str] = None,
+    limit: int = 20,
+    offset: int = 0,
+) -> Dict[str, Any]:
+    """
+    Find documents containing every word of ``query`` and the posts embedding them.
+
+    Only documents embedded in an approved post are public; signed-in users
+    also see their own. Returns ``{"total", "documents", "posts", "terms"}``
+    where ``posts`` maps document ids to ``BlogPost`` rows.
+    """
+    terms = tokenize(query)[:MAX_QUERY_TERMS]
+    if not terms:
+        return {"total": 0, "documents": [], "posts": {}, "terms": []}
+
+    matching = (
+        db.query(DocumentTerm.document_id)
+        .filter(DocumentTerm.term.in_(terms))
+        .group_by(DocumentTerm.document_id)
+        .having(func.count(DocumentTerm.term) == len(terms))
+    )
+    published = (
+        db.query(PostDocument.post_id)
+        .join(BlogPost, BlogPost.id == PostDocument.post_id)
+        .filter(PostDocument.document_id == DocumentRecord.id, BlogPost.status == "approved")
+        .exists()
+    )
+    visible = or_(published, DocumentRecord.owner_id == user_id) if user_id else published
+
+    results = db.query(DocumentRecord).filter(DocumentRecord.id.in_(matching), visible)
+    total = results.count()
+    documents = results.order_by(DocumentRecord.created_at.desc()).offset(offset).limit(limit).all()
+
+    posts: Dict[str, List[BlogPost]] = {document.id: [] for document in documents}
+    if documents:
+        rows = (
+            db.query(PostDocument.document_id, BlogPost)
+            .join(BlogPost, BlogPost.id == PostDocument.post_id)
+            .filter(PostDocument.document_id.in_(list(posts)), BlogPost.status == "approved")
+            .order_by(BlogPost.created_at.desc())
+            .all()
+        )
+        for document_id, post in rows:
+            posts[document_id].append(post)
+    return {"total": total, "documents": documents, "posts": posts, "terms": terms}
+
+
+async def index_analysis(
+    db: Session,
+    data: bytes,
+    response: Dict[str, Any],
+    *,
+    content_sha256: Optional[str] = None,
+    **fields: Any,
+) -> Optional[DocumentRecord]:
+    """
+    Index an /analyze ``response`` and add its ``document_id``.
+
+    ``data`` is hashed off the event loop when the digest isn't known yet.
+    """
+    if not settings.DOCUMENT_INDEX_ENABLED:
+        return None
+    if content_sha256 is None:
+        content_sha256 = await asyncio.to_thread(lambda: hashlib.sha256(data).hexdigest())
+    record = index_document(db, response=response, content_sha256=content_sha256, **fields)
+    if record is not None:
+        response["document_id"] = record.id
+    return record
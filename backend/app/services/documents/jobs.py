@@ -0,0 +1,438 @@
+"""
+Background document analysis jobs.
+
+``POST /documents/jobs`` stores the original, records a ``DocumentJob`` and
+hands it to the in-process :class:`DocumentJobRunner`, which runs at most
+``DOCUMENT_JOB_WORKERS`` analyses at a time on the event loop (rasterization
+itself still happens in the render pool). Progress and results are written to
+the job row, so any instance can answer ``GET /documents/jobs/{id}``.
+
+With ``DOCUMENT_JOB_INLINE`` (the default on Vercel, which freezes a function
+once it has responded) nothing runs after the response: the submission and
+each poll do a bounded slice of the job instead (:func:`process_job_slice`).
+
+A job is claimed with a conditional ``queued -> processing`` update, so an
+instance that picks up another instance's abandoned job never runs it twice.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional, Set
+
+from sqlalchemy import func, or_
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.document import DocumentJob
+from app.services.documents.analysis import DocumentAnalysis, InvalidDocumentError, document_kind
+from app.services.documents.cache import analysis_cache_key, store_analysis
+from app.services.documents.index import index_analysis
+from app.services.documents.rendering import DocumentRenderError, DocumentRenderTimeout, page_budget
+from app.services.documents.uploads import UploadPipeline
+from app.services.storage import StorageBackend, StorageError, StoredObject, get_storage_backend
+
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_PROCESSING = "processing"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+# Queued jobs older than this are assumed to have lost their instance
+STALE_QUEUED_AFTER = timedelta(seconds=30)
+
+SessionFactory = Callable[[], Session]
+
+
+def create_job(
+    db: Session,
+    *,
+    filename: Optional[str],
+    content_type: Optional[str],
+    kind: Optional[str],
+    source_key: Optional[str],
+    content_sha256: Optional[str] = None,
+) -> DocumentJob:
+    """Insert a queued job and return it."""
+    job = DocumentJob(
+        id=str(uuid.uuid4()),
+        status=JOB_QUEUED,
+        filename=(filename or "")[:500] or None,
+        content_type=content_type,
+        kind=kind,
+        source_key=source_key,
+        content_sha256=content_sha256,
+        pages_done=0,
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def complete_job(db: Session, job: DocumentJob, result: Dict) -> None:
+    """Mark ``job`` completed with the /analyze response body ``result``."""
+    job.status = JOB_COMPLETED
+    job.result = result
+    job.error = None
+    if job.page_count is not None and "page_count" not in result:
+        job.pages_done = job.page_count
+    job.finished_at = datetime.utcnow()
+    job.partial = None
+    job.lease_expires_at = None
+    db.commit()
+
+
+def fail_job(db: Session, job: DocumentJob, error: str) -> None:
+    job.status = JOB_FAILED
+    job.error = error
+    job.finished_at = datetime.utcnow()
+    job.partial = None
+    job.lease_expires_at = None
+    db.commit()
+
+
+def claim_job(db: Session, job_id: str) -> bool:
+    """Atomically move a queued job to processing; False if someone else has it."""
+    claimed = (
+        db.query(DocumentJob)
+        .filter(DocumentJob.id == job_id, DocumentJob.status == JOB_QUEUED)
+        .update({DocumentJob.status: JOB_PROCESSING, DocumentJob.started_at: datetime.utcnow()},
+                synchronize_session=False)
+    )
+    db.commit()
+    return claimed == 1
+
+
+def job_progress(job: DocumentJob) -> float:
+    """Return the fraction of pages processed, between 0 and 1."""
+    if job.status == JOB_COMPLETED:
+        return 1.0
+    if not job.page_count:
+        return 0.0
+    return min(job.pages_done or 0, job.page_count) / job.page_count
+
+
+def expire_stale_job(db: Session, job: DocumentJob) -> bool:
+    """
+    Fail a processing job whose instance stopped before finishing it.
+
+    Returns True if the job was changed.
+    """
+    if job.status != JOB_PROCESSING or job.started_at is None:
+        return False
+    deadline = job.started_at + timedelta(seconds=settings.DOCUMENT_JOB_TIMEOUT_SECONDS * 2)
+    if datetime.utcnow() <= deadline:
+        return False
+    fail_job(db, job, "Job was interrupted before it finished")
+    return True
+
+
+def is_abandoned(job: DocumentJob) -> bool:
+    """True for a queued job that should have started by now and can be resumed from storage."""
+    if job.status != JOB_QUEUED or not job.source_key or job.created_at is None:
+        return False
+    return datetime.utcnow() - job.created_at > STALE_QUEUED_AFTER
+
+
+async def process_job(
+    job_id: str,
+    session_factory: SessionFactory,
+    *,
+    data: Optional[bytes] = None,
+    storage: Optional[StorageBackend] = None,
+) -> None:
+    """
+    Claim and run one job, recording progress and the final result.
+
+    ``data`` is the original document when the submitting request still has
+    it in memory; otherwise it is read back from ``job.source_key``.
+    """
+    db = session_factory()
+    uploads: Optional[UploadPipeline] = None
+    try:
+        if not claim_job(db, job_id):
+            logger.info("Document job %s already claimed, skipping", job_id)
+            return
+        job = db.query(DocumentJob).filter(DocumentJob.id == job_id).first()
+        storage = _job_storage(job_id, storage)
+        uploads = UploadPipeline(storage)
+        analysis = await _open_analysis(db, job, data, storage, uploads)
+        if analysis is None:
+            return
+
+        async def record_progress(current: DocumentAnalysis) -> None:
+            job.pages_done = current.rendered_pages
+            db.commit()
+
+        await analysis.run(on_page=record_progress, timeout=settings.DOCUMENT_JOB_TIMEOUT_SECONDS)
+        await _complete_analysis(db, job, analysis, storage)
+    except asyncio.CancelledError:
+        # Instance shutting down; the job is expired later by expire_stale_job
+        raise
+    except Exception as exc:
+        _record_failure(db, job_id, exc)
+    finally:
+        if uploads is not None:
+            await uploads.aclose()
+        db.close()
+
+
+def lease_job(db: Session, job_id: str) -> bool:
+    """
+    Atomically take an unfinished job for one slice; False if it is finished
+    or another request holds it. A lease outlives a slice's render budget, so
+    a request that died mid-slice only delays the job.
+    """
+    now = datetime.utcnow()
+    lease = timedelta(seconds=settings.DOCUMENT_JOB_SLICE_SECONDS + settings.DOCUMENT_RENDER_TIMEOUT_SECONDS)
+    leased = (
+        db.query(DocumentJob)
+        .filter(
+            DocumentJob.id == job_id,
+            DocumentJob.status.in_((JOB_QUEUED, JOB_PROCESSING)),
+            or_(DocumentJob.lease_expires_at.is_(None), DocumentJob.lease_expires_at < now),
+        )
+        .update({
+            DocumentJob.status: JOB_PROCESSING,
+            DocumentJob.started_at: func.coalesce(DocumentJob.started_at, now),
+            DocumentJob.lease_expires_at: now + lease,
+        }, synchronize_session=False)
+    )
+    db.commit()
+    return leased == 1
+
+
+async def process_job_slice(
+    db: Session,
+    job_id: str,
+    *,
+    data: Optional[bytes] = None,
+    storage: Optional[StorageBackend] = None,
+) -> None:
+    """
+    Advance a job by one slice of work, within the current request.
+
+    For runtimes that freeze once the response is sent (``DOCUMENT_JOB_INLINE``):
+    the submission and every poll lease the job, add pages from
+    ``job.pages_done`` on for up to ``DOCUMENT_JOB_SLICE_SECONDS``, and save
+    the output so far on the job (``partial``) for the next request. The slice
+    that adds the last page completes the job; a DOCX is converted in one.
+    """
+    if not lease_job(db, job_id):
+        return
+    uploads: Optional[UploadPipeline] = None
+    try:
+        job = db.query(DocumentJob).filter(DocumentJob.id == job_id).first()
+        storage = _job_storage(job_id, storage)
+        uploads = UploadPipeline(storage)
+        analysis = await _open_analysis(db, job, data, storage, uploads)
+        if analysis is None:
+            return
+
+        if analysis.kind == "docx":
+            await analysis.run(timeout=settings.DOCUMENT_RENDER_TIMEOUT_SECONDS)
+        else:
+            if job.partial:
+                analysis.restore(job.partial)
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + settings.DOCUMENT_JOB_SLICE_SECONDS
+            pages = analysis.iter_pages(timeout=settings.DOCUMENT_RENDER_TIMEOUT_SECONDS, start=analysis.rendered_pages)
+            try:
+                async for _page, _preview in pages:
+                    if loop.time() >= deadline:
+                        break
+            finally:
+                await pages.aclose()
+
+            if analysis.rendered_pages < page_budget(analysis.page_count):
+                job.pages_done = analysis.rendered_pages
+                job.partial = analysis.snapshot()
+                job.lease_expires_at = None
+                db.commit()
+                logger.info("Document job %s: %d of %d pages done", job_id, job.pages_done, job.page_count)
+                return
+            await analysis.finish()
+
+        await _complete_analysis(db, job, analysis, storage)
+    except Exception as exc:
+        _record_failure(db, job_id, exc)
+    finally:
+        if uploads is not None:
+            await uploads.aclose()
+
+
+def _job_storage(job_id: str, storage: Optional[StorageBackend]) -> Optional[StorageBackend]:
+    if storage is not None:
+        return storage
+    try:
+        return get_storage_backend()
+    except StorageError as exc:
+        logger.warning("Storage unavailable for document job %s: %s", job_id, exc)
+        return None
+
+
+async def _open_analysis(
+    db: Session,
+    job: DocumentJob,
+    data: Optional[bytes],
+    storage: Optional[StorageBackend],
+    uploads: UploadPipeline,
+) -> Optional[DocumentAnalysis]:
+    """Load and open the job's document, or fail the job and return None."""
+    original: Optional[StoredObject] = None
+    if data is None:
+        if storage is None or not job.source_key:
+            fail_job(db, job, "Original document is not available")
+            return None
+        data = await storage.aread_bytes(job.source_key)
+    if storage is not None and job.source_key:
+        original = StoredObject(
+            key=job.source_key,
+            url=storage.url_for(job.source_key),
+            content_type=job.content_type or "application/octet-stream",
+            size=len(data),
+            checksum=job.content_sha256,
+        )
+
+    kind = job.kind or document_kind(job.filename, data)
+    if kind is None:
+        fail_job(db, job, "Unsupported file type. Only PDF and DOCX are allowed.")
+        return None
+
+    analysis = DocumentAnalysis(
+        data,
+        kind=kind,
+        content_type=job.content_type or "application/octet-stream",
+        uploads=uploads,
+        original=original,
+    )
+    await analysis.open()
+    job.kind = kind
+    job.page_count = analysis.page_count
+    db.commit()
+    return analysis
+
+
+async def _complete_analysis(
+    db: Session, job: DocumentJob, analysis: DocumentAnalysis, storage: Optional[StorageBackend]
+) -> None:
+    """Record a finished analysis: index it, complete the job and cache the result."""
+    if not analysis.content_html and not analysis.text_html:
+        fail_job(db, job, "Could not extract any content from the document. The file may be empty or corrupted.")
+        return
+    response = analysis.response()
+    await index_analysis(
+        db,
+        analysis.data,
+        response,
+        content_sha256=job.content_sha256,
+        filename=job.filename,
+        kind=analysis.kind,
+        content_type=job.content_type,
+        storage_key=job.source_key,
+    )
+    complete_job(db, job, response)
+    if (
+        settings.DOCUMENT_CACHE_ENABLED and storage is not None and job.content_sha256
+        and analysis.document and not analysis.inline_previews
+    ):
+        store_analysis(
+            db,
+            analysis_cache_key(job.content_sha256, storage_name=storage.name),
+            content_sha256=job.content_sha256,
+            filename=job.filename,
+            response=response,
+        )
+    logger.info("Document job %s completed (%s pages)", job.id, job.page_count)
+
+
+def _record_failure(db: Session, job_id: str, exc: Exception) -> None:
+    if isinstance(exc, InvalidDocumentError):
+        _fail_quietly(db, job_id, str(exc))
+    elif isinstance(exc, DocumentRenderTimeout):
+        _fail_quietly(db, job_id, "Document rendering timed out. Try a smaller file.")
+    elif isinstance(exc, (DocumentRenderError, StorageError)):
+        logger.error("Document job %s failed: %s", job_id, exc)
+        _fail_quietly(db, job_id, str(exc))
+    else:
+        logger.exception("Unexpected error in document job %s: %s", job_id, exc)
+        _fail_quietly(db, job_id, f"Error processing document: {str(exc)}")
+
+
+def _fail_quietly(db: Session, job_id: str, error: str) -> None:
+    try:
+        db.rollback()
+        job = db.query(DocumentJob).filter(DocumentJob.id == job_id).first()
+        if job is not None:
+            fail_job(db, job, error)
+    except SQLAlchemyError as exc:
+        logger.error("Failed to record failure of document job %s: %s", job_id, exc)
+
+
+class DocumentJobRunner:
+    """
+    In-process worker pool for document jobs.
+
+    Jobs run as tasks on the event loop that submitted them; a semaphore caps
+    how many analyses run at once so a burst of jobs queues up instead of
+    competing for the render pool. Unused with ``DOCUMENT_JOB_INLINE``.
+    """
+
+    def __init__(self, workers: Optional[int] = None):
+        self._workers = workers
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def __contains__(self, job_id: str) -> bool:
+        return job_id in self._tasks
+
+    def submit(
+        self,
+        job_id: str,
+        session_factory: SessionFactory,
+        *,
+        data: Optional[bytes] = None,
+        storage: Optional[StorageBackend] = None,
+    ) -> asyncio.Task:
+        """Schedule ``job_id`` on the running event loop and return its task."""
+        task = asyncio.ensure_future(self._run(job_id, session_factory, data=data, storage=storage))
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _task: self._tasks.pop(job_id, None))
+        return task
+
+    async def drain(self) -> None:
+        """Wait for every submitted job to finish."""
+        pending: Set[asyncio.Task] = set(self._tasks.values())
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def shutdown(self) -> None:
+        """Cancel running jobs (they are expired as stale by later readers)."""
+        pending = [task for task in self._tasks.values() if not task.done()]
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _run(self, job_id: str, session_factory: SessionFactory, **kwargs) -> None:
+        async with self._semaphore():
+            await process_job(job_id, session_factory, **kwargs)
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        # Semaphores bind to a loop; test clients may run one loop per request
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._loop is not loop:
+            workers = settings.DOCUMENT_JOB_WORKERS if self._workers is None else self._workers
+            self._slots = asyncio.Semaphore(max(workers, 1))
+            self._loop = loop
+        return self._slots
+
+
+job_runner = DocumentJobRunner()
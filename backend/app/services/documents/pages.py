@@ -0,0 +1,135 @@
+"""
+On-demand rendering of PDF pages beyond the eagerly rendered ones.
+
+Analysis renders the first ``DOCUMENT_EAGER_PAGES`` pages right away; later
+pages point at ``/documents/{doc_id}/pages/{n}``, which renders a page the
+first time it is viewed and stores it under a key derived from the document,
+page, width and preview settings. Later views (from any instance) find the
+stored render, so rendering cost follows actual page views.
+
+``doc_id`` is the last segment of the original's storage key under
+``documents/originals/`` (a SHA-256 or random hex id).
+"""
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import hashlib
+import logging
+import re
+from typing import Dict, Optional
+
+from app.core.config import settings
+from app.services.documents.rendering import PreviewOptions, count_pdf_pages, render_page
+from app.services.documents.uploads import PreviewImage
+from app.services.storage import StorageBackend, StorageObjectNotFound, StoredObject
+
+
+logger = logging.getLogger(__name__)
+
+ORIGINALS_PREFIX = "documents/originals/"
+PAGES_PREFIX = "documents/pages"
+PAGE_URL = "/api/v1/documents/{doc_id}/pages/{number}"
+
+# Requested widths snap to these buckets so arbitrary ?width= values can't
+# multiply the number of stored renders
+PAGE_WIDTHS = (320, 640, 960, 1280, 1600, 2400)
+
+_DOC_ID = re.compile(r"^[0-9a-f]{32,64}$")
+
+
+class DocumentPageNotFound(LookupError):
+    """Raised when the document or the requested page does not exist."""
+
+
+def document_id(stored: Optional[StoredObject]) -> Optional[str]:
+    """Return the id used in page URLs for a stored original, or None."""
+    if stored is None or not stored.key.startswith(ORIGINALS_PREFIX):
+        return None
+    doc_id = stored.key[len(ORIGINALS_PREFIX):]
+    return doc_id if _DOC_ID.match(doc_id) else None
+
+
+def is_document_id(doc_id: str) -> bool:
+    return bool(_DOC_ID.match(doc_id))
+
+
+def page_url(doc_id: str, number: int, width: Optional[int] = None) -> str:
+    url = PAGE_URL.format(doc_id=doc_id, number=number)
+    return f"{url}?width={width}" if width else url
+
+
+def page_options(width: Optional[int] = None) -> PreviewOptions:
+    """Preview settings for an on-demand page, at the width bucket covering ``width``."""
+    options = PreviewOptions.from_settings()
+    max_width = options.max_width
+    if width:
+        max_width = next((bucket for bucket in PAGE_WIDTHS if bucket >= width), PAGE_WIDTHS[-1])
+        if options.max_width > 0:
+            max_width = min(max_width, options.max_width)
+    return dataclasses.replace(options, max_width=max_width, thumbnail_width=0)
+
+
+def page_key(doc_id: str, number: int, options: PreviewOptions) -> str:
+    settings_hash = hashlib.sha256(options.fingerprint.encode()).hexdigest()[:12]
+    return f"{PAGES_PREFIX}/{doc_id}/{number}-{settings_hash}"
+
+
+def lazy_preview(doc_id: str, width: int, height: int, number: int) -> PreviewImage:
+    """Preview pointing at the on-demand endpoint, with a small variant for ``srcset``."""
+    preview = PreviewImage(url=page_url(doc_id, number), stored=True, width=width, height=height)
+    thumbnail_width = settings.DOCUMENT_PREVIEW_THUMBNAIL_WIDTH
+    if 0 < thumbnail_width < width:
+        preview.thumbnail_url = page_url(doc_id, number, width=thumbnail_width)
+        preview.thumbnail_width = thumbnail_width
+    return preview
+
+
+_inflight: Dict[str, "asyncio.Future[StoredObject]"] = {}
+
+
+async def get_page(
+    storage: StorageBackend, doc_id: str, number: int, *, width: Optional[int] = None
+) -> StoredObject:
+    """
+    Return the stored render of page ``number``, rendering it on first access.
+
+    Concurrent requests for the same page share one render.
+
+    Raises:
+        DocumentPageNotFound: If the document or page does not exist, or the
+            document is not a PDF
+        DocumentRenderError: If the page cannot be rendered
+    """
+    options = page_options(width)
+    key = page_key(doc_id, number, options)
+    if await storage.aobject_exists(key):
+        return StoredObject(key=key, url=storage.url_for(key), content_type="", size=0)
+
+    pending = _inflight.get(key)
+    if pending is None:
+        pending = asyncio.ensure_future(_render_and_store(storage, doc_id, number, key, options))
+        _inflight[key] = pending
+        pending.add_done_callback(lambda _future: _inflight.pop(key, None))
+    return await asyncio.shield(pending)
+
+
+async def _render_and_store(
+    storage: StorageBackend, doc_id: str, number: int, key: str, options: PreviewOptions
+) -> StoredObject:
+    try:
+        data = await storage.aread_bytes(f"{ORIGINALS_PREFIX}{doc_id}")
+    except StorageObjectNotFound as exc:
+        raise DocumentPageNotFound("Document not found") from exc
+    if not data.startswith(b"%PDF"):
+        # DOCX originals have no pages to render; their analysis never links here
+        raise DocumentPageNotFound("Page rendering is only available for PDFs")
+
+    page_count = await asyncio.to_thread(count_pdf_pages, data)
+    if number < 1 or number > page_count:
+        raise DocumentPageNotFound(f"Page {number} not found")
+
+    page = await render_page(data, number, options=options)
+    stored = await storage.aupload_bytes(page.image, content_type=page.content_type, key=key)
+    logger.info("Rendered page %d of document %s on demand (%d bytes)", number, doc_id, len(page.image))
+    return stored
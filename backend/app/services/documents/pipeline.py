@@ -0,0 +1,93 @@
+"""
+Render-then-upload pipeline for PDF analysis.
+
+A producer task walks the rendered pages and starts each preview upload right
+away; the consumer receives ``(page, preview)`` pairs strictly in page order.
+Rendering, uploads and whatever the consumer does with a page (building HTML,
+streaming it to the client) therefore all overlap, within a bounded window:
+only a few pages are ever waiting for the consumer.
+"""
+from __future__ import annotations
+
+import asyncio
+from typing import AsyncIterator, Optional, Tuple
+
+from app.services.documents.rendering import RenderedPage, iter_pdf_pages, render_concurrency
+from app.services.documents.uploads import PreviewImage, UploadPipeline
+
+
+_DONE = object()
+
+
+def page_image_html(preview: PreviewImage, page_number: int) -> str:
+    """
+    Return the ``<img>`` tag used for a page preview in post content.
+
+    Stored previews with a thumbnail get a ``srcset`` so small screens fetch
+    the thumbnail; intrinsic dimensions avoid layout shift while loading.
+    """
+    attributes = [f'src="{preview.url}"']
+    if preview.thumbnail_url and preview.width:
+        attributes.append(
+            f'srcset="{preview.thumbnail_url} {preview.thumbnail_width}w, {preview.url} {preview.width}w"'
+        )
+        attributes.append('sizes="(max-width: 768px) 100vw, 768px"')
+    if preview.width and preview.height:
+        attributes.append(f'width="{preview.width}" height="{preview.height}"')
+    attributes.append(f'alt="Page {page_number}"')
+    if page_number > 1:
+        attributes.append('loading="lazy"')
+    attributes.append('class="w-full h-auto mb-4 rounded-lg shadow-md"')
+    return f"<img {' '.join(attributes)} />"
+
+
+def page_text_html(text: str) -> str:
+    """Return a page's extracted text as a paragraph, or "" when it is blank."""
+    if not text.strip():
+        return ""
+    return f"<p>{text.replace(chr(10), '<br>')}</p>"
+
+
+async def iter_page_previews(
+    data: bytes,
+    *,
+    page_count: int,
+    uploads: UploadPipeline,
+    max_pages: Optional[int] = None,
+    timeout: Optional[float] = None,
+    start: int = 0,
+) -> AsyncIterator[Tuple[RenderedPage, Optional[PreviewImage]]]:
+    """
+    Yield each rendered page with its uploaded preview, in page order.
+
+    ``preview`` is None when the page could not be rasterized. Rendering errors
+    (``DocumentRenderError``/``DocumentRenderTimeout``) are re-raised here.
+    """
+    # Bounded so a slow consumer stalls the producer instead of buffering every page
+    queue: asyncio.Queue = asyncio.Queue(maxsize=render_concurrency())
+
+    async def produce() -> None:
+        try:
+            async for page in iter_pdf_pages(
+                data, page_count=page_count, max_pages=max_pages, timeout=timeout, start=start
+            ):
+                upload = uploads.preview(page) if page.image else None
+                await queue.put((page, upload))
+        except Exception as exc:
+            await queue.put(exc)
+        else:
+            await queue.put(_DONE)
+
+    producer = asyncio.ensure_future(produce())
+    try:
+        while True:
+            item = await queue.get()
+            if item is _DONE:
+                break
+            if isinstance(item, Exception):
+                raise item
+            page, upload = item
+            yield page, (await upload if upload is not None else None)
+    finally:
+        producer.cancel()
+        await asyncio.gather(producer, return_exceptions=True)
@@ -0,0 +1,395 @@
+"""
+PDF page rasterization and text extraction off the event loop.
+
+Pages are split into ranges and rendered in a process pool; every worker opens
+the document from bytes and handles one range. Results come back in page
+order. With ``DOCUMENT_RENDER_WORKERS=0`` (or where worker processes can't be
+started, as on Vercel) the same work runs in background threads instead.
+
+Previews are encoded compactly (WebP by default) at a resolution chosen from
+the page size, plus a small thumbnail for responsive ``srcset`` markup.
+"""
+from __future__ import annotations
+
+import asyncio
+import io
+import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from collections import deque
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Deque, List, Optional, Tuple
+
+import pymupdf  # PyMuPDF
+from PIL import Image
+
+from app.core.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+PREVIEW_FORMATS = ("webp", "jpeg", "png")
+
+
+class DocumentRenderError(ValueError):
+    """Raised when a document cannot be opened or rendered."""
+
+
+class DocumentRenderTimeout(DocumentRenderError):
+    """Raised when rendering exceeds its time budget."""
+
+
+@dataclass(frozen=True)
+class PreviewOptions:
+    """
+    How page previews are encoded.
+
+    Pages render at ``max_dpi`` unless that would exceed ``max_width`` pixels,
+    so small pages stay sharp and posters don't explode in size.
+    ``thumbnail_width`` 0 disables the thumbnail variant.
+    """
+
+    format: str = "webp"
+    quality: int = 75
+    max_width: int = 1600
+    max_dpi: int = 144
+    thumbnail_width: int = 320
+
+    @classmethod
+    def from_settings(cls) -> "PreviewOptions":
+        preview_format = settings.DOCUMENT_PREVIEW_FORMAT.lower()
+        if preview_format == "jpg":
+            preview_format = "jpeg"
+        if preview_format not in PREVIEW_FORMATS:
+            raise ValueError(f"Unsupported DOCUMENT_PREVIEW_FORMAT: {settings.DOCUMENT_PREVIEW_FORMAT}")
+        return cls(
+            format=preview_format,
+            quality=settings.DOCUMENT_PREVIEW_QUALITY,
+            max_width=settings.DOCUMENT_PREVIEW_MAX_WIDTH,
+            max_dpi=settings.DOCUMENT_PREVIEW_MAX_DPI,
+            thumbnail_width=settings.DOCUMENT_PREVIEW_THUMBNAIL_WIDTH,
+        )
+
+    @property
+    def fingerprint(self) -> str:
+        """Stable description used in cache keys."""
+        return f"{self.format}:q{self.quality}:w{self.max_width}:dpi{self.max_dpi}:t{self.thumbnail_width}"
+
+    def zoom_for(self, page_width: float) -> float:
+        """Return the render zoom for a page ``page_width`` points wide."""
+        zoom = self.max_dpi / 72
+        if self.max_width > 0 and page_width > 0:
+            zoom = min(zoom, self.max_width / page_width)
+        return max(zoom, 0.1)
+
+
+@dataclass
+class RenderedPage:
+    """One rendered page; ``image`` is None when rasterization failed."""
+
+    number: int  # 1-based
+    image: Optional[bytes]
+    text: str
+    error: Optional[str] = None
+    content_type: str = "image/png"
+    width: int = 0
+    height: int = 0
+    thumbnail: Optional[bytes] = None
+    thumbnail_content_type: str = "image/png"
+    thumbnail_width: int = 0
+
+
+@dataclass
+class RenderResult:
+    """All rendered pages of a document, in order."""
+
+    page_count: int
+    pages: List[RenderedPage] = field(default_factory=list)
+
+    @property
+    def truncated(self) -> bool:
+        return len(self.pages) < self.page_count
+
+
+def count_pdf_pages(data: bytes) -> int:
+    """Open ``data`` as a PDF and return its page count."""
+    try:
+        doc = pymupdf.open(stream=data, filetype="pdf")
+    except Exception as exc:
+        error_msg = str(exc).lower()
+        if "empty" in error_msg or "cannot open" in error_msg:
+            raise DocumentRenderError(f"Invalid or corrupted PDF file: {str(exc)}") from exc
+        raise DocumentRenderError(f"Invalid PDF file: {str(exc)}") from exc
+    try:
+        page_count = len(doc)
+    finally:
+        doc.close()
+    if page_count == 0:
+        raise DocumentRenderError("PDF file contains no pages")
+    return page_count
+
+
+def is_flat_image(image: Image.Image) -> bool:
+    """Return True for images with at most 256 distinct colours."""
+    return image.getcolors(maxcolors=256) is not None
+
+
+def encode_image(image: Image.Image, options: PreviewOptions) -> Tuple[bytes, str]:
+    """
+    Encode a Pillow image for the configured preview format.
+
+    Returns ``(data, content_type)``. Flat images (at most 256 colours: text,
+    line art) compress far better losslessly, so they are stored as lossless
+    WebP, or as palette PNG when the format is JPEG/PNG; lossy encoding only
+    applies to photographic pages.
+    """
+    buffer = io.BytesIO()
+    flat = is_flat_image(image)
+    if options.format == "webp":
+        if flat:
+            image.save(buffer, format="WEBP", lossless=True, quality=50, method=4)
+        else:
+            image.save(buffer, format="WEBP", quality=options.quality, method=4)
+        return buffer.getvalue(), "image/webp"
+    if options.format == "jpeg" and not flat:
+        image.save(buffer, format="JPEG", quality=options.quality, optimize=True, progressive=True)
+        return buffer.getvalue(), "image/jpeg"
+    if flat:
+        image = image.quantize(colors=256)
+    image.save(buffer, format="PNG", optimize=True)
+    return buffer.getvalue(), "image/png"
+
+
+def _render_preview(page, number: int, options: PreviewOptions) -> RenderedPage:
+    zoom = options.zoom_for(page.rect.width)
+    pixmap = page.get_pixmap(matrix=pymupdf.Matrix(zoom, zoom), alpha=False)
+    image = Image.frombytes("RGB", (pixmap.width, pixmap.height), pixmap.samples)
+    data, content_type = encode_image(image, options)
+    rendered = RenderedPage(
+        number=number,
+        image=data,
+        text="",
+        content_type=content_type,
+        width=image.width,
+        height=image.height,
+    )
+    if 0 < options.thumbnail_width < image.width:
+        thumb_height = max(round(image.height * options.thumbnail_width / image.width), 1)
+        thumbnail = image.resize((options.thumbnail_width, thumb_height), Image.LANCZOS)
+        thumbnail_data, thumbnail_type = encode_image(thumbnail, options)
+        # Lossless text pages can be smaller than their downscaled (anti-aliased) thumbnail
+        if len(thumbnail_data) < len(data):
+            rendered.thumbnail = thumbnail_data
+            rendered.thumbnail_content_type = thumbnail_type
+            rendered.thumbnail_width = thumbnail.width
+    return rendered
+
+
+def render_page_range(
+    data: bytes, start: int, stop: int, options: Optional[PreviewOptions] = None
+) -> List[RenderedPage]:
+    """
+    Render pages ``[start, stop)`` (0-based) of a PDF.
+
+    Runs inside pool workers, so it must stay a picklable top-level function.
+    A failing page is reported in ``RenderedPage.error`` instead of aborting
+    the range.
+    """
+    options = options or PreviewOptions()
+    pages: List[RenderedPage] = []
+    doc = pymupdf.open(stream=data, filetype="pdf")
+    try:
+        for index in range(start, stop):
+            try:
+                page = doc[index]
+            except Exception as exc:
+                pages.append(RenderedPage(number=index + 1, image=None, text="", error=str(exc)))
+                continue
+            try:
+                rendered = _render_preview(page, index + 1, options)
+            except Exception as exc:
+                rendered = RenderedPage(number=index + 1, image=None, text="", error=str(exc))
+            try:
+                rendered.text = page.get_text()
+            except Exception:
+                pass
+            pages.append(rendered)
+    finally:
+        doc.close()
+    return pages
+
+
+def describe_page_range(
+    data: bytes, start: int, stop: int, options: Optional[PreviewOptions] = None
+) -> List[RenderedPage]:
+    """
+    Return text and preview dimensions of pages ``[start, stop)`` without rasterizing them.
+
+    Used for pages that are rendered on demand: their markup needs the size
+    the preview will have, but not the image itself.
+    """
+    options = options or PreviewOptions()
+    pages: List[RenderedPage] = []
+    doc = pymupdf.open(stream=data, filetype="pdf")
+    try:
+        for index in range(start, stop):
+            page = doc[index]
+            zoom = options.zoom_for(page.rect.width)
+            size = (page.rect * pymupdf.Matrix(zoom, zoom)).irect
+            try:
+                text = page.get_text()
+            except Exception:
+                text = ""
+            pages.append(RenderedPage(number=index + 1, image=None, text=text, width=size.width, height=size.height))
+    finally:
+        doc.close()
+    return pages
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+_pool_unavailable = False
+
+
+def _get_pool() -> Optional[ProcessPoolExecutor]:
+    """The render pool, or None to render in background threads."""
+    global _pool, _pool_unavailable
+    if settings.DOCUMENT_RENDER_WORKERS <= 0 or _pool_unavailable:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            try:
+                _pool = ProcessPoolExecutor(max_workers=settings.DOCUMENT_RENDER_WORKERS)
+            except (OSError, NotImplementedError) as exc:
+                # e.g. no semaphores in serverless runtimes; don't retry on every document
+                _pool_unavailable = True
+                logger.warning("Document render pool unavailable (%s); rendering in threads", exc)
+                return None
+        return _pool
+
+
+def shutdown_render_pool() -> None:
+    """Stop the worker processes; a new pool is created on next use."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def render_concurrency() -> int:
+    """Page ranges rendered at once: one per worker process, or one thread."""
+    return max(settings.DOCUMENT_RENDER_WORKERS, 1)
+
+
+def page_budget(page_count: int, max_pages: Optional[int] = None) -> int:
+    """Return how many pages of a ``page_count``-page document are processed."""
+    limit = settings.DOCUMENT_MAX_PAGES if max_pages is None else max_pages
+    return page_count if limit <= 0 else min(page_count, limit)
+
+
+def _submit_range(loop, pool, data: bytes, first: int, last: int, options: PreviewOptions) -> asyncio.Future:
+    if pool is not None:
+        return loop.run_in_executor(pool, render_page_range, data, first, last, options)
+    return asyncio.ensure_future(asyncio.to_thread(render_page_range, data, first, last, options))
+
+
+async def iter_pdf_pages(
+    data: bytes,
+    *,
+    page_count: int,
+    options: Optional[PreviewOptions] = None,
+    max_pages: Optional[int] = None,
+    timeout: Optional[float] = None,
+    start: int = 0,
+) -> AsyncIterator[RenderedPage]:
+    """
+    Yield rendered pages in order as soon as their range is done.
+
+    Up to ``render_concurrency()`` ranges are rendered ahead of the caller, so
+    workers run in parallel while earlier pages are consumed but a slow caller
+    holds back rendering instead of piling up finished pages. ``timeout``
+    bounds the whole render; ``start`` skips the first pages (0-based).
+
+    Raises:
+        DocumentRenderTimeout: If the time budget is exhausted
+        DocumentRenderError: If the worker pool breaks
+    """
+    budget = page_budget(page_count, max_pages)
+    per_task = max(settings.DOCUMENT_RENDER_PAGES_PER_TASK, 1)
+    timeout = settings.DOCUMENT_RENDER_TIMEOUT_SECONDS if timeout is None else timeout
+    options = options or PreviewOptions.from_settings()
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout if timeout and timeout > 0 else None
+    pool = _get_pool()
+    ranges = ((first, min(first + per_task, budget)) for first in range(start, budget, per_task))
+    futures: Deque[asyncio.Future] = deque()
+
+    def submit_next() -> None:
+        next_range = next(ranges, None)
+        if next_range is not None:
+            futures.append(_submit_range(loop, pool, data, *next_range, options))
+
+    for _ in range(render_concurrency()):
+        submit_next()
+
+    try:
+        while futures:
+            future = futures.popleft()
+            remaining = None if deadline is None else max(deadline - loop.time(), 0)
+            try:
+                pages = await asyncio.wait_for(future, remaining)
+            except asyncio.TimeoutError as exc:
+                raise DocumentRenderTimeout(f"Rendering exceeded {timeout:.0f} seconds") from exc
+            except BrokenProcessPool as exc:
+                shutdown_render_pool()
+                raise DocumentRenderError("Document renderer crashed") from exc
+            submit_next()
+            for page in pages:
+                yield page
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+async def render_page(
+    data: bytes,
+    number: int,
+    *,
+    options: Optional[PreviewOptions] = None,
+    timeout: Optional[float] = None,
+) -> RenderedPage:
+    """
+    Render a single page (1-based) in the render pool.
+
+    Raises:
+        DocumentRenderTimeout: If rendering exceeds ``timeout``
+        DocumentRenderError: If the page cannot be rendered
+    """
+    async for page in iter_pdf_pages(
+        data, page_count=number, options=options, max_pages=0, timeout=timeout, start=number - 1
+    ):
+        if page.image is None:
+            raise DocumentRenderError(f"Failed to render page {number}: {page.error}")
+        return page
+    raise DocumentRenderError(f"Page {number} does not exist")
+
+
+async def render_pdf(
+    data: bytes,
+    *,
+    options: Optional[PreviewOptions] = None,
+    max_pages: Optional[int] = None,
+    timeout: Optional[float] = None,
+) -> RenderResult:
+    """Render a whole PDF (up to the page budget) and return its pages in order."""
+    page_count = await asyncio.to_thread(count_pdf_pages, data)
+    result = RenderResult(page_count=page_count)
+    async for page in iter_pdf_pages(
+        data, page_count=page_count, options=options, max_pages=max_pages, timeout=timeout
+    ):
+        result.pages.append(page)
+    logger.info("Rendered %d/%d PDF pages", len(result.pages), page_count)
+    return result
@@ -0,0 +1,139 @@
+"""
+Concurrent storage uploads for document analysis.
+
+Preview images are handed to the pipeline as soon as their page is rendered
+and upload in the background, at most ``DOCUMENT_UPLOAD_CONCURRENCY`` at a
+time, while the next pages are still rendering. Callers keep the returned
+tasks in page order and await them in that order, so the generated HTML does
+not depend on which upload finishes first.
+"""
+from __future__ import annotations
+
+import asyncio
+import base64
+import logging
+from dataclasses import dataclass
+from typing import Optional, Set
+
+from app.core.config import settings
+from app.services.documents.rendering import RenderedPage
+from app.services.storage import StorageBackend, StoredObject
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PreviewImage:
+    """Where a preview ended up; ``stored`` is False for inline base64 fallbacks."""
+
+    url: str
+    stored: bool
+    width: int = 0
+    height: int = 0
+    thumbnail_url: Optional[str] = None
+    thumbnail_width: int = 0
+
+
+def inline_image(data: bytes, content_type: str = "image/png") -> str:
+    """Return ``data`` as a ``data:`` URL."""
+    return f"data:{content_type};base64,{base64.b64encode(data).decode()}"
+
+
+class UploadPipeline:
+    """
+    Runs preview and original uploads concurrently with a bounded limit.
+
+    Storage failures never propagate: a preview falls back to an inline data
+    URL and the original resolves to None, matching the serial behaviour.
+    """
+
+    def __init__(self, storage: Optional[StorageBackend], *, concurrency: Optional[int] = None):
+        self._storage = storage
+        limit = settings.DOCUMENT_UPLOAD_CONCURRENCY if concurrency is None else concurrency
+        self._slots = asyncio.Semaphore(max(limit, 1))
+        self._tasks: Set[asyncio.Task] = set()
+
+    @property
+    def storage(self) -> Optional[StorageBackend]:
+        return self._storage
+
+    def preview(self, page: RenderedPage) -> "asyncio.Task[PreviewImage]":
+        """Start uploading a rendered page preview and its thumbnail."""
+        return self._spawn(self._upload_preview(page))
+
+    def original(self, data: bytes, *, content_type: str) -> "asyncio.Task[Optional[StoredObject]]":
+        """Start uploading the original document."""
+        return self._spawn(self._upload_original(data, content_type))
+
+    async def aclose(self) -> None:
+        """Cancel uploads that are still pending (e.g. the request failed)."""
+        pending = [task for task in self._tasks if not task.done()]
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    def _spawn(self, coro) -> asyncio.Task:
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _upload_preview(self, page: RenderedPage) -> PreviewImage:
+        preview = PreviewImage(url="", stored=False, width=page.width, height=page.height)
+        if self._storage is None:
+            # Inline only the main image; a thumbnail would just add bytes to the post
+            logger.debug("Using inline base64 preview due to missing storage.")
+            preview.url = inline_image(page.image, page.content_type)
+            return preview
+
+        uploads = [self._upload_image(page.image, page.content_type)]
+        if page.thumbnail:
+            uploads.append(self._upload_image(page.thumbnail, page.thumbnail_content_type))
+        results = await asyncio.gather(*uploads, return_exceptions=True)
+
+        if isinstance(results[0], BaseException):
+            logger.error("Failed to upload PDF preview page %d: %s", page.number, results[0])
+            logger.warning("Using base64 fallback for page %d", page.number)
+            preview.url = inline_image(page.image, page.content_type)
+            return preview
+
+        preview.url = results[0].url
+        preview.stored = True
+        if len(results) > 1 and not isinstance(results[1], BaseException):
+            preview.thumbnail_url = results[1].url
+            preview.thumbnail_width = page.thumbnail_width
+        logger.info("Stored PDF preview page %d: %s", page.number, results[0].key)
+        return preview
+
+    async def _upload_image(self, data: bytes, content_type: str) -> StoredObject:
+        async with self._slots:
+            return await self._storage.aupload_bytes(
+                data,
+                content_type=content_type,
+                prefix="documents/previews",
+                content_addressed=True,
+            )
+
+    async def _upload_original(self, data: bytes, content_type: str) -> Optional[StoredObject]:
+        if self._storage is None:
+            logger.warning("Document stored only in-memory; storage unavailable.")
+            return None
+
+        async with self._slots:
+            try:
+                logger.info("Uploading original document via %s", self._storage.name)
+                stored = await self._storage.aupload_bytes(
+                    data,
+                    content_type=content_type,
+                    prefix="documents/originals",
+                    content_addressed=True,
+                )
+            except Exception as exc:
+                # Don't fail the whole request if document storage fails - we still have content
+                logger.error("Failed to store analyzed document: %s", exc)
+                return None
+
+        logger.info("Stored analyzed document: %s", stored.key)
+        return stored
@@ -0,0 +1,14 @@
+"""Event helpers shared by the event endpoints."""
+
+from app.services.events.listing import EVENT_FIELDS, project_events, serialize_events
+from app.services.events.mappers import event_response
+from app.services.events.validators import event_list_validators, event_validators
+
+__all__ = [
+    "EVENT_FIELDS",
+    "event_list_validators",
+    "event_response",
+    "event_validators",
+    "project_events",
+    "serialize_events",
+]
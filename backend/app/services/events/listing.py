@@ -0,0 +1,73 @@
+"""
+Serialization of event list items, honouring ``?fields=`` / ``?view=``.
+
+Only the columns the selected fields need are loaded; organizers,
+participant counts and image variants are fetched once per page.
+"""
+from __future__ import annotations
+
+from typing import Dict, FrozenSet, List
+
+from pydantic import BaseModel
+from sqlalchemy import func
+from sqlalchemy.orm import Query, Session
+
+from app.core.projection import FieldSet
+from app.models.event import Event, EventRegistration
+from app.models.user import User
+from app.schemas.event import EventResponse
+from app.services.images import image_response, image_variants
+
+
+EVENT_FIELDS = FieldSet(
+    Event,
+    EventResponse,
+    presets={
+        "card": (
+            "id", "title", "description", "date", "time", "location", "image_url", "image",
+            "max_participants", "registration_deadline", "categories", "organizer_id",
+            "organizer_name", "status", "participants_count", "created_at",
+        ),
+    },
+    columns={
+        "organizer_name": ("organizer_id",),
+        "image": ("image_url",),
+        "participants_count": (),
+    },
+)
+
+
+def project_events(query: Query, selection: FrozenSet[str]) -> Query:
+    """Restrict ``query`` to the columns ``selection`` needs."""
+    return query.options(EVENT_FIELDS.load_only(selection))
+
+
+def serialize_events(db: Session, events: List[Event], selection: FrozenSet[str]) -> List[BaseModel]:
+    """Build the list items of ``events`` with only the ``selection`` fields."""
+    organizers: Dict[str, str] = {}
+    if "organizer_name" in selection and events:
+        organizers = dict(
+            db.query(User.id, User.full_name).filter(User.id.in_({event.organizer_id for event in events})).all()
+        )
+    participants: Dict[str, int] = {}
+    if "participants_count" in selection and events:
+        participants = dict(
+            db.query(EventRegistration.event_id, func.count(EventRegistration.id))
+            .filter(EventRegistration.event_id.in_([event.id for event in events]))
+            .group_by(EventRegistration.event_id)
+            .all()
+        )
+    images = image_variants(db, [event.image_url for event in events]) if "image" in selection else {}
+
+    columns = selection & EVENT_FIELDS.columns_for(selection)
+    result = []
+    for event in events:
+        values = {name: getattr(event, name) for name in columns}
+        if "organizer_name" in selection:
+            values["organizer_name"] = organizers.get(event.organizer_id, "Unknown")
+        if "participants_count" in selection:
+            values["participants_count"] = participants.get(event.id, 0)
+        if "image" in selection:
+            values["image"] = image_response(images.get(event.image_url))
+        result.append(EVENT_FIELDS.serialize(values, selection))
+    return result
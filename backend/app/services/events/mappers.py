@@ -0,0 +1,49 @@
+"""
+ORM row to response mapping for events.
+
+Rows come from the database, so responses are assembled with
+``model_construct`` (no validation); the endpoints return them through
+``FastJSONResponse``.
+"""
+from __future__ import annotations
+
+from typing import Any, Optional
+
+from app.models.event import Event
+from app.models.image import ImageAsset
+from app.schemas.event import EventResponse
+from app.services.images import image_response
+
+
+def event_response(
+    event: Event,
+    *,
+    organizer: Any = None,
+    participants_count: int = 0,
+    image: Optional[ImageAsset] = None,
+) -> EventResponse:
+    """Map a fully loaded event to its response; ``organizer`` needs a ``full_name``."""
+    return EventResponse.model_construct(
+        id=event.id,
+        title=event.title,
+        description=event.description,
+        full_description=event.full_description,
+        date=event.date,
+        time=event.time,
+        location=event.location,
+        address=event.address,
+        image_url=event.image_url,
+        image=image_response(image),
+        max_participants=event.max_participants,
+        registration_deadline=event.registration_deadline,
+        categories=event.categories,
+        organizer_id=event.organizer_id,
+        organizer_name=organizer.full_name if organizer else "Unknown",
+        status=event.status or "pending",
+        participants_count=participants_count,
+        bank_name=event.bank_name,
+        account_number=event.account_number,
+        account_holder_name=event.account_holder_name,
+        created_at=event.created_at,
+        updated_at=event.updated_at,
+    )
@@ -0,0 +1,79 @@
+"""
+HTTP cache validators (ETag / Last-Modified) of event details and lists.
+
+Computed from one aggregate query over the event timestamps, the
+organizer's ``updated_at``, the registrations and the ``events``/``users``
+cache versions (bumped by every write, so edits within the same second
+still change the ETag), so a request whose cached copy is current is
+answered ``304`` without building the response. Details also cover the
+cover image's ingested variants.
+"""
+from __future__ import annotations
+
+from typing import Any, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Query, Session
+
+from app.core.cache import EVENTS, USERS, tag_version
+from app.core.http_cache import Validators, latest, make_validators
+from app.models.event import Event, EventRegistration
+from app.models.user import User
+from app.services.images import image_version
+
+
+def event_validators(db: Session, event_id: str) -> Optional[Validators]:
+    """Validators of one event, or None if it doesn't exist."""
+    registrations = db.query(func.count(EventRegistration.id)).filter(EventRegistration.event_id == Event.id)
+    registered_at = db.query(func.max(EventRegistration.created_at)).filter(EventRegistration.event_id == Event.id)
+    row = (
+        db.query(
+            Event.created_at,
+            Event.updated_at,
+            User.updated_at.label("organizer_updated_at"),
+            registrations.scalar_subquery().label("registrations"),
+            registered_at.scalar_subquery().label("registered_at"),
+            Event.image_url,
+            tag_version(db, EVENTS).label("events_version"),
+            tag_version(db, USERS).label("users_version"),
+        )
+        .outerjoin(User, User.id == Event.organizer_id)
+        .filter(Event.id == event_id)
+        .first()
+    )
+    if row is None:
+        return None
+    image = image_version(db, row.image_url)
+    return make_validators(
+        "event", event_id, row.created_at, row.updated_at, row.organizer_updated_at, row.registrations,
+        row.events_version, row.users_version, image,
+        last_modified=latest((row.created_at, row.updated_at, row.organizer_updated_at, row.registered_at, image[1])),
+    )
+
+
+def event_list_validators(db: Session, query: Query, *variant: Any) -> Validators:
+    """
+    Validators of an event list: ``query`` is the filtered ``Event`` query,
+    ``variant`` the parameters that shape the response (page, limit, fields).
+    """
+    events = (
+        query.outerjoin(User, User.id == Event.organizer_id)
+        .with_entities(
+            func.count(Event.id),
+            func.max(Event.created_at),
+            func.max(Event.updated_at),
+            func.max(User.updated_at),
+            tag_version(db, EVENTS),
+            tag_version(db, USERS),
+        )
+        .one()
+    )
+    registrations = (
+        db.query(func.count(EventRegistration.id), func.max(EventRegistration.created_at))
+        .filter(EventRegistration.event_id.in_(query.with_entities(Event.id)))
+        .one()
+    )
+    return make_validators(
+        "events", variant, tuple(events), tuple(registrations),
+        last_modified=latest((*events[1:4], registrations[1])),
+    )
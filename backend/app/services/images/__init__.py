@@ -0,0 +1,31 @@
+"""Cover image ingestion: WebP variants and placeholders in object storage."""
+
+from app.services.images.variants import (
+    MAX_IMAGE_BYTES,
+    VARIANT_WIDTHS,
+    ImageVariantSet,
+    InvalidImage,
+    build_variants,
+    get_image_variants,
+    image_id,
+    image_response,
+    image_variants,
+    image_version,
+    ingest_image,
+    shutdown_image_pool,
+)
+
+__all__ = [
+    "MAX_IMAGE_BYTES",
+    "VARIANT_WIDTHS",
+    "ImageVariantSet",
+    "InvalidImage",
+    "build_variants",
+    "get_image_variants",
+    "image_id",
+    "image_response",
+    "image_variants",
+    "image_version",
+    "ingest_image",
+    "shutdown_image_pool",
+]
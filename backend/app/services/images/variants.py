@@ -0,0 +1,236 @@
+"""
+Cover image ingestion.
+
+An uploaded image is decoded once and downscaled into ``VARIANT_WIDTHS``
+(thumbnail for listings, card, hero for detail pages) plus a tiny blurred
+placeholder, in worker processes so large photos don't stall the event loop.
+Variants are stored as WebP under ``images/{sha256}/{name}.webp``; the
+``ImageAsset`` row records their URLs and is keyed by the same hash, so
+re-uploading an image costs one lookup.
+
+Posts and events keep a single ``image_url``. When it points at an ingested
+image, ``image_variants`` resolves it back to its ``ImageAsset`` from the key.
+"""
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+import io
+import logging
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Tuple
+
+from PIL import Image, ImageFilter, ImageOps, UnidentifiedImageError
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.cache import EVENTS, POSTS, mark_changed
+from app.core.config import settings
+from app.models.image import ImageAsset
+from app.schemas.image import ImageVariants
+from app.services.storage import StorageBackend
+
+
+logger = logging.getLogger(__name__)
+
+IMAGE_PREFIX = "images"
+# Largest first: each variant is downscaled from the previous one
+VARIANT_WIDTHS = {"hero": 1600, "card": 640, "thumbnail": 320}
+PLACEHOLDER_WIDTH = 16
+MAX_IMAGE_BYTES = 15 * 1024 * 1024
+MAX_IMAGE_PIXELS = 50_000_000
+
+_IMAGE_KEY = re.compile(rf"{IMAGE_PREFIX}/([0-9a-f]{{64}})/")
+
+
+class InvalidImage(ValueError):
+    """Raised when an upload is not an image Pillow can read."""
+
+
+@dataclass
+class ImageVariantSet:
+    """Encoded variants of one image; returned from worker processes."""
+
+    width: int
+    height: int
+    placeholder: str
+    images: Dict[str, bytes] = field(default_factory=dict)
+
+
+def variant_key(digest: str, name: str) -> str:
+    return f"{IMAGE_PREFIX}/{digest}/{name}.webp"
+
+
+def image_id(url: Optional[str]) -> Optional[str]:
+    """Return the ``ImageAsset`` id a variant URL belongs to, or None."""
+    match = _IMAGE_KEY.search(url or "")
+    return match.group(1) if match else None
+
+
+def build_variants(data: bytes, quality: int = 80) -> ImageVariantSet:
+    """
+    Decode ``data`` once and encode every variant and the placeholder.
+
+    Images are never upscaled, so a small upload yields identical variants.
+
+    Raises:
+        InvalidImage: If ``data`` is not a readable image
+    """
+    try:
+        with Image.open(io.BytesIO(data)) as source:
+            if source.width * source.height > MAX_IMAGE_PIXELS:
+                raise InvalidImage("Image dimensions are too large")
+            # JPEG decoders can scale by 1/2..1/8 while decoding, far cheaper than a full decode
+            source.draft("RGB", (VARIANT_WIDTHS["hero"], VARIANT_WIDTHS["hero"]))
+            image = ImageOps.exif_transpose(source)
+            image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as exc:
+        raise InvalidImage("File is not a readable image") from exc
+
+    result = None
+    for name, width in VARIANT_WIDTHS.items():
+        if image.width > width:
+            image = image.resize((width, max(round(image.height * width / image.width), 1)), Image.LANCZOS)
+        if result is None:
+            result = ImageVariantSet(width=image.width, height=image.height, placeholder="")
+        buffer = io.BytesIO()
+        image.save(buffer, format="WEBP", quality=quality, method=4)
+        result.images[name] = buffer.getvalue()
+
+    tiny = image.resize(
+        (PLACEHOLDER_WIDTH, max(round(image.height * PLACEHOLDER_WIDTH / image.width), 1)), Image.BILINEAR
+    ).filter(ImageFilter.GaussianBlur(1))
+    buffer = io.BytesIO()
+    tiny.save(buffer, format="WEBP", quality=30)
+    result.placeholder = "data:image/webp;base64," + base64.b64encode(buffer.getvalue()).decode()
+    return result
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+_pool_unavailable = False
+
+
+def _get_pool() -> Optional[ProcessPoolExecutor]:
+    """The worker pool, or None to build variants in a thread."""
+    global _pool, _pool_unavailable
+    if settings.IMAGE_WORKERS <= 0 or _pool_unavailable:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            try:
+                _pool = ProcessPoolExecutor(max_workers=settings.IMAGE_WORKERS)
+            except (OSError, NotImplementedError) as exc:
+                # e.g. no semaphores in serverless runtimes; don't retry on every upload
+                _pool_unavailable = True
+                logger.warning("Image worker pool unavailable (%s); building variants in threads", exc)
+                return None
+        return _pool
+
+
+def shutdown_image_pool() -> None:
+    """Stop the worker processes; a new pool is created on next use."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+async def _build_in_pool(data: bytes) -> ImageVariantSet:
+    pool = _get_pool()
+    if pool is None:
+        return await asyncio.to_thread(build_variants, data, settings.IMAGE_QUALITY)
+    try:
+        return await asyncio.get_running_loop().run_in_executor(pool, build_variants, data, settings.IMAGE_QUALITY)
+    except BrokenProcessPool:
+        shutdown_image_pool()
+        logger.warning("Image worker pool crashed; retrying in a thread")
+        return await asyncio.to_thread(build_variants, data, settings.IMAGE_QUALITY)
+
+
+async def ingest_image(db: Session, storage: StorageBackend, data: bytes) -> ImageAsset:
+    """
+    Store the variants of an uploaded image and return its ``ImageAsset``.
+
+    Raises:
+        InvalidImage: If ``data`` is not a readable image
+        StorageError: If a variant upload fails
+    """
+    if len(data) > MAX_IMAGE_BYTES:
+        raise InvalidImage(f"Image is too large ({len(data)} bytes)")
+    digest = await asyncio.to_thread(lambda: hashlib.sha256(data).hexdigest())
+    asset = db.query(ImageAsset).filter(ImageAsset.id == digest).first()
+    if asset is not None:
+        return asset
+
+    variants = await _build_in_pool(data)
+    stored = await asyncio.gather(*(
+        storage.aupload_bytes(image, content_type="image/webp", key=variant_key(digest, name))
+        for name, image in variants.images.items()
+    ))
+    urls = {name: item.url for name, item in zip(variants.images, stored)}
+
+    asset = ImageAsset(
+        id=digest,
+        width=variants.width,
+        height=variants.height,
+        thumbnail_url=urls["thumbnail"],
+        card_url=urls["card"],
+        hero_url=urls["hero"],
+        placeholder=variants.placeholder,
+    )
+    db.add(asset)
+    # Posts and events already pointing at these URLs gain their variants
+    mark_changed(db, EVENTS, POSTS)
+    try:
+        db.commit()
+    except IntegrityError:
+        # The same image was ingested concurrently; both stored identical variants
+        db.rollback()
+        asset = db.query(ImageAsset).filter(ImageAsset.id == digest).one()
+    logger.info("Ingested image %s (%dx%d, %d bytes)", digest, variants.width, variants.height, len(data))
+    return asset
+
+
+def image_variants(db: Session, urls: Iterable[Optional[str]]) -> Dict[str, ImageAsset]:
+    """Map each ingested image URL in ``urls`` to its ``ImageAsset``, in one query."""
+    ids = {url: image_id(url) for url in urls if url}
+    ids = {url: asset_id for url, asset_id in ids.items() if asset_id}
+    if not ids:
+        return {}
+    assets = {asset.id: asset for asset in db.query(ImageAsset).filter(ImageAsset.id.in_(set(ids.values())))}
+    return {url: assets[asset_id] for url, asset_id in ids.items() if asset_id in assets}
+
+
+def get_image_variants(db: Session, url: Optional[str]) -> Optional[ImageAsset]:
+    """Single-URL form of :func:`image_variants`."""
+    return image_variants(db, [url]).get(url) if url else None
+
+
+def image_version(db: Session, url: Optional[str]) -> Tuple[Optional[str], Optional[datetime]]:
+    """Validator part for the image behind ``url``: its asset id and when it was ingested."""
+    asset_id = image_id(url)
+    if asset_id is None:
+        return None, None
+    return asset_id, db.query(ImageAsset.created_at).filter(ImageAsset.id == asset_id).scalar()
+
+
+def image_response(asset: Optional[ImageAsset]) -> Optional[ImageVariants]:
+    """The ``image`` field of a post or event response, built without validation."""
+    if asset is None:
+        return None
+    return ImageVariants.model_construct(
+        thumbnail_url=asset.thumbnail_url,
+        card_url=asset.card_url,
+        hero_url=asset.hero_url,
+        placeholder=asset.placeholder,
+        width=asset.width,
+        height=asset.height,
+    )
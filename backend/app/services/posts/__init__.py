@@ -0,0 +1,39 @@
+"""Post helpers shared by the blog and content endpoints."""
+
+from app.services.posts.content import (
+    OffloadResult,
+    has_inline_images,
+    offload_inline_images,
+    offload_post_images,
+    prepare_post_content,
+)
+from app.services.posts.metadata import (
+    PostMetadata,
+    apply_post_metadata,
+    backfill_post_metadata,
+    compute_post_metadata,
+    plain_text,
+)
+from app.services.posts.listing import POST_FIELDS, post_excerpt, project_posts, serialize_posts
+from app.services.posts.mappers import post_response
+from app.services.posts.validators import post_list_validators, post_validators
+
+__all__ = [
+    "POST_FIELDS",
+    "OffloadResult",
+    "PostMetadata",
+    "apply_post_metadata",
+    "backfill_post_metadata",
+    "compute_post_metadata",
+    "has_inline_images",
+    "offload_inline_images",
+    "offload_post_images",
+    "plain_text",
+    "post_excerpt",
+    "post_list_validators",
+    "post_response",
+    "post_validators",
+    "prepare_post_content",
+    "project_posts",
+    "serialize_posts",
+]
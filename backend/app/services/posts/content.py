@@ -0,0 +1,157 @@
+"""
+Write-time processing of post HTML.
+
+Document analysis falls back to ``data:image/...;base64`` previews when
+storage is unavailable, and the editor inlines pasted images the same way.
+Left in ``BlogPost.content`` they make every feed response and row carry
+megabytes of base64. ``offload_inline_images`` uploads them to storage
+(content-addressed, so identical images are stored once) and rewrites the
+HTML to point at the stored URLs.
+"""
+from __future__ import annotations
+
+import asyncio
+import base64
+import binascii
+import hashlib
+import logging
+import re
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.blog import BlogPost
+from app.services.storage import StorageBackend, StorageError, content_key, get_storage_backend
+
+
+logger = logging.getLogger(__name__)
+
+POST_IMAGE_PREFIX = "posts/images"
+
+# src="data:image/png;base64,...." (either quote style); base64 may be line-wrapped
+_INLINE_IMAGE = re.compile(
+    r"""(?P<attr>src\s*=\s*)(?P<quote>["'])data:(?P<type>image/[\w.+-]+);base64,(?P<data>[A-Za-z0-9+/=\s]+)(?P=quote)""",
+    re.IGNORECASE,
+)
+
+
+@dataclass
+class OffloadResult:
+    content: str
+    images: int = 0  # data URLs replaced
+    bytes_saved: int = 0  # Reduction of the HTML size
+
+
+def has_inline_images(content: Optional[str]) -> bool:
+    return bool(content) and "data:image/" in content
+
+
+def offload_inline_images(content: str, storage: Optional[StorageBackend]) -> OffloadResult:
+    """
+    Upload every inline base64 image in ``content`` and return the rewritten HTML.
+
+    Images that fail to decode or upload stay inline, so the post is never
+    lost; the caller can retry later (e.g. with the migration script).
+    With ``storage`` None nothing is uploaded and the object key stands in
+    for the URL, which is enough to measure a dry run.
+    Blocking: run it in a worker thread from async code.
+    """
+    result = OffloadResult(content=content)
+    if not has_inline_images(content):
+        return result
+
+    urls: Dict[str, str] = {}  # sha256 of the image -> stored URL
+
+    def replace(match: "re.Match[str]") -> str:
+        try:
+            data = base64.b64decode("".join(match.group("data").split()), validate=True)
+        except (binascii.Error, ValueError):
+            logger.warning("Skipping undecodable inline image (%d chars)", len(match.group("data")))
+            return match.group(0)
+
+        digest = hashlib.sha256(data).hexdigest()
+        url = urls.get(digest)
+        if url is None and storage is None:
+            url = content_key(POST_IMAGE_PREFIX, digest)
+        if url is None:
+            try:
+                url = storage.upload_bytes(
+                    data,
+                    content_type=match.group("type").lower(),
+                    prefix=POST_IMAGE_PREFIX,
+                    content_addressed=True,
+                ).url
+            except StorageError as exc:
+                logger.error("Failed to offload inline image: %s", exc)
+                return match.group(0)
+            urls[digest] = url
+        result.images += 1
+        return f"{match.group('attr')}{match.group('quote')}{url}{match.group('quote')}"
+
+    result.content = _INLINE_IMAGE.sub(replace, content)
+    result.bytes_saved = len(content) - len(result.content)
+    if result.images:
+        logger.info("Offloaded %d inline images (%d bytes)", result.images, result.bytes_saved)
+    return result
+
+
+async def prepare_post_content(content: Optional[str]) -> Optional[str]:
+    """
+    Process post HTML before it is saved: inline images are moved to storage.
+
+    Without storage the content is saved unchanged.
+    """
+    if not has_inline_images(content):
+        return content
+    try:
+        storage = get_storage_backend()
+    except StorageError as exc:
+        logger.warning("Storage unavailable; keeping inline images in post content: %s", exc)
+        return content
+    result = await asyncio.to_thread(offload_inline_images, content, storage)
+    return result.content
+
+
+def offload_post_images(
+    db: Session,
+    storage: Optional[StorageBackend],
+    *,
+    batch_size: int = 50,
+    dry_run: bool = False,
+) -> Dict[str, int]:
+    """
+    Rewrite inline images in existing posts, ``batch_size`` rows at a time.
+
+    Returns counts of posts scanned/updated, images moved and bytes saved.
+    ``dry_run`` only measures: nothing is uploaded or written.
+    """
+    stats = {"posts": 0, "updated": 0, "images": 0, "bytes_saved": 0}
+    last_id = ""
+    while True:
+        # Keyset pagination: updated rows drop out of the LIKE filter, so offsets would skip rows
+        posts = (
+            db.query(BlogPost)
+            .filter(BlogPost.content.like("%data:image/%"), BlogPost.id > last_id)
+            .order_by(BlogPost.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not posts:
+            break
+        for post in posts:
+            stats["posts"] += 1
+            result = offload_inline_images(post.content, None if dry_run else storage)
+            if result.images:
+                stats["updated"] += 1
+                stats["images"] += result.images
+                stats["bytes_saved"] += result.bytes_saved
+                if not dry_run:
+                    post.content = result.content
+        last_id = posts[-1].id
+        if dry_run:
+            db.rollback()
+        else:
+            db.commit()
+        db.expunge_all()
+    return stats
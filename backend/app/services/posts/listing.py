@@ -0,0 +1,104 @@
+"""
+Serialization of post list items, honouring ``?fields=`` / ``?view=``.
+
+Only the columns the selected fields need are loaded, and the related data
+(authors, like counts, image variants) is fetched with one query per kind
+for the whole page instead of per post.
+"""
+from __future__ import annotations
+
+from typing import Dict, FrozenSet, List
+
+from pydantic import BaseModel
+from sqlalchemy import case, func
+from sqlalchemy.orm import Query, Session, with_expression
+
+from app.core.projection import FieldSet
+from app.models.blog import BlogPost, BlogPostLike
+from app.models.user import User
+from app.schemas.blog import BlogPostResponse
+from app.services.images import image_response, image_variants
+from app.services.posts.metadata import make_excerpt, plain_text
+
+
+# Characters of content read for posts whose excerpt hasn't been backfilled yet
+EXCERPT_SOURCE_LENGTH = 2000
+
+POST_FIELDS = FieldSet(
+    BlogPost,
+    BlogPostResponse,
+    presets={
+        "card": (
+            "id", "title", "excerpt", "reading_minutes", "first_image_url", "category", "image_url", "image",
+            "author_id", "author_name", "author_avatar", "status", "likes_count", "comments_count", "created_at",
+        ),
+    },
+    columns={
+        "author_name": ("author_id",),
+        "author_avatar": ("author_id",),
+        "image": ("image_url",),
+        "likes_count": (),
+        "comments_count": (),
+    },
+)
+
+
+def project_posts(query: Query, selection: FrozenSet[str]) -> Query:
+    """Restrict ``query`` to the columns ``selection`` needs."""
+    query = query.options(POST_FIELDS.load_only(selection))
+    if "excerpt" in selection and "content" not in selection:
+        # Posts saved before excerpts were stored fall back to the start of the content
+        preview = case((BlogPost.excerpt.is_(None), func.substr(BlogPost.content, 1, EXCERPT_SOURCE_LENGTH)))
+        query = query.options(with_expression(BlogPost.content_preview, preview))
+    return query
+
+
+def post_excerpt(post: BlogPost, content_loaded: bool = True) -> str:
+    """The stored excerpt, or one made from the start of the content for older posts."""
+    if post.excerpt:
+        return post.excerpt
+    html = post.content if content_loaded else post.content_preview
+    if not html:
+        return post.excerpt
+    if not content_loaded and "<" in html[html.rfind(">") + 1:]:
+        html = html[:html.rfind("<")]  # Drop a tag cut off by the preview
+    return make_excerpt(plain_text(html))
+
+
+def serialize_posts(db: Session, posts: List[BlogPost], selection: FrozenSet[str]) -> List[BaseModel]:
+    """Build the list items of ``posts`` with only the ``selection`` fields."""
+    authors: Dict[str, tuple] = {}
+    if selection & {"author_name", "author_avatar"}:
+        author_ids = {post.author_id for post in posts}
+        authors = {
+            row.id: row
+            for row in db.query(User.id, User.full_name, User.avatar).filter(User.id.in_(author_ids))
+        }
+    likes: Dict[str, int] = {}
+    if "likes_count" in selection and posts:
+        likes = dict(
+            db.query(BlogPostLike.post_id, func.count(BlogPostLike.id))
+            .filter(BlogPostLike.post_id.in_([post.id for post in posts]))
+            .group_by(BlogPostLike.post_id)
+            .all()
+        )
+    images = image_variants(db, [post.image_url for post in posts]) if "image" in selection else {}
+
+    columns = selection & POST_FIELDS.columns_for(selection) - {"excerpt"}
+    result = []
+    for post in posts:
+        values = {name: getattr(post, name) for name in columns}
+        if "excerpt" in selection:
+            values["excerpt"] = post_excerpt(post, content_loaded="content" in selection)
+        if "author_name" in selection or "author_avatar" in selection:
+            author = authors.get(post.author_id)
+            values["author_name"] = author.full_name if author else "Unknown"
+            values["author_avatar"] = author.avatar if author else None
+        if "likes_count" in selection:
+            values["likes_count"] = likes.get(post.id, 0)
+        if "comments_count" in selection:
+            values["comments_count"] = 0
+        if "image" in selection:
+            values["image"] = image_response(images.get(post.image_url))
+        result.append(POST_FIELDS.serialize({name: values[name] for name in selection}, selection))
+    return result
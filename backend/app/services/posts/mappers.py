@@ -0,0 +1,50 @@
+"""
+ORM row to response mapping for posts.
+
+Rows come from the database, so responses are assembled with
+``model_construct`` (no validation); the endpoints return them through
+``FastJSONResponse``.
+"""
+from __future__ import annotations
+
+from typing import Any, Optional
+
+from app.models.blog import BlogPost
+from app.models.image import ImageAsset
+from app.schemas.blog import BlogPostResponse
+from app.services.images import image_response
+
+
+def post_response(
+    post: BlogPost,
+    *,
+    author: Any = None,
+    likes_count: int = 0,
+    image: Optional[ImageAsset] = None,
+    excerpt: Optional[str] = None,
+) -> BlogPostResponse:
+    """
+    Map a fully loaded post to its response.
+
+    ``author`` is a ``User`` (or a row with ``full_name`` and ``avatar``).
+    """
+    return BlogPostResponse.model_construct(
+        id=post.id,
+        title=post.title,
+        content=post.content,
+        excerpt=excerpt if excerpt is not None else post.excerpt,
+        word_count=post.word_count,
+        reading_minutes=post.reading_minutes,
+        first_image_url=post.first_image_url,
+        category=post.category,
+        image_url=post.image_url,
+        image=image_response(image),
+        author_id=post.author_id,
+        author_name=author.full_name if author else "Unknown",
+        author_avatar=author.avatar if author else None,
+        status=post.status,
+        likes_count=likes_count,
+        comments_count=0,
+        created_at=post.created_at,
+        updated_at=post.updated_at,
+    )
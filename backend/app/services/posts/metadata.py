@@ -0,0 +1,145 @@
+"""
+Reading metadata derived from post HTML when a post is saved.
+
+The excerpt, word count, reading time and first image are computed once per
+write from the text of the HTML (tags stripped, entities decoded), so list
+endpoints read short columns instead of slicing ``content`` on every request.
+"""
+from __future__ import annotations
+
+import logging
+import math
+import re
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models.blog import BlogPost
+
+
+logger = logging.getLogger(__name__)
+
+EXCERPT_LENGTH = 200
+WORDS_PER_MINUTE = 200
+MAX_IMAGE_URL_LENGTH = 500
+
+_WORD = re.compile(r"\w+")
+_SPACE = re.compile(r"\s+")
+_BLOCK_TAGS = {
+    "p", "div", "br", "li", "ul", "ol", "h1", "h2", "h3", "h4", "h5", "h6",
+    "blockquote", "pre", "table", "tr", "td", "th", "figure", "figcaption", "hr",
+}
+_SKIPPED_TAGS = {"script", "style", "template"}
+
+
+@dataclass
+class PostMetadata:
+    excerpt: str
+    word_count: int
+    reading_minutes: int
+    first_image_url: Optional[str]
+
+
+class _TextExtractor(HTMLParser):
+    """Collects the visible text of an HTML fragment and its first image URL."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self.first_image_url: Optional[str] = None
+        self._skipping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _SKIPPED_TAGS:
+            self._skipping += 1
+        elif tag in _BLOCK_TAGS:
+            self.parts.append(" ")
+        elif tag == "img" and self.first_image_url is None:
+            src = dict(attrs).get("src") or ""
+            # Inline data URLs don't fit the column and are moved to storage on save anyway
+            if src and not src.startswith("data:") and len(src) <= MAX_IMAGE_URL_LENGTH:
+                self.first_image_url = src
+
+    def handle_endtag(self, tag):
+        if tag in _SKIPPED_TAGS:
+            self._skipping = max(self._skipping - 1, 0)
+        elif tag in _BLOCK_TAGS:
+            self.parts.append(" ")
+
+    def handle_data(self, data):
+        if not self._skipping:
+            self.parts.append(data)
+
+
+def _extract(content: Optional[str]) -> Tuple[str, Optional[str]]:
+    parser = _TextExtractor()
+    parser.feed(content or "")
+    parser.close()
+    return _SPACE.sub(" ", "".join(parser.parts)).strip(), parser.first_image_url
+
+
+def plain_text(content: Optional[str]) -> str:
+    """The visible text of post HTML, whitespace collapsed."""
+    return _extract(content)[0]
+
+
+def make_excerpt(text: str, length: int = EXCERPT_LENGTH) -> str:
+    """Cut ``text`` to ``length`` characters at a word boundary."""
+    if len(text) <= length:
+        return text
+    cut = text[:length]
+    if not text[length].isspace() and " " in cut:
+        cut = cut.rsplit(" ", 1)[0]
+    return cut.rstrip(" ,.;:") + "..."
+
+
+def compute_post_metadata(content: Optional[str]) -> PostMetadata:
+    text, first_image_url = _extract(content)
+    word_count = len(_WORD.findall(text))
+    return PostMetadata(
+        excerpt=make_excerpt(text),
+        word_count=word_count,
+        reading_minutes=math.ceil(word_count / WORDS_PER_MINUTE),
+        first_image_url=first_image_url,
+    )
+
+
+def apply_post_metadata(post: BlogPost) -> None:
+    """Recompute the stored metadata of ``post`` from its content."""
+    metadata = compute_post_metadata(post.content)
+    post.excerpt = metadata.excerpt
+    post.word_count = metadata.word_count
+    post.reading_minutes = metadata.reading_minutes
+    post.first_image_url = metadata.first_image_url
+
+
+def backfill_post_metadata(
+    db: Session,
+    *,
+    batch_size: int = 200,
+    recompute: bool = False,
+) -> Dict[str, int]:
+    """
+    Fill in the metadata of posts saved before it was stored, ``batch_size`` rows at a time.
+
+    Only rows without a word count are touched unless ``recompute`` is set.
+    """
+    stats = {"posts": 0}
+    last_id = ""
+    while True:
+        query = db.query(BlogPost).filter(BlogPost.id > last_id)
+        if not recompute:
+            query = query.filter(BlogPost.word_count.is_(None))
+        posts = query.order_by(BlogPost.id).limit(batch_size).all()
+        if not posts:
+            break
+        for post in posts:
+            apply_post_metadata(post)
+        stats["posts"] += len(posts)
+        last_id = posts[-1].id
+        db.commit()
+        db.expunge_all()
+        logger.info("Backfilled metadata of %d posts", stats["posts"])
+    return stats
@@ -0,0 +1,86 @@
+"""
+HTTP cache validators (ETag / Last-Modified) of post details and lists.
+
+Computed from one aggregate query over the post timestamps, the author's
+``updated_at``, the likes and the ``posts``/``users`` cache versions (which
+catch edits within the same second), so a request whose cached copy is
+current is answered ``304`` without loading content or serializing
+anything. Details also cover the cover image's ingested variants.
+"""
+from __future__ import annotations
+
+from typing import Any, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Query, Session
+
+from app.core.cache import POSTS, USERS, tag_version
+from app.core.http_cache import Validators, latest, make_validators
+from app.models.blog import BlogPost, BlogPostLike
+from app.models.user import User
+from app.services.images import image_version
+
+
+def post_validators(db: Session, post_id: str, *, post_type: Optional[str] = None) -> Optional[Validators]:
+    """Validators of one post, or None if it doesn't exist. Only approved posts are publicly cacheable."""
+    likes = db.query(func.count(BlogPostLike.id)).filter(BlogPostLike.post_id == BlogPost.id)
+    liked_at = db.query(func.max(BlogPostLike.created_at)).filter(BlogPostLike.post_id == BlogPost.id)
+    query = (
+        db.query(
+            BlogPost.status,
+            BlogPost.created_at,
+            BlogPost.updated_at,
+            User.updated_at.label("author_updated_at"),
+            likes.scalar_subquery().label("likes"),
+            liked_at.scalar_subquery().label("liked_at"),
+            BlogPost.image_url,
+            tag_version(db, POSTS).label("posts_version"),
+            tag_version(db, USERS).label("users_version"),
+        )
+        .outerjoin(User, User.id == BlogPost.author_id)
+        .filter(BlogPost.id == post_id)
+    )
+    if post_type is not None:
+        query = query.filter(BlogPost.post_type == post_type)
+    row = query.first()
+    if row is None:
+        return None
+    image = image_version(db, row.image_url)
+    return make_validators(
+        "post", post_id, row.status, row.created_at, row.updated_at, row.author_updated_at, row.likes,
+        row.posts_version, row.users_version, image,
+        last_modified=latest((row.created_at, row.updated_at, row.author_updated_at, row.liked_at, image[1])),
+        public=row.status == "approved",
+    )
+
+
+def post_list_validators(db: Session, query: Query, *variant: Any, public: bool = True) -> Validators:
+    """
+    Validators of a post list: ``query`` is the filtered ``BlogPost`` query,
+    ``variant`` the parameters that shape the response (page, limit, fields).
+
+    Adding, editing or removing a matching post, editing one of their authors
+    or (un)liking one of them changes the ETag, as does any other post write.
+    """
+    posts = (
+        query.outerjoin(User, User.id == BlogPost.author_id)
+        .with_entities(
+            func.count(BlogPost.id),
+            func.max(BlogPost.created_at),
+            func.max(BlogPost.updated_at),
+            func.max(User.updated_at),
+            tag_version(db, POSTS),
+            tag_version(db, USERS),
+        )
+        .one()
+    )
+    likes = (
+        db.query(func.count(BlogPostLike.id), func.max(BlogPostLike.created_at))
+        .filter(BlogPostLike.post_id.in_(query.with_entities(BlogPost.id)))
+        .one()
+    )
+    return make_validators(
+        "posts", variant, tuple(posts), tuple(likes),
+        last_modified=latest((*posts[1:4], likes[1])),
+        public=public,
+    )
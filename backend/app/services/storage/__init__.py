@@ -0,0 +1,81 @@
+"""
+Object storage backends.
+
+``get_storage_backend()`` returns the backend selected by ``STORAGE_BACKEND``:
+Cloudflare R2 (default), the local filesystem, or process memory.
+"""
+from __future__ import annotations
+
+import threading
+from typing import Optional
+
+from app.core.config import settings
+from app.services.storage.base import (
+    DEFAULT_CHUNK_SIZE,
+    IMMUTABLE_CACHE_CONTROL,
+    ObjectWriter,
+    StorageBackend,
+    StorageError,
+    StorageObjectNotFound,
+    StorageSizeLimitError,
+    StoredObject,
+    content_key,
+)
+from app.services.storage.local import LocalStorageBackend
+from app.services.storage.memory import MemoryStorageBackend
+from app.services.storage.r2 import R2StorageService, known_objects
+
+_backend: Optional[StorageBackend] = None
+_backend_lock = threading.Lock()
+
+
+def get_storage_backend() -> StorageBackend:
+    """
+    Return the configured storage backend, created once per process.
+
+    Raises:
+        StorageError: If the backend is unknown or not configured. Failures
+            are not cached, so a later call retries.
+    """
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = _create_backend(settings.STORAGE_BACKEND)
+        return _backend
+
+
+def set_storage_backend(backend: Optional[StorageBackend]) -> None:
+    """Install a specific backend (tests, benchmarks); ``None`` resets to config."""
+    global _backend
+    with _backend_lock:
+        _backend = backend
+
+
+def _create_backend(name: str) -> StorageBackend:
+    name = (name or "r2").lower()
+    if name in ("r2", "s3"):
+        return R2StorageService()
+    if name == "local":
+        return LocalStorageBackend()
+    if name == "memory":
+        return MemoryStorageBackend()
+    raise StorageError(f"Unknown STORAGE_BACKEND: {name}")
+
+
+__all__ = [
+    "DEFAULT_CHUNK_SIZE",
+    "IMMUTABLE_CACHE_CONTROL",
+    "LocalStorageBackend",
+    "MemoryStorageBackend",
+    "ObjectWriter",
+    "R2StorageService",
+    "StorageBackend",
+    "StorageError",
+    "StorageObjectNotFound",
+    "StorageSizeLimitError",
+    "StoredObject",
+    "content_key",
+    "get_storage_backend",
+    "known_objects",
+    "set_storage_backend",
+]
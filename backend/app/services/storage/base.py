@@ -0,0 +1,351 @@
+"""
+Storage backend interface shared by the R2, local filesystem and in-memory stores.
+"""
+from __future__ import annotations
+
+import asyncio
+import functools
+import hashlib
+import logging
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional
+
+from app.core.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+# Content-addressed objects never change, so caches may keep them forever.
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class StorageError(RuntimeError):
+    """Raised when document storage fails."""
+
+
+class StorageSizeLimitError(StorageError):
+    """Raised when a streamed upload grows past its allowed size."""
+
+
+class StorageObjectNotFound(StorageError):
+    """Raised when reading or serving a key that does not exist."""
+
+
+@dataclass
+class StoredObject:
+    """Metadata for an uploaded object."""
+
+    key: str
+    url: str
+    content_type: str
+    size: int
+    checksum: Optional[str] = None  # hex SHA-256, set for streamed uploads
+
+
+def content_key(prefix: str, digest: str) -> str:
+    """Return the object key for a payload with the given SHA-256 hex digest."""
+    return f"{prefix.rstrip('/')}/{digest}"
+
+
+def random_key(prefix: str) -> str:
+    """Return a fresh random object key under ``prefix``."""
+    return f"{prefix.rstrip('/')}/{uuid.uuid4().hex}"
+
+
+class ObjectWriter(ABC):
+    """
+    Incremental writer for a single object.
+
+    Tracks size and SHA-256 as chunks arrive and enforces ``max_bytes`` before
+    any data reaches the backend; subclasses only move bytes.
+    """
+
+    def __init__(self, key: str, *, content_type: str, max_bytes: Optional[int]):
+        self.key = key
+        self.content_type = content_type
+        self._max_bytes = max_bytes
+        self._hasher = hashlib.sha256()
+        self.size = 0
+
+    def write(self, chunk: bytes) -> None:
+        """Append a chunk to the object."""
+        if not chunk:
+            return
+
+        self.size += len(chunk)
+        if self._max_bytes is not None and self.size > self._max_bytes:
+            raise StorageSizeLimitError(
+                f"Upload exceeds the maximum allowed size of {self._max_bytes} bytes"
+            )
+
+        self._hasher.update(chunk)
+        self._write(chunk)
+
+    def finish(self) -> StoredObject:
+        """Commit the object and return its metadata (without URL)."""
+        if self.size <= 0:
+            raise StorageError(f"Invalid size: {self.size} bytes")
+        self._commit()
+        return StoredObject(
+            key=self.key,
+            url="",
+            content_type=self.content_type,
+            size=self.size,
+            checksum=self._hasher.hexdigest(),
+        )
+
+    def abort(self) -> None:
+        """Discard everything written so far."""
+        self._abort()
+
+    @abstractmethod
+    def _write(self, chunk: bytes) -> None:
+        ...
+
+    @abstractmethod
+    def _commit(self) -> None:
+        ...
+
+    @abstractmethod
+    def _abort(self) -> None:
+        ...
+
+
+class StorageBackend(ABC):
+    """
+    Object store used for documents, previews and other uploads.
+
+    Backends implement a handful of primitives (``_open_writer``,
+    ``object_exists``, ``read_bytes``, ``delete``, ``url_for``); the upload
+    flow, content addressing and the async variants are shared. Blocking
+    methods are safe to call from worker threads; the ``a*`` variants run
+    them off the event loop.
+    """
+
+    name = "storage"
+
+    @abstractmethod
+    def _open_writer(
+        self,
+        key: str,
+        *,
+        content_type: str,
+        max_bytes: Optional[int],
+        cache_control: Optional[str],
+    ) -> ObjectWriter:
+        """Return a writer that stores a new object at ``key``."""
+
+    @abstractmethod
+    def object_exists(self, key: str) -> bool:
+        """Return True if ``key`` exists."""
+
+    @abstractmethod
+    def read_bytes(self, key: str) -> bytes:
+        """Return the payload stored at ``key`` or raise ``StorageObjectNotFound``."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove ``key``; missing keys are ignored."""
+
+    @abstractmethod
+    def url_for(self, key: str) -> str:
+        """Return the public URL for ``key``."""
+
+    def upload_bytes(
+        self,
+        data: bytes,
+        *,
+        content_type: str,
+        prefix: str = "documents",
+        content_addressed: Optional[bool] = None,
+        key: Optional[str] = None,
+    ) -> StoredObject:
+        """
+        Store an in-memory payload.
+
+        In content-addressed mode the key is the payload's SHA-256, and an
+        upload whose key already exists costs one hash plus one existence check.
+        An explicit ``key`` is for derived objects whose key is known before
+        the payload exists (e.g. on-demand page renders); they are immutable.
+        """
+        content_addressed = True if key else self._content_addressed(content_addressed)
+        object_key = key or random_key(prefix)
+        if content_addressed and not key:
+            digest = hashlib.sha256(data).hexdigest()
+            object_key = content_key(prefix, digest)
+            if self.object_exists(object_key):
+                logger.info("Skipping upload of existing object %s (%d bytes)", object_key, len(data))
+                return self._stored(object_key, content_type=content_type, size=len(data), checksum=digest)
+
+        writer = self._writer_for(
+            object_key, content_type=content_type, max_bytes=None, content_addressed=content_addressed
+        )
+        try:
+            writer.write(data)
+            stored = writer.finish()
+        except Exception as exc:
+            writer.abort()
+            raise self._translate_error(exc) from exc
+        return self._finalize(stored, content_addressed=content_addressed)
+
+    def upload_file(
+        self,
+        file_path: str,
+        *,
+        content_type: str,
+        prefix: str = "documents",
+        content_addressed: Optional[bool] = None,
+    ) -> StoredObject:
+        """Upload a local file path."""
+        return self.upload_path(
+            file_path, content_type=content_type, prefix=prefix, content_addressed=content_addressed
+        )
+
+    def upload_path(
+        self,
+        file_path: str,
+        *,
+        content_type: str,
+        prefix: str = "documents",
+        max_bytes: Optional[int] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        content_addressed: Optional[bool] = None,
+    ) -> StoredObject:
+        """
+        Stream a local file without loading it into memory.
+
+        In content-addressed mode the file is hashed in a first local pass so
+        the key is known before anything is written.
+        """
+        content_addressed = self._content_addressed(content_addressed)
+        object_key = random_key(prefix)
+        if content_addressed:
+            size, digest = _hash_file(file_path, chunk_size)
+            # Checked before the existence shortcut: a known payload doesn't lift the limit
+            if max_bytes is not None and size > max_bytes:
+                raise StorageSizeLimitError(f"Upload exceeds the maximum allowed size of {max_bytes} bytes")
+            object_key = content_key(prefix, digest)
+            if self.object_exists(object_key):
+                logger.info("Skipping upload of existing object %s (%d bytes)", object_key, size)
+                return self._stored(object_key, content_type=content_type, size=size, checksum=digest)
+
+        writer = self._writer_for(
+            object_key, content_type=content_type, max_bytes=max_bytes, content_addressed=content_addressed
+        )
+        try:
+            with open(file_path, "rb") as file_obj:
+                for chunk in iter(lambda: file_obj.read(chunk_size), b""):
+                    writer.write(chunk)
+            stored = writer.finish()
+        except Exception as exc:
+            writer.abort()
+            raise self._translate_error(exc) from exc
+        return self._finalize(stored, content_addressed=content_addressed)
+
+    async def upload_chunks(
+        self,
+        chunks: AsyncIterator[bytes],
+        *,
+        content_type: str,
+        prefix: str = "documents",
+        max_bytes: Optional[int] = None,
+    ) -> StoredObject:
+        """
+        Stream an async chunk iterator.
+
+        The size limit is enforced while streaming, so an oversized upload is
+        rejected (and any partial object discarded) as soon as it crosses
+        ``max_bytes``. Blocking writes run in worker threads. Keys are always
+        random here: the digest is only known once the stream ends.
+
+        Raises:
+            StorageSizeLimitError: If the stream exceeds ``max_bytes``
+            StorageError: If the upload fails for any other reason
+        """
+        writer = self._writer_for(
+            random_key(prefix), content_type=content_type, max_bytes=max_bytes, content_addressed=False
+        )
+        try:
+            async for chunk in chunks:
+                await asyncio.to_thread(writer.write, chunk)
+            stored = await asyncio.to_thread(writer.finish)
+        except asyncio.CancelledError:
+            # Aborting a multipart upload is a network call; keep it off the loop and finish it regardless
+            await asyncio.shield(asyncio.to_thread(writer.abort))
+            raise
+        except Exception as exc:
+            await asyncio.to_thread(writer.abort)
+            raise self._translate_error(exc) from exc
+        return self._finalize(stored, content_addressed=False)
+
+    async def aupload_bytes(self, data: bytes, **kwargs) -> StoredObject:
+        """Async variant of :meth:`upload_bytes`."""
+        return await asyncio.to_thread(functools.partial(self.upload_bytes, data, **kwargs))
+
+    async def aupload_path(self, file_path: str, **kwargs) -> StoredObject:
+        """Async variant of :meth:`upload_path`."""
+        return await asyncio.to_thread(functools.partial(self.upload_path, file_path, **kwargs))
+
+    async def aobject_exists(self, key: str) -> bool:
+        """Async variant of :meth:`object_exists`."""
+        return await asyncio.to_thread(self.object_exists, key)
+
+    async def aread_bytes(self, key: str) -> bytes:
+        """Async variant of :meth:`read_bytes`."""
+        return await asyncio.to_thread(self.read_bytes, key)
+
+    async def adelete(self, key: str) -> None:
+        """Async variant of :meth:`delete`."""
+        await asyncio.to_thread(self.delete, key)
+
+    def _content_addressed(self, override: Optional[bool]) -> bool:
+        return settings.STORAGE_CONTENT_ADDRESSED_KEYS if override is None else override
+
+    def _writer_for(
+        self, key: str, *, content_type: str, max_bytes: Optional[int], content_addressed: bool
+    ) -> ObjectWriter:
+        return self._open_writer(
+            key,
+            content_type=content_type,
+            max_bytes=max_bytes,
+            cache_control=IMMUTABLE_CACHE_CONTROL if content_addressed else None,
+        )
+
+    def _finalize(self, stored: StoredObject, *, content_addressed: bool) -> StoredObject:
+        stored.url = self.url_for(stored.key)
+        if content_addressed:
+            self._mark_exists(stored.key)
+        logger.info("Stored %s via %s (%d bytes, sha256=%s)", stored.key, self.name, stored.size, stored.checksum)
+        return stored
+
+    def _mark_exists(self, key: str) -> None:
+        """Hook for backends that cache existence checks."""
+
+    def _translate_error(self, exc: Exception) -> StorageError:
+        if isinstance(exc, StorageError):
+            return exc
+        logger.error("Error storing object via %s: %s", self.name, exc)
+        return StorageError(f"Failed to upload document to storage: {str(exc)}")
+
+    def _stored(self, key: str, *, content_type: str, size: int, checksum: Optional[str]) -> StoredObject:
+        return StoredObject(
+            key=key,
+            url=self.url_for(key),
+            content_type=content_type,
+            size=size,
+            checksum=checksum,
+        )
+
+
+def _hash_file(file_path: str, chunk_size: int) -> tuple[int, str]:
+    """Return ``(size, sha256 hex digest)`` of a local file, read in chunks."""
+    hasher = hashlib.sha256()
+    size = 0
+    with open(file_path, "rb") as file_obj:
+        for chunk in iter(lambda: file_obj.read(chunk_size), b""):
+            hasher.update(chunk)
+            size += len(chunk)
+    return size, hasher.hexdigest()
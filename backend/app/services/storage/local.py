@@ -0,0 +1,230 @@
+"""
+Local filesystem storage backend.
+
+Objects live under ``LOCAL_STORAGE_DIR`` (``public/uploads`` by default) and are
+served by the app itself at ``LOCAL_STORAGE_BASE_URL`` with byte-range support,
+so single-node deployments need no object store at all.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import mimetypes
+import os
+import re
+import tempfile
+from typing import Dict, Optional, Tuple
+
+import anyio
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+from app.core.config import settings
+from app.services.storage.base import ObjectWriter, StorageBackend, StorageError, StorageObjectNotFound
+
+
+logger = logging.getLogger(__name__)
+
+_META_SUFFIX = ".meta.json"
+_RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class _LocalWriter(ObjectWriter):
+    """Write to a temp file beside the target, then atomically rename it into place."""
+
+    def __init__(self, path: str, key: str, *, content_type: str, max_bytes: Optional[int],
+                 cache_control: Optional[str]):
+        super().__init__(key, content_type=content_type, max_bytes=max_bytes)
+        self._path = path
+        self._cache_control = cache_control
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._tmp = tempfile.NamedTemporaryFile(dir=os.path.dirname(path), prefix=".upload-", delete=False)
+
+    def _write(self, chunk: bytes) -> None:
+        self._tmp.write(chunk)
+
+    def _commit(self) -> None:
+        self._tmp.close()
+        os.replace(self._tmp.name, self._path)
+        with open(self._path + _META_SUFFIX, "w", encoding="utf-8") as meta:
+            json.dump({"content_type": self.content_type, "cache_control": self._cache_control}, meta)
+
+    def _abort(self) -> None:
+        self._tmp.close()
+        try:
+            os.remove(self._tmp.name)
+        except FileNotFoundError:
+            pass
+
+
+class RangeFileResponse(Response):
+    """
+    Serve a file, or a single byte range of it.
+
+    Uses the ASGI zero-copy send extension (sendfile) when the server offers
+    it and falls back to chunked reads otherwise.
+    """
+
+    chunk_size = 64 * 1024
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        start: int,
+        length: int,
+        status_code: int,
+        headers: Dict[str, str],
+        media_type: str,
+        head: bool = False,
+    ):
+        super().__init__(content=None, status_code=status_code, headers=headers, media_type=media_type)
+        self.path = path
+        self.start = start
+        self.length = length
+        self.head = head
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if self.head or self.length == 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        if "http.response.zerocopysend" in scope.get("extensions", {}):
+            with await asyncio.to_thread(open, self.path, "rb") as file_obj:
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": file_obj,
+                    "offset": self.start,
+                    "count": self.length,
+                    "more_body": False,
+                })
+            return
+
+        async with await anyio.open_file(self.path, mode="rb") as file_obj:
+            await file_obj.seek(self.start)
+            remaining = self.length
+            while remaining > 0:
+                chunk = await file_obj.read(min(self.chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining > 0:
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+def parse_range(range_header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single ``bytes=`` range into inclusive ``(start, end)``.
+
+    Returns None when the whole file should be sent (no header, or a
+    multi-range request we choose not to honour). Raises ``ValueError`` for
+    unsatisfiable ranges.
+    """
+    if not range_header or "," in range_header:
+        return None
+    match = _RANGE_PATTERN.match(range_header.strip())
+    if not match:
+        return None
+
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        suffix = int(last)
+        if suffix == 0:
+            raise ValueError("Empty suffix range")
+        return max(size - suffix, 0), size - 1
+
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size or end < start:
+        raise ValueError("Unsatisfiable range")
+    return start, min(end, size - 1)
+
+
+class LocalStorageBackend(StorageBackend):
+    """Stores objects as files; metadata lives in a ``.meta.json`` sidecar."""
+
+    name = "local"
+
+    def __init__(self, root: Optional[str] = None, base_url: Optional[str] = None):
+        self._root = os.path.abspath(root or settings.LOCAL_STORAGE_DIR)
+        self._base_url = (base_url if base_url is not None else settings.LOCAL_STORAGE_BASE_URL).rstrip("/")
+        try:
+            os.makedirs(self._root, exist_ok=True)
+        except OSError as exc:
+            raise StorageError(f"Local storage directory is not writable: {self._root}") from exc
+
+    def object_exists(self, key: str) -> bool:
+        return os.path.isfile(self._path(key))
+
+    def read_bytes(self, key: str) -> bytes:
+        try:
+            with open(self._path(key), "rb") as file_obj:
+                return file_obj.read()
+        except FileNotFoundError as exc:
+            raise StorageObjectNotFound(f"Object not found: {key}") from exc
+
+    def delete(self, key: str) -> None:
+        path = self._path(key)
+        for candidate in (path, path + _META_SUFFIX):
+            try:
+                os.remove(candidate)
+            except FileNotFoundError:
+                pass
+
+    def url_for(self, key: str) -> str:
+        return f"{self._base_url}/{key}"
+
+    def serve(self, key: str, range_header: Optional[str] = None, *, head: bool = False) -> Response:
+        """Build a (possibly partial) file response for ``key``."""
+        path = self._path(key)
+        if key.endswith(_META_SUFFIX) or not os.path.isfile(path):
+            raise StorageObjectNotFound(f"Object not found: {key}")
+
+        size = os.path.getsize(path)
+        content_type, cache_control = self._metadata(path)
+        headers = {"Accept-Ranges": "bytes"}
+        if cache_control:
+            headers["Cache-Control"] = cache_control
+
+        try:
+            byte_range = parse_range(range_header, size)
+        except ValueError:
+            return Response(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+
+        if byte_range is None:
+            headers["Content-Length"] = str(size)
+            return RangeFileResponse(path, start=0, length=size, status_code=200,
+                                     headers=headers, media_type=content_type, head=head)
+
+        start, end = byte_range
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        headers["Content-Length"] = str(end - start + 1)
+        return RangeFileResponse(path, start=start, length=end - start + 1, status_code=206,
+                                 headers=headers, media_type=content_type, head=head)
+
+    def _open_writer(self, key: str, *, content_type: str, max_bytes: Optional[int],
+                     cache_control: Optional[str]) -> ObjectWriter:
+        return _LocalWriter(self._path(key), key, content_type=content_type, max_bytes=max_bytes,
+                            cache_control=cache_control)
+
+    def _path(self, key: str) -> str:
+        path = os.path.normpath(os.path.join(self._root, key))
+        if not path.startswith(self._root + os.sep):
+            raise StorageObjectNotFound(f"Invalid object key: {key}")
+        return path
+
+    def _metadata(self, path: str) -> Tuple[str, Optional[str]]:
+        try:
+            with open(path + _META_SUFFIX, encoding="utf-8") as meta:
+                data = json.load(meta)
+            return data.get("content_type") or "application/octet-stream", data.get("cache_control")
+        except (FileNotFoundError, ValueError):
+            # Files written before the backend existed have no sidecar.
+            guessed, _ = mimetypes.guess_type(path)
+            return guessed or "application/octet-stream", None
@@ -0,0 +1,97 @@
+"""
+In-memory storage backend for tests, benchmarks and throwaway dev servers.
+"""
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from starlette.responses import Response
+
+from app.core.config import settings
+from app.services.storage.base import ObjectWriter, StorageBackend, StorageObjectNotFound
+
+
+@dataclass
+class _MemoryObject:
+    data: bytes
+    content_type: str
+    cache_control: Optional[str]
+
+
+class _MemoryWriter(ObjectWriter):
+    def __init__(self, backend: "MemoryStorageBackend", key: str, *, content_type: str,
+                 max_bytes: Optional[int], cache_control: Optional[str]):
+        super().__init__(key, content_type=content_type, max_bytes=max_bytes)
+        self._backend = backend
+        self._cache_control = cache_control
+        self._buffer = bytearray()
+
+    def _write(self, chunk: bytes) -> None:
+        self._buffer += chunk
+
+    def _commit(self) -> None:
+        self._backend._put(self.key, _MemoryObject(bytes(self._buffer), self.content_type, self._cache_control))
+        self._buffer = bytearray()
+
+    def _abort(self) -> None:
+        self._buffer = bytearray()
+
+
+class MemoryStorageBackend(StorageBackend):
+    """Keeps objects in a process-local dict; nothing survives a restart."""
+
+    name = "memory"
+
+    def __init__(self, base_url: Optional[str] = None):
+        self._objects: Dict[str, _MemoryObject] = {}
+        self._lock = threading.Lock()
+        self._base_url = (base_url if base_url is not None else settings.LOCAL_STORAGE_BASE_URL).rstrip("/")
+
+    def object_exists(self, key: str) -> bool:
+        with self._lock:
+            return key in self._objects
+
+    def read_bytes(self, key: str) -> bytes:
+        return self._get(key).data
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._objects.pop(key, None)
+
+    def url_for(self, key: str) -> str:
+        return f"{self._base_url}/{key}"
+
+    def clear(self) -> None:
+        """Drop every stored object."""
+        with self._lock:
+            self._objects.clear()
+
+    def serve(self, key: str, range_header: Optional[str] = None, *, head: bool = False) -> Response:
+        """Build a response for ``key``; ranges are not needed for in-memory objects."""
+        stored = self._get(key)
+        headers = {"Content-Length": str(len(stored.data))}
+        if stored.cache_control:
+            headers["Cache-Control"] = stored.cache_control
+        return Response(
+            content=b"" if head else stored.data,
+            media_type=stored.content_type,
+            headers=headers,
+        )
+
+    def _open_writer(self, key: str, *, content_type: str, max_bytes: Optional[int],
+                     cache_control: Optional[str]) -> ObjectWriter:
+        return _MemoryWriter(self, key, content_type=content_type, max_bytes=max_bytes,
+                             cache_control=cache_control)
+
+    def _put(self, key: str, stored: _MemoryObject) -> None:
+        with self._lock:
+            self._objects[key] = stored
+
+    def _get(self, key: str) -> _MemoryObject:
+        with self._lock:
+            stored = self._objects.get(key)
+        if stored is None:
+            raise StorageObjectNotFound(f"Object not found: {key}")
+        return stored
@@ -0,0 +1,329 @@
+"""
+Cloudflare R2 storage service helpers.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Dict, List, Optional
+
+import boto3
+from botocore.client import BaseClient
+from botocore.config import Config
+from botocore.exceptions import BotoCoreError, ClientError
+
+from app.core.config import settings
+from app.services.storage.base import (
+    ObjectWriter,
+    StorageBackend,
+    StorageError,
+    StorageObjectNotFound,
+)
+
+
+logger = logging.getLogger(__name__)
+
+# S3/R2 reject multipart parts smaller than 5MB (except the last one).
+MIN_PART_SIZE = 5 * 1024 * 1024
+KNOWN_OBJECTS_MAX_ENTRIES = 10_000
+_MISSING_KEY_CODES = ("404", "NoSuchKey", "NotFound")
+
+
+class _KnownObjectCache:
+    """
+    Bounded, process-wide record of content-addressed keys known to exist.
+
+    Storage services are created per request, so the cache lives at module
+    level; a hit lets a repeat upload skip even the HEAD request.
+    """
+
+    def __init__(self, max_entries: int = KNOWN_OBJECTS_MAX_ENTRIES):
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return True
+            return False
+
+    def add(self, key: str) -> None:
+        with self._lock:
+            self._entries[key] = None
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+known_objects = _KnownObjectCache()
+
+
+class _StreamingUpload(ObjectWriter):
+    """
+    Incrementally upload chunks to a single object key.
+
+    Small payloads are sent with one ``put_object`` call. As soon as a full part
+    is buffered the upload switches to S3 multipart and parts are sent in
+    parallel. Peak memory is bounded by ``part_size * (concurrency + 1)``: the
+    part being filled plus at most ``concurrency`` parts in flight.
+    """
+
+    def __init__(
+        self,
+        client: BaseClient,
+        bucket: str,
+        key: str,
+        *,
+        content_type: str,
+        part_size: int,
+        concurrency: int,
+        max_bytes: Optional[int],
+        cache_control: Optional[str] = None,
+    ):
+        super().__init__(key, content_type=content_type, max_bytes=max_bytes)
+        self._client = client
+        self._bucket = bucket
+        self._object_args: Dict[str, str] = {"ContentType": content_type}
+        if cache_control:
+            self._object_args["CacheControl"] = cache_control
+        self._part_size = max(part_size, MIN_PART_SIZE)
+        self._concurrency = max(concurrency, 1)
+
+        self._buffer = bytearray()
+        self._upload_id: Optional[str] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: List[Future] = []
+        self._parts: List[Dict[str, object]] = []
+        self._next_part_number = 1
+
+    def _write(self, chunk: bytes) -> None:
+        self._buffer += chunk
+        while len(self._buffer) >= self._part_size:
+            part = bytes(self._buffer[: self._part_size])
+            del self._buffer[: self._part_size]
+            self._submit_part(part)
+
+    def _commit(self) -> None:
+        if self._upload_id is None:
+            self._client.put_object(
+                Bucket=self._bucket,
+                Key=self.key,
+                Body=bytes(self._buffer),
+                **self._object_args,
+            )
+        else:
+            if self._buffer:
+                self._submit_part(bytes(self._buffer))
+            self._collect(wait(self._pending).done)
+            self._parts.sort(key=lambda part: part["PartNumber"])
+            self._client.complete_multipart_upload(
+                Bucket=self._bucket,
+                Key=self.key,
+                UploadId=self._upload_id,
+                MultipartUpload={"Parts": self._parts},
+            )
+            logger.debug("Completed multipart upload %s (%d parts)", self.key, len(self._parts))
+
+        self._buffer = bytearray()
+        self._shutdown()
+
+    def _abort(self) -> None:
+        """Cancel in-flight parts and discard a started multipart upload."""
+        self._buffer = bytearray()
+        if self._upload_id is not None:
+            for future in self._pending:
+                future.cancel()
+            wait(self._pending)
+            try:
+                self._client.abort_multipart_upload(
+                    Bucket=self._bucket, Key=self.key, UploadId=self._upload_id
+                )
+            except (ClientError, BotoCoreError) as exc:
+                logger.warning("Failed to abort multipart upload %s: %s", self.key, exc)
+        self._shutdown()
+
+    def _submit_part(self, data: bytes) -> None:
+        if self._upload_id is None:
+            response = self._client.create_multipart_upload(
+                Bucket=self._bucket, Key=self.key, **self._object_args
+            )
+            self._upload_id = response["UploadId"]
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._concurrency, thread_name_prefix="r2-part"
+            )
+
+        # Back-pressure: wait for a slot so buffered parts never pile up.
+        while len(self._pending) >= self._concurrency:
+            self._collect(wait(self._pending, return_when=FIRST_COMPLETED).done)
+
+        part_number = self._next_part_number
+        self._next_part_number += 1
+        self._pending.append(self._executor.submit(self._upload_part, part_number, data))
+
+    def _upload_part(self, part_number: int, data: bytes) -> Dict[str, object]:
+        response = self._client.upload_part(
+            Bucket=self._bucket,
+            Key=self.key,
+            UploadId=self._upload_id,
+            PartNumber=part_number,
+            Body=data,
+        )
+        return {"PartNumber": part_number, "ETag": response["ETag"]}
+
+    def _collect(self, done) -> None:
+        for future in done:
+            self._pending.remove(future)
+            self._parts.append(future.result())
+
+    def _shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+def _default_endpoint() -> Optional[str]:
+    if settings.CLOUDFLARE_R2_ACCOUNT_ID:
+        return f"https://{settings.CLOUDFLARE_R2_ACCOUNT_ID}.r2.cloudflarestorage.com"
+    return None
+
+
+class R2StorageService(StorageBackend):
+    """Upload helper that wraps the S3-compatible R2 API."""
+
+    name = "cloudflare-r2"
+
+    def __init__(self, client: Optional[BaseClient] = None):
+        bucket = settings.CLOUDFLARE_R2_BUCKET
+
+        if not bucket:
+            raise StorageError("CLOUDFLARE_R2_BUCKET is not configured")
+
+        endpoint_url = settings.CLOUDFLARE_R2_ENDPOINT or _default_endpoint()
+        if not endpoint_url:
+            raise StorageError("R2 endpoint is not configured")
+
+        access_key = settings.CLOUDFLARE_R2_ACCESS_KEY_ID
+        secret_key = settings.CLOUDFLARE_R2_SECRET_ACCESS_KEY
+
+        if not client:
+            if not access_key or not secret_key:
+                raise StorageError("R2 credentials are not configured")
+
+            session = boto3.session.Session()
+            client = session.client(
+                "s3",
+                region_name=os.getenv("CLOUDFLARE_R2_REGION", "auto"),
+                endpoint_url=endpoint_url,
+                aws_access_key_id=access_key,
+                aws_secret_access_key=secret_key,
+                config=Config(signature_version="s3v4"),
+            )
+
+        self._client = client
+        self._bucket = bucket
+        self._public_base_url = (settings.CLOUDFLARE_R2_PUBLIC_DOMAIN or f"{endpoint_url}/{bucket}").rstrip("/")
+
+    def object_exists(self, key: str) -> bool:
+        """Return True if ``key`` exists, consulting the local cache before a HEAD request."""
+        cache_key = self._cache_key(key)
+        if cache_key in known_objects:
+            return True
+        try:
+            self._client.head_object(Bucket=self._bucket, Key=key)
+        except ClientError as exc:
+            error_code = str(exc.response.get("Error", {}).get("Code", ""))
+            if error_code not in _MISSING_KEY_CODES:
+                logger.warning("HEAD failed for %s (code=%s); uploading anyway", key, error_code)
+            return False
+        except BotoCoreError as exc:
+            logger.warning("HEAD failed for %s: %s; uploading anyway", key, exc)
+            return False
+        known_objects.add(cache_key)
+        return True
+
+    def read_bytes(self, key: str) -> bytes:
+        """Download an object's payload."""
+        try:
+            response = self._client.get_object(Bucket=self._bucket, Key=key)
+            return response["Body"].read()
+        except ClientError as exc:
+            error_code = str(exc.response.get("Error", {}).get("Code", ""))
+            if error_code in _MISSING_KEY_CODES:
+                raise StorageObjectNotFound(f"Object not found: {key}") from exc
+            logger.exception("Failed to download %s from R2", key)
+            raise StorageError(f"Failed to read document from storage: {error_code}") from exc
+        except BotoCoreError as exc:
+            logger.exception("Failed to download %s from R2", key)
+            raise StorageError(f"Failed to read document from storage: {str(exc)}") from exc
+
+    def delete(self, key: str) -> None:
+        """Delete an object; S3 treats missing keys as success."""
+        try:
+            self._client.delete_object(Bucket=self._bucket, Key=key)
+        except (ClientError, BotoCoreError) as exc:
+            logger.exception("Failed to delete %s from R2", key)
+            raise StorageError(f"Failed to delete document from storage: {str(exc)}") from exc
+        known_objects.discard(self._cache_key(key))
+
+    def url_for(self, key: str) -> str:
+        return f"{self._public_base_url}/{key}"
+
+    def _open_writer(
+        self,
+        key: str,
+        *,
+        content_type: str,
+        max_bytes: Optional[int],
+        cache_control: Optional[str],
+    ) -> ObjectWriter:
+        return _StreamingUpload(
+            self._client,
+            self._bucket,
+            key,
+            content_type=content_type,
+            part_size=settings.R2_MULTIPART_PART_SIZE,
+            concurrency=settings.R2_MULTIPART_CONCURRENCY,
+            max_bytes=max_bytes,
+            cache_control=cache_control,
+        )
+
+    def _mark_exists(self, key: str) -> None:
+        known_objects.add(self._cache_key(key))
+
+    def _cache_key(self, key: str) -> str:
+        return f"{self._bucket}/{key}"
+
+    def _translate_error(self, exc: Exception) -> StorageError:
+        if isinstance(exc, ClientError):
+            error_code = exc.response.get("Error", {}).get("Code", "Unknown")
+            error_message = exc.response.get("Error", {}).get("Message", str(exc))
+            logger.error("AWS ClientError during streamed upload (code=%s): %s", error_code, error_message)
+            return StorageError(f"Failed to upload document to storage: {error_code} - {error_message}")
+        return super()._translate_error(exc)
+
+    def generate_presigned_url(self, key: str, expires_in: int = 3600) -> str:
+        """Return a signed URL for private objects."""
+        try:
+            return self._client.generate_presigned_url(
+                "get_object",
+                Params={"Bucket": self._bucket, "Key": key},
+                ExpiresIn=expires_in,
+            )
+        except (ClientError, BotoCoreError) as exc:
+            logger.exception("Failed to generate presigned URL for %s", key)
+            raise StorageError("Failed to generate download URL") from exc
+
+
@@ -0,0 +1,23 @@
+"""User helpers shared by the auth endpoints and maintenance scripts."""
+
+from app.services.users.avatars import (
+    AVATAR_SIZES,
+    MAX_AVATAR_BYTES,
+    InvalidAvatar,
+    is_inline_avatar,
+    migrate_avatars,
+    prepare_avatar,
+    resize_avatar,
+    store_avatar,
+)
+
+__all__ = [
+    "AVATAR_SIZES",
+    "MAX_AVATAR_BYTES",
+    "InvalidAvatar",
+    "is_inline_avatar",
+    "migrate_avatars",
+    "prepare_avatar",
+    "resize_avatar",
+    "store_avatar",
+]
@@ -0,0 +1,182 @@
+"""
+Avatar images in object storage.
+
+Avatars used to be stored in ``users.avatar`` as base64 data URLs, which made
+every ``User`` row (and every post's ``author_avatar``) carry the whole image.
+Uploaded avatars are now cropped to a square, resized to ``AVATAR_SIZES`` and
+stored as WebP under ``avatars/{sha256}/{size}.webp``; the user row keeps only
+the URL of the largest size. Smaller sizes sit next to it, so a client can
+swap the file name for ``64.webp`` or ``128.webp``.
+"""
+from __future__ import annotations
+
+import asyncio
+import base64
+import binascii
+import hashlib
+import io
+import logging
+import re
+from typing import Dict, Optional
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+from sqlalchemy.orm import Session
+
+from app.models.user import User
+from app.services.storage import StorageBackend, StorageError, get_storage_backend
+
+
+logger = logging.getLogger(__name__)
+
+AVATAR_PREFIX = "avatars"
+AVATAR_SIZES = (64, 128, 256)
+AVATAR_QUALITY = 85
+MAX_AVATAR_BYTES = 5 * 1024 * 1024
+MAX_AVATAR_PIXELS = 40_000_000
+
+_DATA_URL = re.compile(r"^data:image/[\w.+-]+;base64,(?P<data>.*)$", re.IGNORECASE | re.DOTALL)
+
+
+class InvalidAvatar(ValueError):
+    """Raised when avatar data is not a readable image."""
+
+
+def is_inline_avatar(value: Optional[str]) -> bool:
+    return bool(value) and value[:11].lower() == "data:image/"
+
+
+def decode_data_url(value: str) -> bytes:
+    match = _DATA_URL.match(value)
+    if not match:
+        raise InvalidAvatar("Not an image data URL")
+    try:
+        return base64.b64decode("".join(match.group("data").split()), validate=True)
+    except (binascii.Error, ValueError) as exc:
+        raise InvalidAvatar("Avatar is not valid base64") from exc
+
+
+def resize_avatar(data: bytes) -> Dict[int, bytes]:
+    """
+    Crop ``data`` to a centred square and encode it at every ``AVATAR_SIZES`` width.
+
+    Raises:
+        InvalidAvatar: If ``data`` is not an image Pillow can read
+    """
+    if len(data) > MAX_AVATAR_BYTES:
+        raise InvalidAvatar(f"Avatar is too large ({len(data)} bytes)")
+    try:
+        with Image.open(io.BytesIO(data)) as source:
+            if source.width * source.height > MAX_AVATAR_PIXELS:
+                raise InvalidAvatar("Avatar dimensions are too large")
+            image = ImageOps.exif_transpose(source)
+            image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as exc:
+        raise InvalidAvatar("Avatar is not a readable image") from exc
+
+    side = min(image.size)
+    square = ImageOps.fit(image, (side, side), method=Image.LANCZOS)
+    renditions = {}
+    for size in AVATAR_SIZES:
+        buffer = io.BytesIO()
+        resized = square if side <= size else square.resize((size, size), Image.LANCZOS)
+        resized.save(buffer, format="WEBP", quality=AVATAR_QUALITY, method=4)
+        renditions[size] = buffer.getvalue()
+    return renditions
+
+
+def avatar_key(digest: str, size: int) -> str:
+    return f"{AVATAR_PREFIX}/{digest}/{size}.webp"
+
+
+def store_avatar(storage: StorageBackend, data: bytes) -> str:
+    """
+    Resize and store an avatar; returns the URL to save on the user.
+
+    Keys derive from the source image's hash, so re-uploading the same image
+    reuses the stored renditions. Blocking: run it in a worker thread.
+
+    Raises:
+        InvalidAvatar: If ``data`` is not a readable image
+        StorageError: If an upload fails
+    """
+    digest = hashlib.sha256(data).hexdigest()
+    largest = avatar_key(digest, AVATAR_SIZES[-1])
+    if storage.object_exists(largest):
+        return storage.url_for(largest)
+
+    url = ""
+    # Largest last: its presence marks the set as complete
+    for size, image in resize_avatar(data).items():
+        url = storage.upload_bytes(image, content_type="image/webp", key=avatar_key(digest, size)).url
+    return url
+
+
+async def prepare_avatar(value: Optional[str]) -> Optional[str]:
+    """
+    Process an avatar value before it is saved: data URLs are moved to storage.
+
+    URLs are kept as they are. Without storage the data URL is kept.
+
+    Raises:
+        InvalidAvatar: If a data URL does not hold a readable image
+    """
+    if not is_inline_avatar(value):
+        return value
+    data = decode_data_url(value)
+    try:
+        storage = get_storage_backend()
+        return await asyncio.to_thread(store_avatar, storage, data)
+    except StorageError as exc:
+        logger.warning("Storage unavailable; keeping inline avatar: %s", exc)
+        return value
+
+
+def migrate_avatars(
+    db: Session,
+    storage: Optional[StorageBackend],
+    *,
+    batch_size: int = 100,
+    dry_run: bool = False,
+) -> Dict[str, int]:
+    """
+    Move base64 avatars of existing users to storage, ``batch_size`` rows at a time.
+
+    Unreadable avatars are counted as ``failed`` and left untouched.
+    ``dry_run`` only validates the images: nothing is uploaded or written.
+    """
+    stats = {"users": 0, "updated": 0, "failed": 0, "bytes_saved": 0}
+    last_id = ""
+    while True:
+        users = (
+            db.query(User)
+            .filter(User.avatar.like("data:image/%"), User.id > last_id)
+            .order_by(User.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not users:
+            break
+        for user in users:
+            stats["users"] += 1
+            try:
+                data = decode_data_url(user.avatar)
+                if dry_run:
+                    resize_avatar(data)
+                    url = avatar_key(hashlib.sha256(data).hexdigest(), AVATAR_SIZES[-1])
+                else:
+                    url = store_avatar(storage, data)
+            except (InvalidAvatar, StorageError) as exc:
+                stats["failed"] += 1
+                logger.warning("Could not migrate avatar of user %s: %s", user.id, exc)
+                continue
+            stats["updated"] += 1
+            stats["bytes_saved"] += len(user.avatar) - len(url)
+            if not dry_run:
+                user.avatar = url
+        last_id = users[-1].id
+        if dry_run:
+            db.rollback()
+        else:
+            db.commit()
+        db.expunge_all()
+    return stats
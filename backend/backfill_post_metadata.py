@@ -0,0 +1,46 @@
+"""
+Backfill post reading metadata
+
+Computes the excerpt, word count, reading time and first image URL of posts
+saved before these were stored on write.
+
+Usage:
+    python backend/backfill_post_metadata.py [--batch-size 200] [--recompute]
+"""
+import argparse
+import os
+import sys
+import logging
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.database import SessionLocal
+from app.services.posts import backfill_post_metadata
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def run(batch_size: int = 200, recompute: bool = False):
+    """Backfill every post without metadata (or all posts with --recompute)"""
+    db = SessionLocal()
+    try:
+        stats = backfill_post_metadata(db, batch_size=batch_size, recompute=recompute)
+        logger.info(f"✅ Updated metadata of {stats['posts']} posts")
+        return True
+    except Exception as e:
+        logger.error(f"❌ Backfill failed: {e}")
+        db.rollback()
+        return False
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill post excerpts and reading metadata")
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--recompute", action="store_true", help="Recompute posts that already have metadata")
+    args = parser.parse_args()
+    success = run(batch_size=args.batch_size, recompute=args.recompute)
+    sys.exit(0 if success else 1)
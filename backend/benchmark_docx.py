@@ -0,0 +1,106 @@
+"""
+Benchmark DOCX to HTML conversion on a generated ~300-page document.
+
+Compares the previous paragraph-only converter (string concatenation, one
+list per item, no tables or images) with the current converter.
+
+Usage:
+    python backend/benchmark_docx.py [--pages 300] [--repeat 3]
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from docx import Document
+from PIL import Image
+
+from app.services.documents import docx_to_html, open_docx
+from app.services.storage import MemoryStorageBackend
+
+
+def build_docx(pages: int) -> bytes:
+    """Build a document of roughly ``pages`` pages: text, lists, a table and images."""
+    image = io.BytesIO()
+    Image.new("RGB", (320, 180), "steelblue").save(image, format="PNG")
+
+    doc = Document()
+    for page in range(1, pages + 1):
+        doc.add_heading(f"Section {page}", level=2)
+        for paragraph in range(6):
+            doc.add_paragraph(f"Paragraph {paragraph} of section {page}. " * 8)
+        for item in range(4):
+            doc.add_paragraph(f"Checkpoint {item}", style="List Bullet")
+        if page % 5 == 0:
+            table = doc.add_table(rows=4, cols=3)
+            for row in table.rows:
+                for cell in row.cells:
+                    cell.text = f"km {page}"
+        if page % 20 == 0:
+            image.seek(0)
+            doc.add_picture(image)
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def legacy_docx_to_html(doc):
+    """The converter before grouping lists and handling tables/images."""
+    content_html = ""
+    text_html = ""
+    for para in doc.paragraphs:
+        text = para.text.strip()
+        if not text:
+            continue
+        style_name = para.style.name
+        tag = "p"
+        if style_name.startswith('Heading 1'): tag = "h1"
+        elif style_name.startswith('Heading 2'): tag = "h2"
+        elif style_name.startswith('Heading 3'): tag = "h3"
+        elif style_name.startswith('List Bullet'):
+            content_html += f"<ul><li>{text}</li></ul>"
+            continue
+        elif style_name.startswith('List Number'):
+            content_html += f"<ol><li>{text}</li></ol>"
+            continue
+        content_html += f"<{tag}>{text}</{tag}>"
+        text_html += f"<{tag}>{text}</{tag}>"
+    return content_html, text_html
+
+
+def best_of(repeat: int, func, *args, **kwargs):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func(*args, **kwargs)
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    data = build_docx(args.pages)
+    doc = open_docx(data)
+    print(f"Document: {args.pages} pages, {len(data) / 1024:.0f} KB, {len(doc.paragraphs)} paragraphs")
+
+    legacy_time, (legacy_html, _) = best_of(args.repeat, legacy_docx_to_html, doc)
+    storage = MemoryStorageBackend()
+    current_time, (current_html, _) = best_of(args.repeat, docx_to_html, doc, storage=storage)
+
+    print(f"legacy : {legacy_time * 1000:8.1f} ms  {len(legacy_html) / 1024:8.0f} KB HTML  "
+          f"{legacy_html.count('<ul>')} lists, 0 tables, 0 images")
+    print(f"current: {current_time * 1000:8.1f} ms  {len(current_html) / 1024:8.0f} KB HTML  "
+          f"{current_html.count('<ul>')} lists, {current_html.count('<table')} tables, "
+          f"{current_html.count('<img')} images")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+Benchmark serializing 1,000 events and 1,000 posts to JSON.
+
+Compares the previous path (responses built with validation, then
+``jsonable_encoder`` and ``json.dumps``, as FastAPI's default response does)
+with the current one (``model_construct`` mappers rendered by orjson).
+
+Usage:
+    python backend/benchmark_serialization.py [--count 1000] [--repeat 5]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi.encoders import jsonable_encoder
+
+from app.core.responses import FastJSONResponse
+from app.models.blog import BlogPost
+from app.models.event import Event
+from app.models.image import ImageAsset
+from app.models.user import User
+from app.schemas.blog import BlogPostResponse
+from app.schemas.event import EventResponse
+from app.services.events import event_response
+from app.services.posts import post_response
+
+
+def build_rows(count: int):
+    """Transient users, events and posts shaped like production rows."""
+    now = datetime.utcnow()
+    user = User(id=str(uuid.uuid4()), full_name="Nguyễn Văn An", avatar="/uploads/avatars/a/128.webp")
+    image = ImageAsset(
+        id="0" * 64,
+        width=1600,
+        height=900,
+        thumbnail_url="/uploads/images/0/thumbnail.webp",
+        card_url="/uploads/images/0/card.webp",
+        hero_url="/uploads/images/0/hero.webp",
+        placeholder="data:image/webp;base64," + "A" * 120,
+    )
+    content = "<p>" + "Chạy bộ buổi sáng quanh Hồ Gươm. " * 60 + "</p>"
+    events = [
+        Event(
+            id=str(uuid.uuid4()),
+            title=f"Giải chạy {index}",
+            description="Giải chạy cộng đồng 5km / 10km / 21km",
+            full_description=content,
+            date=now + timedelta(days=30),
+            time="05:30",
+            location="Hà Nội",
+            address="Hồ Hoàn Kiếm",
+            image_url="/uploads/images/0/original.jpg",
+            max_participants=500,
+            registration_deadline=now + timedelta(days=25),
+            categories=["5km", "10km", "21km"],
+            organizer_id=user.id,
+            status="approved",
+            bank_name="VCB",
+            account_number="0123456789",
+            account_holder_name="NGUYEN VAN AN",
+            created_at=now - timedelta(minutes=index),
+            updated_at=now,
+        )
+        for index in range(count)
+    ]
+    posts = [
+        BlogPost(
+            id=str(uuid.uuid4()),
+            title=f"Nhật ký chạy bộ {index}",
+            content=content,
+            excerpt=content[3:203],
+            word_count=420,
+            reading_minutes=3,
+            first_image_url=None,
+            category="training",
+            image_url="/uploads/images/0/original.jpg",
+            author_id=user.id,
+            status="approved",
+            created_at=now - timedelta(minutes=index),
+            updated_at=now,
+        )
+        for index in range(count)
+    ]
+    return user, image, events, posts
+
+
+def legacy_events(events, user, image):
+    """Field by field with validation, then jsonable_encoder + json.dumps."""
+    items = [
+        EventResponse(
+            id=event.id,
+            title=event.title,
+            description=event.description,
+            full_description=event.full_description,
+            date=event.date,
+            time=event.time,
+            location=event.location,
+            address=event.address,
+            image_url=event.image_url,
+            image=image,
+            max_participants=event.max_participants,
+            registration_deadline=event.registration_deadline,
+            categories=event.categories,
+            organizer_id=event.organizer_id,
+            organizer_name=user.full_name,
+            status=event.status,
+            participants_count=0,
+            bank_name=event.bank_name,
+            account_number=event.account_number,
+            account_holder_name=event.account_holder_name,
+            created_at=event.created_at,
+            updated_at=event.updated_at,
+        )
+        for event in events
+    ]
+    return json.dumps(jsonable_encoder({"events": items}), ensure_ascii=False).encode("utf-8")
+
+
+def legacy_posts(posts, user, image):
+    items = [
+        BlogPostResponse(
+            id=post.id,
+            title=post.title,
+            content=post.content,
+            excerpt=post.excerpt,
+            word_count=post.word_count,
+            reading_minutes=post.reading_minutes,
+            first_image_url=post.first_image_url,
+            category=post.category,
+            image_url=post.image_url,
+            image=image,
+            author_id=post.author_id,
+            author_name=user.full_name,
+            author_avatar=user.avatar,
+            status=post.status,
+            likes_count=0,
+            created_at=post.created_at,
+            updated_at=post.updated_at,
+        )
+        for post in posts
+    ]
+    return json.dumps(jsonable_encoder({"posts": items}), ensure_ascii=False).encode("utf-8")
+
+
+def current_events(events, user, image):
+    items = [event_response(event, organizer=user, image=image) for event in events]
+    return FastJSONResponse({"events": items}).body
+
+
+def current_posts(posts, user, image):
+    items = [post_response(post, author=user, image=image) for post in posts]
+    return FastJSONResponse({"posts": items}).body
+
+
+def best_of(repeat: int, func, *args, **kwargs):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func(*args, **kwargs)
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    user, image, events, posts = build_rows(args.count)
+    for name, rows, legacy, current in (
+        ("events", events, legacy_events, current_events),
+        ("posts", posts, legacy_posts, current_posts),
+    ):
+        legacy_time, legacy_body = best_of(args.repeat, legacy, rows, user, image)
+        current_time, current_body = best_of(args.repeat, current, rows, user, image)
+        same = json.loads(legacy_body) == json.loads(current_body)
+        print(f"{args.count} {name}: legacy {legacy_time * 1000:7.1f} ms  current {current_time * 1000:7.1f} ms  "
+              f"({legacy_time / current_time:.1f}x)  {len(current_body) / 1024:.0f} KB  same output: {same}")
+
+
+if __name__ == "__main__":
+    main()
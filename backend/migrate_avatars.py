@@ -0,0 +1,56 @@
+"""
+Move base64 avatars out of the users table
+
+Avatars saved as data URLs are resized, uploaded to storage, and replaced by
+the URL of the stored image. Unreadable avatars are reported and left as is.
+
+Usage:
+    python backend/migrate_avatars.py [--batch-size 100] [--dry-run]
+"""
+import argparse
+import os
+import sys
+import logging
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.database import SessionLocal
+from app.services.storage import StorageError, get_storage_backend
+from app.services.users import migrate_avatars
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def run(batch_size: int = 100, dry_run: bool = False):
+    """Migrate every base64 avatar, committing per batch"""
+    try:
+        storage = None if dry_run else get_storage_backend()
+    except StorageError as e:
+        logger.error(f"❌ Storage is not configured: {e}")
+        return False
+
+    db = SessionLocal()
+    try:
+        stats = migrate_avatars(db, storage, batch_size=batch_size, dry_run=dry_run)
+        verb = "Would move" if dry_run else "Moved"
+        logger.info(f"✅ Scanned {stats['users']} users with base64 avatars")
+        logger.info(f"   {verb} {stats['updated']} avatars, {stats['failed']} unreadable")
+        logger.info(f"   User rows shrink by {stats['bytes_saved'] / 1024:.0f} KB")
+        return stats["failed"] == 0
+    except Exception as e:
+        logger.error(f"❌ Migration failed: {e}")
+        db.rollback()
+        return False
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move base64 avatars to storage")
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would change")
+    args = parser.parse_args()
+    success = run(batch_size=args.batch_size, dry_run=args.dry_run)
+    sys.exit(0 if success else 1)
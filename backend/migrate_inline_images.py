@@ -0,0 +1,56 @@
+"""
+Move inline base64 images out of existing post content
+
+New and edited posts are cleaned on save; this rewrites posts stored before
+that, uploading each distinct image once and replacing its data URL.
+
+Usage:
+    python backend/migrate_inline_images.py [--batch-size 50] [--dry-run]
+"""
+import argparse
+import os
+import sys
+import logging
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.database import SessionLocal
+from app.services.posts import offload_post_images
+from app.services.storage import StorageError, get_storage_backend
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def migrate_inline_images(batch_size: int = 50, dry_run: bool = False):
+    """Offload inline images of every post, committing per batch"""
+    try:
+        storage = None if dry_run else get_storage_backend()
+    except StorageError as e:
+        logger.error(f"❌ Storage is not configured: {e}")
+        return False
+
+    db = SessionLocal()
+    try:
+        stats = offload_post_images(db, storage, batch_size=batch_size, dry_run=dry_run)
+        verb = "Would move" if dry_run else "Moved"
+        logger.info(f"✅ Scanned {stats['posts']} posts with inline images")
+        logger.info(f"   {verb} {stats['images']} images out of {stats['updated']} posts")
+        logger.info(f"   Content shrinks by {stats['bytes_saved'] / 1024 / 1024:.1f} MB")
+        return True
+    except Exception as e:
+        logger.error(f"❌ Migration failed: {e}")
+        db.rollback()
+        return False
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move inline base64 images in posts to storage")
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would change")
+    args = parser.parse_args()
+    success = migrate_inline_images(batch_size=args.batch_size, dry_run=args.dry_run)
+    sys.exit(0 if success else 1)
@@ -3,8 +3,9 @@ Pytest configuration and fixtures for API tests
 """
 import os
 import sys
-from typing import Generator
+from typing import Any, Dict, Generator
 import pytest
+from botocore.exceptions import ClientError
 from starlette.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
@@ -15,6 +16,8 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Import models to register them with Base.metadata
 from app.models import user, blog, event  # noqa: F401
+from app.core.cache import response_cache
+from app.core.config import settings
 from app.core.database import Base, get_db
 from app.core.security import get_password_hash, create_access_token
 from app.main import app
@@ -72,6 +75,8 @@ def client(db_session: Session) -> Generator[TestClient, None, None]:
             pass
     
     app.dependency_overrides[get_db] = override_get_db
+    # Each test starts from an empty database, so no list cached by a previous test applies
+    response_cache.clear()
     
     test_client = TestClient(app)
     try:
@@ -79,6 +84,7 @@ def client(db_session: Session) -> Generator[TestClient, None, None]:
     finally:
         # Clean up dependency overrides
         app.dependency_overrides.clear()
+        response_cache.clear()
 
 
 @pytest.fixture
@@ -314,3 +320,61 @@ def test_event(db_session: Session, test_user):
     
     return test_event
 
+
+class DummyClient:
+    """Minimal S3-compatible stub standing in for the R2 client."""
+
+    def __init__(self, fail_upload: bool = False):
+        self.fail_upload = fail_upload
+        self.upload_calls: list[Dict[str, Any]] = []
+        self.parts: Dict[int, bytes] = {}
+        self.completed: list[Dict[str, Any]] = []
+        self.aborted: list[str] = []
+        self.head_calls: list[str] = []
+
+    def head_object(self, Bucket, Key):
+        self.head_calls.append(Key)
+        if not any(call["key"] == Key for call in self.upload_calls):
+            raise ClientError({"Error": {"Code": "404", "Message": "Not Found"}}, "HeadObject")
+        return {}
+
+    def put_object(self, Bucket, Key, Body, ContentType, CacheControl=None):
+        if self.fail_upload:
+            raise ClientError({"Error": {"Code": "500", "Message": "boom"}}, "PutObject")
+        self.upload_calls.append(
+            {"bucket": Bucket, "key": Key, "content_type": ContentType, "cache_control": CacheControl, "payload": Body}
+        )
+
+    def create_multipart_upload(self, Bucket, Key, ContentType, **_kwargs):
+        return {"UploadId": "upload-1"}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        if self.fail_upload:
+            raise ClientError({"Error": {"Code": "500", "Message": "boom"}}, "upload_part")
+        self.parts[PartNumber] = Body
+        return {"ETag": f"etag-{PartNumber}"}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        self.completed.append({"key": Key, "parts": MultipartUpload["Parts"]})
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.aborted.append(UploadId)
+
+    def generate_presigned_url(self, *_args, **_kwargs):
+        return "https://example.com/signed"
+
+
+@pytest.fixture
+def r2_settings(monkeypatch):
+    """Configure the R2 backend with dummy credentials"""
+    monkeypatch.setattr(settings, "CLOUDFLARE_R2_BUCKET", "test-bucket", raising=False)
+    monkeypatch.setattr(settings, "CLOUDFLARE_R2_ENDPOINT", "https://example.com", raising=False)
+    monkeypatch.setattr(settings, "CLOUDFLARE_R2_PUBLIC_DOMAIN", "https://cdn.example.com", raising=False)
+    monkeypatch.setattr(settings, "CLOUDFLARE_R2_ACCESS_KEY_ID", "dummy", raising=False)
+    monkeypatch.setattr(settings, "CLOUDFLARE_R2_SECRET_ACCESS_KEY", "dummy", raising=False)
+
+
+@pytest.fixture
+def r2_client(r2_settings) -> DummyClient:
+    """S3 client stub for an ``R2StorageService``, with R2 configured"""
+    return DummyClient()
@@ -0,0 +1,129 @@
+"""
+Avatar storage tests
+
+Avatars are resized into fixed sizes and stored; users keep only the URL.
+"""
+import base64
+import io
+import uuid
+
+import pytest
+from fastapi import status
+from PIL import Image
+
+from app.core.security import get_password_hash
+from app.models.user import User
+from app.services.storage import MemoryStorageBackend, R2StorageService, known_objects, set_storage_backend
+from app.services.users import AVATAR_SIZES, migrate_avatars
+
+
+def make_image(width: int = 400, height: int = 300, color: str = "orange") -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), color).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+def data_url(data: bytes) -> str:
+    return "data:image/jpeg;base64," + base64.b64encode(data).decode()
+
+
+@pytest.fixture
+def memory_storage():
+    backend = MemoryStorageBackend(base_url="/uploads")
+    set_storage_backend(backend)
+    yield backend
+    set_storage_backend(None)
+
+
+def avatar_keys(storage: MemoryStorageBackend):
+    return sorted(key for key in storage._objects if key.startswith("avatars/"))
+
+
+def test_upload_avatar_stores_resized_squares(client, auth_headers, memory_storage):
+    response = client.post(
+        "/api/v1/auth/me/avatar",
+        files={"file": ("avatar.jpg", make_image(), "image/jpeg")},
+        headers=auth_headers,
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    avatar = response.json()["avatar"]
+    assert avatar.startswith("/uploads/avatars/") and avatar.endswith(f"/{AVATAR_SIZES[-1]}.webp")
+    keys = avatar_keys(memory_storage)
+    assert len(keys) == len(AVATAR_SIZES)
+    for size in AVATAR_SIZES:
+        key = next(key for key in keys if key.endswith(f"/{size}.webp"))
+        with Image.open(io.BytesIO(memory_storage.read_bytes(key))) as image:
+            assert image.size == (size, size)
+
+
+def test_upload_avatar_to_r2(client, auth_headers, r2_client):
+    known_objects.clear()
+    set_storage_backend(R2StorageService(client=r2_client))
+    try:
+        response = client.post(
+            "/api/v1/auth/me/avatar",
+            files={"file": ("avatar.jpg", make_image(), "image/jpeg")},
+            headers=auth_headers,
+        )
+    finally:
+        set_storage_backend(None)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["avatar"].startswith("https://cdn.example.com/avatars/")
+    assert [call["key"].rsplit("/", 1)[1] for call in r2_client.upload_calls] == [
+        f"{size}.webp" for size in AVATAR_SIZES
+    ]
+
+
+def test_upload_avatar_rejects_non_images(client, auth_headers, memory_storage):
+    response = client.post(
+        "/api/v1/auth/me/avatar",
+        files={"file": ("avatar.jpg", b"not an image", "image/jpeg")},
+        headers=auth_headers,
+    )
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert avatar_keys(memory_storage) == []
+
+
+def test_update_profile_moves_base64_avatar_to_storage(client, auth_headers, memory_storage):
+    response = client.put("/api/v1/auth/me", json={"avatar": data_url(make_image())}, headers=auth_headers)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["avatar"].startswith("/uploads/avatars/")
+
+
+def test_update_profile_keeps_avatar_urls(client, auth_headers, memory_storage):
+    url = "https://res.cloudinary.com/demo/image/upload/avatar.jpg"
+
+    response = client.put("/api/v1/auth/me", json={"avatar": url}, headers=auth_headers)
+
+    assert response.json()["avatar"] == url
+    assert avatar_keys(memory_storage) == []
+
+
+def test_migrate_avatars_converts_existing_users(db_session):
+    storage = MemoryStorageBackend(base_url="/uploads")
+    avatars = [data_url(make_image(color=color)) for color in ("red", "green", "blue")]
+    avatars.append("data:image/png;base64,bm90IGFuIGltYWdl")  # "not an image"
+    for index, avatar in enumerate(avatars):
+        db_session.add(User(
+            id=str(uuid.uuid4()),
+            email=f"runner{index}@example.com",
+            hashed_password=get_password_hash("password"),
+            full_name=f"Runner {index}",
+            avatar=avatar,
+        ))
+    db_session.commit()
+
+    dry_run = migrate_avatars(db_session, storage, batch_size=2, dry_run=True)
+    assert (dry_run["updated"], dry_run["failed"]) == (3, 1)
+    assert avatar_keys(storage) == []
+
+    stats = migrate_avatars(db_session, storage, batch_size=2)
+
+    assert (stats["users"], stats["updated"], stats["failed"]) == (4, 3, 1)
+    assert len(avatar_keys(storage)) == 3 * len(AVATAR_SIZES)
+    remaining = db_session.query(User).filter(User.avatar.like("data:image/%")).all()
+    assert [user.email for user in remaining] == ["runner3@example.com"]
@@ -0,0 +1,139 @@
+"""
+Batch request endpoint tests
+"""
+from fastapi import Request, status
+from sqlalchemy import event
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core import database
+from app.core.config import settings
+from app.core.database import SHARED_SESSION_SCOPE_KEY, get_db
+from app.main import app
+
+
+class TestBatch:
+    """Test running several GETs in one request"""
+
+    def test_runs_sub_requests_in_order(self, client, auth_headers, test_event):
+        """Test every sub-request is answered with its own status and body"""
+        response = client.post("/api/v1/batch", headers=auth_headers, json={"requests": [
+            {"id": "event", "path": f"/events/{test_event.id}"},
+            {"id": "me", "path": "/auth/me"},
+            {"id": "unread", "path": "/notifications/unread-count"},
+            {"id": "missing", "path": "/events/missing"},
+        ]})
+        data = response.json()["responses"]
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["cache-control"] == "private, no-cache"
+        assert [item["id"] for item in data] == ["event", "me", "unread", "missing"]
+        assert data[0]["status"] == status.HTTP_200_OK
+        assert data[0]["body"]["title"] == "Test Running Event"
+        assert "etag" in data[0]["headers"]
+        assert data[1]["body"]["full_name"] == "Test User"
+        assert data[2]["status"] == status.HTTP_200_OK
+        assert data[3]["status"] == status.HTTP_404_NOT_FOUND
+        assert data[3]["body"] == {"detail": "Event not found"}
+
+    def test_shares_principal(self, client, auth_headers):
+        """Test sub-requests act as the batch's user and can't swap credentials"""
+        anonymous = client.post("/api/v1/batch", json={"requests": [{"path": "/auth/me"}]})
+        swapped = client.post("/api/v1/batch", json={"requests": [
+            {"path": "/auth/me", "headers": auth_headers},
+        ]})
+        authenticated = client.post("/api/v1/batch", headers=auth_headers, json={"requests": [{"path": "/auth/me"}]})
+
+        assert anonymous.json()["responses"][0]["status"] == status.HTTP_401_UNAUTHORIZED
+        assert swapped.json()["responses"][0]["status"] == status.HTTP_401_UNAUTHORIZED
+        assert authenticated.json()["responses"][0]["status"] == status.HTTP_200_OK
+
+    def test_user_looked_up_once(self, client, auth_headers, db_session, test_user):
+        """Test the sub-requests reuse the batch's user instead of querying it again"""
+        db_session.expire_all()
+        statements = []
+        listener = lambda *args: statements.append(args[2])  # noqa: E731
+        event.listen(db_session.get_bind(), "before_cursor_execute", listener)
+        try:
+            response = client.post("/api/v1/batch", headers=auth_headers, json={"requests": [
+                {"path": "/auth/me"},
+                {"path": "/auth/stats"},
+            ]})
+        finally:
+            event.remove(db_session.get_bind(), "before_cursor_execute", listener)
+
+        assert [item["status"] for item in response.json()["responses"]] == [200, 200]
+        user_selects = [sql for sql in statements if "FROM users" in sql and "users.id = ?" in sql]
+        assert len(user_selects) == 1
+
+    def test_conditional_sub_request(self, client, test_blog_post):
+        """Test sub-request headers such as If-None-Match are passed on"""
+        etag = client.get(f"/api/v1/blog/posts/{test_blog_post.id}").headers["etag"]
+
+        response = client.post("/api/v1/batch", json={"requests": [
+            {"path": f"/blog/posts/{test_blog_post.id}", "headers": {"If-None-Match": etag}},
+        ]})
+
+        item = response.json()["responses"][0]
+        assert item["status"] == status.HTTP_304_NOT_MODIFIED
+        assert item["body"] is None
+
+    def test_rejects_invalid_batches(self, client, monkeypatch):
+        """Test writes, nested batches, foreign URLs and oversized batches are refused"""
+        monkeypatch.setattr(settings, "BATCH_MAX_REQUESTS", 2)
+        invalid = [
+            [{"method": "POST", "path": "/events"}],
+            [{"path": "/batch"}],
+            [{"path": "//example.com/events"}],
+            [{"path": "/events"}] * 3,
+        ]
+
+        for requests in invalid:
+            response = client.post("/api/v1/batch", json={"requests": requests})
+            assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_get_db_yields_shared_session(self):
+        """Test sub-requests get the batch's session, which they don't close"""
+        class Scoped:
+            scope = {SHARED_SESSION_SCOPE_KEY: "session"}
+
+        sessions = get_db(Scoped())
+
+        assert next(sessions) == "session"
+
+    def test_sub_requests_share_one_session(self, client, auth_headers, db_session, monkeypatch):
+        """Test a batch opens one session from the real get_db, used by every sub-request and closed once"""
+        opened = []
+        closes = []
+        yielded = []
+
+        class RecordingSession(Session):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                opened.append(self)
+
+            def close(self):
+                closes.append(self)
+                super().close()
+
+        def recording_get_db(request: Request):
+            sessions = get_db(request)
+            db = next(sessions)
+            yielded.append(db)
+            yield db
+            next(sessions, None)
+
+        monkeypatch.setattr(
+            database, "SessionLocal",
+            sessionmaker(autocommit=False, autoflush=False, bind=db_session.get_bind(), class_=RecordingSession),
+        )
+        app.dependency_overrides[get_db] = recording_get_db
+
+        response = client.post("/api/v1/batch", headers=auth_headers, json={"requests": [
+            {"path": "/auth/me"},
+            {"path": "/auth/stats"},
+        ]})
+
+        assert [item["status"] for item in response.json()["responses"]] == [200, 200]
+        assert len(opened) == 1
+        assert yielded == opened * 3
+        assert closes == opened
@@ -3,6 +3,7 @@ Blog endpoints tests
 """
 import pytest
 from fastapi import status
+from sqlalchemy import event
 
 
 class TestListBlogPosts:
@@ -298,3 +299,73 @@ class TestLikeBlogPost:
         
         assert response.status_code == status.HTTP_404_NOT_FOUND
 
+
+class TestBlogPostFieldProjection:
+    """Test fields= and view= on the blog post list"""
+    
+    def test_card_view_omits_content(self, client, test_blog_post, db_session):
+        """Test the card preset returns card fields and skips the content column"""
+        test_blog_post.status = "approved"
+        test_blog_post.excerpt = None
+        test_blog_post.content = "x" * 300
+        db_session.commit()
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(db_session.bind, "before_cursor_execute", listener)
+        try:
+            response = client.get("/api/v1/blog/posts?view=card")
+        finally:
+            event.remove(db_session.bind, "before_cursor_execute", listener)
+        
+        assert response.status_code == status.HTTP_200_OK
+        post = response.json()["posts"][0]
+        assert "content" not in post
+        assert post["excerpt"] == "x" * 200 + "..."
+        assert post["author_name"] == "Test User"
+        post_query = next(sql for sql in statements if "FROM blog_posts" in sql and "LIMIT" in sql)
+        assert "blog_posts_content" not in post_query
+    
+    def test_fields_returns_only_requested_fields(self, client, test_blog_post, db_session):
+        """Test fields= returns the requested fields plus id"""
+        test_blog_post.status = "approved"
+        db_session.commit()
+        
+        response = client.get("/api/v1/blog/posts?fields=title,likes_count")
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["posts"] == [{"id": test_blog_post.id, "title": "Test Blog Post", "likes_count": 0}]
+    
+    def test_full_view_is_the_default(self, client, test_blog_post, db_session):
+        """Test the default response keeps every field"""
+        test_blog_post.status = "approved"
+        db_session.commit()
+        
+        default = client.get("/api/v1/blog/posts").json()["posts"][0]
+        full = client.get("/api/v1/blog/posts?view=full").json()["posts"][0]
+        
+        assert default == full
+        assert default["content"] == "This is test content for a blog post."
+    
+    def test_unknown_field_or_view(self, client):
+        """Test unknown fields and views are rejected"""
+        assert client.get("/api/v1/blog/posts?fields=title,password").status_code == status.HTTP_400_BAD_REQUEST
+        assert client.get("/api/v1/blog/posts?view=tiny").status_code == status.HTTP_400_BAD_REQUEST
+
+
+class TestBlogPostResponseMapping:
+    """Test responses built by the post mapper"""
+    
+    def test_matches_validated_response(self, client, test_blog_post, test_user):
+        """Test the mapped response serializes like a validated BlogPostResponse"""
+        from fastapi.encoders import jsonable_encoder
+        from app.schemas.blog import BlogPostResponse
+        
+        response = client.get(f"/api/v1/blog/posts/{test_blog_post.id}")
+        
+        assert response.status_code == status.HTTP_200_OK
+        expected = BlogPostResponse.model_validate({
+            **{column: getattr(test_blog_post, column) for column in test_blog_post.__table__.columns.keys()},
+            "author_name": test_user.full_name,
+            "author_avatar": test_user.avatar,
+        })
+        assert response.json() == jsonable_encoder(expected)
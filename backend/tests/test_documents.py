@@ -0,0 +1,767 @@
+"""
+Tests for document rendering and the document analysis endpoint.
+"""
+from __future__ import annotations
+
+import asyncio
+import io
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pymupdf
+import pytest
+from docx import Document
+from sqlalchemy.orm import sessionmaker
+from starlette.testclient import TestClient
+
+from app.core.config import settings
+from app.main import app
+from app.models.document import DocumentAnalysisCache, DocumentJob, DocumentTerm, PostDocument
+from app.services.documents import (
+    DocumentRenderError,
+    DocumentRenderTimeout,
+    PreviewOptions,
+    RenderedPage,
+    PreviewImage,
+    UploadPipeline,
+    analysis_cache_key,
+    create_job,
+    docx_to_html,
+    evict_analysis_cache,
+    page_image_html,
+    job_runner,
+    process_job,
+    process_job_slice,
+    render_pdf,
+    shutdown_render_pool,
+    store_analysis,
+)
+from app.services.documents import rendering as rendering_module
+from app.services.documents.jobs import lease_job
+from app.services.documents.pipeline import iter_page_previews
+from app.services.storage import MemoryStorageBackend, StorageError, set_storage_backend
+
+
+SMALL_PREVIEWS = PreviewOptions(max_dpi=36, thumbnail_width=0)
+
+
+def make_pdf(page_count: int) -> bytes:
+    """Build a small PDF whose pages say "Page N"."""
+    doc = pymupdf.open()
+    for number in range(1, page_count + 1):
+        page = doc.new_page(width=200, height=200)
+        page.insert_text((20, 50), f"Page {number}")
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+class SlowStorage(MemoryStorageBackend):
+    """Memory backend whose uploads finish in reverse order and track concurrency."""
+
+    def __init__(self, fail: bool = False):
+        super().__init__(base_url="/uploads")
+        self.fail = fail
+        self.active = 0
+        self.peak = 0
+        self.calls = 0
+        self._counter = threading.Lock()
+
+    def upload_bytes(self, data, **kwargs):
+        with self._counter:
+            self.calls += 1
+            delay = max(0.05 - 0.01 * self.calls, 0)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(delay)
+            if self.fail:
+                raise StorageError("boom")
+            return super().upload_bytes(data, **kwargs)
+        finally:
+            with self._counter:
+                self.active -= 1
+
+
+@pytest.fixture
+def thread_renderer(monkeypatch):
+    monkeypatch.setattr(settings, "DOCUMENT_RENDER_WORKERS", 0)
+    monkeypatch.setattr(settings, "DOCUMENT_RENDER_PAGES_PER_TASK", 2)
+
+
+@pytest.fixture
+def memory_storage():
+    backend = MemoryStorageBackend(base_url="/uploads")
+    set_storage_backend(backend)
+    yield backend
+    set_storage_backend(None)
+
+
+async def test_render_pdf_keeps_page_order(thread_renderer):
+    result = await render_pdf(make_pdf(5), options=SMALL_PREVIEWS)
+
+    assert result.page_count == 5
+    assert not result.truncated
+    assert [page.number for page in result.pages] == [1, 2, 3, 4, 5]
+    assert all(page.image and page.image[8:12] == b"WEBP" for page in result.pages)
+    assert [page.text.strip() for page in result.pages] == [f"Page {n}" for n in range(1, 6)]
+
+
+def test_preview_options_scale_with_page_size():
+    options = PreviewOptions(max_dpi=144, max_width=1600)
+
+    assert options.zoom_for(595) == 2.0  # A4 renders at full DPI
+    assert options.zoom_for(2000) == 0.8  # Posters are capped at max_width
+
+
+async def test_render_pdf_encodes_compact_variants(thread_renderer):
+    doc = pymupdf.open()
+    page = doc.new_page(width=595, height=842)
+    page.insert_textbox(pymupdf.Rect(40, 40, 560, 800), "Race route and schedule. " * 150, fontsize=9)
+    data = doc.tobytes()
+    png_size = len(page.get_pixmap(matrix=pymupdf.Matrix(2, 2)).tobytes("png"))
+    doc.close()
+
+    rendered = (await render_pdf(data, options=PreviewOptions())).pages[0]
+
+    assert rendered.content_type == "image/webp"
+    assert rendered.width == 1190  # A4 page at 144 DPI
+    assert len(rendered.image) < png_size / 10
+    # A thumbnail is only kept when it is actually smaller
+    assert rendered.thumbnail is None or len(rendered.thumbnail) < len(rendered.image)
+
+
+async def test_render_pdf_adds_thumbnail_for_photo_pages(thread_renderer):
+    from PIL import Image
+
+    photo = io.BytesIO()
+    Image.merge("RGB", [Image.effect_noise((300, 300), 60) for _ in range(3)]).save(photo, format="PNG")
+    doc = pymupdf.open()
+    page = doc.new_page(width=595, height=842)
+    page.insert_image(pymupdf.Rect(40, 40, 555, 555), stream=photo.getvalue())
+    data = doc.tobytes()
+    doc.close()
+
+    rendered = (await render_pdf(data, options=PreviewOptions())).pages[0]
+
+    assert rendered.thumbnail_width == 320
+    assert rendered.thumbnail_content_type == "image/webp"
+    assert len(rendered.thumbnail) < len(rendered.image) / 4
+
+
+@pytest.mark.parametrize("preview_format,content_type", [("jpeg", "image/jpeg"), ("webp", "image/webp")])
+def test_photographic_previews_use_lossy_encoding(preview_format, content_type):
+    from PIL import Image
+
+    from app.services.documents.rendering import encode_image
+
+    photo = Image.merge("RGB", [Image.effect_noise((256, 256), 60) for _ in range(3)])
+    data, encoded_type = encode_image(photo, PreviewOptions(format=preview_format, quality=60))
+
+    assert encoded_type == content_type
+    flat, flat_type = encode_image(Image.new("RGB", (256, 256), "white"), PreviewOptions(format=preview_format))
+    assert flat_type == ("image/webp" if preview_format == "webp" else "image/png")
+
+
+def test_page_image_html_offers_thumbnail_in_srcset():
+    preview = PreviewImage(
+        url="/u/full", stored=True, width=1190, height=1684, thumbnail_url="/u/thumb", thumbnail_width=320
+    )
+
+    html = page_image_html(preview, 2)
+
+    assert 'src="/u/full"' in html
+    assert 'srcset="/u/thumb 320w, /u/full 1190w"' in html
+    assert 'width="1190" height="1684"' in html
+    assert 'loading="lazy"' in html
+    assert "srcset" not in page_image_html(PreviewImage(url="data:image/webp;base64,AA", stored=False), 1)
+
+
+async def test_render_pdf_respects_page_budget(thread_renderer):
+    result = await render_pdf(make_pdf(5), options=SMALL_PREVIEWS, max_pages=3)
+
+    assert result.page_count == 5
+    assert result.truncated
+    assert [page.number for page in result.pages] == [1, 2, 3]
+
+
+async def test_render_pdf_rejects_invalid_data(thread_renderer):
+    with pytest.raises(DocumentRenderError):
+        await render_pdf(b"not a pdf")
+
+
+async def test_render_pdf_times_out(thread_renderer):
+    with pytest.raises(DocumentRenderTimeout):
+        await render_pdf(make_pdf(2), timeout=1e-9)
+
+
+async def test_render_pdf_in_process_pool(monkeypatch):
+    monkeypatch.setattr(settings, "DOCUMENT_RENDER_WORKERS", 2)
+    monkeypatch.setattr(settings, "DOCUMENT_RENDER_PAGES_PER_TASK", 1)
+    try:
+        result = await render_pdf(make_pdf(3), options=SMALL_PREVIEWS)
+    finally:
+        shutdown_render_pool()
+
+    assert [page.number for page in result.pages] == [1, 2, 3]
+    assert [page.text.strip() for page in result.pages] == ["Page 1", "Page 2", "Page 3"]
+
+
+async def test_render_pdf_falls_back_to_threads_without_process_pool(monkeypatch):
+    from app.services.documents import rendering
+
+    def unavailable(*_args, **_kwargs):
+        raise OSError(38, "Function not implemented")
+
+    monkeypatch.setattr(settings, "DOCUMENT_RENDER_WORKERS", 2)
+    monkeypatch.setattr(rendering, "_pool", None)
+    monkeypatch.setattr(rendering, "_pool_unavailable", False)
+    monkeypatch.setattr(rendering, "ProcessPoolExecutor", unavailable)
+
+    result = await render_pdf(make_pdf(2), options=SMALL_PREVIEWS)
+
+    assert [page.number for page in result.pages] == [1, 2]
+    assert rendering._pool_unavailable
+
+
+def test_analyze_pdf_stores_previews_in_order(client, thread_renderer, memory_storage, monkeypatch):
+    monkeypatch.setattr(settings, "DOCUMENT_MAX_PAGES", 2)
+
+    response = client.post(
+        "/api/v1/documents/analyze",
+        files={"file": ("sample.pdf", make_pdf(3), "application/pdf")},
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data["preview_urls"]) == 2
+    assert data["content"].index('alt="Page 1"') < data["content"].index('alt="Page 2"')
+    assert data["content"].count('width="400" height="400"') == 2
+    assert data["content"].count('loading="lazy"') == 1
+    assert data["page_count"] == 3
+    assert "first 2 of 3 pages" in data["warning"]
+
+
+def test_analyze_rejects_invalid_pdf(client, thread_renderer, memory_storage):
+    response = client.post(
+        "/api/v1/documents/analyze",
+        files={"file": ("broken.pdf", b"%PDF-1.4 garbage", "application/pdf")},
+    )
+
+    assert response.status_code == 400
+
+
+async def test_upload_pipeline_preserves_order_and_bounds_concurrency():
+    storage = SlowStorage()
+    uploads = UploadPipeline(storage, concurrency=2)
+
+    tasks = [uploads.preview(RenderedPage(number=n, image=f"image {n}".encode(), text="")) for n in range(1, 6)]
+    previews = [await task for task in tasks]
+
+    assert all(preview.stored for preview in previews)
+    assert [storage.read_bytes(p.url.split("/uploads/", 1)[1]) for p in previews] == [
+        f"image {n}".encode() for n in range(1, 6)
+    ]
+    assert storage.peak == 2
+
+
+async def test_upload_pipeline_falls_back_to_inline_images():
+    uploads = UploadPipeline(SlowStorage(fail=True))
+
+    preview = await uploads.preview(RenderedPage(number=1, image=b"png", text=""))
+    original = await uploads.original(b"%PDF", content_type="application/pdf")
+
+    assert not preview.stored
+    assert preview.url.startswith("data:image/png;base64,")
+    assert original is None
+
+
+async def test_page_previews_hold_back_rendering_for_a_slow_consumer(thread_renderer, monkeypatch):
+    rendered = []
+    render_page_range = rendering_module.render_page_range
+
+    def recording_render(data, first, last, options):
+        rendered.extend(range(first, last))
+        return render_page_range(data, first, last, options)
+
+    monkeypatch.setattr(rendering_module, "render_page_range", recording_render)
+    pages = iter_page_previews(make_pdf(20), page_count=20, uploads=UploadPipeline(None))
+
+    first, _preview = await pages.__anext__()
+    await asyncio.sleep(0.3)
+    rendered_while_stalled = len(rendered)
+    remaining = [page.number async for page, _preview in pages]
+
+    assert first.number == 1
+    assert rendered_while_stalled <= 8
+    assert remaining == list(range(2, 21))
+
+
+def test_analyze_pdf_uploads_previews_concurrently(client, thread_renderer, monkeypatch):
+    storage = SlowStorage()
+    set_storage_backend(storage)
+    monkeypatch.setattr(settings, "DOCUMENT_UPLOAD_CONCURRENCY", 3)
+    try:
+        response = client.post(
+            "/api/v1/documents/analyze",
+            files={"file": ("sample.pdf", make_pdf(4), "application/pdf")},
+        )
+    finally:
+        set_storage_backend(None)
+
+    assert response.status_code == 200
+    data = response.json()
+    content = data["content"]
+    positions = [content.index(f'alt="Page {n}"') for n in range(1, 5)]
+    assert positions == sorted(positions)
+    assert [content.index(url) for url in data["preview_urls"]] == sorted(
+        content.index(url) for url in data["preview_urls"]
+    )
+    assert data["document_url"].startswith("/uploads/documents/originals/")
+    assert 1 < storage.peak <= 3
+
+
+def make_docx() -> bytes:
+    doc = Document()
+    doc.add_heading("Title", level=1)
+    doc.add_paragraph("Body text")
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def test_analyze_stream_emits_pages_in_order(client, thread_renderer, monkeypatch):
+    monkeypatch.setattr(settings, "DOCUMENT_MAX_PAGES", 3)
+    storage = SlowStorage()
+    set_storage_backend(storage)
+    try:
+        response = client.post(
+            "/api/v1/documents/analyze/stream",
+            files={"file": ("sample.pdf", make_pdf(4), "application/pdf")},
+        )
+    finally:
+        set_storage_backend(None)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert [event["event"] for event in events] == ["start", "page", "page", "page", "done"]
+    assert events[0]["page_count"] == 4
+    assert [event["page"] for event in events[1:4]] == [1, 2, 3]
+    assert all(event["image_url"] in event["content"] for event in events[1:4])
+    assert events[1]["seo_text"] == "<p>Page 1<br></p>"
+    summary = events[-1]
+    assert summary["document_url"].startswith("/uploads/documents/originals/")
+    assert summary["preview_urls"] == [event["image_url"] for event in events[1:4]]
+    assert "first 3 of 4 pages" in summary["warning"]
+
+
+def test_analyze_stream_supports_sse_for_docx(client, memory_storage):
+    response = client.post(
+        "/api/v1/documents/analyze/stream?format=sse",
+        files={
+            "file": (
+                "sample.docx",
+                make_docx(),
+                "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+            )
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    blocks = [block for block in response.text.split("\n\n") if block]
+    names = [block.split("\n")[0] for block in blocks]
+    assert names == ["event: start", "event: content", "event: done"]
+    content = json.loads(blocks[1].split("data: ", 1)[1])
+    assert content["content"] == "<h1>Title</h1><p>Body text</p>"
+
+
+def test_analyze_stream_validates_before_streaming(client, memory_storage):
+    response = client.post(
+        "/api/v1/documents/analyze/stream",
+        files={"file": ("broken.pdf", b"%PDF-1.4 garbage", "application/pdf")},
+    )
+
+    assert response.status_code == 400
+
+
+def test_analyze_stream_reports_render_timeout(client, thread_renderer, memory_storage, monkeypatch):
+    monkeypatch.setattr(settings, "DOCUMENT_RENDER_TIMEOUT_SECONDS", 1e-9)
+
+    response = client.post(
+        "/api/v1/documents/analyze/stream",
+        files={"file": ("sample.pdf", make_pdf(2), "application/pdf")},
+    )
+
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert events[-1] == {
+        "event": "error",
+        "status": 504,
+        "detail": "Document rendering timed out. Try a smaller file.",
+    }
+
+
+def test_analyze_serves_repeated_uploads_from_cache(client, db_session, thread_renderer):
+    storage = SlowStorage()
+    set_storage_backend(storage)
+    pdf = make_pdf(2)
+    try:
+        first = client.post("/api/v1/documents/analyze", files={"file": ("a.pdf", pdf, "application/pdf")})
+        uploads_after_first = storage.calls
+        second = client.post("/api/v1/documents/analyze", files={"file": ("b.pdf", pdf, "application/pdf")})
+    finally:
+        set_storage_backend(None)
+
+    assert first.status_code == second.status_code == 200
+    assert "cached" not in first.json()
+    assert second.json() == {**first.json(), "cached": True}
+    assert storage.calls == uploads_after_first
+    entry = db_session.query(DocumentAnalysisCache).one()
+    assert entry.hit_count == 1
+
+
+def test_analysis_cache_key_depends_on_render_settings(monkeypatch):
+    key = analysis_cache_key("abc", storage_name="memory")
+
+    assert analysis_cache_key("abc", storage_name="local") != key
+    monkeypatch.setattr(settings, "DOCUMENT_MAX_PAGES", 5)
+    assert analysis_cache_key("abc", storage_name="memory") != key
+
+
+def test_analysis_cache_evicts_least_recently_used(db_session, monkeypatch):
+    monkeypatch.setattr(settings, "DOCUMENT_CACHE_MAX_BYTES", 10_000)
+    for name in ("old", "mid", "new"):
+        store_analysis(
+            db_session,
+            name,
+            content_sha256=name,
+            filename=f"{name}.pdf",
+            response={"content": "x" * 4_000, "seo_text": "", "preview_urls": []},
+        )
+
+    remaining = {entry.cache_key for entry in db_session.query(DocumentAnalysisCache).all()}
+    assert remaining == {"mid", "new"}
+    assert evict_analysis_cache(db_session, max_bytes=0) == 2
+
+
+def test_admin_can_purge_document_cache(client, db_session, admin_headers, auth_headers):
+    store_analysis(
+        db_session,
+        "key",
+        content_sha256="digest",
+        filename="a.pdf",
+        response={"content": "<p>x</p>", "seo_text": "", "preview_urls": []},
+    )
+
+    assert client.delete("/api/v1/admin/documents/cache", headers=auth_headers).status_code == 403
+    response = client.delete("/api/v1/admin/documents/cache", headers=admin_headers)
+
+    assert response.status_code == 200
+    assert response.json()["deleted"] == 1
+    assert db_session.query(DocumentAnalysisCache).count() == 0
+
+
+def test_analyze_docx_from_memory(client, memory_storage, monkeypatch, tmp_path):
+    # Nothing should be written to the temp directory any more
+    monkeypatch.setattr("tempfile.tempdir", str(tmp_path))
+
+    response = client.post(
+        "/api/v1/documents/analyze",
+        files={
+            "file": (
+                "sample.docx",
+                make_docx(),
+                "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+            )
+        },
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["content"] == "<h1>Title</h1><p>Body text</p>"
+    assert data["document_url"].startswith("/uploads/documents/originals/")
+    assert list(tmp_path.iterdir()) == []
+
+
+def wait_for_job(live_client, db_session, job_id: str, timeout: float = 10.0) -> dict:
+    """Poll a job until it finishes; the worker commits through its own session."""
+    deadline = time.monotonic() + timeout
+    while True:
+        db_session.expire_all()
+        job = live_client.get(f"/api/v1/documents/jobs/{job_id}").json()
+        if job["status"] in ("completed", "failed") or time.monotonic() > deadline:
+            return job
+        time.sleep(0.05)
+
+
+def test_document_job_reports_progress_and_result(client, db_session, thread_renderer, memory_storage):
+    # A context-managed client keeps one event loop alive for the background job
+    with TestClient(app) as live_client:
+        response = live_client.post(
+            "/api/v1/documents/jobs",
+            files={"file": ("sample.pdf", make_pdf(3), "application/pdf")},
+        )
+        assert response.status_code == 202
+        queued = response.json()
+        assert queued["status"] == "queued"
+        assert queued["progress"] == 0.0
+
+        job = wait_for_job(live_client, db_session, queued["id"])
+
+    assert job["status"] == "completed"
+    assert job["page_count"] == job["pages_done"] == 3
+    assert job["progress"] == 1.0
+    assert len(job["result"]["preview_urls"]) == 3
+    assert job["result"]["document_url"].startswith("/uploads/documents/originals/")
+    record = db_session.query(DocumentJob).one()
+    assert record.source_key and record.started_at and record.finished_at
+
+
+def test_document_job_from_storage_key(client, db_session, thread_renderer, memory_storage):
+    uploaded = client.post(
+        "/api/v1/documents/upload",
+        files={"file": ("sample.pdf", make_pdf(2), "application/pdf")},
+    ).json()
+    storage_key = uploaded["url"].removeprefix("/uploads/")
+
+    with TestClient(app) as live_client:
+        response = live_client.post("/api/v1/documents/jobs", data={"storage_key": storage_key})
+        assert response.status_code == 202
+        job = wait_for_job(live_client, db_session, response.json()["id"])
+
+    assert job["status"] == "completed"
+    assert job["result"]["document_url"] == uploaded["url"]
+    assert len(job["result"]["preview_urls"]) == 2
+
+
+def test_document_job_validates_input(client, memory_storage):
+    assert client.post("/api/v1/documents/jobs").status_code == 400
+    assert client.post(
+        "/api/v1/documents/jobs", data={"storage_key": "avatars/someone.png"}
+    ).status_code == 400
+    assert client.post(
+        "/api/v1/documents/jobs", data={"storage_key": "documents/originals/missing"}
+    ).status_code == 404
+    assert client.get("/api/v1/documents/jobs/unknown").status_code == 404
+
+
+async def test_process_job_records_failure_once(db_session, thread_renderer, memory_storage):
+    sessions = sessionmaker(autocommit=False, autoflush=False, bind=db_session.get_bind())
+    job = create_job(db_session, filename="broken.pdf", content_type="application/pdf", kind="pdf", source_key=None)
+
+    await process_job(job.id, sessions, data=b"%PDF-1.4 garbage")
+    # A second worker must not claim a job that already ran
+    await process_job(job.id, sessions, data=make_pdf(1))
+
+    db_session.expire_all()
+    job = db_session.query(DocumentJob).one()
+    assert job.status == "failed"
+    assert job.result is None
+    assert job.error
+
+
+@pytest.fixture
+def inline_jobs(monkeypatch):
+    monkeypatch.setattr(settings, "DOCUMENT_JOB_INLINE", True)
+    # Every slice stops after its first page
+    monkeypatch.setattr(settings, "DOCUMENT_JOB_SLICE_SECONDS", 0)
+
+    def submit(*args, **kwargs):
+        raise AssertionError("inline jobs must not start background tasks")
+
+    monkeypatch.setattr(job_runner, "submit", submit)
+
+
+def test_inline_document_job_advances_on_each_poll(client, db_session, thread_renderer, memory_storage, inline_jobs):
+    response = client.post(
+        "/api/v1/documents/jobs",
+        files={"file": ("sample.pdf", make_pdf(3), "application/pdf")},
+    )
+    assert response.status_code == 202
+    job_id = response.json()["id"]
+    assert response.json()["status"] == "processing"
+    assert response.json()["pages_done"] == 1
+
+    polled = [client.get(f"/api/v1/documents/jobs/{job_id}").json() for _ in range(2)]
+
+    assert [job["pages_done"] for job in polled] == [2, 3]
+    assert polled[-1]["status"] == "completed"
+    result = polled[-1]["result"]
+    assert len(result["preview_urls"]) == 3
+    positions = [result["content"].index(f'alt="Page {n}"') for n in (1, 2, 3)]
+    assert positions == sorted(positions)
+    assert result["document_url"].startswith("/uploads/documents/originals/")
+    record = db_session.query(DocumentJob).one()
+    assert record.partial is None and record.lease_expires_at is None
+
+
+async def test_job_slice_lease_is_exclusive(db_session, memory_storage, monkeypatch):
+    monkeypatch.setattr(settings, "DOCUMENT_JOB_SLICE_SECONDS", 5)
+    job = create_job(db_session, filename="sample.pdf", content_type="application/pdf", kind="pdf", source_key="k")
+
+    assert lease_job(db_session, job.id)
+    # A concurrent poll leaves the job to the request holding the lease
+    await process_job_slice(db_session, job.id)
+    assert not lease_job(db_session, job.id)
+
+    db_session.expire_all()
+    assert db_session.query(DocumentJob).one().status == "processing"
+
+    job.lease_expires_at = datetime.utcnow() - timedelta(seconds=1)
+    db_session.commit()
+    assert lease_job(db_session, job.id)
+
+
+def test_analyze_renders_later_pages_on_demand(client, thread_renderer, monkeypatch):
+    monkeypatch.setattr(settings, "DOCUMENT_EAGER_PAGES", 2)
+    storage = SlowStorage()
+    set_storage_backend(storage)
+    try:
+        data = client.post(
+            "/api/v1/documents/analyze",
+            files={"file": ("sample.pdf", make_pdf(4), "application/pdf")},
+        ).json()
+        uploads_after_analyze = storage.calls
+
+        lazy_url = data["preview_urls"][2]
+        first = client.get(lazy_url, follow_redirects=False)
+        second = client.get(lazy_url, follow_redirects=False)
+        small = client.get(f"{lazy_url}?width=300", follow_redirects=False)
+        missing = client.get(lazy_url.replace("/pages/3", "/pages/9"), follow_redirects=False)
+        uploads_after_views = storage.calls
+    finally:
+        set_storage_backend(None)
+
+    assert [url.startswith("/uploads/documents/previews/") for url in data["preview_urls"]] == [
+        True, True, False, False
+    ]
+    assert lazy_url.startswith("/api/v1/documents/") and lazy_url.endswith("/pages/3")
+    assert 'width="400" height="400"' in data["content"].split('alt="Page 3"')[0].rsplit("<img", 1)[1]
+    assert "Page 4" in data["seo_text"]
+    assert "warning" not in data
+
+    assert first.status_code == second.status_code == small.status_code == 307
+    assert first.headers["location"].startswith("/uploads/documents/pages/")
+    assert second.headers["location"] == first.headers["location"]
+    assert small.headers["location"] != first.headers["location"]
+    assert missing.status_code == 404
+    # Two renders (full and small width); the repeat view was served from storage
+    assert uploads_after_views - uploads_after_analyze == 2
+
+
+def test_page_of_non_pdf_original_is_not_found(client, memory_storage):
+    doc_id = "ab" * 32
+    memory_storage.upload_bytes(
+        b"PK\x03\x04 docx", content_type="application/octet-stream", key=f"documents/originals/{doc_id}"
+    )
+
+    response = client.get(f"/api/v1/documents/{doc_id}/pages/1", follow_redirects=False)
+
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Page rendering is only available for PDFs"
+
+
+def test_docx_to_html_groups_lists_and_escapes_text():
+    doc = Document()
+    for text, style in [
+        ("One", "List Bullet"),
+        ("Two", "List Bullet"),
+        ("Nested", "List Bullet 2"),
+        ("Three", "List Bullet"),
+        ("First", "List Number"),
+        ("Second", "List Number"),
+        ("a < b", None),
+    ]:
+        doc.add_paragraph(text, style=style)
+
+    content, seo_text = docx_to_html(doc)
+
+    assert content == (
+        "<ul><li>One</li><li>Two<ul><li>Nested</li></ul></li><li>Three</li></ul>"
+        "<ol><li>First</li><li>Second</li></ol>"
+        "<p>a &lt; b</p>"
+    )
+    assert "<p>Nested</p>" in seo_text
+
+
+def test_docx_to_html_converts_tables_with_merged_cells():
+    doc = Document()
+    table = doc.add_table(rows=3, cols=3)
+    table.cell(0, 0).merge(table.cell(0, 1)).text = "Wide"
+    table.cell(1, 2).merge(table.cell(2, 2)).text = "Tall"
+    table.cell(2, 0).text = "x & y"
+
+    content, seo_text = docx_to_html(doc)
+
+    assert content.startswith("<table") and content.endswith("</tbody></table>")
+    assert content.count("<tr>") == 3
+    assert content.count("<td") == 7
+    assert 'colspan="2"><p>Wide</p></td>' in content
+    assert 'rowspan="2"><p>Tall</p></td>' in content
+    assert "x &amp; y" in seo_text
+
+
+def test_docx_to_html_stores_each_image_once(tmp_path):
+    from PIL import Image
+
+    image_path = tmp_path / "dot.png"
+    Image.new("RGB", (40, 20), "red").save(image_path)
+    doc = Document()
+    doc.add_picture(str(image_path))
+    doc.add_paragraph("Between")
+    doc.add_picture(str(image_path))
+    storage = SlowStorage()
+
+    content, _ = docx_to_html(doc, storage=storage)
+
+    assert storage.calls == 1
+    sources = [part.split('"', 1)[0] for part in content.split('src="')[1:]]
+    assert len(sources) == 2 and sources[0] == sources[1]
+    assert sources[0].startswith("/uploads/documents/images/")
+    assert content.count('loading="lazy"') == 2
+
+
+def test_search_finds_indexed_documents_and_embedding_posts(client, db_session, memory_storage, auth_headers):
+    doc = Document()
+    doc.add_heading("Giải chạy Hà Nội Marathon", level=1)
+    doc.add_paragraph("Lộ trình 42km quanh Hồ Gươm, xuất phát lúc 5 giờ sáng.")
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    docx_type = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+    analyzed = client.post(
+        "/api/v1/documents/analyze",
+        files={"file": ("brochure.docx", buffer.getvalue(), docx_type)},
+        headers=auth_headers,
+    ).json()
+    assert analyzed["document_id"]
+    assert db_session.query(DocumentTerm).filter(DocumentTerm.term == "marathon").count() == 1
+
+    # Not embedded in any post yet: only the owner can find it
+    assert client.get("/api/v1/documents/search", params={"q": "ha noi"}).json()["total"] == 0
+    own = client.get("/api/v1/documents/search", params={"q": "ha noi"}, headers=auth_headers).json()
+    assert [result["id"] for result in own["documents"]] == [analyzed["document_id"]]
+
+    post = client.post(
+        "/api/v1/content/posts",
+        json={
+            "title": "Race brochure",
+            "content": f'<p>Details: <a href="{analyzed["document_url"]}">brochure</a></p>',
+            "category": "news",
+        },
+        headers=auth_headers,
+    ).json()
+    assert db_session.query(PostDocument).filter(PostDocument.post_id == post["id"]).count() == 1
+
+    found = client.get("/api/v1/documents/search", params={"q": "Hồ Gươm lộ trình"}).json()
+    assert found["total"] == 1
+    result = found["documents"][0]
+    assert result["filename"] == "brochure.docx"
+    assert "Hồ Gươm" in result["snippet"]
+    assert [p["id"] for p in result["posts"]] == [post["id"]]
+    assert [p["title"] for p in found["posts"]] == ["Race brochure"]
+
+    assert client.get("/api/v1/documents/search", params={"q": "marathon berlin"}).json()["total"] == 0
@@ -449,3 +449,45 @@ class TestCancelRegistration:
         data = response.json()
         assert "not found" in data["detail"].lower()
 
+
+class TestEventFieldProjection:
+    """Test fields= and view= on the event list"""
+    
+    def test_card_view_omits_details(self, client, test_event):
+        """Test the card preset leaves out the full description and bank details"""
+        response = client.get("/api/v1/events?view=card")
+        
+        assert response.status_code == status.HTTP_200_OK
+        event = response.json()["events"][0]
+        assert event["title"] == "Test Running Event"
+        assert event["participants_count"] == 0
+        assert event["organizer_name"] == "Test User"
+        assert "full_description" not in event
+        assert "account_number" not in event
+    
+    def test_fields_returns_only_requested_fields(self, client, test_event):
+        """Test fields= returns the requested fields plus id"""
+        response = client.get("/api/v1/events?fields=title,location")
+        
+        assert response.json()["events"] == [
+            {"id": test_event.id, "title": "Test Running Event", "location": "Test Location"}
+        ]
+
+
+class TestEventResponseMapping:
+    """Test responses built by the event mapper"""
+    
+    def test_matches_validated_response(self, client, test_event, test_user):
+        """Test the mapped response serializes like a validated EventResponse"""
+        from fastapi.encoders import jsonable_encoder
+        from app.schemas.event import EventResponse
+        
+        response = client.get(f"/api/v1/events/{test_event.id}")
+        
+        assert response.status_code == status.HTTP_200_OK
+        expected = EventResponse.model_validate({
+            **{column: getattr(test_event, column) for column in test_event.__table__.columns.keys()},
+            "organizer_name": test_user.full_name,
+            "participants_count": 0,
+        })
+        assert response.json() == jsonable_encoder(expected)
@@ -0,0 +1,111 @@
+"""
+Home page aggregate endpoint tests
+"""
+import uuid
+from datetime import datetime, timedelta
+
+from fastapi import status
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.models.blog import BlogPost
+from app.models.event import Event
+
+
+def add_event(db_session, organizer, title, date, event_status="approved"):
+    db_session.add(Event(
+        id=str(uuid.uuid4()),
+        title=title,
+        description="Event",
+        full_description="Event",
+        date=date,
+        time="06:00",
+        location="Location",
+        address="Address",
+        max_participants=100,
+        registration_deadline=date,
+        categories=["5K"],
+        status=event_status,
+        organizer_id=organizer.id,
+    ))
+
+
+def add_post(db_session, author, title, post_type=None, post_status="approved"):
+    db_session.add(BlogPost(
+        id=str(uuid.uuid4()),
+        title=title,
+        content="<p>Text</p>",
+        excerpt="Text",
+        category="training",
+        status=post_status,
+        post_type=post_type,
+        author_id=author.id,
+    ))
+
+
+class TestHome:
+    """Test the composite home page response"""
+
+    def test_aggregates_public_content(self, client, db_session, test_user):
+        """Test only upcoming approved events and approved posts are included"""
+        now = datetime.utcnow()
+        add_event(db_session, test_user, "Later", now + timedelta(days=20))
+        add_event(db_session, test_user, "Sooner", now + timedelta(days=2))
+        add_event(db_session, test_user, "Past", now - timedelta(days=2))
+        add_event(db_session, test_user, "Pending", now + timedelta(days=5), event_status="pending")
+        add_post(db_session, test_user, "Blog")
+        add_post(db_session, test_user, "Legacy blog", post_type="blog")
+        add_post(db_session, test_user, "Content", post_type="content")
+        add_post(db_session, test_user, "Draft", post_status="pending")
+        db_session.commit()
+
+        response = client.get("/api/v1/home")
+        data = response.json()
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [item["title"] for item in data["upcoming_events"]] == ["Sooner", "Later"]
+        assert data["upcoming_events"][0]["organizer_name"] == "Test User"
+        assert {item["title"] for item in data["blog_posts"]} == {"Blog", "Legacy blog"}
+        assert [item["title"] for item in data["content_posts"]] == ["Content"]
+        assert data["blog_posts"][0]["author_name"] == "Test User"
+        assert data["counts"] == {"upcoming_events": 2, "blog_posts": 2, "content_posts": 1, "users": 1}
+
+    def test_limits(self, client, db_session, test_user):
+        """Test the limits cap each list but not the counts"""
+        for index in range(3):
+            add_event(db_session, test_user, f"Event {index}", datetime.utcnow() + timedelta(days=index + 1))
+            add_post(db_session, test_user, f"Post {index}")
+        db_session.commit()
+
+        data = client.get("/api/v1/home?events_limit=1&posts_limit=2").json()
+
+        assert len(data["upcoming_events"]) == 1
+        assert len(data["blog_posts"]) == 2
+        assert data["counts"]["upcoming_events"] == 3
+
+    def test_cached_with_etag(self, client, db_session, test_user, monkeypatch):
+        """Test a repeated request is served from the cache and revalidates with 304"""
+        monkeypatch.setattr(settings, "CACHE_VERSION_CHECK_SECONDS", 3600)
+        first = client.get("/api/v1/home")
+        statements = []
+        listener = lambda *args: statements.append(args[2])  # noqa: E731
+        event.listen(db_session.get_bind(), "before_cursor_execute", listener)
+        try:
+            cached = client.get("/api/v1/home", headers={"If-None-Match": first.headers["etag"]})
+        finally:
+            event.remove(db_session.get_bind(), "before_cursor_execute", listener)
+
+        assert first.headers["cache-control"].startswith("public, ")
+        assert cached.status_code == status.HTTP_304_NOT_MODIFIED
+        assert statements == []
+
+    def test_write_invalidates(self, client, admin_headers, test_event):
+        """Test approving an event shows it on the home page"""
+        before = client.get("/api/v1/home")
+        assert before.json()["upcoming_events"] == []
+
+        client.put(f"/api/v1/admin/events/{test_event.id}/status?status_update=approved", headers=admin_headers)
+        after = client.get("/api/v1/home", headers={"If-None-Match": before.headers["etag"]})
+
+        assert after.status_code == status.HTTP_200_OK
+        assert [item["id"] for item in after.json()["upcoming_events"]] == [test_event.id]
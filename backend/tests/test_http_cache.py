@@ -0,0 +1,143 @@
+"""
+Conditional request (ETag / Last-Modified) tests
+"""
+from datetime import datetime
+
+from fastapi import status
+from sqlalchemy import update
+
+from app.core.cache import EVENTS, mark_changed, response_cache
+from app.models.event import Event
+from app.models.image import ImageAsset
+
+
+class TestPostConditionalRequests:
+    """Test ETag handling of blog post details and lists"""
+
+    def test_detail_not_modified(self, client, test_blog_post):
+        """Test a matching If-None-Match is answered 304 with the validators"""
+        response = client.get(f"/api/v1/blog/posts/{test_blog_post.id}")
+        etag = response.headers["etag"]
+
+        cached = client.get(f"/api/v1/blog/posts/{test_blog_post.id}", headers={"If-None-Match": etag})
+
+        assert cached.status_code == status.HTTP_304_NOT_MODIFIED
+        assert cached.content == b""
+        assert cached.headers["etag"] == etag
+
+    def test_like_changes_etag(self, client, auth_headers, test_blog_post):
+        """Test a like makes the cached copy stale"""
+        etag = client.get(f"/api/v1/blog/posts/{test_blog_post.id}").headers["etag"]
+        client.post(f"/api/v1/blog/posts/{test_blog_post.id}/like", headers=auth_headers)
+
+        response = client.get(f"/api/v1/blog/posts/{test_blog_post.id}", headers={"If-None-Match": etag})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["likes_count"] == 1
+        assert response.headers["etag"] != etag
+
+    def test_if_modified_since(self, client, test_blog_post):
+        """Test If-Modified-Since is compared with Last-Modified"""
+        last_modified = client.get(f"/api/v1/blog/posts/{test_blog_post.id}").headers["last-modified"]
+
+        cached = client.get(f"/api/v1/blog/posts/{test_blog_post.id}", headers={"If-Modified-Since": last_modified})
+        stale = client.get(
+            f"/api/v1/blog/posts/{test_blog_post.id}",
+            headers={"If-Modified-Since": "Mon, 01 Jan 2001 00:00:00 GMT"},
+        )
+
+        assert cached.status_code == status.HTTP_304_NOT_MODIFIED
+        assert stale.status_code == status.HTTP_200_OK
+
+    def test_cache_control(self, client, admin_headers, test_blog_post):
+        """Test only approved posts are publicly cacheable"""
+        pending = client.get(f"/api/v1/blog/posts/{test_blog_post.id}")
+        client.put(f"/api/v1/admin/posts/{test_blog_post.id}/status?status_update=approved", headers=admin_headers)
+        approved = client.get(f"/api/v1/blog/posts/{test_blog_post.id}")
+
+        assert pending.headers["cache-control"] == "private, no-cache"
+        assert approved.headers["cache-control"].startswith("public, ")
+        assert "stale-while-revalidate=" in approved.headers["cache-control"]
+        assert approved.headers["etag"] != pending.headers["etag"]
+
+    def test_list_changes_with_new_post(self, client, auth_headers, test_blog_post):
+        """Test the list ETag changes when a matching post is added"""
+        url = "/api/v1/blog/posts?status_filter=pending"
+        etag = client.get(url).headers["etag"]
+        assert client.get(url, headers={"If-None-Match": etag}).status_code == status.HTTP_304_NOT_MODIFIED
+
+        client.post(
+            "/api/v1/blog/posts",
+            headers=auth_headers,
+            json={"title": "Another post", "content": "<p>Text</p>", "category": "training"},
+        )
+        response = client.get(url, headers={"If-None-Match": etag})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["total"] == 2
+
+
+class TestEventConditionalRequests:
+    """Test ETag handling of event details and lists"""
+
+    def test_registration_changes_etag(self, client, auth_headers, db_session, test_event):
+        """Test a registration makes the cached detail and list stale"""
+        test_event.status = "approved"
+        db_session.commit()
+        detail = client.get(f"/api/v1/events/{test_event.id}")
+        listing = client.get("/api/v1/events")
+        assert client.get(
+            f"/api/v1/events/{test_event.id}", headers={"If-None-Match": detail.headers["etag"]}
+        ).status_code == status.HTTP_304_NOT_MODIFIED
+
+        client.post("/api/v1/events/register", headers=auth_headers, json={"event_id": test_event.id, "category": "5K"})
+
+        detail_after = client.get(f"/api/v1/events/{test_event.id}", headers={"If-None-Match": detail.headers["etag"]})
+        listing_after = client.get("/api/v1/events", headers={"If-None-Match": listing.headers["etag"]})
+        assert detail_after.status_code == status.HTTP_200_OK
+        assert detail_after.json()["participants_count"] == 1
+        assert listing_after.status_code == status.HTTP_200_OK
+
+    def test_edit_within_the_same_second_changes_etag(self, client, db_session, test_event):
+        """Test the write's cache version changes the ETags when the timestamps can't"""
+        edited_at = datetime(2026, 1, 1, 12, 0, 0)
+        db_session.execute(update(Event).where(Event.id == test_event.id).values(updated_at=edited_at))
+        db_session.commit()
+        detail = client.get(f"/api/v1/events/{test_event.id}").headers["etag"]
+        listing = client.get("/api/v1/events").headers["etag"]
+
+        db_session.execute(
+            update(Event).where(Event.id == test_event.id).values(title="Renamed", updated_at=edited_at)
+        )
+        mark_changed(db_session, EVENTS)
+        db_session.commit()
+
+        detail_after = client.get(f"/api/v1/events/{test_event.id}", headers={"If-None-Match": detail})
+        listing_after = client.get("/api/v1/events", headers={"If-None-Match": listing})
+        assert detail_after.status_code == status.HTTP_200_OK
+        assert detail_after.json()["title"] == "Renamed"
+        assert listing_after.status_code == status.HTTP_200_OK
+
+    def test_ingested_image_changes_etag(self, client, db_session, test_event):
+        """Test variants appearing for the cover image make the cached detail stale"""
+        digest = "c" * 64
+        test_event.image_url = f"/uploads/images/{digest}/hero.webp"
+        db_session.commit()
+        etag = client.get(f"/api/v1/events/{test_event.id}").headers["etag"]
+
+        db_session.add(ImageAsset(
+            id=digest, width=1600, height=900, thumbnail_url=f"/uploads/images/{digest}/thumbnail.webp",
+            card_url=f"/uploads/images/{digest}/card.webp", hero_url=test_event.image_url, placeholder="data:,",
+        ))
+        db_session.commit()
+        response_cache.clear()
+        response = client.get(f"/api/v1/events/{test_event.id}", headers={"If-None-Match": etag})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["image"]["hero_url"] == test_event.image_url
+
+    def test_missing_event(self, client):
+        """Test an unknown event is still 404"""
+        response = client.get("/api/v1/events/missing", headers={"If-None-Match": "*"})
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -0,0 +1,157 @@
+"""
+Cover image ingestion tests
+
+Uploads are resized into WebP variants that post and event responses expose.
+"""
+import io
+
+import pytest
+from fastapi import status
+from PIL import Image
+
+from app.core.config import _default_workers, settings
+from app.models.cache import CacheVersion
+from app.services.images import VARIANT_WIDTHS, build_variants
+from app.services.images import variants as variants_module
+from app.services.storage import MemoryStorageBackend, R2StorageService, known_objects, set_storage_backend
+
+
+def make_jpeg(width: int, height: int) -> bytes:
+    image = Image.linear_gradient("L").resize((width, height)).convert("RGB")
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def memory_storage(monkeypatch):
+    monkeypatch.setattr(settings, "IMAGE_WORKERS", 0)
+    backend = MemoryStorageBackend(base_url="/uploads")
+    set_storage_backend(backend)
+    yield backend
+    set_storage_backend(None)
+
+
+def image_keys(storage: MemoryStorageBackend):
+    return sorted(key for key in storage._objects if key.startswith("images/"))
+
+
+def test_build_variants_downscales_from_one_decode():
+    variants = build_variants(make_jpeg(3000, 2000))
+
+    assert (variants.width, variants.height) == (1600, 1067)
+    for name, width in VARIANT_WIDTHS.items():
+        with Image.open(io.BytesIO(variants.images[name])) as image:
+            assert image.format == "WEBP"
+            assert image.width == width
+    assert variants.placeholder.startswith("data:image/webp;base64,")
+    assert len(variants.placeholder) < 500
+
+
+def test_build_variants_never_upscales():
+    variants = build_variants(make_jpeg(200, 100))
+
+    assert (variants.width, variants.height) == (200, 100)
+    for data in variants.images.values():
+        with Image.open(io.BytesIO(data)) as image:
+            assert image.size == (200, 100)
+
+
+def test_upload_image_stores_variants_once(client, auth_headers, db_session, memory_storage):
+    data = make_jpeg(1200, 800)
+
+    first = client.post("/api/v1/images", files={"file": ("cover.jpg", data, "image/jpeg")}, headers=auth_headers)
+    second = client.post("/api/v1/images", files={"file": ("cover.jpg", data, "image/jpeg")}, headers=auth_headers)
+
+    assert first.status_code == status.HTTP_201_CREATED
+    body = first.json()
+    assert body == second.json()
+    assert body["url"] == body["hero_url"]
+    assert body["thumbnail_url"] == f"/uploads/images/{body['id']}/thumbnail.webp"
+    assert (body["width"], body["height"]) == (1200, 800)
+    assert len(image_keys(memory_storage)) == len(VARIANT_WIDTHS)
+    # Ingesting (once) invalidates posts and events already pointing at the URLs
+    versions = dict(db_session.query(CacheVersion.tag, CacheVersion.version).all())
+    assert versions == {"events": 1, "posts": 1}
+
+
+def test_upload_image_rejects_invalid_files(client, auth_headers, memory_storage):
+    response = client.post(
+        "/api/v1/images", files={"file": ("cover.jpg", b"not an image", "image/jpeg")}, headers=auth_headers
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    response = client.post("/api/v1/images", files={"file": ("cover.jpg", make_jpeg(10, 10), "image/jpeg")})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert image_keys(memory_storage) == []
+
+
+def test_listings_include_image_variants(client, auth_headers, db_session, test_blog_post, test_event, memory_storage):
+    body = client.post(
+        "/api/v1/images", files={"file": ("cover.jpg", make_jpeg(800, 600), "image/jpeg")}, headers=auth_headers
+    ).json()
+    test_blog_post.status = "approved"
+    test_blog_post.image_url = body["url"]
+    test_event.image_url = body["url"]
+    db_session.commit()
+
+    post = client.get("/api/v1/blog/posts").json()["posts"][0]
+    event = client.get("/api/v1/events").json()["events"][0]
+    detail = client.get(f"/api/v1/events/{test_event.id}").json()
+
+    assert post["image"]["thumbnail_url"] == body["thumbnail_url"]
+    assert event["image"]["placeholder"] == body["placeholder"]
+    assert detail["image"]["card_url"] == body["card_url"]
+
+
+def test_external_image_urls_have_no_variants(client, db_session, test_blog_post):
+    test_blog_post.status = "approved"
+    test_blog_post.image_url = "https://example.com/cover.jpg"
+    db_session.commit()
+
+    post = client.get(f"/api/v1/blog/posts/{test_blog_post.id}").json()
+
+    assert post["image_url"] == "https://example.com/cover.jpg"
+    assert post["image"] is None
+
+
+def test_upload_image_to_r2(client, auth_headers, r2_client, monkeypatch):
+    monkeypatch.setattr(settings, "IMAGE_WORKERS", 0)
+    known_objects.clear()
+    set_storage_backend(R2StorageService(client=r2_client))
+    try:
+        response = client.post(
+            "/api/v1/images", files={"file": ("cover.jpg", make_jpeg(400, 300), "image/jpeg")}, headers=auth_headers
+        )
+    finally:
+        set_storage_backend(None)
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.json()["thumbnail_url"].startswith("https://cdn.example.com/images/")
+    assert len(r2_client.upload_calls) == len(VARIANT_WIDTHS)
+
+
+def test_upload_image_falls_back_to_thread_without_process_pool(client, auth_headers, memory_storage, monkeypatch):
+    def unavailable(*_args, **_kwargs):
+        raise OSError(38, "Function not implemented")
+
+    monkeypatch.setattr(settings, "IMAGE_WORKERS", 2)
+    monkeypatch.setattr(variants_module, "_pool", None)
+    monkeypatch.setattr(variants_module, "_pool_unavailable", False)
+    monkeypatch.setattr(variants_module, "ProcessPoolExecutor", unavailable)
+
+    response = client.post(
+        "/api/v1/images", files={"file": ("cover.jpg", make_jpeg(400, 300), "image/jpeg")}, headers=auth_headers
+    )
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert len(image_keys(memory_storage)) == len(VARIANT_WIDTHS)
+    assert variants_module._pool_unavailable
+
+
+def test_worker_pools_are_off_by_default_on_vercel(monkeypatch):
+    monkeypatch.setenv("VERCEL", "1")
+    assert _default_workers(4) == "0"
+
+    monkeypatch.delenv("VERCEL")
+    assert int(_default_workers(4)) >= 1
@@ -0,0 +1,162 @@
+"""
+Post content processing tests
+
+Inline base64 images are moved to storage and reading metadata is computed
+when posts are saved.
+"""
+import base64
+import io
+import uuid
+
+import pytest
+from fastapi import status
+from PIL import Image
+
+from app.models.blog import BlogPost
+from app.services.posts import (
+    backfill_post_metadata,
+    compute_post_metadata,
+    offload_inline_images,
+    offload_post_images,
+)
+from app.services.storage import MemoryStorageBackend, set_storage_backend
+
+
+def data_url(color: str) -> str:
+    buffer = io.BytesIO()
+    Image.new("RGB", (8, 8), color).save(buffer, format="PNG")
+    return "data:image/png;base64," + base64.b64encode(buffer.getvalue()).decode()
+
+
+@pytest.fixture
+def memory_storage():
+    backend = MemoryStorageBackend(base_url="/uploads")
+    set_storage_backend(backend)
+    yield backend
+    set_storage_backend(None)
+
+
+def stored_keys(storage: MemoryStorageBackend):
+    return [key for key in storage._objects if key.startswith("posts/images/")]
+
+
+def test_create_post_moves_inline_images_to_storage(client, auth_headers, memory_storage):
+    image = data_url("red")
+    content = f'<p>Route</p><img src="{image}" alt="a" /><img src=\'{image}\' alt="b" />'
+
+    response = client.post(
+        "/api/v1/content/posts",
+        json={"title": "Inline images", "content": content, "category": "training"},
+        headers=auth_headers,
+    )
+
+    assert response.status_code == status.HTTP_201_CREATED
+    saved = response.json()["content"]
+    assert "data:image" not in saved
+    assert len(stored_keys(memory_storage)) == 1
+    url = memory_storage.url_for(stored_keys(memory_storage)[0])
+    assert saved == f'<p>Route</p><img src="{url}" alt="a" /><img src=\'{url}\' alt="b" />'
+
+
+def test_update_post_moves_inline_images_to_storage(client, auth_headers, test_blog_post, memory_storage):
+    response = client.put(
+        f"/api/v1/blog/posts/{test_blog_post.id}",
+        json={"content": f'<img src="{data_url("blue")}" />'},
+        headers=auth_headers,
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["content"].startswith('<img src="/uploads/posts/images/')
+
+
+def test_undecodable_inline_image_is_kept():
+    storage = MemoryStorageBackend(base_url="/uploads")
+    content = '<img src="data:image/png;base64,abc" />'
+
+    result = offload_inline_images(content, storage)
+
+    assert result.content == content
+    assert result.images == 0
+    assert stored_keys(storage) == []
+
+
+def test_offload_post_images_rewrites_existing_posts(db_session, test_user):
+    storage = MemoryStorageBackend(base_url="/uploads")
+    for index in range(5):
+        db_session.add(BlogPost(
+            id=str(uuid.uuid4()),
+            title=f"Post {index}",
+            content=f'<img src="{data_url("green")}" /><p>{index}</p>',
+            category="training",
+            author_id=test_user.id,
+        ))
+    db_session.add(BlogPost(
+        id=str(uuid.uuid4()), title="Plain", content="<p>No images</p>", category="training", author_id=test_user.id,
+    ))
+    db_session.commit()
+
+    dry_run = offload_post_images(db_session, storage, batch_size=2, dry_run=True)
+    assert dry_run["updated"] == 5
+    assert stored_keys(storage) == []
+    assert db_session.query(BlogPost).filter(BlogPost.content.like("%data:image/%")).count() == 5
+
+    stats = offload_post_images(db_session, storage, batch_size=2)
+
+    assert (stats["posts"], stats["updated"], stats["images"]) == (5, 5, 5)
+    assert stats["bytes_saved"] > 0
+    assert len(stored_keys(storage)) == 1
+    assert db_session.query(BlogPost).filter(BlogPost.content.like("%data:image/%")).count() == 0
+
+
+def test_compute_post_metadata_reads_text_not_markup():
+    body = " ".join(f"word{index}" for index in range(450))
+    content = (
+        '<h2>Hà Nội &amp; Huế</h2><img src="data:image/png;base64,AAAA" />'
+        '<script>var hidden = 1;</script>'
+        f'<p><img src="/uploads/a.webp" alt="" />{body}</p><img src="/uploads/b.webp" />'
+    )
+
+    metadata = compute_post_metadata(content)
+
+    assert metadata.word_count == 453
+    assert metadata.reading_minutes == 3
+    assert metadata.first_image_url == "/uploads/a.webp"
+    assert metadata.excerpt.startswith("Hà Nội & Huế word0 word1")
+    assert metadata.excerpt.endswith("...")
+    assert "<" not in metadata.excerpt and "hidden" not in metadata.excerpt
+    # Cut at a word boundary
+    assert metadata.excerpt[:-3].split()[-1].startswith("word")
+    assert len(metadata.excerpt) <= 203
+
+
+def test_create_post_stores_reading_metadata(client, auth_headers, db_session):
+    response = client.post(
+        "/api/v1/blog/posts",
+        json={"title": "Long run", "content": "<p>Easy <strong>pace</strong> today</p>", "category": "training"},
+        headers=auth_headers,
+    )
+
+    post = response.json()
+    assert (post["excerpt"], post["word_count"], post["reading_minutes"]) == ("Easy pace today", 3, 1)
+    assert post["first_image_url"] is None
+
+
+def test_backfill_post_metadata_fills_missing_rows(db_session, test_user):
+    for index in range(3):
+        db_session.add(BlogPost(
+            id=str(uuid.uuid4()),
+            title=f"Post {index}",
+            content=f"<p>Run {index} <img src='/uploads/{index}.webp'></p>",
+            category="training",
+            author_id=test_user.id,
+        ))
+    db_session.commit()
+
+    stats = backfill_post_metadata(db_session, batch_size=2)
+
+    assert stats == {"posts": 3}
+    posts = db_session.query(BlogPost).order_by(BlogPost.title).all()
+    assert [(post.excerpt, post.word_count, post.first_image_url) for post in posts] == [
+        (f"Run {index}", 2, f"/uploads/{index}.webp") for index in range(3)
+    ]
+    assert backfill_post_metadata(db_session) == {"posts": 0}
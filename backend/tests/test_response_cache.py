@@ -0,0 +1,313 @@
+"""
+Response cache and single-flight tests
+"""
+import asyncio
+import threading
+
+from fastapi import status
+from sqlalchemy import event
+
+from app.api.v1.endpoints import blog as blog_endpoint
+from app.api.v1.endpoints import events as events_endpoint
+from app.core import cache
+from app.core.cache import CachedResponse, TTLCache, cached_load, invalidate, response_cache
+from app.core.http_cache import make_validators
+from app.core.config import settings
+from app.core.singleflight import SingleFlight
+from app.models.cache import CacheVersion
+from app.models.event import EventRegistration
+
+
+class TestTTLCache:
+    """Test the LRU/TTL/tag behaviour"""
+
+    def test_evicts_least_recently_used(self):
+        """Test the oldest unused entry goes first"""
+        store = TTLCache(max_entries=2, ttl=60)
+        store.set("a", 1)
+        store.set("b", 2)
+        store.get("a")
+        store.set("c", 3)
+
+        assert store.get("a") == 1
+        assert store.get("b") is None
+        assert store.metrics()["evictions"] == 1
+
+    def test_expires_after_ttl(self, monkeypatch):
+        """Test entries are misses once their TTL passes"""
+        now = [1000.0]
+        monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+        store = TTLCache(max_entries=10, ttl=30)
+        store.set("a", 1)
+
+        now[0] += 29
+        assert store.get("a") == 1
+        now[0] += 2
+        assert store.get("a") is None
+        assert store.metrics()["expired"] == 1
+
+    def test_invalidate_by_tag(self):
+        """Test invalidation only drops entries with the tag"""
+        store = TTLCache(max_entries=10, ttl=60)
+        store.set("posts", 1, tags=("posts", "users"))
+        store.set("events", 2, tags=("events", "users"))
+
+        assert store.invalidate("posts") == 1
+        assert store.get("posts") is None
+        assert store.get("events") == 2
+        assert store.invalidate("users") == 1
+        assert store.metrics()["entries"] == 0
+
+
+class TestCachedLists:
+    """Test list endpoints served from the cache"""
+
+    def test_repeated_list_skips_database(self, client, db_session, test_event, monkeypatch):
+        """Test a second identical request runs no queries"""
+        monkeypatch.setattr(settings, "CACHE_VERSION_CHECK_SECONDS", 3600)
+        first = client.get("/api/v1/events?view=card")
+        statements = []
+        listener = lambda *args: statements.append(args[2])  # noqa: E731
+        event.listen(db_session.get_bind(), "before_cursor_execute", listener)
+        try:
+            second = client.get("/api/v1/events?view=card")
+            not_modified = client.get("/api/v1/events?view=card", headers={"If-None-Match": first.headers["etag"]})
+        finally:
+            event.remove(db_session.get_bind(), "before_cursor_execute", listener)
+
+        assert second.json() == first.json()
+        assert second.headers["etag"] == first.headers["etag"]
+        assert not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+        assert statements == []
+        assert response_cache.metrics()["hits"] >= 2
+
+    def test_write_invalidates_list(self, client, auth_headers, test_blog_post):
+        """Test creating a post drops the cached post lists"""
+        url = "/api/v1/blog/posts?status_filter=pending"
+        assert client.get(url).json()["total"] == 1
+
+        client.post(
+            "/api/v1/blog/posts",
+            headers=auth_headers,
+            json={"title": "Another post", "content": "<p>Text</p>", "category": "training"},
+        )
+
+        assert client.get(url).json()["total"] == 2
+
+    def test_admin_status_change_invalidates_list(self, client, admin_headers, test_event):
+        """Test approving an event drops the cached event lists"""
+        assert client.get("/api/v1/events").json()["events"][0]["status"] == "pending"
+
+        client.put(f"/api/v1/admin/events/{test_event.id}/status?status_update=approved", headers=admin_headers)
+
+        assert client.get("/api/v1/events").json()["events"][0]["status"] == "approved"
+
+    def test_metrics_endpoint(self, client, admin_headers, auth_headers):
+        """Test admins can read and clear the cache metrics"""
+        client.get("/api/v1/events")
+
+        metrics = client.get("/api/v1/admin/cache", headers=admin_headers)
+        forbidden = client.get("/api/v1/admin/cache", headers=auth_headers)
+        cleared = client.delete("/api/v1/admin/cache", headers=admin_headers)
+
+        assert metrics.status_code == status.HTTP_200_OK
+        assert metrics.json()["misses"] >= 1
+        assert metrics.json()["entries"] == 1
+        assert forbidden.status_code == status.HTTP_403_FORBIDDEN
+        assert cleared.status_code == status.HTTP_200_OK
+        assert response_cache.metrics()["entries"] == 0
+
+
+class TestConditionalMisses:
+    """Test conditional requests that miss the cache"""
+
+    def test_list_not_modified_without_building_body(self, client, test_event, monkeypatch):
+        """Test a current ETag is answered 304 from the validators alone"""
+        etag = client.get("/api/v1/events").headers["etag"]
+        response_cache.clear()
+
+        def fail(*args, **kwargs):
+            raise AssertionError("body was built")
+
+        monkeypatch.setattr(events_endpoint, "serialize_events", fail)
+        response = client.get("/api/v1/events", headers={"If-None-Match": etag})
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response_cache.metrics()["entries"] == 0
+
+    def test_detail_not_modified_without_building_body(self, client, test_blog_post, monkeypatch):
+        """Test a detail's 304 skips the load, and a stale ETag still gets the body"""
+        etag = client.get(f"/api/v1/blog/posts/{test_blog_post.id}").headers["etag"]
+        response_cache.clear()
+
+        def fail(*args, **kwargs):
+            raise AssertionError("body was built")
+
+        monkeypatch.setattr(blog_endpoint, "post_response", fail)
+        cached = client.get(f"/api/v1/blog/posts/{test_blog_post.id}", headers={"If-None-Match": etag})
+        monkeypatch.undo()
+        stale = client.get(f"/api/v1/blog/posts/{test_blog_post.id}", headers={"If-None-Match": 'W/"old"'})
+        missing = client.get("/api/v1/blog/posts/missing", headers={"If-None-Match": etag})
+
+        assert cached.status_code == status.HTTP_304_NOT_MODIFIED
+        assert stale.status_code == status.HTTP_200_OK
+        assert stale.json()["title"] == "Test Blog Post"
+        assert missing.status_code == status.HTTP_404_NOT_FOUND
+
+
+class TestSingleFlight:
+    """Test collapsing of concurrent identical loads"""
+
+    async def test_concurrent_calls_share_one_load(self):
+        """Test only the first caller of a key runs the load"""
+        flight = SingleFlight()
+        calls = []
+
+        async def load():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "result"
+
+        results = await asyncio.gather(*(flight.do("key", load) for _ in range(20)))
+
+        assert results == ["result"] * 20
+        assert len(calls) == 1
+        assert flight.metrics() == {"flights": 1, "collapsed": 19, "in_flight": 0}
+
+    async def test_exception_reaches_every_caller(self):
+        """Test a failed load fails all waiting callers and isn't remembered"""
+        flight = SingleFlight()
+
+        async def load():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("boom")
+
+        results = await asyncio.gather(*(flight.do("key", load) for _ in range(3)), return_exceptions=True)
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert flight.metrics()["in_flight"] == 0
+
+    async def test_cached_load_runs_blocking_load_once(self, db_session):
+        """Test concurrent misses of a key run one load in a worker thread"""
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def load(db):
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return CachedResponse(b"{}", make_validators("test"))
+
+        waiting = [
+            asyncio.ensure_future(cached_load(db_session, ("test", "burst"), load, tags=("test",)))
+            for _ in range(10)
+        ]
+        await asyncio.to_thread(started.wait, 5)
+        release.set()
+        responses = await asyncio.gather(*waiting)
+
+        assert len(calls) == 1
+        assert all(response is responses[0] for response in responses)
+        assert response_cache.get(("test", "burst")) is responses[0]
+        invalidate("test")
+
+    async def test_load_started_before_invalidation_is_not_stored(self, db_session):
+        """Test a write during a load keeps its stale result out of the cache"""
+        release = threading.Event()
+
+        def stale(db):
+            release.wait(5)
+            return CachedResponse(b"old", make_validators("old"))
+
+        def fresh(db):
+            return CachedResponse(b"new", make_validators("new"))
+
+        before = asyncio.ensure_future(cached_load(db_session, ("test", "race"), stale, tags=("test",)))
+        await asyncio.sleep(0.01)
+        invalidate("test")
+        after = await cached_load(db_session, ("test", "race"), fresh, tags=("test",))
+        release.set()
+
+        assert (await before).body == b"old"
+        assert after.body == b"new"
+        assert response_cache.get(("test", "race")).body == b"new"
+        invalidate("test")
+
+
+    async def test_load_survives_cancelled_first_request(self, db_session):
+        """Test the shared load runs on its own session, so cancelling the request that started it is harmless"""
+        started = threading.Event()
+        release = threading.Event()
+        sessions = []
+
+        def load(db):
+            sessions.append(db)
+            started.set()
+            release.wait(5)
+            return CachedResponse(str(db.query(CacheVersion).count()).encode(), make_validators("test"))
+
+        first = asyncio.ensure_future(cached_load(db_session, ("test", "cancel"), load, tags=("test",)))
+        second = asyncio.ensure_future(cached_load(db_session, ("test", "cancel"), load, tags=("test",)))
+        await asyncio.to_thread(started.wait, 5)
+        first.cancel()
+        release.set()
+
+        assert (await second).body == b"0"
+        assert first.cancelled()
+        assert len(sessions) == 1
+        assert sessions[0] is not db_session
+        assert not sessions[0].in_transaction()
+        invalidate("test")
+
+
+class TestCacheVersions:
+    """Test cross-instance invalidation through cache_versions"""
+
+    def test_write_bumps_version_on_commit(self, client, auth_headers, db_session, test_blog_post):
+        """Test a write bumps its tag's version in the database"""
+        client.post(f"/api/v1/blog/posts/{test_blog_post.id}/like", headers=auth_headers)
+        client.post(f"/api/v1/blog/posts/{test_blog_post.id}/like", headers=auth_headers)
+
+        versions = dict(db_session.query(CacheVersion.tag, CacheVersion.version).all())
+        assert versions["posts"] == 2
+        assert "events" not in versions
+
+    def test_registration_review_bumps_events_version(self, client, admin_headers, db_session, test_event, test_user):
+        """Test approving and rejecting a registration invalidate the event responses"""
+        for registration_id in ("to-approve", "to-reject"):
+            db_session.add(EventRegistration(
+                id=registration_id, event_id=test_event.id, user_id=test_user.id, category="5K"
+            ))
+        db_session.commit()
+
+        client.put("/api/v1/admin/registrations/to-approve/approve", headers=admin_headers)
+        client.put(
+            "/api/v1/admin/registrations/to-reject/reject", headers=admin_headers, json={"reasons": ["Full"]}
+        )
+
+        versions = dict(db_session.query(CacheVersion.tag, CacheVersion.version).all())
+        assert versions["events"] == 2
+
+    def test_rollback_keeps_local_cache(self, client, db_session, test_event):
+        """Test a rolled back write neither bumps the version nor drops entries"""
+        client.get("/api/v1/events")
+        entries = response_cache.metrics()["entries"]
+
+        cache.mark_changed(db_session, cache.EVENTS)
+        db_session.rollback()
+
+        assert response_cache.metrics()["entries"] == entries
+        assert db_session.query(CacheVersion).count() == 0
+
+    def test_other_instance_write_is_picked_up(self, client, db_session, test_event, monkeypatch):
+        """Test a version bumped elsewhere drops the cached responses of its tag"""
+        monkeypatch.setattr(settings, "CACHE_VERSION_CHECK_SECONDS", 0)
+        assert client.get("/api/v1/events").json()["events"][0]["title"] == "Test Running Event"
+
+        # Another instance renames the event: it bumps the version, but this instance's cache isn't told
+        test_event.title = "Renamed Event"
+        db_session.add(CacheVersion(tag=cache.EVENTS, version=41))
+        db_session.commit()
+
+        assert client.get("/api/v1/events").json()["events"][0]["title"] == "Renamed Event"
@@ -1,52 +1,31 @@
 """
-Tests for the Cloudflare R2 storage helpers.
+Tests for the storage backends (Cloudflare R2, local filesystem, in-memory).
 """
 from __future__ import annotations
 
-from typing import Any, Dict
+import asyncio
+import hashlib
+import threading
 
 import pytest
-from botocore.exceptions import ClientError
 
 from app.core.config import settings
-from app.services.storage import R2StorageService, StorageError
-
-
-class DummyClient:
-    """Minimal S3-compatible stub for tests."""
-
-    def __init__(self, fail_upload: bool = False):
-        self.fail_upload = fail_upload
-        self.upload_calls: list[Dict[str, Any]] = []
-
-    def upload_fileobj(self, file_obj, bucket, key, ExtraArgs):
-        if self.fail_upload:
-            raise ClientError({"Error": {"Code": "500", "Message": "boom"}}, "upload_fileobj")
-        payload = file_obj.read()
-        self.upload_calls.append(
-            {
-                "bucket": bucket,
-                "key": key,
-                "content_type": ExtraArgs.get("ContentType"),
-                "payload": payload,
-            }
-        )
-
-    def generate_presigned_url(self, *_args, **_kwargs):
-        return "https://example.com/signed"
-
-
-def _patch_r2_settings(monkeypatch):
-    monkeypatch.setattr(settings, "CLOUDFLARE_R2_BUCKET", "test-bucket", raising=False)
-    monkeypatch.setattr(settings, "CLOUDFLARE_R2_ENDPOINT", "https://example.com", raising=False)
-    monkeypatch.setattr(settings, "CLOUDFLARE_R2_PUBLIC_DOMAIN", "https://cdn.example.com", raising=False)
-    monkeypatch.setattr(settings, "CLOUDFLARE_R2_ACCESS_KEY_ID", "dummy", raising=False)
-    monkeypatch.setattr(settings, "CLOUDFLARE_R2_SECRET_ACCESS_KEY", "dummy", raising=False)
+from app.services.storage import r2 as r2_module
+from app.services.storage import (
+    IMMUTABLE_CACHE_CONTROL,
+    LocalStorageBackend,
+    MemoryStorageBackend,
+    R2StorageService,
+    StorageError,
+    StorageObjectNotFound,
+    StorageSizeLimitError,
+    known_objects,
+    set_storage_backend,
+)
 
 
-def test_upload_bytes_returns_metadata(monkeypatch):
-    _patch_r2_settings(monkeypatch)
-    service = R2StorageService(client=DummyClient())
+def test_upload_bytes_returns_metadata(r2_client):
+    service = R2StorageService(client=r2_client)
 
     result = service.upload_bytes(b"hello world", content_type="application/pdf", prefix="docs")
 
@@ -54,11 +33,239 @@ def test_upload_bytes_returns_metadata(monkeypatch):
     assert result.url.startswith("https://cdn.example.com/docs/")
 
 
-def test_upload_bytes_raises_storage_error(monkeypatch):
-    _patch_r2_settings(monkeypatch)
-    service = R2StorageService(client=DummyClient(fail_upload=True))
+def test_upload_bytes_raises_storage_error(r2_client):
+    r2_client.fail_upload = True
+    service = R2StorageService(client=r2_client)
 
     with pytest.raises(StorageError):
         service.upload_bytes(b"boom", content_type="application/pdf")
 
 
+def _use_small_parts(monkeypatch, part_size: int = 4):
+    monkeypatch.setattr(r2_module, "MIN_PART_SIZE", 1)
+    monkeypatch.setattr(settings, "R2_MULTIPART_PART_SIZE", part_size, raising=False)
+    monkeypatch.setattr(settings, "R2_MULTIPART_CONCURRENCY", 2, raising=False)
+
+
+async def _chunks(*parts: bytes):
+    for part in parts:
+        yield part
+
+
+def test_upload_path_streams_small_file_in_one_request(tmp_path, r2_client):
+    service = R2StorageService(client=r2_client)
+    source = tmp_path / "doc.pdf"
+    source.write_bytes(b"small pdf")
+
+    result = service.upload_path(str(source), content_type="application/pdf", prefix="docs")
+
+    assert result.size == 9
+    assert result.checksum == hashlib.sha256(b"small pdf").hexdigest()
+    assert r2_client.upload_calls[0]["payload"] == b"small pdf"
+    assert r2_client.completed == []
+
+
+async def test_upload_chunks_uses_multipart_for_large_payloads(monkeypatch, r2_client):
+    _use_small_parts(monkeypatch)
+    service = R2StorageService(client=r2_client)
+
+    result = await service.upload_chunks(
+        _chunks(b"abc", b"defgh", b"ijklm"), content_type="application/pdf", prefix="docs"
+    )
+
+    assert result.size == 13
+    assert result.checksum == hashlib.sha256(b"abcdefghijklm").hexdigest()
+    assert [part["PartNumber"] for part in r2_client.completed[0]["parts"]] == [1, 2, 3, 4]
+    assert b"".join(r2_client.parts[n] for n in sorted(r2_client.parts)) == b"abcdefghijklm"
+
+
+async def test_upload_chunks_enforces_max_bytes(monkeypatch, r2_client):
+    _use_small_parts(monkeypatch)
+    service = R2StorageService(client=r2_client)
+
+    with pytest.raises(StorageSizeLimitError):
+        await service.upload_chunks(
+            _chunks(b"abcd", b"efgh", b"ijkl"), content_type="application/pdf", max_bytes=10
+        )
+
+    assert r2_client.aborted == ["upload-1"]
+    assert r2_client.completed == []
+
+
+async def test_upload_chunks_aborts_when_a_part_fails(monkeypatch, r2_client):
+    _use_small_parts(monkeypatch)
+    r2_client.fail_upload = True
+    service = R2StorageService(client=r2_client)
+
+    with pytest.raises(StorageError):
+        await service.upload_chunks(_chunks(b"abcdefghij"), content_type="application/pdf")
+
+    assert r2_client.aborted == ["upload-1"]
+
+
+async def test_upload_chunks_aborts_off_the_event_loop_when_cancelled(monkeypatch, r2_client):
+    _use_small_parts(monkeypatch)
+    aborted_on = []
+    abort_multipart_upload = r2_client.abort_multipart_upload
+
+    def recording_abort(**kwargs):
+        aborted_on.append(threading.get_ident())
+        abort_multipart_upload(**kwargs)
+
+    monkeypatch.setattr(r2_client, "abort_multipart_upload", recording_abort)
+    service = R2StorageService(client=r2_client)
+    started = asyncio.Event()
+
+    async def stalled_chunks():
+        yield b"abcdefgh"
+        started.set()
+        await asyncio.Event().wait()
+
+    upload = asyncio.ensure_future(service.upload_chunks(stalled_chunks(), content_type="application/pdf"))
+    await started.wait()
+    upload.cancel()
+
+    with pytest.raises(asyncio.CancelledError):
+        await upload
+
+    assert r2_client.aborted == ["upload-1"]
+    assert aborted_on and aborted_on[0] != threading.get_ident()
+
+
+def test_content_addressed_upload_skips_existing_objects(r2_client):
+    known_objects.clear()
+    service = R2StorageService(client=r2_client)
+
+    first = service.upload_bytes(b"page", content_type="image/png", prefix="previews", content_addressed=True)
+    known_objects.clear()  # force the second upload to go through HEAD
+    second = service.upload_bytes(b"page", content_type="image/png", prefix="previews", content_addressed=True)
+
+    digest = hashlib.sha256(b"page").hexdigest()
+    assert first.key == second.key == f"previews/{digest}"
+    assert len(r2_client.upload_calls) == 1
+    assert r2_client.upload_calls[0]["cache_control"] == IMMUTABLE_CACHE_CONTROL
+    assert r2_client.head_calls == [first.key, first.key]
+
+
+def test_content_addressed_upload_uses_local_cache_before_head(tmp_path, r2_client):
+    known_objects.clear()
+    service = R2StorageService(client=r2_client)
+    source = tmp_path / "doc.pdf"
+    source.write_bytes(b"same pdf")
+
+    first = service.upload_path(str(source), content_type="application/pdf", content_addressed=True)
+    second = service.upload_path(str(source), content_type="application/pdf", content_addressed=True)
+
+    assert first.key == second.key
+    assert second.checksum == hashlib.sha256(b"same pdf").hexdigest()
+    assert len(r2_client.upload_calls) == 1
+    assert r2_client.head_calls == [first.key]
+
+
+def test_upload_bytes_with_explicit_key(r2_client):
+    known_objects.clear()
+    service = R2StorageService(client=r2_client)
+
+    result = service.upload_bytes(b"page", content_type="image/webp", key="pages/doc/1-w800.webp")
+
+    assert result.key == "pages/doc/1-w800.webp"
+    assert result.url == "https://cdn.example.com/pages/doc/1-w800.webp"
+    assert result.checksum == hashlib.sha256(b"page").hexdigest()
+    assert r2_client.upload_calls == [{
+        "bucket": "test-bucket",
+        "key": "pages/doc/1-w800.webp",
+        "content_type": "image/webp",
+        "cache_control": IMMUTABLE_CACHE_CONTROL,
+        "payload": b"page",
+    }]
+    assert service.object_exists(result.key)
+    assert r2_client.head_calls == []
+
+
+@pytest.mark.parametrize("backend_factory", [MemoryStorageBackend, LocalStorageBackend])
+async def test_backends_share_upload_semantics(backend_factory, tmp_path):
+    backend = backend_factory() if backend_factory is MemoryStorageBackend else backend_factory(str(tmp_path))
+
+    first = backend.upload_bytes(b"payload", content_type="image/png", prefix="previews", content_addressed=True)
+    again = await backend.aupload_bytes(b"payload", content_type="image/png", prefix="previews", content_addressed=True)
+    streamed = await backend.upload_chunks(_chunks(b"pay", b"load"), content_type="image/png", prefix="previews")
+
+    assert first.key == again.key == f"previews/{hashlib.sha256(b'payload').hexdigest()}"
+    assert first.url == f"/uploads/{first.key}"
+    assert streamed.key != first.key
+    assert backend.read_bytes(streamed.key) == b"payload"
+
+    with pytest.raises(StorageSizeLimitError):
+        await backend.upload_chunks(_chunks(b"abc", b"def"), content_type="image/png", max_bytes=4)
+
+    backend.delete(first.key)
+    assert not backend.object_exists(first.key)
+    with pytest.raises(StorageObjectNotFound):
+        await backend.aread_bytes(first.key)
+
+
+def test_content_addressed_upload_path_enforces_max_bytes_for_existing_objects(tmp_path):
+    backend = MemoryStorageBackend()
+    source = tmp_path / "doc.pdf"
+    source.write_bytes(b"known payload")
+    backend.upload_path(str(source), content_type="application/pdf", content_addressed=True)
+
+    with pytest.raises(StorageSizeLimitError):
+        backend.upload_path(str(source), content_type="application/pdf", max_bytes=4, content_addressed=True)
+
+
+def test_local_backend_rejects_keys_outside_root(tmp_path):
+    backend = LocalStorageBackend(str(tmp_path / "uploads"))
+
+    with pytest.raises(StorageObjectNotFound):
+        backend.read_bytes("../secret")
+
+
+def test_uploads_route_serves_byte_ranges(client, tmp_path):
+    backend = LocalStorageBackend(str(tmp_path))
+    stored = backend.upload_bytes(b"0123456789", content_type="application/pdf", prefix="docs")
+    set_storage_backend(backend)
+    try:
+        full = client.get(stored.url)
+        partial = client.get(stored.url, headers={"Range": "bytes=2-5"})
+        suffix = client.get(stored.url, headers={"Range": "bytes=-3"})
+        unsatisfiable = client.get(stored.url, headers={"Range": "bytes=50-"})
+        missing = client.get("/uploads/docs/missing")
+    finally:
+        set_storage_backend(None)
+
+    assert full.status_code == 200
+    assert full.content == b"0123456789"
+    assert full.headers["content-type"] == "application/pdf"
+    assert full.headers["accept-ranges"] == "bytes"
+    assert partial.status_code == 206
+    assert partial.content == b"2345"
+    assert partial.headers["content-range"] == "bytes 2-5/10"
+    assert suffix.content == b"789"
+    assert unsatisfiable.status_code == 416
+    assert missing.status_code == 404
+
+
+def test_uploads_route_reads_files_off_the_event_loop(client, tmp_path, monkeypatch):
+    backend = LocalStorageBackend(str(tmp_path))
+    stored = backend.upload_bytes(b"0123456789", content_type="application/pdf", prefix="docs")
+    on_event_loop = []
+    serve = backend.serve
+
+    def recording_serve(*args, **kwargs):
+        try:
+            asyncio.get_running_loop()
+            on_event_loop.append(True)
+        except RuntimeError:
+            on_event_loop.append(False)
+        return serve(*args, **kwargs)
+
+    monkeypatch.setattr(backend, "serve", recording_serve)
+    set_storage_backend(backend)
+    try:
+        response = client.get(stored.url)
+    finally:
+        set_storage_backend(None)
+
+    assert response.content == b"0123456789"
+    assert on_event_loop == [False]
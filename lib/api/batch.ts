@@ -0,0 +1,30 @@
+import apiClient from './client'
+
+/**
+ * Batch API
+ *
+ * Runs several GETs to the API in one round trip, as the current user.
+ */
+
+export interface BatchSubRequest {
+  id?: string
+  method?: 'GET'
+  /** Path relative to the API root, e.g. `/events/123` or `/notifications/unread-count` */
+  path: string
+  headers?: Record<string, string>
+}
+
+export interface BatchSubResponse<T = any> {
+  id?: string
+  status: number
+  headers: Record<string, string>
+  body: T | null
+}
+
+/**
+ * Run sub-requests together; responses come back in request order
+ */
+export async function batch(requests: BatchSubRequest[]): Promise<BatchSubResponse[]> {
+  const response = await apiClient.post('/batch', { requests })
+  return response.data.responses
+}
@@ -0,0 +1,33 @@
+import apiClient from './client'
+import type { BlogPost } from './blog-service'
+import type { Event } from './events'
+
+/**
+ * Home page API
+ *
+ * Upcoming events, latest posts and counters in one round trip.
+ */
+
+export interface HomeCounts {
+  upcoming_events: number
+  blog_posts: number
+  content_posts: number
+  users: number
+}
+
+export interface HomeData {
+  upcoming_events: Event[]
+  blog_posts: BlogPost[]
+  content_posts: BlogPost[]
+  counts: HomeCounts
+}
+
+/**
+ * Get the public home page data
+ */
+export async function getHome(eventsLimit: number = 12, postsLimit: number = 4): Promise<HomeData> {
+  const response = await apiClient.get('/home', {
+    params: { events_limit: eventsLimit, posts_limit: postsLimit },
+  })
+  return response.data
+}